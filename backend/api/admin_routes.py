@@ -283,6 +283,8 @@ def delete_local_tenant_data():
             vector_store = get_hybrid_store()
             vector_store.delete_tenant_data(source_tenant)
             print(f"[Admin] Deleted Pinecone namespace for {source_tenant}")
+            from services.embedding_service import get_embedding_service
+            get_embedding_service().clear_tenant_index_state(source_tenant, db)
         except Exception as e:
             print(f"[Admin] Warning: Could not delete Pinecone data: {e}")
 
@@ -1147,6 +1149,63 @@ def get_unembedded_docs():
         db.close()
 
 
+@admin_bp.route('/embedding-cache-stats', methods=['GET'])
+@require_auth
+def get_embedding_cache_stats():
+    """
+    Query-embedding cache counters (per-turn memo + process LRU) and
+    answer cache hit rates. Super admin only. Counters are per worker process.
+
+    GET /api/admin/embedding-cache-stats
+    """
+    db = get_db()
+    try:
+        user = db.query(User).filter(User.id == g.user_id).first()
+        if not user or user.email not in SUPER_ADMIN_EMAILS:
+            return jsonify({"success": False, "error": "Forbidden"}), 403
+
+        from services.embedding_cache import get_embedding_cache_stats as _cache_stats
+        from services.answer_cache import get_answer_cache
+
+        answer_cache = get_answer_cache()
+        return jsonify({
+            "success": True,
+            "pid": os.getpid(),
+            **_cache_stats(),
+            "answer_cache": answer_cache.stats() if answer_cache else None,
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        db.close()
+
+
+@admin_bp.route('/rebuild-bm25-index', methods=['POST'])
+@require_auth
+def rebuild_bm25_index():
+    """
+    Rebuild the BM25 keyword index for a tenant from its embedded documents.
+    Super admin only. Defaults to the caller's tenant.
+
+    POST /api/admin/rebuild-bm25-index
+    Body: {"tenant_id": "..."}  (optional)
+    """
+    db = get_db()
+    try:
+        user = db.query(User).filter(User.id == g.user_id).first()
+        if not user or user.email not in SUPER_ADMIN_EMAILS:
+            return jsonify({"success": False, "error": "Forbidden"}), 403
+
+        tenant_id = (request.get_json(silent=True) or {}).get("tenant_id") or g.tenant_id
+        from services.embedding_service import get_embedding_service
+        result = get_embedding_service().rebuild_bm25_index(tenant_id, db)
+        return jsonify({"tenant_id": tenant_id, **result})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        db.close()
+
+
 @admin_bp.route('/refresh-models', methods=['POST'])
 @require_auth
 def refresh_models():
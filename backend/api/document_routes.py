@@ -3,6 +3,7 @@ Document API Routes
 REST endpoints for document management and classification.
 """
 
+import json
 import time
 import zipfile
 import io
@@ -10,7 +11,7 @@ import mimetypes
 import werkzeug.exceptions
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, Response, request, jsonify, g, stream_with_context
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_
 
@@ -19,6 +20,10 @@ from database.models import (
     DocumentStatus, DocumentClassification,
     utc_now
 )
+from database.document_search import apply_ranked_search
+from database.document_listing import (
+    KEYSET_SORTS, InvalidCursor, iter_summaries, keyset_page, listing_total, summary_row_to_dict
+)
 from services.auth_service import require_auth
 from services.classification_service import ClassificationService
 from services.embedding_service import get_embedding_service
@@ -169,6 +174,80 @@ def list_document_sources():
 # LIST DOCUMENTS
 # ============================================================================
 
+LISTING_FILTER_PARAMS = ('status', 'classification', 'needs_review', 'search', 'search_mode', 'source_type')
+
+
+def _filtered_documents_query(db: Session, args, tenant_id: str):
+    """
+    Document query with the listing filters applied (no ordering or paging).
+
+    Returns:
+        (query, rank_order) - rank_order is the best-match-first ORDER BY for
+        ranked search, else None
+    """
+    status = args.get('status')
+    classification = args.get('classification')
+    needs_review = args.get('needs_review', '').lower() == 'true'
+    search = args.get('search', '').strip()
+    search_mode = args.get('search_mode', 'substring')
+    source_type = args.get('source_type')
+
+    query = db.query(Document).filter(
+        Document.tenant_id == tenant_id,
+        Document.is_deleted == False,
+        Document.source_type != 'ctsi_shared',  # Hide shared CTSI data from documents page
+        Document.source_type != 'grant'  # Grants are accessed via chatbot RAG, not docs page
+    )
+
+    # Apply filters
+    if status:
+        status_map = {
+            'pending': DocumentStatus.PENDING,
+            'classified': DocumentStatus.CLASSIFIED,
+            'confirmed': DocumentStatus.CONFIRMED,
+            'rejected': DocumentStatus.REJECTED,
+            'archived': DocumentStatus.ARCHIVED
+        }
+        if status in status_map:
+            query = query.filter(Document.status == status_map[status])
+
+    if classification:
+        class_map = {
+            'work': DocumentClassification.WORK,
+            'personal': DocumentClassification.PERSONAL,
+            'spam': DocumentClassification.SPAM,
+            'unknown': DocumentClassification.UNKNOWN
+        }
+        if classification in class_map:
+            query = query.filter(Document.classification == class_map[classification])
+
+    if needs_review:
+        query = query.filter(
+            Document.status == DocumentStatus.CLASSIFIED,
+            Document.user_confirmed == False
+        )
+
+    rank_order = None
+    if search and search_mode == 'ranked':
+        ranked = apply_ranked_search(db, query, search)
+        if ranked:
+            query, rank_order = ranked
+
+    if search and rank_order is None:
+        search_pattern = f"%{search}%"
+        query = query.filter(
+            or_(
+                Document.title.ilike(search_pattern),
+                Document.sender.ilike(search_pattern)
+            )
+        )
+
+    if source_type:
+        query = query.filter(Document.source_type == source_type)
+
+    return query, rank_order
+
+
 @document_bp.route('', methods=['GET'])
 @require_auth
 def list_documents():
@@ -179,12 +258,24 @@ def list_documents():
         status: pending, classified, confirmed, rejected
         classification: work, personal, spam, unknown
         needs_review: true/false - only show documents needing review
-        search: search in title/content
+        search: search in title/sender
+        search_mode: substring (default) or ranked - full-text search over
+            title, sender and content, best matches first unless sort is given
         source_type: email, message, file
         limit: page size (default 50)
         offset: page offset (default 0)
         sort: field to sort by (created_at, classification_confidence)
         order: asc or desc
+        paginate: offset (default) or cursor - see below
+        cursor: next_cursor from the previous page (implies paginate=cursor)
+        total: cursor mode only - omit for no total, approx (planner estimate)
+            or cached (exact count reused for a minute)
+        format: json (default) or ndjson - streams every matching document,
+            one summary per line, for bulk export
+
+    Cursor mode pages on (sort, id) instead of OFFSET and selects only the
+    summary columns, so page 2000 costs the same as page 1. Ranked search
+    still filters by the full-text index but results follow the sort key.
 
     Response:
     {
@@ -197,80 +288,38 @@ def list_documents():
             "has_more": true
         }
     }
+
+    Cursor-mode pagination: {"limit", "next_cursor", "has_more", "total"}
     """
+    tenant_id = getattr(g, 'tenant_id', 'local-tenant')
+    if request.args.get('format') == 'ndjson':
+        return _export_documents_ndjson(tenant_id)
+    if request.args.get('paginate') == 'cursor' or 'cursor' in request.args:
+        return _list_documents_keyset(tenant_id)
+
     try:
         db = get_db()
         try:
-            # Parse query params
-            status = request.args.get('status')
-            classification = request.args.get('classification')
-            needs_review = request.args.get('needs_review', '').lower() == 'true'
-            search = request.args.get('search', '').strip()
-            source_type = request.args.get('source_type')
             limit = min(int(request.args.get('limit', 1000)), 10000)
             offset = int(request.args.get('offset', 0))
             sort = request.args.get('sort', 'created_at')
             order = request.args.get('order', 'desc')
 
-            # Build query
-            query = db.query(Document).options(
-                joinedload(Document.connector)
-            ).filter(
-                Document.tenant_id == getattr(g, 'tenant_id', 'local-tenant'),
-                Document.is_deleted == False,
-                Document.source_type != 'ctsi_shared',  # Hide shared CTSI data from documents page
-                Document.source_type != 'grant'  # Grants are accessed via chatbot RAG, not docs page
-            )
-
-            # Apply filters
-            if status:
-                status_map = {
-                    'pending': DocumentStatus.PENDING,
-                    'classified': DocumentStatus.CLASSIFIED,
-                    'confirmed': DocumentStatus.CONFIRMED,
-                    'rejected': DocumentStatus.REJECTED,
-                    'archived': DocumentStatus.ARCHIVED
-                }
-                if status in status_map:
-                    query = query.filter(Document.status == status_map[status])
-
-            if classification:
-                class_map = {
-                    'work': DocumentClassification.WORK,
-                    'personal': DocumentClassification.PERSONAL,
-                    'spam': DocumentClassification.SPAM,
-                    'unknown': DocumentClassification.UNKNOWN
-                }
-                if classification in class_map:
-                    query = query.filter(Document.classification == class_map[classification])
-
-            if needs_review:
-                query = query.filter(
-                    Document.status == DocumentStatus.CLASSIFIED,
-                    Document.user_confirmed == False
-                )
-
-            if search:
-                search_pattern = f"%{search}%"
-                query = query.filter(
-                    or_(
-                        Document.title.ilike(search_pattern),
-                        Document.sender.ilike(search_pattern)
-                    )
-                )
-
-            if source_type:
-                query = query.filter(Document.source_type == source_type)
+            query, rank_order = _filtered_documents_query(db, request.args, tenant_id)
+            query = query.options(joinedload(Document.connector))
 
             # Get total count
             total = query.count()
 
-            # Apply sorting
-            sort_column = getattr(Document, sort, Document.created_at)
-            if order == 'asc':
-                query = query.order_by(sort_column.asc())
+            # Apply sorting (ranked search orders by relevance unless a sort is requested)
+            if rank_order is not None and 'sort' not in request.args:
+                query = query.order_by(rank_order, Document.created_at.desc())
             else:
-                query = query.order_by(sort_column.desc())
+                sort_column = getattr(Document, sort, Document.created_at)
+                if order == 'asc':
+                    query = query.order_by(sort_column.asc())
+                else:
+                    query = query.order_by(sort_column.desc())
 
             # Apply pagination
             documents = query.offset(offset).limit(limit).all()
@@ -296,6 +345,80 @@ def list_documents():
         }), 500
 
 
+def _listing_sort_args():
+    sort = request.args.get('sort', 'created_at')
+    order = 'asc' if request.args.get('order') == 'asc' else 'desc'
+    if sort not in KEYSET_SORTS:
+        raise InvalidCursor(f"sort must be one of {', '.join(KEYSET_SORTS)} in cursor mode")
+    return sort, order
+
+
+def _list_documents_keyset(tenant_id: str):
+    """Cursor-paginated, column-projected page of GET /api/documents."""
+    try:
+        db = get_db()
+        try:
+            sort, order = _listing_sort_args()
+            limit = max(1, min(int(request.args.get('limit', 50)), 1000))
+            query, _ = _filtered_documents_query(db, request.args, tenant_id)
+            rows, next_cursor = keyset_page(query, sort, order, request.args.get('cursor'), limit)
+
+            pagination = {
+                "limit": limit,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
+            }
+            total_mode = request.args.get('total')
+            if total_mode in ('approx', 'cached'):
+                signature = json.dumps({k: request.args.get(k) for k in LISTING_FILTER_PARAMS}, sort_keys=True)
+                pagination["total"] = listing_total(db, query, tenant_id, signature, total_mode)
+                pagination["total_mode"] = total_mode
+
+            return jsonify({
+                "success": True,
+                "documents": [summary_row_to_dict(row) for row in rows],
+                "pagination": pagination
+            })
+
+        finally:
+            db.close()
+
+    except InvalidCursor as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+def _export_documents_ndjson(tenant_id: str):
+    """Stream every matching document summary as NDJSON (keyset batches, bounded memory)."""
+    try:
+        sort, order = _listing_sort_args()
+    except InvalidCursor as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    args = request.args.copy()
+
+    def generate():
+        db = get_db()
+        try:
+            query, _ = _filtered_documents_query(db, args, tenant_id)
+            for summary in iter_summaries(query, sort, order):
+                yield json.dumps(summary, default=str) + "\n"
+        except Exception as e:
+            print(f"[Documents] NDJSON export failed for tenant {tenant_id}: {e}", flush=True)
+            yield json.dumps({"error": str(e)}) + "\n"
+        finally:
+            db.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename="documents.ndjson"'}
+    )
+
+
 # ============================================================================
 # GET SINGLE DOCUMENT
 # ============================================================================
@@ -2832,6 +2955,8 @@ def delete_all_documents():
                 vector_store = get_hybrid_store()
                 vector_store.delete_tenant_data(tenant_id)
                 embeddings_deleted = True
+                from services.embedding_service import get_embedding_service
+                get_embedding_service().clear_tenant_index_state(tenant_id, db)
                 print(f"[DeleteAll] Deleted Pinecone namespace for {tenant_id}")
             except Exception as e:
                 print(f"[DeleteAll] Warning: Could not delete Pinecone data: {e}")
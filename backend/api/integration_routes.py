@@ -3753,6 +3753,8 @@ def _run_connector_sync(
                     doc.external_id for doc in existing_docs_query
                     if doc.content and len(doc.content.strip()) > 100
                 )
+                # Connectors that only yield new or changed documents replace any stored one
+                stored_external_ids = set(doc.external_id for doc in existing_docs_query)
                 print(f"[Sync] Pre-fetched dedup sets: {len(deleted_external_ids)} deleted, {len(existing_external_ids)} existing embedded")
 
                 # Delete documents with empty content so they can be re-synced
@@ -3778,7 +3780,9 @@ def _run_connector_sync(
                 _incremental_batch = [0]
                 _incremental_skipped = [0]
                 _incremental_errors = [0]
+                _incremental_replaced = [0]
                 _incremental_db = [db]  # Mutable ref for session refresh
+                _incremental_batch_ids = []  # doc_ids added since the last commit
                 _INCREMENTAL_BATCH_SIZE = 10
                 # Lock protects the shared session + counters — connectors
                 # like Box call this callback from multiple ThreadPoolExecutor
@@ -3789,6 +3793,47 @@ def _run_connector_sync(
                 # Capture connector_id for use in closure (avoid nonlocal issues)
                 _connector_id = connector.id
 
+                def _record_saved(doc):
+                    """Count a document added to (or replaced in) the session; commit in batches (caller holds the lock)."""
+                    _incremental_batch[0] += 1
+                    _incremental_count[0] += 1
+                    _incremental_batch_ids.append(doc.doc_id)
+
+                    # Commit in batches
+                    if _incremental_batch[0] >= _INCREMENTAL_BATCH_SIZE:
+                        committed_ids = list(_incremental_batch_ids)
+                        _incremental_batch_ids.clear()
+                        try:
+                            _incremental_db[0].commit()
+                            print(f"[Sync] Incremental save: committed batch ({_incremental_count[0]} total, {_incremental_skipped[0]} skipped, {_incremental_errors[0]} errors)", flush=True)
+                            instance.documents_committed(committed_ids)
+                        except Exception as commit_err:
+                            print(f"[Sync] Incremental commit error: {commit_err}", flush=True)
+                            _incremental_errors[0] += _incremental_batch[0]
+                            try:
+                                _incremental_db[0].rollback()
+                            except Exception:
+                                pass
+                            try:
+                                _incremental_db[0].close()
+                            except Exception:
+                                pass
+                            _incremental_db[0] = get_db()
+                        _incremental_batch[0] = 0
+
+                    # Update progress
+                    current_doc_name = doc.title[:50] if doc.title else f"Document {_incremental_count[0]}"
+                    sync_progress[progress_key]["documents_parsed"] = _incremental_count[0]
+                    sync_progress[progress_key]["current_file"] = current_doc_name
+                    if sync_id:
+                        progress_service.update_progress(
+                            sync_id,
+                            status='syncing',
+                            stage=f'Parsed {_incremental_count[0]} documents...',
+                            processed_items=_incremental_count[0],
+                            current_item=current_doc_name
+                        )
+
                 def _on_document_ready(doc):
                     """Save a single document to DB immediately when connector parses it.
 
@@ -3797,7 +3842,38 @@ def _run_connector_sync(
                     """
                     with _incremental_lock:
                         # Dedup check
-                        if doc.doc_id in deleted_external_ids or doc.doc_id in existing_external_ids:
+                        if doc.doc_id in deleted_external_ids:
+                            # Deleted by the user on purpose: nothing to persist, the connector may move on
+                            _incremental_skipped[0] += 1
+                            instance.documents_committed([doc.doc_id])
+                            return
+                        if instance.REPLACES_CHANGED_DOCUMENTS and doc.doc_id in stored_external_ids:
+                            # The connector only yields new or changed documents: replace the stored one
+                            existing_doc = _incremental_db[0].query(Document).filter(
+                                Document.tenant_id == tenant_id,
+                                Document.connector_id == _connector_id,
+                                Document.external_id == doc.doc_id
+                            ).first()
+                            if existing_doc is not None:
+                                if existing_doc.content == doc.content and existing_doc.title == doc.title:
+                                    _incremental_skipped[0] += 1
+                                    instance.documents_committed([doc.doc_id])
+                                    return
+                                existing_doc.title = doc.title
+                                existing_doc.content = doc.content
+                                existing_doc.doc_metadata = doc.metadata
+                                existing_doc.sender = doc.author
+                                existing_doc.source_url = doc.url
+                                existing_doc.source_updated_at = doc.timestamp
+                                existing_doc.structured_summary = None
+                                existing_doc.structured_summary_at = None
+                                # Re-embedded below; stale chunks are dropped by the chunk fingerprints
+                                existing_doc.embedded_at = None
+                                existing_doc.embedding_generated = False
+                                _incremental_replaced[0] += 1
+                                _record_saved(doc)
+                                return
+                        elif doc.doc_id in existing_external_ids:
                             _incremental_skipped[0] += 1
                             return
 
@@ -3854,40 +3930,7 @@ def _run_connector_sync(
                             return
 
                         _incremental_db[0].add(db_doc)
-                        _incremental_batch[0] += 1
-                        _incremental_count[0] += 1
-
-                        # Commit in batches
-                        if _incremental_batch[0] >= _INCREMENTAL_BATCH_SIZE:
-                            try:
-                                _incremental_db[0].commit()
-                                print(f"[Sync] Incremental save: committed batch ({_incremental_count[0]} total, {_incremental_skipped[0]} skipped, {_incremental_errors[0]} errors)", flush=True)
-                            except Exception as commit_err:
-                                print(f"[Sync] Incremental commit error: {commit_err}", flush=True)
-                                _incremental_errors[0] += _incremental_batch[0]
-                                try:
-                                    _incremental_db[0].rollback()
-                                except Exception:
-                                    pass
-                                try:
-                                    _incremental_db[0].close()
-                                except Exception:
-                                    pass
-                                _incremental_db[0] = get_db()
-                            _incremental_batch[0] = 0
-
-                        # Update progress
-                        current_doc_name = doc.title[:50] if doc.title else f"Document {_incremental_count[0]}"
-                        sync_progress[progress_key]["documents_parsed"] = _incremental_count[0]
-                        sync_progress[progress_key]["current_file"] = current_doc_name
-                        if sync_id:
-                            progress_service.update_progress(
-                                sync_id,
-                                status='syncing',
-                                stage=f'Parsed {_incremental_count[0]} documents...',
-                                processed_items=_incremental_count[0],
-                                current_item=current_doc_name
-                            )
+                        _record_saved(doc)
 
                 # Set callback on connector instance
                 instance.on_document_ready = _on_document_ready
@@ -4058,6 +4101,7 @@ def _run_connector_sync(
                     try:
                         _incremental_db[0].commit()
                         print(f"[Sync] Flushed final incremental batch ({_incremental_count[0]} total saved)", flush=True)
+                        instance.documents_committed(list(_incremental_batch_ids))
                     except Exception as flush_err:
                         print(f"[Sync] Final incremental flush error: {flush_err}", flush=True)
                         try: _incremental_db[0].rollback()
@@ -4080,11 +4124,39 @@ def _run_connector_sync(
                     raise Exception(f"Failed to re-fetch connector after session refresh")
                 print(f"[Sync] Database session refreshed successfully")
 
+                # === SOURCE DELETIONS: documents the connector found removed at the source ===
+                removed_ids = list(getattr(instance, 'removed_doc_ids', None) or [])
+                if removed_ids:
+                    removed_docs = db.query(Document).filter(
+                        Document.tenant_id == tenant_id,
+                        Document.connector_id == connector.id,
+                        Document.external_id.in_(removed_ids)
+                    ).all()
+                    embedded_ids = [str(d.id) for d in removed_docs if d.embedded_at]
+                    embeddings_removed = not embedded_ids or get_embedding_service().delete_document_embeddings(
+                        document_ids=embedded_ids, tenant_id=tenant_id, db=db
+                    ).get('success')
+                    if embeddings_removed:
+                        for removed_doc in removed_docs:
+                            db.delete(removed_doc)
+                        try:
+                            db.commit()
+                            instance.documents_committed(removed_ids)
+                            print(f"[Sync] Removed {len(removed_docs)} documents deleted at the source", flush=True)
+                        except Exception as remove_err:
+                            print(f"[Sync] Error removing documents deleted at the source: {remove_err}", flush=True)
+                            try: db.rollback()
+                            except Exception: pass
+                    else:
+                        # Not reported committed, so the connector offers the removal again next sync
+                        print(f"[Sync] Could not delete embeddings of {len(embedded_ids)} removed documents, retrying next sync", flush=True)
+
                 original_count = len(documents) if documents else 0
                 incremental_saved = _incremental_count[0]
                 incremental_skipped = _incremental_skipped[0]
 
-                print(f"[Sync] Sync returned {original_count} docs total, {incremental_saved} saved incrementally, {incremental_skipped} skipped (dedup)")
+                print(f"[Sync] Sync returned {original_count} docs total, {incremental_saved} saved incrementally "
+                      f"({_incremental_replaced[0]} replaced), {incremental_skipped} skipped (dedup)")
 
                 # === FALLBACK: batch-save for connectors that don't call on_document_ready ===
                 # If connector returned docs but callback wasn't called, save them the old way
@@ -4110,6 +4182,7 @@ def _run_connector_sync(
 
                         BATCH_SIZE = 10
                         batch_count = 0
+                        batch_ids = []
                         for i, doc in enumerate(new_documents):
                             save_pct = ((i + 1) / len(new_documents)) * 33.0
                             current_doc_name = doc.title[:50] if doc.title else f"Document {i+1}"
@@ -4168,11 +4241,13 @@ def _run_connector_sync(
                             )
                             db.add(db_doc)
                             batch_count += 1
+                            batch_ids.append(doc.doc_id)
 
                             if batch_count >= BATCH_SIZE:
                                 try:
                                     db.commit()
                                     print(f"[Sync] Batch saved {i+1}/{len(new_documents)} documents", flush=True)
+                                    instance.documents_committed(batch_ids)
                                 except Exception as commit_err:
                                     print(f"[Sync] Batch commit error: {commit_err}", flush=True)
                                     try: db.rollback()
@@ -4182,11 +4257,13 @@ def _run_connector_sync(
                                     db = get_db()
                                     connector = db.query(Connector).filter(Connector.id == connector_id_for_refresh).first()
                                 batch_count = 0
+                                batch_ids = []
 
                         if batch_count > 0:
                             try:
                                 db.commit()
                                 print(f"[Sync] Final batch saved ({len(new_documents)} total)", flush=True)
+                                instance.documents_committed(batch_ids)
                             except Exception as commit_err:
                                 print(f"[Sync] Final batch commit error: {commit_err}", flush=True)
                                 try: db.rollback()
@@ -4209,7 +4286,9 @@ def _run_connector_sync(
                 if original_count == 0 and new_doc_count == 0 and connector_error:
                     print(f"[Sync] ERROR: Connector reported error with 0 docs: {connector_error}", flush=True)
                     raise Exception(connector_error)
-                elif original_count == 0 and new_doc_count == 0 and connector_type in ('webscraper', 'firecrawl'):
+                # An incremental crawl where every page answered 304 Not Modified is not an error
+                elif (original_count == 0 and new_doc_count == 0 and connector_type in ('webscraper', 'firecrawl')
+                      and not getattr(instance, 'unchanged_count', 0)):
                     error_msg = "Website returned no content. The site may be blocking cloud servers, or the pages may have no extractable text."
                     print(f"[Sync] ERROR: {error_msg}", flush=True)
                     raise Exception(error_msg)
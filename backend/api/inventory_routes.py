@@ -256,7 +256,7 @@ def delete_item(item_id):
         # Remove from Pinecone
         try:
             embedding_service = get_embedding_service()
-            embedding_service.delete_inventory_embeddings([item_id], g.tenant_id)
+            embedding_service.delete_inventory_embeddings([item_id], g.tenant_id, db)
         except Exception as embed_err:
             print(f"[Inventory] Warning: Failed to delete embedding: {embed_err}")
 
@@ -1318,7 +1318,7 @@ def clear_all_inventory():
         if item_ids:
             try:
                 embedding_service = get_embedding_service()
-                embedding_service.delete_inventory_embeddings(item_ids, g.tenant_id)
+                embedding_service.delete_inventory_embeddings(item_ids, g.tenant_id, db)
             except Exception as embed_err:
                 print(f"[Inventory] Warning: Failed to delete embeddings: {embed_err}")
 
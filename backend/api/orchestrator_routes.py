@@ -4,6 +4,7 @@ import json
 import logging
 from flask import Blueprint, request, g, Response, stream_with_context
 from services.auth_service import require_auth
+from services.embedding_cache import embedding_scoped
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +46,7 @@ def orchestrated_chat():
         file_bytes = f.read()
         filename = f.filename
 
+    @embedding_scoped("orchestrated_chat")
     def generate():
         try:
             # --- LAYER 1: Intent Gate ---
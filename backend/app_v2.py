@@ -3063,12 +3063,12 @@ def get_citation_graph():
     if not openalex_id:
         return jsonify({'error': 'openalex_id required'}), 400
 
-    depth = min(data.get('depth', 1), 2)  # Cap at 2
-    max_nodes = min(data.get('max_nodes', 50), 100)  # Cap at 100
+    depth = min(data.get('depth', 1), 3)  # Cap at 3
+    max_nodes = min(data.get('max_nodes', 50), 500)  # Cap at 500
 
     try:
-        from services.citation_graph_service import CitationGraphService
-        service = CitationGraphService()
+        from services.citation_graph_service import get_citation_graph_service
+        service = get_citation_graph_service()
         graph = service.build_citation_graph(openalex_id, depth=depth, max_nodes=max_nodes)
         return jsonify(graph)
     except Exception as e:
@@ -5,6 +5,7 @@ Background job processing for long-running operations.
 
 import os
 from celery import Celery
+from celery.signals import worker_process_init
 from kombu import Exchange, Queue
 
 # Get Redis URL from environment or use localhost
@@ -140,6 +141,22 @@ class CallbackTask(celery.Task):
 celery.Task = CallbackTask
 
 
+# ============================================================================
+# WORKER STARTUP
+# ============================================================================
+
+@worker_process_init.connect
+def prewarm_models(**kwargs):
+    """Load the oncology models in each worker process before the first task (ONCOLOGY_PREWARM=1)."""
+    if os.getenv('ONCOLOGY_PREWARM', '').lower() not in ('1', 'true', 'yes'):
+        return
+    try:
+        from oncology_model.inference import get_oncology_suite
+        get_oncology_suite().warmup()
+    except Exception as e:
+        print(f"[Celery] Oncology model pre-warm failed: {e}", flush=True)
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
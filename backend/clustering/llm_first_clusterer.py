@@ -21,6 +21,7 @@ from dataclasses import dataclass, field, asdict
 import numpy as np
 from collections import defaultdict
 import pickle
+from concurrent.futures import ThreadPoolExecutor
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -29,6 +30,8 @@ from sentence_transformers import SentenceTransformer
 import networkx as nx
 from networkx.algorithms import community
 
+from clustering.neighbor_candidates import candidate_pairs
+
 # Load environment
 from dotenv import load_dotenv
 
@@ -38,6 +41,9 @@ AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 AZURE_API_VERSION = "2025-01-01-preview"
 AZURE_CHAT_DEPLOYMENT = "gpt-5-chat"
 
+# Concurrent LLM requests while adjudicating candidate pairs
+PAIR_COMPARISON_CONCURRENCY = int(os.getenv("LLM_CLUSTER_CONCURRENCY", "8"))
+
 load_dotenv()
 
 
@@ -251,6 +257,40 @@ Focus on CONCRETE deliverables, not vague mentions of work."""
     # Phase 2: Pairwise LLM Comparison with Embedding Pre-filter
     # =========================================================================
 
+    def _format_signature(self, sig: ProjectSignature) -> str:
+        """Signature fields as shown to the LLM in comparison prompts"""
+        return f"""- Deliverable: {sig.core_deliverable}
+- Goal: {sig.project_goal}
+- Entities: {', '.join(sig.key_entities)}
+- Keywords: {', '.join(sig.technical_keywords)}
+- Identifiers: {', '.join(sig.unique_identifiers)}
+- Phase: {sig.timeline_phase}
+- Summary: {sig.content_summary}"""
+
+    def _signature_fingerprint(self, sig: ProjectSignature) -> str:
+        """Hash of everything in a signature except doc_id"""
+        fields = asdict(sig)
+        fields.pop('doc_id', None)
+        return hashlib.md5(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+    def _pair_cache_key(self, sig1: ProjectSignature, sig2: ProjectSignature) -> str:
+        """
+        Cache key for a pair decision, keyed by both signatures (order-free).
+        A document whose signature changes gets fresh comparisons; unchanged
+        pairs are never re-adjudicated.
+        """
+        fingerprints = sorted([self._signature_fingerprint(sig1), self._signature_fingerprint(sig2)])
+        return self._get_cache_key("".join(fingerprints), "pair")
+
+    @staticmethod
+    def _edge_weight(decision: str, confidence: float) -> float:
+        """Edge weight for an LLM decision"""
+        if decision == "YES":
+            return confidence
+        if decision == "MAYBE":
+            return confidence * 0.5
+        return 0.0
+
     def compare_documents_llm(
         self,
         sig1: ProjectSignature,
@@ -264,8 +304,7 @@ Focus on CONCRETE deliverables, not vague mentions of work."""
             decision: "YES" | "NO" | "MAYBE"
         """
         # Create cache key from both signatures
-        content_key = f"{sig1.doc_id}_{sig2.doc_id}"
-        cache_key = self._get_cache_key(content_key, "comparison")
+        cache_key = self._pair_cache_key(sig1, sig2)
         cached = self._load_from_cache(cache_key)
         if cached:
             return cached['decision'], cached['confidence'], cached['reasoning']
@@ -273,22 +312,10 @@ Focus on CONCRETE deliverables, not vague mentions of work."""
         prompt = f"""Are these two documents part of the SAME project?
 
 DOCUMENT 1:
-- Deliverable: {sig1.core_deliverable}
-- Goal: {sig1.project_goal}
-- Entities: {', '.join(sig1.key_entities)}
-- Keywords: {', '.join(sig1.technical_keywords)}
-- Identifiers: {', '.join(sig1.unique_identifiers)}
-- Phase: {sig1.timeline_phase}
-- Summary: {sig1.content_summary}
+{self._format_signature(sig1)}
 
 DOCUMENT 2:
-- Deliverable: {sig2.core_deliverable}
-- Goal: {sig2.project_goal}
-- Entities: {', '.join(sig2.key_entities)}
-- Keywords: {', '.join(sig2.technical_keywords)}
-- Identifiers: {', '.join(sig2.unique_identifiers)}
-- Phase: {sig2.timeline_phase}
-- Summary: {sig2.content_summary}
+{self._format_signature(sig2)}
 
 Consider:
 - Same core deliverable? (even if worded differently)
@@ -329,20 +356,146 @@ Be conservative with YES (high recall). Only say NO if clearly different project
             print(f"⚠ Comparison failed: {e}")
             return "MAYBE", 0.5, "Comparison error"
 
+    def compare_pairs_llm(
+        self,
+        pairs: List[Tuple[ProjectSignature, ProjectSignature]]
+    ) -> List[Tuple[str, float, str]]:
+        """
+        Adjudicate several document pairs with one LLM call.
+
+        Pairs the model skips (or a failed call) fall back to
+        compare_documents_llm one at a time.
+
+        Returns:
+            One (decision, confidence, reasoning) per pair, in input order
+        """
+        if len(pairs) == 1:
+            return [self.compare_documents_llm(*pairs[0])]
+
+        blocks = "\n\n".join(
+            f"PAIR P{n}\nDOCUMENT A:\n{self._format_signature(a)}\nDOCUMENT B:\n{self._format_signature(b)}"
+            for n, (a, b) in enumerate(pairs, 1)
+        )
+        prompt = f"""For each pair below, are the two documents part of the SAME project?
+
+{blocks}
+
+For every pair consider:
+- Same core deliverable? (even if worded differently)
+- Same entities/client/stakeholder?
+- Shared unique identifiers (project codes, names)?
+- Compatible timeline phases?
+- Same ultimate goal?
+
+Judge each pair independently. Respond in JSON with one entry per pair:
+{{
+  "comparisons": [
+    {{"pair": "P1", "decision": "YES|NO|MAYBE", "confidence": 0.0-1.0, "reasoning": "Brief explanation"}}
+  ]
+}}
+
+Be conservative with YES (high recall). Only say NO if clearly different projects."""
+
+        answers = {}
+        try:
+            response = self.client.chat.completions.create(
+                model=AZURE_CHAT_DEPLOYMENT,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.0,
+                response_format={"type": "json_object"}
+            )
+            result = json.loads(response.choices[0].message.content)
+            for item in result.get('comparisons', []):
+                label = str(item.get('pair', '')).strip().upper().lstrip('P')
+                if label.isdigit() and item.get('decision') in ("YES", "NO", "MAYBE"):
+                    answers[int(label) - 1] = item
+        except Exception as e:
+            print(f"⚠ Batched comparison failed, comparing pairs individually: {e}")
+
+        results = []
+        for n, (a, b) in enumerate(pairs):
+            item = answers.get(n)
+            if item is None:
+                results.append(self.compare_documents_llm(a, b))
+                continue
+            decision = {
+                'decision': item['decision'],
+                'confidence': item.get('confidence', 0.5),
+                'reasoning': item.get('reasoning', '')
+            }
+            self._save_to_cache(self._pair_cache_key(a, b), decision)
+            results.append((decision['decision'], decision['confidence'], decision['reasoning']))
+        return results
+
+    def adjudicate_pairs(
+        self,
+        pairs: List[Tuple[ProjectSignature, ProjectSignature]],
+        pairs_per_prompt: int = 1,
+        max_concurrent: int = PAIR_COMPARISON_CONCURRENCY
+    ) -> List[Tuple[str, float, str]]:
+        """
+        LLM decisions for many pairs: cached decisions are reused, the rest
+        are packed pairs_per_prompt to a prompt and run max_concurrent at a time.
+
+        Returns:
+            One (decision, confidence, reasoning) per pair, in input order
+        """
+        results: List[Optional[Tuple[str, float, str]]] = [None] * len(pairs)
+        pending = []
+        for n, (a, b) in enumerate(pairs):
+            cached = self._load_from_cache(self._pair_cache_key(a, b))
+            if cached:
+                results[n] = (cached['decision'], cached['confidence'], cached['reasoning'])
+            else:
+                pending.append(n)
+
+        print(f"  Cached pair decisions: {len(pairs) - len(pending)}, to adjudicate: {len(pending)}")
+        if not pending:
+            return results
+
+        size = max(1, pairs_per_prompt)
+        batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+
+        def run(batch):
+            return batch, self.compare_pairs_llm([pairs[n] for n in batch])
+
+        done = 0
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrent)) as executor:
+            for batch, batch_results in executor.map(run, batches):
+                for n, result in zip(batch, batch_results):
+                    results[n] = result
+                done += len(batch)
+                if done // 50 > (done - len(batch)) // 50:
+                    print(f"    LLM comparisons: {done}/{len(pending)}...")
+        return results
+
     def build_similarity_graph(
         self,
         signatures: List[ProjectSignature],
         embedding_threshold: float = 0.6,
-        llm_threshold: float = 0.5
+        llm_threshold: float = 0.5,
+        top_k: Optional[int] = None,
+        pairs_per_prompt: int = 1,
+        max_concurrent: int = PAIR_COMPARISON_CONCURRENCY,
+        block_size: int = 1024
     ) -> nx.Graph:
         """
         Build graph where edges connect documents in same project.
         Uses embedding pre-filter + LLM comparison.
 
+        The defaults compare every pair above embedding_threshold, one pair per
+        prompt. For large corpora (scalable mode) set top_k (e.g. 20) to only
+        compare each document with its nearest neighbours, and pairs_per_prompt
+        (e.g. 8) to pack several comparisons into one LLM call.
+
         Args:
             signatures: List of project signatures
             embedding_threshold: Min embedding similarity to do LLM comparison
             llm_threshold: Min LLM confidence to add edge
+            top_k: Max nearest neighbours per document (None = all above threshold)
+            pairs_per_prompt: Pairs adjudicated per LLM call
+            max_concurrent: Concurrent LLM calls
+            block_size: Rows per block when computing embedding similarities
 
         Returns:
             NetworkX graph
@@ -361,63 +514,40 @@ Be conservative with YES (high recall). Only say NO if clearly different project
         print("  Computing embeddings...")
         embeddings = model.encode(texts, show_progress_bar=False)
 
-        # Compute embedding similarities
-        print("  Computing embedding similarities...")
-        from sklearn.metrics.pairwise import cosine_similarity
-        embedding_sim = cosine_similarity(embeddings)
-
         # Build graph
         G = nx.Graph()
         for i, sig in enumerate(signatures):
             G.add_node(sig.doc_id, signature=sig)
 
-        # Only do LLM comparison for pairs above embedding threshold
         total_pairs = len(signatures) * (len(signatures) - 1) // 2
-        candidate_pairs = 0
-        llm_comparisons = 0
-        edges_added = 0
-
         print(f"  Total possible pairs: {total_pairs}")
-        print(f"  Filtering with embedding threshold: {embedding_threshold}")
+        print(f"  Filtering with embedding threshold: {embedding_threshold}"
+              + (f", top {top_k} neighbours per document" if top_k else ""))
 
-        for i in range(len(signatures)):
-            for j in range(i + 1, len(signatures)):
-                candidate_pairs += 1
+        # Blocked similarity search - never holds the full n x n matrix
+        candidates = candidate_pairs(embeddings, embedding_threshold, top_k=top_k, block_size=block_size)
 
-                # Pre-filter with embeddings
-                if embedding_sim[i][j] < embedding_threshold:
-                    continue
-
-                # Do LLM comparison
-                llm_comparisons += 1
-                if llm_comparisons % 50 == 0:
-                    print(f"    LLM comparisons: {llm_comparisons}...")
+        decisions = self.adjudicate_pairs(
+            [(signatures[i], signatures[j]) for i, j, _ in candidates],
+            pairs_per_prompt=pairs_per_prompt,
+            max_concurrent=max_concurrent
+        )
 
-                decision, confidence, reasoning = self.compare_documents_llm(
-                    signatures[i],
-                    signatures[j]
+        edges_added = 0
+        for (i, j, _), (decision, confidence, reasoning) in zip(candidates, decisions):
+            edge_weight = self._edge_weight(decision, confidence)
+            if edge_weight >= llm_threshold:
+                G.add_edge(
+                    signatures[i].doc_id,
+                    signatures[j].doc_id,
+                    weight=edge_weight,
+                    decision=decision,
+                    reasoning=reasoning
                 )
-
-                # Add edge based on decision
-                edge_weight = 0.0
-                if decision == "YES":
-                    edge_weight = confidence
-                elif decision == "MAYBE":
-                    edge_weight = confidence * 0.5
-
-                if edge_weight >= llm_threshold:
-                    G.add_edge(
-                        signatures[i].doc_id,
-                        signatures[j].doc_id,
-                        weight=edge_weight,
-                        decision=decision,
-                        reasoning=reasoning
-                    )
-                    edges_added += 1
+                edges_added += 1
 
         print(f"✓ Graph built")
-        print(f"  - Candidate pairs (embedding > {embedding_threshold}): {llm_comparisons}")
-        print(f"  - LLM comparisons performed: {llm_comparisons}")
+        print(f"  - Candidate pairs (embedding > {embedding_threshold}): {len(candidates)}")
         print(f"  - Edges added: {edges_added}")
         print(f"  - Nodes: {G.number_of_nodes()}, Edges: {G.number_of_edges()}")
 
@@ -743,7 +873,9 @@ Respond in JSON:
         documents: List[Dict],
         embedding_threshold: float = 0.6,
         llm_threshold: float = 0.5,
-        merge_threshold: float = 0.85
+        merge_threshold: float = 0.85,
+        top_k: Optional[int] = None,
+        pairs_per_prompt: int = 1
     ) -> Dict[str, ProjectCluster]:
         """
         Complete high-accuracy clustering pipeline.
@@ -753,6 +885,8 @@ Respond in JSON:
             embedding_threshold: Pre-filter threshold
             llm_threshold: Min confidence to connect documents
             merge_threshold: Min confidence to merge clusters
+            top_k: Nearest neighbours compared per document (None = all above threshold)
+            pairs_per_prompt: Document pairs adjudicated per LLM call
 
         Returns:
             Dict of cluster_id -> ProjectCluster
@@ -772,7 +906,9 @@ Respond in JSON:
         G = self.build_similarity_graph(
             signatures,
             embedding_threshold=embedding_threshold,
-            llm_threshold=llm_threshold
+            llm_threshold=llm_threshold,
+            top_k=top_k,
+            pairs_per_prompt=pairs_per_prompt
         )
 
         # Phase 3: Detect communities
@@ -0,0 +1,76 @@
+"""
+Nearest-Neighbour Candidate Pairs
+=================================
+Finds the document pairs worth sending to the LLM without materializing the
+full n x n similarity matrix.
+
+Embeddings are L2-normalized once, then cosine similarities are computed one
+block of rows at a time (block_size x n), so peak memory is O(block_size * n)
+instead of O(n^2).
+
+- top_k=None: every pair at or above the threshold (same set the dense
+  cosine_similarity loop produced)
+- top_k=k: each document keeps only its k most similar neighbours above the
+  threshold; a pair is kept if either side selected the other
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalize rows; all-zero rows stay zero (cosine 0 to everything)."""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def candidate_pairs(
+    embeddings: np.ndarray,
+    threshold: float,
+    top_k: Optional[int] = None,
+    block_size: int = 1024
+) -> List[Tuple[int, int, float]]:
+    """
+    Candidate pairs by blocked cosine similarity.
+
+    Args:
+        embeddings: n x d embedding matrix (any norm)
+        threshold: Min cosine similarity for a pair to be a candidate
+        top_k: Max neighbours per document (None = no limit)
+        block_size: Rows per similarity block
+
+    Returns:
+        List of (i, j, similarity) with i < j, sorted by (i, j)
+    """
+    matrix = normalize_rows(embeddings)
+    n = len(matrix)
+    pairs = {}
+
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        sims = matrix[start:end] @ matrix.T
+        rows = np.arange(end - start)
+
+        if top_k is None:
+            # Upper triangle only: j > i
+            sims[np.arange(n)[None, :] <= (rows + start)[:, None]] = -np.inf
+            r, c = np.nonzero(sims >= threshold)
+            for i, j, s in zip(r + start, c, sims[r, c]):
+                pairs[(int(i), int(j))] = float(s)
+            continue
+
+        sims[rows, rows + start] = -np.inf
+        k = min(top_k, n - 1)
+        if k <= 0:
+            continue
+        neighbours = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        neighbour_sims = np.take_along_axis(sims, neighbours, axis=1)
+        r, c = np.nonzero(neighbour_sims >= threshold)
+        for i, j, s in zip(r + start, neighbours[r, c], neighbour_sims[r, c]):
+            key = (int(i), int(j)) if i < j else (int(j), int(i))
+            pairs[key] = float(s)
+
+    return [(i, j, pairs[(i, j)]) for i, j in sorted(pairs)]
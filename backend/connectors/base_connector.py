@@ -135,6 +135,10 @@ class BaseConnector(ABC):
     CONNECTOR_TYPE = "base"
     REQUIRED_CREDENTIALS = []
     OPTIONAL_SETTINGS = {}
+    # True when an incremental sync() yields only new or changed documents:
+    # the sync route then replaces a stored document with the same doc_id
+    # instead of skipping it as already synced
+    REPLACES_CHANGED_DOCUMENTS = False
 
     def __init__(self, config: ConnectorConfig):
         self.config = config
@@ -144,6 +148,18 @@ class BaseConnector(ABC):
         # Callback for incremental document saving — called as each doc is parsed
         # Signature: on_document_ready(doc: Document) -> None
         self.on_document_ready: Optional[Any] = None
+        # doc_ids the last sync found deleted at the source; the sync route
+        # deletes their documents and reports them via documents_committed()
+        self.removed_doc_ids: List[str] = []
+
+    def documents_committed(self, doc_ids: List[str]):
+        """
+        Called by the sync route once the documents with these doc_ids are
+        committed. Connectors that keep per-document sync state (e.g. HTTP
+        validators) record it here, so a document that never reached the
+        database is fetched again on the next sync.
+        """
+        pass
 
     @abstractmethod
     async def connect(self) -> bool:
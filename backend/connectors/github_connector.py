@@ -1,16 +1,42 @@
 """
 GitHub Connector
 OAuth integration and repository code analysis for 2nd Brain.
+
+Code is ingested from the repository tarball rather than one contents API
+call per file: the head commit is resolved, its tree is listed and
+filtered, and the tarball for that commit is streamed once, decoding only
+the selected entries (nothing is written to disk). Syncs therefore cost
+three API calls however many files they read. The commit SHA and each
+path's blob SHA are recorded (SQLite, GITHUB_STATE_PATH), so incremental
+syncs only re-read files whose blob SHA changed, and stop after one call
+when the head commit hasn't moved.
+
+An incremental sync yields changed files under their existing doc_ids
+(REPLACES_CHANGED_DOCUMENTS, so the sync route replaces the stored documents)
+and lists removed paths in removed_doc_ids. The new state is only recorded
+once the route reports every one of those doc_ids committed
+(documents_committed), so a failed save is retried by the next sync.
 """
 
 import os
 import re
+import tarfile
 import requests
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import datetime, timezone
 import base64
 
 from connectors.base_connector import BaseConnector, ConnectorConfig, ConnectorStatus, Document
+from services.openalex_client import ResponseCache
+
+# Read file contents from the repository tarball (false = per-file contents API)
+GITHUB_ARCHIVE_INGEST = os.getenv('GITHUB_ARCHIVE_INGEST', 'true').lower() in ('1', 'true', 'yes')
+# Commit SHA + blob SHAs of the last synced tree, per connector and repository. Empty string disables.
+GITHUB_STATE_PATH = os.getenv(
+    'GITHUB_STATE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'github_state.sqlite3'),
+)
+GITHUB_STATE_TTL_SECONDS = int(os.getenv('GITHUB_STATE_TTL_SECONDS', str(180 * 24 * 3600)))
 
 
 class GitHubConnector(BaseConnector):
@@ -27,6 +53,7 @@ class GitHubConnector(BaseConnector):
     """
 
     CONNECTOR_TYPE = "github"
+    REPLACES_CHANGED_DOCUMENTS = True
 
     def __init__(self, config_or_token: Union[ConnectorConfig, str, None] = None, access_token: Optional[str] = None):
         """
@@ -81,6 +108,20 @@ class GitHubConnector(BaseConnector):
             self.headers['Authorization'] = f'Bearer {self.access_token}'
             self.status = ConnectorStatus.CONNECTED
 
+        # Commit the last fetch_repository_code() call read from (None for the contents API path),
+        # and the blob SHA of every file it read
+        self.last_commit_sha: Optional[str] = None
+        self.last_blob_shas: Dict[str, str] = {}
+        # State of the current sync, recorded once all its doc_ids are committed
+        self._pending_state: Optional[Dict] = None
+        self._committed_doc_ids: set = set()
+        self.repo_state = None
+        if GITHUB_STATE_PATH:
+            try:
+                self.repo_state = ResponseCache(GITHUB_STATE_PATH, ttl_seconds=GITHUB_STATE_TTL_SECONDS)
+            except Exception as e:
+                print(f"[GitHub] Repository state disabled ({GITHUB_STATE_PATH}): {e}")
+
     # =========================================================================
     # OAUTH FLOW
     # =========================================================================
@@ -391,12 +432,122 @@ class GitHubConnector(BaseConnector):
             print(f"[GitHub] Error fetching {path}: {e}")
             return None
 
+    def get_head_commit(self, owner: str, repo: str, ref: str = 'HEAD') -> str:
+        """
+        Resolve a ref (default: the default branch) to its commit SHA.
+
+        Uses the sha media type, so the response is just the 40-character SHA.
+        """
+        response = requests.get(
+            f'{self.base_url}/repos/{owner}/{repo}/commits/{ref}',
+            headers={**self.headers, 'Accept': 'application/vnd.github.sha'},
+            timeout=15
+        )
+        response.raise_for_status()
+        return response.text.strip()
+
+    def iter_archive_files(self, owner: str, repo: str, ref: str, paths: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+        """
+        Stream the repository tarball at `ref` and yield (path, bytes) for the requested paths.
+
+        The archive is read straight off the response - nothing is written to
+        disk - and the download stops as soon as every requested path was seen.
+        """
+        remaining = set(paths)
+        if not remaining:
+            return
+        response = requests.get(
+            f'{self.base_url}/repos/{owner}/{repo}/tarball/{ref}',
+            headers=self.headers,
+            stream=True,
+            timeout=(15, 120)
+        )
+        response.raise_for_status()
+        response.raw.decode_content = True
+        with response, tarfile.open(fileobj=response.raw, mode='r|*') as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                # Entries sit under a '<owner>-<repo>-<short sha>/' directory
+                path = member.name.split('/', 1)[1] if '/' in member.name else member.name
+                if path not in remaining:
+                    continue
+                remaining.discard(path)
+                handle = archive.extractfile(member)
+                if handle is not None:
+                    yield path, handle.read()
+                if not remaining:
+                    break
+
+    def _fetch_contents(self, owner: str, repo: str, code_files: List[Dict],
+                        commit_sha: Optional[str]) -> Dict[str, Optional[str]]:
+        """
+        Text content per path for the given tree entries (None = binary).
+
+        Reads the tarball at commit_sha, falling back to the per-file contents
+        API if there is no commit or the archive can't be streamed. Paths that
+        could not be read are left out.
+        """
+        if commit_sha and code_files:
+            try:
+                contents = {}
+                for path, data in self.iter_archive_files(owner, repo, commit_sha, (f['path'] for f in code_files)):
+                    try:
+                        contents[path] = data.decode('utf-8')
+                    except UnicodeDecodeError:
+                        contents[path] = None  # Skip binary files
+                print(f"[GitHub] Read {len(contents)}/{len(code_files)} files from tarball at {commit_sha[:7]}")
+                return contents
+            except Exception as e:
+                print(f"[GitHub] Tarball ingestion failed ({e}), falling back to contents API")
+
+        contents = {}
+        for i, file_item in enumerate(code_files, 1):
+            path = file_item['path']
+            print(f"[GitHub] [{i}/{len(code_files)}] Fetching: {path}")
+            content = self.get_file_content(owner, repo, path)
+            if content is not None:  # binary and failed fetches look the same here
+                contents[path] = content
+        return contents
+
+    def _build_code_files(self, code_files: List[Dict], contents: Dict[str, Optional[str]],
+                          max_chars_per_file: int) -> List[Dict]:
+        results = []
+
+        for file_item in code_files:
+            path = file_item['path']
+            content = contents.get(path)
+
+            if content is None:
+                print(f"[GitHub]   → Skipped {path} (binary or error)")
+                continue
+
+            # Truncate if too long
+            if len(content) > max_chars_per_file:
+                content = content[:max_chars_per_file] + "\n\n[... truncated ...]"
+
+            # Detect language from extension
+            _, ext = os.path.splitext(path)
+            language = self._extension_to_language(ext)
+
+            results.append({
+                'path': path,
+                'content': content,
+                'language': language,
+                'size': file_item.get('size', len(content)),
+                'lines': content.count('\n') + 1,
+                'sha': file_item.get('sha')
+            })
+
+        return results
+
     def fetch_repository_code(
         self,
         owner: str,
         repo: str,
         max_files: int = 100,
-        max_chars_per_file: int = 50000
+        max_chars_per_file: int = 50000,
+        use_archive: Optional[bool] = None
     ) -> List[Dict]:
         """
         Fetch code files from repository with content.
@@ -406,6 +557,7 @@ class GitHubConnector(BaseConnector):
             repo: Repository name
             max_files: Maximum files to fetch
             max_chars_per_file: Max characters per file
+            use_archive: Read contents from the tarball (default: GITHUB_ARCHIVE_INGEST)
 
         Returns:
             List of dicts:
@@ -414,47 +566,133 @@ class GitHubConnector(BaseConnector):
                 'content': '...',
                 'language': 'Python',
                 'size': 1234,
-                'lines': 50
+                'lines': 50,
+                'sha': '<blob sha>'
             }
         """
-        print(f"[GitHub] Fetching repository tree: {owner}/{repo}")
-        tree = self.get_repository_tree(owner, repo)
+        if use_archive is None:
+            use_archive = GITHUB_ARCHIVE_INGEST
+
+        commit_sha = None
+        if use_archive:
+            try:
+                commit_sha = self.get_head_commit(owner, repo)
+            except Exception as e:
+                print(f"[GitHub] Could not resolve head commit ({e}), using contents API")
+
+        print(f"[GitHub] Fetching repository tree: {owner}/{repo}" + (f" @ {commit_sha[:7]}" if commit_sha else ""))
+        tree = self.get_repository_tree(owner, repo, branch=commit_sha) if commit_sha else self.get_repository_tree(owner, repo)
 
         print(f"[GitHub] Found {len(tree)} total items in repository")
         code_files = self.filter_code_files(tree, max_files=max_files)
 
         print(f"[GitHub] Filtered to {len(code_files)} code files")
 
-        results = []
+        contents = self._fetch_contents(owner, repo, code_files, commit_sha)
+        results = self._build_code_files(code_files, contents, max_chars_per_file)
+        self.last_commit_sha = commit_sha
+        self.last_blob_shas = {f['path']: f.get('sha') for f in code_files if f['path'] in contents}
 
-        for i, file_item in enumerate(code_files, 1):
-            path = file_item['path']
-            print(f"[GitHub] [{i}/{len(code_files)}] Fetching: {path}")
+        print(f"[GitHub] Successfully fetched {len(results)} files")
+        return results
 
-            content = self.get_file_content(owner, repo, path)
+    def fetch_changed_code(
+        self,
+        owner: str,
+        repo: str,
+        max_files: int = 100,
+        max_chars_per_file: int = 50000
+    ) -> Dict:
+        """
+        Fetch only the code files whose blob SHA changed since the recorded state.
 
-            if content is None:
-                print(f"[GitHub]   → Skipped (binary or error)")
-                continue
+        The tree at the current head commit is diffed against the blob SHAs
+        recorded by save_repository_state(). Unchanged head: one API call.
+        Otherwise: head + tree + one tarball stream covering only changed files.
 
-            # Truncate if too long
-            if len(content) > max_chars_per_file:
-                content = content[:max_chars_per_file] + "\n\n[... truncated ...]"
+        Returns:
+            {
+                'commit': '<head commit sha>',
+                'files': [...],      # changed/new files, as fetch_repository_code()
+                'removed': [...],    # paths no longer in the selected tree
+                'unchanged': 12,     # files skipped because their blob SHA matched
+                'blobs': {path: sha} # state to record once the files are processed
+            }
+        """
+        state = self.get_repository_state(owner, repo) or {}
+        previous = state.get('blobs', {})
+        commit_sha = self.get_head_commit(owner, repo)
 
-            # Detect language from extension
-            _, ext = os.path.splitext(path)
-            language = self._extension_to_language(ext)
+        if state.get('commit') == commit_sha:
+            print(f"[GitHub] {owner}/{repo} unchanged at {commit_sha[:7]}")
+            return {'commit': commit_sha, 'files': [], 'removed': [], 'unchanged': len(previous), 'blobs': previous}
 
-            results.append({
-                'path': path,
-                'content': content,
-                'language': language,
-                'size': file_item.get('size', len(content)),
-                'lines': content.count('\n') + 1
-            })
+        tree = self.get_repository_tree(owner, repo, branch=commit_sha)
+        code_files = self.filter_code_files(tree, max_files=max_files)
+        changed = [f for f in code_files if previous.get(f['path']) != f.get('sha')]
+        print(f"[GitHub] {owner}/{repo} {str(state.get('commit'))[:7]}..{commit_sha[:7]}: "
+              f"{len(changed)} of {len(code_files)} code files changed")
 
-        print(f"[GitHub] Successfully fetched {len(results)} files")
-        return results
+        contents = self._fetch_contents(owner, repo, changed, commit_sha)
+        files = self._build_code_files(changed, contents, max_chars_per_file)
+        selected = {f['path'] for f in code_files}
+
+        return {
+            'commit': commit_sha,
+            'files': files,
+            'removed': sorted(set(previous) - selected),
+            'unchanged': len(code_files) - len(changed),
+            # Files that could not be read stay out of the state, so they are retried next sync
+            'blobs': {f['path']: f.get('sha') for f in code_files
+                      if f['path'] in contents or previous.get(f['path']) == f.get('sha')},
+        }
+
+    def _state_key(self, owner: str, repo: str) -> str:
+        scope = self.config.connector_id or self.config.tenant_id or self.config.user_id
+        return f"{scope}:{owner}/{repo}".lower()
+
+    def get_repository_state(self, owner: str, repo: str) -> Optional[Dict]:
+        """{'commit', 'blobs': {path: blob sha}} recorded by the last successful sync."""
+        if self.repo_state is None:
+            return None
+        try:
+            return self.repo_state.get(self._state_key(owner, repo))
+        except Exception as e:
+            print(f"[GitHub] Repository state read failed: {e}")
+            return None
+
+    def save_repository_state(self, owner: str, repo: str, commit_sha: Optional[str], blobs: Dict[str, str]):
+        """Record the synced commit and blob SHAs (call after the files were processed)."""
+        if self.repo_state is None or not commit_sha:
+            return
+        try:
+            self.repo_state.put(self._state_key(owner, repo), {'commit': commit_sha, 'blobs': blobs})
+        except Exception as e:
+            print(f"[GitHub] Repository state write failed: {e}")
+
+    def _save_state_when_committed(self, owner: str, repo: str, commit_sha: Optional[str],
+                                   blobs: Dict[str, str], doc_ids: Iterable[str]):
+        """Record the repository state once every doc_id of this sync is committed."""
+        self._pending_state = {
+            'owner': owner, 'repo': repo, 'commit': commit_sha, 'blobs': blobs,
+            'waiting': set(doc_ids) - self._committed_doc_ids,
+        }
+        self.documents_committed([])
+
+    def documents_committed(self, doc_ids: List[str]):
+        """Called by the sync route after commits; records the state once nothing is outstanding."""
+        self._committed_doc_ids.update(doc_ids)
+        pending = self._pending_state
+        if pending is None:
+            return
+        pending['waiting'].difference_update(doc_ids)
+        if not pending['waiting']:
+            self._pending_state = None
+            self.save_repository_state(pending['owner'], pending['repo'], pending['commit'], pending['blobs'])
+
+    @staticmethod
+    def _file_doc_id(repository: str, path: str) -> str:
+        return f"github_{repository.replace('/', '_')}_{path.replace('/', '_')}"
 
     @staticmethod
     def _extension_to_language(ext: str) -> str:
@@ -581,12 +819,14 @@ class GitHubConnector(BaseConnector):
 
         This method:
         1. Gets the most recently updated repository (or uses configured repo)
-        2. Fetches code files from the repository
+        2. Fetches code files from the repository tarball (incremental syncs:
+           only files whose blob SHA changed since the last recorded sync)
         3. Analyzes the code using LLM (CodeAnalysisService)
         4. Returns Document objects containing the analysis
 
         Args:
-            since: Optional datetime to filter repositories updated after this time
+            since: Set for incremental syncs. With recorded repository state,
+                only changed files are fetched, analyzed and returned.
 
         Returns:
             List of Document objects containing:
@@ -601,6 +841,9 @@ class GitHubConnector(BaseConnector):
         try:
             self.status = ConnectorStatus.SYNCING
             documents = []
+            self.removed_doc_ids = []
+            self._pending_state = None
+            self._committed_doc_ids = set()
 
             # Get configured repository or most recent one
             repository = self.config.settings.get('repository') if self.config else None
@@ -629,17 +872,42 @@ class GitHubConnector(BaseConnector):
             max_files = self.config.settings.get('max_files', 100) if self.config else 100
             max_files_to_analyze = self.config.settings.get('max_files_to_analyze', 5) if self.config else 5
 
-            print(f"[GitHub] Fetching code from {repository}")
-            code_files = self.fetch_repository_code(
-                owner=owner,
-                repo=repo,
-                max_files=max_files
-            )
+            # Incremental sync: only files whose blob SHA changed since the last recorded sync
+            incremental = since is not None and self.get_repository_state(owner, repo) is not None
+            changes = {}
+
+            print(f"[GitHub] Fetching code from {repository}" + (" (changed files only)" if incremental else ""))
+            if incremental:
+                changes = self.fetch_changed_code(owner=owner, repo=repo, max_files=max_files)
+                code_files = changes['files']
+                commit_sha, blobs = changes['commit'], changes['blobs']
+                self.removed_doc_ids = [self._file_doc_id(repository, path) for path in changes['removed']]
+
+                if not code_files:
+                    print(f"[GitHub] No changed code files in {repository} ({changes['unchanged']} unchanged)")
+                    self._save_state_when_committed(owner, repo, commit_sha, blobs, self.removed_doc_ids)
+                    self.sync_stats = {
+                        'repository': repository,
+                        'commit': commit_sha,
+                        'documents_synced': 0,
+                        'files_unchanged': changes['unchanged'],
+                        'files_removed': changes['removed'],
+                        'sync_time': datetime.now(timezone.utc).isoformat()
+                    }
+                    self.status = ConnectorStatus.CONNECTED
+                    return []
+            else:
+                code_files = self.fetch_repository_code(
+                    owner=owner,
+                    repo=repo,
+                    max_files=max_files
+                )
+                commit_sha, blobs = self.last_commit_sha, self.last_blob_shas
 
-            if not code_files:
-                self.last_error = "No code files found in repository"
-                self.status = ConnectorStatus.CONNECTED
-                return []
+                if not code_files:
+                    self.last_error = "No code files found in repository"
+                    self.status = ConnectorStatus.CONNECTED
+                    return []
 
             # Get repository info for description
             repos = self.get_repositories()
@@ -668,32 +936,35 @@ class GitHubConnector(BaseConnector):
 
             # Create Document objects
 
-            # 1. Main documentation document
-            doc_main = Document(
-                doc_id=f"github_{repository.replace('/', '_')}_docs",
-                source="github",
-                content=analysis.get('documentation', ''),
-                title=f"{repository} - Technical Documentation",
-                metadata={
-                    'repository': repository,
-                    'analysis_type': 'comprehensive_documentation',
-                    'stats': analysis.get('stats', {})
-                },
-                timestamp=datetime.now(timezone.utc),
-                author=github_user,
-                url=f"https://github.com/{repository}",
-                doc_type="code"
-            )
-            documents.append(doc_main)
-            if self.on_document_ready:
-                try:
-                    self.on_document_ready(doc_main)
-                except Exception as cb_err:
-                    print(f"[GitHub] on_document_ready error: {cb_err}")
+            # Repository-level documents are only rebuilt on full syncs -
+            # an incremental sync analyzes just the changed files
+            if not incremental:
+                # 1. Main documentation document
+                doc_main = Document(
+                    doc_id=f"github_{repository.replace('/', '_')}_docs",
+                    source="github",
+                    content=analysis.get('documentation', ''),
+                    title=f"{repository} - Technical Documentation",
+                    metadata={
+                        'repository': repository,
+                        'analysis_type': 'comprehensive_documentation',
+                        'stats': analysis.get('stats', {})
+                    },
+                    timestamp=datetime.now(timezone.utc),
+                    author=github_user,
+                    url=f"https://github.com/{repository}",
+                    doc_type="code"
+                )
+                documents.append(doc_main)
+                if self.on_document_ready:
+                    try:
+                        self.on_document_ready(doc_main)
+                    except Exception as cb_err:
+                        print(f"[GitHub] on_document_ready error: {cb_err}")
 
-            # 2. Repository overview document
-            overview = analysis.get('repository_overview', {})
-            overview_content = f"""# {repository} - Repository Overview
+                # 2. Repository overview document
+                overview = analysis.get('repository_overview', {})
+                overview_content = f"""# {repository} - Repository Overview
 
 ## Purpose
 {overview.get('purpose', 'N/A')}
@@ -713,27 +984,27 @@ class GitHubConnector(BaseConnector):
 - Total Lines: {analysis.get('stats', {}).get('total_lines', 0):,}
 """
 
-            doc_overview = Document(
-                doc_id=f"github_{repository.replace('/', '_')}_overview",
-                source="github",
-                content=overview_content,
-                title=f"{repository} - Overview",
-                metadata={
-                    'repository': repository,
-                    'analysis_type': 'overview',
-                    'overview': overview
-                },
-                timestamp=datetime.now(timezone.utc),
-                author=github_user,
-                url=f"https://github.com/{repository}",
-                doc_type="code"
-            )
-            documents.append(doc_overview)
-            if self.on_document_ready:
-                try:
-                    self.on_document_ready(doc_overview)
-                except Exception as cb_err:
-                    print(f"[GitHub] on_document_ready error: {cb_err}")
+                doc_overview = Document(
+                    doc_id=f"github_{repository.replace('/', '_')}_overview",
+                    source="github",
+                    content=overview_content,
+                    title=f"{repository} - Overview",
+                    metadata={
+                        'repository': repository,
+                        'analysis_type': 'overview',
+                        'overview': overview
+                    },
+                    timestamp=datetime.now(timezone.utc),
+                    author=github_user,
+                    url=f"https://github.com/{repository}",
+                    doc_type="code"
+                )
+                documents.append(doc_overview)
+                if self.on_document_ready:
+                    try:
+                        self.on_document_ready(doc_overview)
+                    except Exception as cb_err:
+                        print(f"[GitHub] on_document_ready error: {cb_err}")
 
             # 3. Create a document for EVERY code file with actual content
             # This ensures all code files appear in the documents tab
@@ -789,7 +1060,7 @@ class GitHubConnector(BaseConnector):
 """
 
                 doc_file = Document(
-                    doc_id=f"github_{repository.replace('/', '_')}_{file_path.replace('/', '_')}",
+                    doc_id=self._file_doc_id(repository, file_path),
                     source="github",
                     content=doc_content,
                     title=f"{repository} - {file_path}",
@@ -798,11 +1069,13 @@ class GitHubConnector(BaseConnector):
                         'file_path': file_path,
                         'language': file_language,
                         'lines': file_lines,
-                        'has_analysis': file_analysis is not None
+                        'has_analysis': file_analysis is not None,
+                        'commit': commit_sha,
+                        'blob_sha': code_file.get('sha')
                     },
                     timestamp=datetime.now(timezone.utc),
                     author=github_user,
-                    url=f"https://github.com/{repository}/blob/main/{file_path}",
+                    url=f"https://github.com/{repository}/blob/{commit_sha or 'main'}/{file_path}",
                     doc_type="code"
                 )
                 documents.append(doc_file)
@@ -815,11 +1088,20 @@ class GitHubConnector(BaseConnector):
                 if (i + 1) % 20 == 0:
                     print(f"[GitHub] Created {i + 1}/{len(code_files)} file documents")
 
+            # Record what was synced so the next incremental sync can diff against it -
+            # once the route has committed the documents and removed the deleted paths
+            self._save_state_when_committed(owner, repo, commit_sha, blobs,
+                                            [d.doc_id for d in documents] + self.removed_doc_ids)
+
             # Update sync stats
             self.sync_stats = {
                 'repository': repository,
+                'commit': commit_sha,
+                'incremental': incremental,
                 'documents_synced': len(documents),
                 'files_analyzed': len(analysis.get('file_analyses', [])),
+                'files_unchanged': changes.get('unchanged', 0),
+                'files_removed': changes.get('removed', []),
                 'sync_time': datetime.now(timezone.utc).isoformat()
             }
 
@@ -6,24 +6,66 @@ Includes OCR for images without alt text via pytesseract.
 No external API keys required.
 
 SYNCHRONOUS implementation - works with gevent workers.
+
+Crawl engine:
+- A bounded pool of fetcher threads (max_concurrency) works through the
+  crawl frontier; a per-host gate spaces request starts by crawl_delay (or
+  the robots.txt Crawl-delay, if larger) and caps in-flight requests per
+  host (max_per_host)
+- HTML parsing, link discovery and content extraction run in a process
+  pool (WEBSCRAPER_PARSE_PROCESSES, 0 = parse on the fetcher threads), so
+  the GIL-bound BeautifulSoup work does not stall fetching
+- ETag / Last-Modified and outgoing links are stored per URL (SQLite,
+  WEBSCRAPER_STATE_PATH). Incremental syncs send conditional requests and
+  skip pages that answer 304 Not Modified, while still following their links.
+  A page's validators are only stored once the sync route reports its
+  Document committed (documents_committed), so a page whose save failed is
+  fetched and extracted again next time
+- The domain circuit breaker is unchanged
+
+Limitation under gevent: process pools don't mix with monkey-patched
+threading, so in a gevent worker WEBSCRAPER_PARSE_PROCESSES is ignored and
+pages are parsed on the fetcher "threads", which are greenlets. BeautifulSoup
+parsing then runs on the gevent hub and blocks every other greenlet of that
+worker (fetches, other requests) for the duration of each parse. Run large
+crawls from a Celery / threaded worker to get the parse pool.
 """
 
+import os
 import re
 import io
 import time
 import json
 import hashlib
+import threading
 import traceback
+import multiprocessing
 import xml.etree.ElementTree as ET
 from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional, Any, Set
+from typing import List, Dict, Optional, Any, Set, Iterator
 from urllib.parse import urlparse, urljoin, urldefrag, parse_qs, urlencode
+from urllib.robotparser import RobotFileParser
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup, Tag
 
 from .base_connector import BaseConnector, ConnectorConfig, ConnectorStatus, Document
+from services.openalex_client import ResponseCache
+
+# Worker processes for HTML parsing/extraction (0 parses on the fetcher threads).
+# Ignored under gevent, where parsing runs on the hub (see the module docstring)
+WEBSCRAPER_PARSE_PROCESSES = int(os.getenv("WEBSCRAPER_PARSE_PROCESSES", str(min(4, os.cpu_count() or 1))))
+# Per-URL ETag/Last-Modified for conditional re-crawls. Empty string disables.
+WEBSCRAPER_STATE_PATH = os.getenv(
+    "WEBSCRAPER_STATE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "webscraper_state.sqlite3"),
+)
+WEBSCRAPER_STATE_TTL_SECONDS = int(os.getenv("WEBSCRAPER_STATE_TTL_SECONDS", str(30 * 24 * 3600)))
 
 # html2text for clean HTML -> text conversion
 try:
@@ -79,6 +121,124 @@ ICON_MAP = {
 }
 
 
+class HostPoliteness:
+    """
+    Per-host politeness gate shared by the fetcher threads.
+
+    Request starts to one host are spaced at least `delay` seconds apart
+    (raised to the host's robots.txt Crawl-delay / Request-rate, capped at
+    MAX_ROBOTS_DELAY), and at most `max_per_host` requests to it are in
+    flight at once.
+    """
+
+    MAX_ROBOTS_DELAY = 10.0  # seconds - don't let robots.txt stall a sync
+
+    def __init__(self, session: requests.Session, delay: float, max_per_host: int, timeout: float = 10):
+        self.session = session
+        self.delay = max(0.0, delay)
+        self.max_per_host = max(1, max_per_host)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+
+    def _host(self, url: str) -> Dict[str, Any]:
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        with self._lock:
+            host = self._hosts.get(origin)
+            if host is None:
+                host = self._hosts[origin] = {
+                    "origin": origin,
+                    "slots": threading.BoundedSemaphore(self.max_per_host),
+                    "next_start": 0.0,
+                    "delay": None,
+                    "robots_lock": threading.Lock(),
+                }
+            return host
+
+    def _robots_delay(self, origin: str) -> float:
+        """Crawl-delay (or seconds per request from Request-rate) in robots.txt, 0 if none."""
+        try:
+            resp = self.session.get(f"{origin}/robots.txt", timeout=self.timeout)
+            if resp.status_code != 200:
+                return 0.0
+            parser = RobotFileParser()
+            parser.parse(resp.text.splitlines())
+            parser.modified()  # crawl_delay()/request_rate() return None for a parser that was never "read"
+            user_agent = self.session.headers.get("User-Agent", "*")
+            delay = float(parser.crawl_delay(user_agent) or 0)
+            rate = parser.request_rate(user_agent)
+            if rate and rate.requests:
+                delay = max(delay, rate.seconds / rate.requests)
+            return delay
+        except Exception as e:
+            print(f"[WebScraper] robots.txt unavailable for {origin}: {e}", flush=True)
+            return 0.0
+
+    def delay_for(self, url: str) -> float:
+        """Minimum spacing between request starts to this URL's host."""
+        host = self._host(url)
+        with host["robots_lock"]:
+            if host["delay"] is None:
+                robots_delay = min(self._robots_delay(host["origin"]), self.MAX_ROBOTS_DELAY)
+                if robots_delay > self.delay:
+                    print(f"[WebScraper] Using robots.txt crawl delay {robots_delay:.1f}s for {host['origin']}", flush=True)
+                host["delay"] = max(self.delay, robots_delay)
+        return host["delay"]
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold one of the host's concurrency slots, waiting out its request spacing first."""
+        host = self._host(url)
+        delay = self.delay_for(url)
+        with host["slots"]:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, host["next_start"])
+                host["next_start"] = start + delay
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def _gevent_patched() -> bool:
+    try:
+        from gevent import monkey
+        return monkey.is_module_patched("threading")
+    except ImportError:
+        return False
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Process pool shared by every crawl in this worker (None = parse on the fetcher threads)"""
+    global _parse_pool
+    # Process pools don't mix with gevent's monkey-patched threading
+    if WEBSCRAPER_PARSE_PROCESSES <= 0 or _gevent_patched():
+        return None
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                # spawn, not fork: forking while fetcher threads hold locks can deadlock the child
+                _parse_pool = ProcessPoolExecutor(
+                    max_workers=WEBSCRAPER_PARSE_PROCESSES,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _parse_pool
+
+
+def _discard_parse_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool so the next crawl starts a fresh one."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False)
+
+
 class WebScraperConnector(BaseConnector):
     """
     Self-hosted website scraper using requests + BeautifulSoup.
@@ -88,6 +248,7 @@ class WebScraperConnector(BaseConnector):
     """
 
     CONNECTOR_TYPE = "webscraper"
+    REPLACES_CHANGED_DOCUMENTS = True  # re-fetched pages keep their doc_id
     REQUIRED_CREDENTIALS = []
     OPTIONAL_SETTINGS = {
         "start_url": "",
@@ -97,6 +258,8 @@ class WebScraperConnector(BaseConnector):
         "exclude_patterns": [],
         "timeout": 15,
         "priority_paths": [],
+        "max_concurrency": 8,
+        "max_per_host": 2,
     }
 
     # File extensions to skip entirely (never fetch these URLs)
@@ -120,6 +283,9 @@ class WebScraperConnector(BaseConnector):
     # Domain circuit breaker: skip domains after this many consecutive failures
     DOMAIN_FAILURE_THRESHOLD = 3
 
+    # Outgoing links kept per URL so a 304 page's links are still followed
+    MAX_STORED_LINKS = 500
+
     def __init__(self, config: ConnectorConfig, tenant_id: Optional[str] = None):
         print(f"[WebScraper] __init__ called (self-hosted crawler)")
         super().__init__(config)
@@ -150,6 +316,25 @@ class WebScraperConnector(BaseConnector):
         # Per-page fetch timeout. Minimum 20s for server-to-server (cloud hosting has higher latency)
         self.timeout = max(20, int(config.settings.get("timeout", 30)))
 
+        # Crawl engine: fetcher pool size and in-flight cap per host
+        self.max_concurrency = max(1, int(config.settings.get("max_concurrency", 8)))
+        self.max_per_host = max(1, int(config.settings.get("max_per_host", 2)))
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Validators (ETag / Last-Modified) from earlier crawls, for conditional re-crawls
+        self.unchanged_count = 0
+        self.page_state = None
+        # doc_id -> (url, validators) of pages whose Document is not committed yet
+        self._uncommitted_validators: Dict[str, tuple] = {}
+        self._uncommitted_lock = threading.Lock()
+        if WEBSCRAPER_STATE_PATH:
+            try:
+                self.page_state = ResponseCache(WEBSCRAPER_STATE_PATH, ttl_seconds=WEBSCRAPER_STATE_TTL_SECONDS)
+            except Exception as e:
+                print(f"[WebScraper] Page state disabled ({WEBSCRAPER_STATE_PATH}): {e}", flush=True)
+
         # Set up html2text converter
         self.h2t = None
         if HTML2TEXT_AVAILABLE:
@@ -167,6 +352,37 @@ class WebScraperConnector(BaseConnector):
         """Convert URL to safe filename hash"""
         return f"page_{hashlib.sha256(url.encode()).hexdigest()[:16]}"
 
+    def _state_key(self, url: str) -> str:
+        """Page state is per connector, so two tenants crawling one site don't share validators."""
+        scope = self.config.connector_id or self.tenant_id or self.config.tenant_id or self.config.user_id
+        return f"{scope}:{hashlib.sha256(url.encode()).hexdigest()}"
+
+    def _page_validators(self, url: str) -> Optional[Dict[str, Any]]:
+        """{"etag", "last_modified", "links"} stored by the last crawl of this URL, if any."""
+        if self.page_state is None:
+            return None
+        try:
+            return self.page_state.get(self._state_key(url))
+        except Exception as e:
+            print(f"[WebScraper] Page state read failed: {e}", flush=True)
+            return None
+
+    def _store_validators(self, url: str, record: Dict[str, Any]):
+        if self.page_state is None or not (record.get("etag") or record.get("last_modified")):
+            return
+        try:
+            self.page_state.put(self._state_key(url), record)
+        except Exception as e:
+            print(f"[WebScraper] Page state write failed: {e}", flush=True)
+
+    def documents_committed(self, doc_ids: List[str]):
+        """Store the validators of pages whose Documents the sync route has committed."""
+        with self._uncommitted_lock:
+            committed = [self._uncommitted_validators.pop(doc_id, None) for doc_id in doc_ids]
+        for entry in committed:
+            if entry is not None:
+                self._store_validators(*entry)
+
     # ──────────────────────────────────────────────────────────────
     # URL helpers
     # ──────────────────────────────────────────────────────────────
@@ -300,16 +516,35 @@ class WebScraperConnector(BaseConnector):
 
         return urls
 
-    def _crawl_website(self, start_url: str, max_pages: int, max_depth: int) -> List[Dict[str, Any]]:
+    def _crawl_website(self, start_url: str, max_pages: int, max_depth: int,
+                       conditional: bool = False) -> List[Dict[str, Any]]:
+        """Crawl a website and return every fetched (changed) page. See _iter_crawl."""
+        return list(self._iter_crawl(start_url, max_pages, max_depth, conditional=conditional))
+
+    def _iter_crawl(self, start_url: str, max_pages: int, max_depth: int,
+                    conditional: bool = False) -> Iterator[Dict[str, Any]]:
         """
-        Crawl a website using sitemap + BFS hybrid strategy.
+        Crawl a website using sitemap + BFS hybrid strategy, yielding pages as they are extracted.
 
         Strategy:
         1. Try sitemap.xml first — gives us ALL pages regardless of depth
         2. If no sitemap (or sitemap is partial), fall back to BFS link discovery
-        3. max_pages is the hard cap either way
+        3. max_pages is the hard cap either way (unchanged pages count toward it)
 
-        Returns list of {"url", "html", "status_code", "depth", "content_type"} dicts.
+        Up to max_concurrency fetches run at once behind the per-host
+        politeness gate, and fetched HTML is parsed in the parse pool. This
+        generator owns the frontier, so only it touches the queue, the visited
+        set and the circuit breaker counters.
+
+        With conditional=True, URLs crawled before are requested with
+        If-None-Match / If-Modified-Since; 304 responses are counted in
+        unchanged_count and not yielded, but their stored links are followed.
+
+        Validators of yielded pages are NOT stored here: the caller stores
+        page["validators"] once the page is persisted (see documents_committed).
+
+        Yields {"url", "requested_url", "status_code", "depth", "content_type",
+        "extracted", "validators"} dicts.
         """
         crawl_delay = float(self.config.settings.get("crawl_delay", 1.0))
         exclude_patterns = self.config.settings.get("exclude_patterns", [])
@@ -321,7 +556,6 @@ class WebScraperConnector(BaseConnector):
         # BFS state
         visited: Set[str] = set()
         queue: deque = deque()
-        results: List[Dict[str, Any]] = []
 
         # ── Step 1: Try sitemap for comprehensive page discovery ──
         sitemap_urls = self._fetch_sitemap_urls(start_url, base_domain, exclude_patterns)
@@ -353,100 +587,178 @@ class WebScraperConnector(BaseConnector):
                     queue.appendleft((priority_url, 1))
                     visited.add(priority_url)
 
-        print(f"[WebScraper] Crawl starting: {start_url} (max_pages={max_pages}, max_depth={max_depth}, queue={len(queue)} URLs)")
+        def enqueue(links: List[str], depth: int):
+            # Discover links via BFS — even if we used sitemap, this catches
+            # pages the sitemap might have missed
+            if depth >= max_depth:
+                return
+            for link in links:
+                if link not in visited and len(visited) < max_pages * 3 and not self._should_exclude(link, exclude_patterns):
+                    visited.add(link)
+                    queue.append((link, depth + 1))
+
+        parse_pool = get_parse_pool()
+        politeness = HostPoliteness(self.session, crawl_delay, self.max_per_host)
+        fetch_pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="webscraper-fetch")
+
+        def submit_parse(page: Dict[str, Any]):
+            nonlocal parse_pool
+            args = (page["html"], page["url"], base_domain, exclude_patterns)
+            if parse_pool is not None:
+                try:
+                    return parse_pool.submit(_parse_page_in_worker, *args)
+                except Exception as e:
+                    # Pool is broken or can't start worker processes here
+                    print(f"[WebScraper] Parse pool unavailable ({e}), parsing on fetcher threads", flush=True)
+                    _discard_parse_pool(parse_pool)
+                    parse_pool = None
+            return fetch_pool.submit(self._parse_page, *args)
+
+        print(f"[WebScraper] Crawl starting: {start_url} (max_pages={max_pages}, max_depth={max_depth}, queue={len(queue)} URLs, "
+              f"concurrency={self.max_concurrency}, per_host={self.max_per_host}, "
+              f"parse={'processes' if parse_pool is not None else 'gevent hub' if _gevent_patched() else 'threads'}, "
+              f"conditional={conditional})", flush=True)
 
         # ── Step 3: Fetch pages (BFS with link discovery as backup) ──
+        # future -> (stage, requested url, depth, validators for "fetch" / page for "parse")
+        pending: Dict[Any, tuple] = {}
+        fetching = 0
+        accepted = 0  # pages yielded + pages unchanged since the last crawl
         skipped = 0
-        while queue and len(results) < max_pages:
-            url, depth = queue.popleft()
+        started = time.time()
+        try:
+            while (queue or pending) and accepted < max_pages:
+                # Keep the fetcher pool busy, without scheduling past max_pages
+                while queue and fetching < self.max_concurrency and accepted + len(pending) < max_pages:
+                    url, depth = queue.popleft()
+
+                    # Skip non-HTML file extensions BEFORE making any request
+                    if self._is_skippable_url(url):
+                        skipped += 1
+                        continue
 
-            # Skip non-HTML file extensions BEFORE making any request
-            if self._is_skippable_url(url):
-                skipped += 1
-                continue
+                    # Domain circuit breaker: skip URLs from domains with too many consecutive failures
+                    url_domain = urlparse(url).netloc
+                    domain_fails = self._domain_failures.get(url_domain, 0)
+                    if domain_fails >= self.DOMAIN_FAILURE_THRESHOLD:
+                        self._domain_skipped[url_domain] = self._domain_skipped.get(url_domain, 0) + 1
+                        if self._domain_skipped[url_domain] == 1:
+                            print(f"[WebScraper] Circuit breaker: skipping domain {url_domain} after {domain_fails} consecutive failures", flush=True)
+                        continue
 
-            # Domain circuit breaker: skip URLs from domains with too many consecutive failures
-            url_domain = urlparse(url).netloc
-            domain_fails = self._domain_failures.get(url_domain, 0)
-            if domain_fails >= self.DOMAIN_FAILURE_THRESHOLD:
-                self._domain_skipped[url_domain] = self._domain_skipped.get(url_domain, 0) + 1
-                if self._domain_skipped[url_domain] == 1:
-                    print(f"[WebScraper] Circuit breaker: skipping domain {url_domain} after {domain_fails} consecutive failures", flush=True)
-                continue
+                    validators = self._page_validators(url) if conditional else None
+                    print(f"[WebScraper] Fetching [{accepted + len(pending) + 1}/{max_pages}] depth={depth}: {url[:80]}", flush=True)
+                    pending[fetch_pool.submit(self._fetch_page, url, politeness, validators)] = ("fetch", url, depth, validators)
+                    fetching += 1
 
-            try:
-                print(f"[WebScraper] Fetching [{len(results)+1}/{max_pages}] depth={depth}: {url[:80]}", flush=True)
+                if not pending:
+                    break
 
-                resp = self.session.get(
-                    url,
-                    timeout=self.timeout,
-                    allow_redirects=True,
-                )
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, url, depth, extra = pending.pop(future)
 
-                # Reset domain failure counter on success
-                if url_domain in self._domain_failures:
-                    self._domain_failures[url_domain] = 0
+                    if stage == "parse":
+                        page = extra
+                        try:
+                            parsed = future.result()
+                        except BrokenProcessPool:
+                            print(f"[WebScraper] Parse pool broke, parsing on fetcher threads from now on", flush=True)
+                            if parse_pool is not None:
+                                _discard_parse_pool(parse_pool)
+                                parse_pool = None
+                            pending[submit_parse(page)] = ("parse", url, depth, page)
+                            continue
+                        except Exception as e:
+                            print(f"[WebScraper] Error processing {page['url'][:80]}: {e}", flush=True)
+                            self.error_count += 1
+                            continue
 
-                # Check content type — only process HTML
-                content_type = resp.headers.get("Content-Type", "").lower()
-                if "text/html" not in content_type and "application/xhtml" not in content_type:
-                    print(f"[WebScraper] Skipping non-HTML: {content_type} ({url[:60]})", flush=True)
-                    continue
+                        if accepted >= max_pages:
+                            continue
+                        accepted += 1
+                        self.success_count += 1
+                        enqueue(parsed["links"], depth)
+                        page["validators"]["links"] = parsed["links"][:self.MAX_STORED_LINKS]
+                        page.pop("html")
+                        page["extracted"] = parsed["extracted"]
+                        yield page
+                        continue
 
-                # Check content length
-                content_length = resp.headers.get("Content-Length")
-                if content_length and int(content_length) > self.MAX_PAGE_SIZE:
-                    print(f"[WebScraper] Skipping oversized page: {content_length} bytes")
-                    continue
+                    fetching -= 1
+                    url_domain = urlparse(url).netloc
+                    try:
+                        resp = future.result()
+
+                        # Reset domain failure counter on success
+                        if url_domain in self._domain_failures:
+                            self._domain_failures[url_domain] = 0
+
+                        # Not modified since the last crawl — follow its links, don't re-extract
+                        if resp.status_code == 304 and extra:
+                            self.unchanged_count += 1
+                            accepted += 1
+                            print(f"[WebScraper] Unchanged (304): {url[:80]}", flush=True)
+                            enqueue(extra.get("links", []), depth)
+                            self._store_validators(url, extra)  # refresh expiry
+                            continue
 
-                html = resp.text
+                        # Check content type — only process HTML
+                        content_type = resp.headers.get("Content-Type", "").lower()
+                        if "text/html" not in content_type and "application/xhtml" not in content_type:
+                            print(f"[WebScraper] Skipping non-HTML: {content_type} ({url[:60]})", flush=True)
+                            continue
 
-                if not html or len(html.strip()) < 100:
-                    print(f"[WebScraper] Skipping empty page")
-                    continue
+                        # Check content length
+                        content_length = resp.headers.get("Content-Length")
+                        if content_length and int(content_length) > self.MAX_PAGE_SIZE:
+                            print(f"[WebScraper] Skipping oversized page: {content_length} bytes")
+                            continue
 
-                # Add redirected URL to visited set to avoid re-crawling
-                final_url = self._normalize_url(resp.url, resp.url)
-                visited.add(final_url)
-
-                results.append({
-                    "url": resp.url,
-                    "html": html,
-                    "status_code": resp.status_code,
-                    "depth": depth,
-                    "content_type": content_type,
-                })
-
-                self.success_count += 1
-
-                # Discover links via BFS — even if we used sitemap, this catches
-                # pages the sitemap might have missed
-                if depth < max_depth:
-                    new_links = self._extract_links(html, resp.url, base_domain, exclude_patterns)
-                    for link in new_links:
-                        if link not in visited and len(visited) < max_pages * 3:
-                            visited.add(link)
-                            queue.append((link, depth + 1))
-
-                # Rate limiting
-                if crawl_delay > 0:
-                    time.sleep(crawl_delay)
+                        html = resp.text
 
-            except requests.exceptions.Timeout:
-                self._domain_failures[url_domain] = self._domain_failures.get(url_domain, 0) + 1
-                fail_count = self._domain_failures[url_domain]
-                print(f"[WebScraper] Timeout fetching ({fail_count}/{self.DOMAIN_FAILURE_THRESHOLD} for {url_domain}): {url[:80]}", flush=True)
-                self.error_count += 1
-            except requests.exceptions.ConnectionError as e:
-                self._domain_failures[url_domain] = self._domain_failures.get(url_domain, 0) + 1
-                fail_count = self._domain_failures[url_domain]
-                print(f"[WebScraper] Connection error ({fail_count}/{self.DOMAIN_FAILURE_THRESHOLD} for {url_domain}): {url[:80]} - {e}", flush=True)
-                self.error_count += 1
-            except Exception as e:
-                self._domain_failures[url_domain] = self._domain_failures.get(url_domain, 0) + 1
-                print(f"[WebScraper] Error fetching {url[:80]}: {e}", flush=True)
-                traceback.print_exc()
-                self.error_count += 1
+                        if not html or len(html.strip()) < 100:
+                            print(f"[WebScraper] Skipping empty page")
+                            continue
+
+                        # Add redirected URL to visited set to avoid re-crawling
+                        final_url = self._normalize_url(resp.url, resp.url)
+                        visited.add(final_url)
+
+                        page = {
+                            "url": resp.url,
+                            "requested_url": url,  # page state is keyed by the URL we request
+                            "html": html,
+                            "status_code": resp.status_code,
+                            "depth": depth,
+                            "content_type": content_type,
+                            "validators": {
+                                "etag": resp.headers.get("ETag"),
+                                "last_modified": resp.headers.get("Last-Modified"),
+                            },
+                        }
+                        pending[submit_parse(page)] = ("parse", url, depth, page)
+
+                    except requests.exceptions.Timeout:
+                        self._domain_failures[url_domain] = self._domain_failures.get(url_domain, 0) + 1
+                        fail_count = self._domain_failures[url_domain]
+                        print(f"[WebScraper] Timeout fetching ({fail_count}/{self.DOMAIN_FAILURE_THRESHOLD} for {url_domain}): {url[:80]}", flush=True)
+                        self.error_count += 1
+                    except requests.exceptions.ConnectionError as e:
+                        self._domain_failures[url_domain] = self._domain_failures.get(url_domain, 0) + 1
+                        fail_count = self._domain_failures[url_domain]
+                        print(f"[WebScraper] Connection error ({fail_count}/{self.DOMAIN_FAILURE_THRESHOLD} for {url_domain}): {url[:80]} - {e}", flush=True)
+                        self.error_count += 1
+                    except Exception as e:
+                        self._domain_failures[url_domain] = self._domain_failures.get(url_domain, 0) + 1
+                        print(f"[WebScraper] Error fetching {url[:80]}: {e}", flush=True)
+                        traceback.print_exc()
+                        self.error_count += 1
+        finally:
+            # Reached max_pages (or the consumer stopped early): drop work still in flight
+            for future in pending:
+                future.cancel()
+            fetch_pool.shutdown(wait=False, cancel_futures=True)
 
         # Log circuit breaker summary
         total_circuit_skipped = sum(self._domain_skipped.values())
@@ -454,15 +766,37 @@ class WebScraperConnector(BaseConnector):
         if self._domain_skipped:
             circuit_breaker_info = f", {total_circuit_skipped} skipped by circuit breaker ({', '.join(f'{d}: {c}' for d, c in self._domain_skipped.items())})"
 
-        print(f"[WebScraper] Crawl complete: {len(results)} pages fetched, {skipped} skipped (non-HTML), "
-              f"{self.error_count} errors{circuit_breaker_info} (sitemap={'yes' if sitemap_found else 'no'})", flush=True)
-        return results
+        elapsed = time.time() - started
+        print(f"[WebScraper] Crawl complete: {accepted - self.unchanged_count} pages fetched, {self.unchanged_count} unchanged, "
+              f"{skipped} skipped (non-HTML), {self.error_count} errors{circuit_breaker_info} "
+              f"(sitemap={'yes' if sitemap_found else 'no'}, {elapsed:.1f}s)", flush=True)
+
+    def _fetch_page(self, url: str, politeness: HostPoliteness,
+                    validators: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """GET one URL behind its host's politeness gate (runs on a fetcher thread)."""
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        with politeness.slot(url):
+            return self.session.get(url, timeout=self.timeout, allow_redirects=True, headers=headers or None)
+
+    def _parse_page(self, html: str, url: str, base_domain: str, exclude_patterns: List[str]) -> Dict[str, Any]:
+        """Parse a page once for both its links and its content. Returns {"links", "extracted"}."""
+        soup = BeautifulSoup(html, "html.parser")
+        # Links first: content extraction strips nav/header/footer from the soup
+        links = self._extract_links(html, url, base_domain, exclude_patterns, soup=soup)
+        return {"links": links, "extracted": self._extract_content(html, url, soup=soup)}
 
-    def _extract_links(self, html: str, page_url: str, base_domain: str, exclude_patterns: List[str]) -> List[str]:
-        """Extract and filter links from an HTML page."""
+    def _extract_links(self, html: str, page_url: str, base_domain: str, exclude_patterns: List[str],
+                       soup: Optional[BeautifulSoup] = None) -> List[str]:
+        """Extract and filter links from an HTML page (or its already-parsed soup)."""
         links = []
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            if soup is None:
+                soup = BeautifulSoup(html, "html.parser")
             for a_tag in soup.find_all("a", href=True):
                 href = a_tag["href"].strip()
                 if not href or href.startswith(("javascript:", "mailto:", "tel:", "data:", "file:")):
@@ -490,12 +824,14 @@ class WebScraperConnector(BaseConnector):
     # Content Extraction
     # ──────────────────────────────────────────────────────────────
 
-    def _extract_content(self, html: str, url: str) -> Dict[str, Any]:
+    def _extract_content(self, html: str, url: str, soup: Optional[BeautifulSoup] = None) -> Dict[str, Any]:
         """
         Smart content extraction from HTML.
         Returns {title, content, meta_description, word_count, images_found}.
+        A passed-in soup is modified (noise elements are removed).
         """
-        soup = BeautifulSoup(html, "html.parser")
+        if soup is None:
+            soup = BeautifulSoup(html, "html.parser")
 
         # Extract title
         title = self._extract_title(soup)
@@ -954,14 +1290,17 @@ class WebScraperConnector(BaseConnector):
         print(f"[WebScraper] Max pages: {max_pages}, Max depth: {max_depth}")
         print(f"[WebScraper] OCR enabled: {OCR_AVAILABLE}")
 
+        # Incremental sync: re-fetch conditionally and skip pages that haven't changed
+        conditional = since is not None and self.page_state is not None
+        self.unchanged_count = 0
+
         try:
-            # BFS crawl
-            pages = self._crawl_website(start_url, max_pages, max_depth)
-            print(f"[WebScraper] Processing {len(pages)} pages for content extraction")
+            # Concurrent crawl - pages arrive already extracted, as they finish
+            pages = self._iter_crawl(start_url, max_pages, max_depth, conditional=conditional)
 
             for i, page in enumerate(pages):
                 try:
-                    extracted = self._extract_content(page["html"], page["url"])
+                    extracted = page["extracted"]
 
                     content = extracted["content"]
                     title = extracted["title"]
@@ -971,6 +1310,7 @@ class WebScraperConnector(BaseConnector):
                     # Skip pages with too little content
                     if len(content.strip()) < 50:
                         print(f"[WebScraper] Skipping - too short ({len(content.strip())} chars)")
+                        self._store_validators(page["requested_url"], page["validators"])  # no Document to wait for
                         continue
 
                     doc = Document(
@@ -990,11 +1330,16 @@ class WebScraperConnector(BaseConnector):
                         doc_type="webpage",
                     )
                     documents.append(doc)
+                    # Validators wait for documents_committed(), so an unsaved page is re-fetched next sync
+                    with self._uncommitted_lock:
+                        self._uncommitted_validators[doc.doc_id] = (page["requested_url"], page["validators"])
                     if self.on_document_ready:
                         try:
                             self.on_document_ready(doc)
                         except Exception as cb_err:
                             print(f"[WebScraper] on_document_ready error: {cb_err}")
+                            with self._uncommitted_lock:
+                                self._uncommitted_validators.pop(doc.doc_id, None)
                     self.success_count += 1
 
                 except Exception as e:
@@ -1009,7 +1354,7 @@ class WebScraperConnector(BaseConnector):
             raise
 
         print(f"[WebScraper] ========== SYNC DONE ==========")
-        print(f"[WebScraper] Documents: {len(documents)}, Success: {self.success_count}, Errors: {self.error_count}")
+        print(f"[WebScraper] Documents: {len(documents)}, Unchanged: {self.unchanged_count}, Success: {self.success_count}, Errors: {self.error_count}")
 
         self.status = ConnectorStatus.CONNECTED
         return documents
@@ -1024,3 +1369,14 @@ class WebScraperConnector(BaseConnector):
 
     async def test_connection(self) -> bool:
         return self._connect_sync()
+
+
+_worker_scraper: Optional[WebScraperConnector] = None
+
+
+def _parse_page_in_worker(html: str, url: str, base_domain: str, exclude_patterns: List[str]) -> Dict[str, Any]:
+    """Parse pool entry point - one scraper (html2text converter, OCR session) per worker process."""
+    global _worker_scraper
+    if _worker_scraper is None:
+        _worker_scraper = WebScraperConnector(ConnectorConfig(connector_type="webscraper", user_id="parse-worker"))
+    return _worker_scraper._parse_page(html, url, base_domain, exclude_patterns)
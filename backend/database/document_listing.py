@@ -0,0 +1,243 @@
+"""
+Document Listing
+Keyset-paginated, column-projected listing of documents.
+
+OFFSET pagination re-reads every skipped row, so deep pages of a 100k-document
+tenant get slower the further the user scrolls; loading full ORM rows also
+pulls the large content / content_html columns only for to_dict() to drop them.
+This module instead:
+    - pages on (sort key, id) with an opaque cursor, so every page is an index
+      range scan that starts where the previous one stopped
+    - selects only SUMMARY_COLUMNS and builds the same dict Document.to_dict()
+      returns (without content)
+    - offers an approximate total (PostgreSQL planner estimate) or an exact
+      count cached for LISTING_COUNT_TTL_SECONDS, instead of COUNT(*) per page
+    - iterates the whole result set in keyset batches for NDJSON export
+"""
+
+import os
+import json
+import time
+import base64
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query, Session
+
+from .models import Document
+
+LISTING_COUNT_TTL_SECONDS = int(os.getenv("LISTING_COUNT_TTL_SECONDS", "60"))
+LISTING_EXPORT_BATCH_SIZE = int(os.getenv("LISTING_EXPORT_BATCH_SIZE", "1000"))
+
+# Sort keys that can be paged by keyset. classification_confidence is nullable,
+# so NULLs sort as -1 (below every real confidence).
+KEYSET_SORTS = {
+    'created_at': Document.created_at,
+    'classification_confidence': func.coalesce(Document.classification_confidence, -1.0),
+}
+
+SUMMARY_COLUMNS = [
+    Document.id,
+    Document.tenant_id,
+    Document.connector_id,
+    Document.external_id,
+    Document.source_type,
+    Document.source_url,
+    Document.title,
+    Document.summary,
+    Document.sender,
+    Document.sender_email,
+    Document.recipients,
+    Document.source_created_at,
+    Document.status,
+    Document.classification,
+    Document.classification_confidence,
+    Document.classification_reason,
+    Document.user_confirmed,
+    Document.project_id,
+    Document.created_at,
+    Document.is_deleted,
+    Document.embedded_at,
+    (Document.structured_summary != None).label('has_structured_summary'),
+    Document.doc_metadata['file_size'].label('file_size'),
+    Document.doc_metadata['is_protocol'].label('is_protocol'),
+    Document.doc_metadata['protocol_confidence'].label('protocol_confidence'),
+    Document.doc_metadata['protocol_completeness_score'].label('protocol_completeness_score'),
+]
+
+# (tenant_id, filter signature) -> (expires_at, count)
+_count_cache: Dict[Tuple[str, str], Tuple[float, int]] = {}
+_count_cache_lock = threading.Lock()
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that is malformed or was issued for another sort."""
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def summary_row_to_dict(row) -> Dict[str, Any]:
+    """Same keys and formatting as Document.to_dict() for a SUMMARY_COLUMNS row."""
+    return {
+        "id": row.id,
+        "tenant_id": row.tenant_id,
+        "connector_id": row.connector_id,
+        "external_id": row.external_id,
+        "source_type": row.source_type,
+        "source_url": row.source_url,
+        "title": row.title,
+        "summary": row.summary,
+        "sender": row.sender,
+        "sender_email": row.sender_email,
+        "recipients": row.recipients,
+        "source_created_at": _isoformat(row.source_created_at),
+        "status": row.status.value,
+        "classification": row.classification.value,
+        "classification_confidence": row.classification_confidence,
+        "classification_reason": row.classification_reason,
+        "user_confirmed": row.user_confirmed,
+        "project_id": row.project_id,
+        "created_at": _isoformat(row.created_at),
+        "is_deleted": row.is_deleted,
+        "embedded_at": _isoformat(row.embedded_at),
+        "has_structured_summary": bool(row.has_structured_summary),
+        "file_size": row.file_size,
+        "is_protocol": bool(row.is_protocol),  # SQLite JSON_EXTRACT returns 1/0 for booleans
+        "protocol_confidence": row.protocol_confidence,
+        "protocol_completeness_score": row.protocol_completeness_score,
+    }
+
+
+def encode_cursor(sort: str, row) -> str:
+    """Opaque cursor pointing just past `row` in `sort` order."""
+    if sort == 'created_at':
+        value = _isoformat(row.created_at)
+    else:
+        value = row.classification_confidence if row.classification_confidence is not None else -1.0
+    payload = json.dumps([sort, value, row.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, str]:
+    """Returns (sort value, id) of the last row of the previous page."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if cursor_sort != sort or not isinstance(doc_id, str):
+            raise InvalidCursor(f"cursor was issued for sort={cursor_sort}, not sort={sort}")
+        if sort == 'created_at':
+            value = datetime.fromisoformat(value)
+        else:
+            value = float(value)
+        return value, doc_id
+    except InvalidCursor:
+        raise
+    except Exception as e:
+        raise InvalidCursor(f"malformed cursor: {e}")
+
+
+def keyset_page(query: Query, sort: str = 'created_at', order: str = 'desc',
+                cursor: Optional[str] = None, limit: int = 50) -> Tuple[List, Optional[str]]:
+    """
+    One page of summary rows from a filtered Document query.
+
+    Args:
+        query: Filtered query over Document (no ORDER BY / LIMIT)
+        sort: A KEYSET_SORTS key
+        order: asc or desc
+        cursor: next_cursor from the previous page, or None for the first page
+        limit: Page size
+
+    Returns:
+        (rows, next_cursor) - next_cursor is None on the last page
+    """
+    sort_key = KEYSET_SORTS[sort]
+    query = query.with_entities(*SUMMARY_COLUMNS)
+    if cursor:
+        value, doc_id = decode_cursor(cursor, sort)
+        if order == 'asc':
+            query = query.filter(or_(sort_key > value, and_(sort_key == value, Document.id > doc_id)))
+        else:
+            query = query.filter(or_(sort_key < value, and_(sort_key == value, Document.id < doc_id)))
+
+    if order == 'asc':
+        query = query.order_by(sort_key.asc(), Document.id.asc())
+    else:
+        query = query.order_by(sort_key.desc(), Document.id.desc())
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(sort, rows[-1])
+
+
+def iter_summaries(query: Query, sort: str = 'created_at', order: str = 'desc',
+                   batch_size: int = LISTING_EXPORT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Every row of a filtered Document query as summary dicts, fetched in keyset batches."""
+    cursor = None
+    while True:
+        rows, cursor = keyset_page(query, sort, order, cursor, batch_size)
+        for row in rows:
+            yield summary_row_to_dict(row)
+        if cursor is None:
+            return
+
+
+def estimated_count(db: Session, query: Query) -> Optional[int]:
+    """Planner row estimate for the query (PostgreSQL only, no table scan)."""
+    bind = db.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return None
+    try:
+        compiled = query.with_entities(Document.id).statement.compile(dialect=bind.dialect)
+        plan = db.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        print(f"[DocumentListing] Row estimate failed: {e}", flush=True)
+        return None
+
+
+def cached_count(query: Query, tenant_id: str, signature: str) -> int:
+    """Exact COUNT(*) for a filtered query, reused for LISTING_COUNT_TTL_SECONDS."""
+    key = (tenant_id, signature)
+    now = time.time()
+    with _count_cache_lock:
+        entry = _count_cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+    count = query.order_by(None).count()
+    with _count_cache_lock:
+        _count_cache[key] = (now + LISTING_COUNT_TTL_SECONDS, count)
+        if len(_count_cache) > 1000:
+            for stale in [k for k, (expires_at, _) in _count_cache.items() if expires_at <= now]:
+                del _count_cache[stale]
+    return count
+
+
+def listing_total(db: Session, query: Query, tenant_id: str, signature: str,
+                  mode: Optional[str]) -> Optional[int]:
+    """
+    Total for the listing's `total` parameter.
+
+    Args:
+        mode: 'approx' (planner estimate, falls back to 'cached' off PostgreSQL),
+              'cached' (exact count, up to LISTING_COUNT_TTL_SECONDS old) or None
+    """
+    if mode == 'approx':
+        estimate = estimated_count(db, query)
+        if estimate is not None:
+            return estimate
+        return cached_count(query, tenant_id, signature)
+    if mode == 'cached':
+        return cached_count(query, tenant_id, signature)
+    return None
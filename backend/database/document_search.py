@@ -0,0 +1,269 @@
+"""
+Document Full-Text Search
+Dialect-aware full-text index over document title, sender and content.
+
+PostgreSQL:
+    - documents.search_vector: generated tsvector column (title weight A,
+      sender B, content C), maintained by Postgres on every insert/update
+    - GIN index on search_vector
+    - pg_trgm GIN indexes on title and sender, so substring / fuzzy prefix
+      ILIKE filters use an index instead of a sequential scan
+
+SQLite:
+    - documents_fts: FTS5 external-content table over documents, kept in
+      sync by AFTER INSERT / UPDATE / DELETE triggers
+
+ensure_document_search_index() is idempotent and runs ONLY from
+migrations/add_document_search_index.py: on PostgreSQL adding the generated
+column rewrites the documents table, so it must never run on app start or
+deploy. The GIN indexes are built CONCURRENTLY so writes continue meanwhile.
+init_database() and requests only probe (search_index_available()); until the
+migration has run, callers fall back to ILIKE.
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Float, String, func, literal_column, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+
+from .models import Document
+
+# tsvector is capped at 1MB; very long bodies are indexed by their prefix
+CONTENT_INDEX_CHARS = 100000
+
+# bm25() column weights for (title, sender, content)
+FTS5_WEIGHTS = (10.0, 5.0, 1.0)
+
+_POSTGRES_SEARCH_VECTOR_DDL = f"""ALTER TABLE documents ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(sender, '')), 'B') ||
+        setweight(to_tsvector('english', left(coalesce(content, ''), {CONTENT_INDEX_CHARS})), 'C')
+    ) STORED"""
+
+# (index name, definition) - built with CREATE INDEX CONCURRENTLY
+_POSTGRES_INDEXES = [
+    ("ix_document_search_vector", "documents USING GIN (search_vector)"),
+    ("ix_document_title_trgm", "documents USING GIN (title gin_trgm_ops)"),
+    ("ix_document_sender_trgm", "documents USING GIN (sender gin_trgm_ops)"),
+]
+
+# Fail fast instead of queueing behind a long transaction (every later query
+# on documents would queue behind the waiting ALTER)
+POSTGRES_LOCK_TIMEOUT = "5s"
+
+_SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE documents_fts USING fts5(
+        title, sender, content,
+        content='documents', content_rowid='rowid',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS documents_fts_insert AFTER INSERT ON documents BEGIN
+        INSERT INTO documents_fts(rowid, title, sender, content)
+        VALUES (new.rowid, new.title, new.sender, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS documents_fts_delete AFTER DELETE ON documents BEGIN
+        INSERT INTO documents_fts(documents_fts, rowid, title, sender, content)
+        VALUES ('delete', old.rowid, old.title, old.sender, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS documents_fts_update AFTER UPDATE OF title, sender, content ON documents BEGIN
+        INSERT INTO documents_fts(documents_fts, rowid, title, sender, content)
+        VALUES ('delete', old.rowid, old.title, old.sender, old.content);
+        INSERT INTO documents_fts(rowid, title, sender, content)
+        VALUES (new.rowid, new.title, new.sender, new.content);
+    END""",
+    # Index rows that existed before the table was created
+    "INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')",
+]
+
+_MISSING_INDEX_HINT = ("[DocumentSearch] Full-text index missing, ranked search falls back to ILIKE "
+                       "(run migrations/add_document_search_index.py)")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Engine URL -> whether the index exists (probed once per process)
+_available: Dict[str, bool] = {}
+_available_lock = threading.Lock()
+
+
+def _search_tokens(search: str) -> List[str]:
+    """Word tokens of a user query (drops all query-syntax characters)."""
+    return _TOKEN_RE.findall(search.lower())
+
+
+def to_tsquery_text(search: str) -> Optional[str]:
+    """'western blo' -> 'western & blo:*' (all words, last one as a prefix)."""
+    tokens = _search_tokens(search)
+    if not tokens:
+        return None
+    return " & ".join(tokens[:-1] + [f"{tokens[-1]}:*"])
+
+
+def to_fts5_query(search: str) -> Optional[str]:
+    """'western blo' -> '"western" "blo"*' (all words, last one as a prefix)."""
+    tokens = _search_tokens(search)
+    if not tokens:
+        return None
+    return " ".join([f'"{t}"' for t in tokens[:-1]] + [f'"{tokens[-1]}"*'])
+
+
+def _ensure_postgres_index(bind: Engine):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(f"SET lock_timeout = '{POSTGRES_LOCK_TIMEOUT}'"))
+        conn.execute(text(_POSTGRES_SEARCH_VECTOR_DDL))
+        conn.execute(text("RESET lock_timeout"))
+        for name, definition in _POSTGRES_INDEXES:
+            # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+            invalid = conn.execute(text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ), {"name": name}).first()
+            if invalid:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}"))
+
+
+def ensure_document_search_index(bind: Engine) -> bool:
+    """
+    Create the full-text index for the engine's dialect if it is missing.
+
+    Migration only - see the module docstring.
+
+    Returns:
+        True if the index is ready
+    """
+    dialect = bind.dialect.name
+    try:
+        if dialect == 'postgresql':
+            _ensure_postgres_index(bind)
+        elif dialect == 'sqlite':
+            with bind.begin() as conn:
+                exists = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents_fts'"
+                )).first()
+                if not exists:
+                    for statement in _SQLITE_DDL:
+                        conn.execute(text(statement))
+        else:
+            return False
+    except Exception as e:
+        print(f"[DocumentSearch] Full-text index unavailable on {dialect}: {e}", flush=True)
+        _available[str(bind.url)] = False
+        return False
+
+    _available[str(bind.url)] = True
+    print(f"[DocumentSearch] Full-text index ready ({dialect})", flush=True)
+    return True
+
+
+def document_search_index_exists(conn) -> bool:
+    """
+    Whether the migration has built the index (catalog lookups only, no DDL).
+
+    Args:
+        conn: Connection or Session
+    """
+    dialect = (conn.get_bind() if isinstance(conn, Session) else conn).dialect.name
+    if dialect == 'postgresql':
+        return conn.execute(text(
+            "SELECT 1 FROM information_schema.columns c "
+            "JOIN pg_class ic ON ic.relname = 'ix_document_search_vector' "
+            "JOIN pg_index i ON i.indexrelid = ic.oid AND i.indisvalid "
+            "WHERE c.table_name = 'documents' AND c.column_name = 'search_vector'"
+        )).first() is not None
+    if dialect == 'sqlite':
+        return conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents_fts'"
+        )).first() is not None
+    return False
+
+
+def probe_document_search_index(bind: Engine) -> bool:
+    """Log whether the index exists (called from init_database; never builds it)."""
+    try:
+        with bind.connect() as conn:
+            found = document_search_index_exists(conn)
+    except Exception as e:
+        print(f"[DocumentSearch] Could not probe full-text index: {e}", flush=True)
+        return False
+    _available[str(bind.url)] = found
+    if not found:
+        print(_MISSING_INDEX_HINT, flush=True)
+    return found
+
+
+def search_index_available(db: Session) -> bool:
+    """
+    Whether the full-text index exists for this session's database.
+
+    Only probes: building the index is a full pass over documents (and a
+    table rewrite on PostgreSQL), so it is never done from a request.
+    """
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key in _available:
+        return _available[key]
+
+    with _available_lock:
+        if key in _available:
+            return _available[key]
+        try:
+            found = document_search_index_exists(db)
+        except Exception as e:
+            print(f"[DocumentSearch] Could not probe full-text index: {e}", flush=True)
+            found = False
+        if not found:
+            print(_MISSING_INDEX_HINT, flush=True)
+        _available[key] = found
+        return found
+
+
+def apply_ranked_search(db: Session, query: Query, search: str) -> Optional[Tuple[Query, object]]:
+    """
+    Restrict a Document query to full-text matches of `search`.
+
+    Args:
+        db: Session the query runs on
+        query: Query over Document
+        search: Raw user search text
+
+    Returns:
+        (filtered query, ORDER BY clause for best-match-first), or None if the
+        index is unavailable or the search has no words (caller falls back to ILIKE)
+    """
+    if not search_index_available(db):
+        return None
+
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        tsquery_text = to_tsquery_text(search)
+        if tsquery_text is None:
+            return None
+        tsquery = func.to_tsquery('english', tsquery_text)
+        vector = literal_column('documents.search_vector')
+        pattern = f"%{search}%"
+        query = query.filter(or_(
+            vector.op('@@')(tsquery),
+            Document.title.ilike(pattern),  # pg_trgm index
+            Document.sender.ilike(pattern),  # pg_trgm index
+        ))
+        rank = func.ts_rank_cd(vector, tsquery) + func.similarity(func.coalesce(Document.title, ''), search)
+        return query, rank.desc()
+
+    fts_query = to_fts5_query(search)
+    if fts_query is None:
+        return None
+    weights = ", ".join(str(w) for w in FTS5_WEIGHTS)
+    matches = text(
+        f"SELECT documents.id AS id, bm25(documents_fts, {weights}) AS rank "
+        "FROM documents_fts JOIN documents ON documents.rowid = documents_fts.rowid "
+        "WHERE documents_fts MATCH :fts_query"
+    ).bindparams(fts_query=fts_query).columns(id=String, rank=Float).subquery('fts_matches')
+    query = query.join(matches, matches.c.id == Document.id)
+    # bm25() is lower-is-better
+    return query, matches.c.rank.asc()
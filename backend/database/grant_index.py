@@ -0,0 +1,260 @@
+"""
+Grant Index Search
+Dialect-aware full-text index over the local grant index (grant_listings).
+
+PostgreSQL:
+    - grant_listings.search_vector: generated tsvector column (title weight A,
+      agency B, abstract C) with a GIN index
+SQLite:
+    - grant_listings_fts: FTS5 external-content table over grant_listings,
+      kept in sync by AFTER INSERT / UPDATE / DELETE triggers
+
+As with the document search index (database/document_search.py),
+ensure_grant_search_index() runs ONLY from migrations/add_grant_index.py;
+init_database() and searches only probe for it and fall back to ILIKE until
+the migration has run.
+
+Filters mirror the live APIs: agencies only narrow Grants.gov listings,
+activity codes and award amounts only narrow NIH RePORTER listings.
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import Float, String, and_, func, literal_column, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .document_search import _search_tokens, to_fts5_query, to_tsquery_text
+from .models import GrantListing
+
+# bm25() column weights for (title, agency, abstract)
+FTS5_WEIGHTS = (10.0, 2.0, 1.0)
+
+_POSTGRES_DDL = [
+    """ALTER TABLE grant_listings ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(agency, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(abstract, '')), 'C')
+    ) STORED""",
+]
+
+# (index name, definition) - built with CREATE INDEX CONCURRENTLY
+_POSTGRES_INDEXES = [
+    ("ix_grant_listing_search_vector", "grant_listings USING GIN (search_vector)"),
+]
+
+_SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE grant_listings_fts USING fts5(
+        title, agency, abstract,
+        content='grant_listings', content_rowid='rowid',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS grant_listings_fts_insert AFTER INSERT ON grant_listings BEGIN
+        INSERT INTO grant_listings_fts(rowid, title, agency, abstract)
+        VALUES (new.rowid, new.title, new.agency, new.abstract);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS grant_listings_fts_delete AFTER DELETE ON grant_listings BEGIN
+        INSERT INTO grant_listings_fts(grant_listings_fts, rowid, title, agency, abstract)
+        VALUES ('delete', old.rowid, old.title, old.agency, old.abstract);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS grant_listings_fts_update AFTER UPDATE OF title, agency, abstract ON grant_listings BEGIN
+        INSERT INTO grant_listings_fts(grant_listings_fts, rowid, title, agency, abstract)
+        VALUES ('delete', old.rowid, old.title, old.agency, old.abstract);
+        INSERT INTO grant_listings_fts(rowid, title, agency, abstract)
+        VALUES (new.rowid, new.title, new.agency, new.abstract);
+    END""",
+    # Index rows that existed before the table was created
+    "INSERT INTO grant_listings_fts(grant_listings_fts) VALUES ('rebuild')",
+]
+
+_MISSING_INDEX_HINT = ("[GrantIndex] Full-text index missing, local grant search falls back to ILIKE "
+                       "(run migrations/add_grant_index.py)")
+
+# Engine URL -> whether the index exists (probed once per process)
+_available: Dict[str, bool] = {}
+_available_lock = threading.Lock()
+
+
+def _ensure_postgres_index(bind: Engine):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for statement in _POSTGRES_DDL:
+            conn.execute(text(statement))
+        for name, definition in _POSTGRES_INDEXES:
+            # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+            invalid = conn.execute(text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ), {"name": name}).first()
+            if invalid:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}"))
+
+
+def ensure_grant_search_index(bind: Engine) -> bool:
+    """
+    Create the grant_listings table and its full-text index if missing.
+
+    Migration only - see the module docstring.
+
+    Returns:
+        True if the index is ready
+    """
+    dialect = bind.dialect.name
+    try:
+        GrantListing.__table__.create(bind=bind, checkfirst=True)
+        if dialect == 'postgresql':
+            _ensure_postgres_index(bind)
+        elif dialect == 'sqlite':
+            with bind.begin() as conn:
+                exists = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'grant_listings_fts'"
+                )).first()
+                if not exists:
+                    for statement in _SQLITE_DDL:
+                        conn.execute(text(statement))
+        else:
+            return False
+    except Exception as e:
+        print(f"[GrantIndex] Full-text index unavailable on {dialect}: {e}", flush=True)
+        _available[str(bind.url)] = False
+        return False
+
+    _available[str(bind.url)] = True
+    print(f"[GrantIndex] Full-text index ready ({dialect})", flush=True)
+    return True
+
+
+def grant_search_index_exists(conn) -> bool:
+    """
+    Whether the migration has built the index (catalog lookups only, no DDL).
+
+    Args:
+        conn: Connection or Session
+    """
+    dialect = (conn.get_bind() if isinstance(conn, Session) else conn).dialect.name
+    if dialect == 'postgresql':
+        return conn.execute(text(
+            "SELECT 1 FROM pg_class ic JOIN pg_index i ON i.indexrelid = ic.oid AND i.indisvalid "
+            "WHERE ic.relname = 'ix_grant_listing_search_vector'"
+        )).first() is not None
+    if dialect == 'sqlite':
+        return conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'grant_listings_fts'"
+        )).first() is not None
+    return False
+
+
+def probe_grant_search_index(bind: Engine) -> bool:
+    """Log whether the index exists (called from init_database; never builds it)."""
+    try:
+        with bind.connect() as conn:
+            found = grant_search_index_exists(conn)
+    except Exception as e:
+        print(f"[GrantIndex] Could not probe full-text index: {e}", flush=True)
+        return False
+    _available[str(bind.url)] = found
+    if not found:
+        print(_MISSING_INDEX_HINT, flush=True)
+    return found
+
+
+def grant_search_index_available(db: Session) -> bool:
+    """Whether the full-text index exists for this session's database (probe only)."""
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key in _available:
+        return _available[key]
+
+    with _available_lock:
+        if key in _available:
+            return _available[key]
+        try:
+            found = grant_search_index_exists(db)
+        except Exception as e:
+            print(f"[GrantIndex] Could not probe full-text index: {e}", flush=True)
+            found = False
+        if not found:
+            print(_MISSING_INDEX_HINT, flush=True)
+        _available[key] = found
+        return found
+
+
+def search_grant_listings(
+    db: Session,
+    search: str,
+    agencies: Optional[List[str]] = None,
+    activity_codes: Optional[List[str]] = None,
+    amount_min: Optional[int] = None,
+    amount_max: Optional[int] = None,
+    limit: int = 20,
+) -> List[GrantListing]:
+    """
+    Best-matching grant listings for a search, most relevant first.
+
+    Args:
+        db: Session
+        search: Raw user search text (every word must match, the last as a prefix)
+        agencies: Grants.gov agency codes (e.g. HHS-NIH11); other sources pass through
+        activity_codes: NIH activity codes; other sources pass through
+        amount_min / amount_max: NIH award range; other sources pass through
+        limit: Max listings
+
+    Returns:
+        Matching GrantListing rows (empty if the search has no words)
+    """
+    query = db.query(GrantListing)
+
+    if agencies:
+        prefixes = sorted({a.split("-")[0].upper() for a in agencies})
+        query = query.filter(or_(GrantListing.source != 'grants_gov',
+                                 func.upper(GrantListing.agency).in_(prefixes)))
+    if activity_codes:
+        query = query.filter(or_(GrantListing.source != 'nih_reporter',
+                                 GrantListing.activity_code.in_(activity_codes)))
+    if amount_min or amount_max:
+        in_range = []
+        if amount_min:
+            in_range.append(GrantListing.award_amount >= amount_min)
+        if amount_max:
+            in_range.append(GrantListing.award_amount <= amount_max)
+        query = query.filter(or_(GrantListing.source != 'nih_reporter', and_(*in_range)))
+
+    order = None
+    if grant_search_index_available(db):
+        if db.get_bind().dialect.name == 'postgresql':
+            tsquery_text = to_tsquery_text(search)
+            if tsquery_text is None:
+                return []
+            tsquery = func.to_tsquery('english', tsquery_text)
+            vector = literal_column('grant_listings.search_vector')
+            query = query.filter(vector.op('@@')(tsquery))
+            order = func.ts_rank_cd(vector, tsquery).desc()
+        else:
+            fts_query = to_fts5_query(search)
+            if fts_query is None:
+                return []
+            weights = ", ".join(str(w) for w in FTS5_WEIGHTS)
+            matches = text(
+                f"SELECT grant_listings.id AS id, bm25(grant_listings_fts, {weights}) AS rank "
+                "FROM grant_listings_fts JOIN grant_listings ON grant_listings.rowid = grant_listings_fts.rowid "
+                "WHERE grant_listings_fts MATCH :fts_query"
+            ).bindparams(fts_query=fts_query).columns(id=String, rank=Float).subquery('grant_matches')
+            query = query.join(matches, matches.c.id == GrantListing.id)
+            # bm25() is lower-is-better
+            order = matches.c.rank.asc()
+    else:
+        tokens = _search_tokens(search)
+        if not tokens:
+            return []
+        for token in tokens:
+            pattern = f"%{token}%"
+            query = query.filter(or_(GrantListing.title.ilike(pattern), GrantListing.abstract.ilike(pattern)))
+
+    if order is not None:
+        query = query.order_by(order, GrantListing.last_seen_at.desc())
+    else:
+        query = query.order_by(GrantListing.last_seen_at.desc())
+    return query.limit(limit).all()
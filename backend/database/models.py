@@ -1034,6 +1034,98 @@ class DocumentChunk(Base):
         return f"<DocumentChunk {self.document_id[:8]}:{self.chunk_index}>"
 
 
+class ChunkFingerprint(Base):
+    """
+    Content fingerprint (and vector) of every chunk written to a vector index.
+    Lets re-syncs reuse the stored vector for byte-identical chunk text
+    instead of paying for the embedding again.
+    """
+    __tablename__ = "chunk_fingerprints"
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    tenant_id = Column(String(36), ForeignKey("tenants.id"), nullable=False)
+    index_name = Column(String(50), nullable=False, default="pinecone")  # pinecone | local
+
+    # Vector identity (Pinecone vector ID = md5(doc_id_chunk_idx))
+    vector_id = Column(String(255), nullable=False)
+    document_id = Column(String(255), nullable=False)  # Document.id or "inventory:<id>" etc.
+    chunk_index = Column(Integer, nullable=False, default=0)
+
+    # sha256(model | dimensions | normalized chunk text)
+    content_hash = Column(String(64), nullable=False)
+    metadata_hash = Column(String(32))
+    embedding = Column(LargeBinary)  # float32 bytes
+    embedding_model = Column(String(100))
+
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
+
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'index_name', 'vector_id', name='uq_chunk_fp_vector'),
+        Index('ix_chunk_fp_tenant_hash', 'tenant_id', 'content_hash'),
+        Index('ix_chunk_fp_tenant_doc', 'tenant_id', 'document_id'),
+    )
+
+    def __repr__(self):
+        return f"<ChunkFingerprint {self.vector_id[:8]} {self.content_hash[:8]}>"
+
+
+class DocumentExtractionCache(Base):
+    """
+    Last v3 deep extraction (raw LLM JSON) per document. Reused while the
+    document text, extraction prompt and model are unchanged, so gap analysis
+    only re-extracts changed documents and resumes after a worker restart.
+    """
+    __tablename__ = "document_extraction_cache"
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    tenant_id = Column(String(36), ForeignKey("tenants.id"), nullable=False)
+    document_id = Column(String(255), nullable=False)
+
+    # sha256(prompt version | model | doc id | title | content)
+    content_key = Column(String(64), nullable=False)
+    prompt_version = Column(String(32))
+    extraction_model = Column(String(100))
+    extraction = Column(Text, nullable=False)  # raw extraction JSON
+    extracted_at = Column(String(40))
+
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
+
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'document_id', name='uq_extraction_cache_doc'),
+    )
+
+    def __repr__(self):
+        return f"<DocumentExtractionCache {self.document_id} {self.content_key[:8]}>"
+
+
+class GrantListing(Base):
+    """
+    Local index of public grant listings (NIH RePORTER, Grants.gov, NSF, SBIR,
+    Federal RePORTER), shared by all tenants and refreshed by the daily grant
+    scrape. Interactive grant searches read it instead of waiting on the
+    agency APIs; full-text search is added by migrations/add_grant_index.py.
+    """
+    __tablename__ = "grant_listings"
+
+    id = Column(String(255), primary_key=True)  # source-prefixed, e.g. nih_10456789
+    source = Column(String(50), nullable=False)
+
+    # Normalized title (GrantFinderService._normalize_title) - cross-source dedup key
+    title_key = Column(String(500), index=True)
+    title = Column(Text, nullable=False)
+    abstract = Column(Text)
+    agency = Column(String(100))
+    activity_code = Column(String(20))
+    award_amount = Column(Integer, default=0)
+    data = Column(JSON, nullable=False)  # grant dict as returned by the source search
+
+    first_seen_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+    last_seen_at = Column(DateTime(timezone=True), default=utc_now, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<GrantListing {self.id}>"
+
+
 # ============================================================================
 # PROJECT MODEL
 # ============================================================================
@@ -2856,6 +2948,13 @@ def init_database():
     Base.metadata.create_all(bind=engine)
     print("✓ Database tables created successfully")
 
+    # Only checks: the indexes are built by migrations/add_document_search_index.py
+    # and migrations/add_grant_index.py
+    from .document_search import probe_document_search_index
+    from .grant_index import probe_grant_search_index
+    probe_document_search_index(engine)
+    probe_grant_search_index(engine)
+
 
 class SearchFeedback(Base):
     """
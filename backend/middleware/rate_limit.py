@@ -1,25 +1,45 @@
 """
 Rate Limiting Middleware
 Per-tenant rate limiting to prevent abuse and control costs.
+
+Limits use GCRA (generic cell rate algorithm): each key stores a single
+"theoretical arrival time", so memory is O(1) per key regardless of the
+limit. A limit of N per window admits a burst of N, then one request every
+window/N seconds.
+
+Backends (RATE_LIMIT_BACKEND):
+- "memory": per-process, striped locks. With several gunicorn workers each
+  worker enforces the limit on its own (N workers allow N x the quota).
+- "redis": one atomic Lua script per decision against REDIS_URL, shared by
+  all workers. If Redis is unreachable requests are allowed (fail open).
 """
 
+import os
+import math
 import time
+import zlib
 from typing import Dict, Optional, Tuple
 from functools import wraps
 from flask import request, jsonify, g
 from datetime import datetime, timedelta
 import threading
 
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_LOCK_STRIPES = int(os.getenv("RATE_LIMIT_LOCK_STRIPES", "64"))
+
 
 class RateLimiter:
     """
-    Simple in-memory rate limiter with sliding window algorithm.
-    For production, use Redis for distributed rate limiting.
+    In-memory GCRA rate limiter.
+    Keys are spread over RATE_LIMIT_LOCK_STRIPES independently locked dicts,
+    so concurrent requests for different tenants rarely contend.
     """
 
-    def __init__(self):
-        self._requests: Dict[str, list] = {}  # tenant_id -> list of timestamps
-        self._lock = threading.Lock()
+    def __init__(self, stripes: int = RATE_LIMIT_LOCK_STRIPES):
+        self._stripes = [({}, threading.Lock()) for _ in range(max(1, stripes))]
+
+    def _stripe(self, key: str) -> Tuple[Dict[str, float], threading.Lock]:
+        return self._stripes[zlib.crc32(key.encode()) % len(self._stripes)]
 
     def is_allowed(
         self,
@@ -31,47 +51,106 @@ class RateLimiter:
         Check if request is allowed for tenant.
         Returns (is_allowed, retry_after_seconds)
         """
-        now = time.time()
-        window_start = now - window_seconds
-
-        with self._lock:
-            # Get request timestamps for this tenant
-            if tenant_id not in self._requests:
-                self._requests[tenant_id] = []
-
-            timestamps = self._requests[tenant_id]
-
-            # Remove timestamps outside the window
-            timestamps[:] = [ts for ts in timestamps if ts > window_start]
+        emission_interval = window_seconds / limit
+        now = time.monotonic()
+        arrivals, lock = self._stripe(tenant_id)
+
+        with lock:
+            tat = max(arrivals.get(tenant_id, now), now)
+            allow_at = tat + emission_interval - window_seconds
+            if allow_at > now:
+                return False, math.ceil(allow_at - now)
+            arrivals[tenant_id] = tat + emission_interval
+            return True, None
 
-            # Check if limit exceeded
-            if len(timestamps) >= limit:
-                # Calculate retry after (time until oldest request expires)
-                retry_after = int(timestamps[0] - window_start) + 1
-                return False, retry_after
+    def cleanup(self, max_age_seconds: int = 3600):
+        """Remove keys that have fully recovered (same as never seen)"""
+        now = time.monotonic()
+        for arrivals, lock in self._stripes:
+            with lock:
+                for key in [k for k, tat in arrivals.items() if tat <= now]:
+                    del arrivals[key]
+
+
+class RedisRateLimiter:
+    """GCRA rate limiter shared across workers (one Lua script call per decision)."""
+
+    PREFIX = "rate_limit"
+
+    # Server clock (TIME) so all workers agree; floats are returned as strings
+    # because Lua numbers are truncated to integers in replies
+    GCRA_SCRIPT = """
+local emission_interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local allow_at = tat + emission_interval - window
+if allow_at > now then
+  return {0, tostring(allow_at - now)}
+end
+local new_tat = tat + emission_interval
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
 
-            # Add current timestamp
-            timestamps.append(now)
+    def __init__(self, url: Optional[str] = None):
+        import redis
+        self.client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self._script = self.client.register_script(self.GCRA_SCRIPT)
+        self._last_error_log = 0.0
 
+    def is_allowed(
+        self,
+        tenant_id: str,
+        limit: int = 100,
+        window_seconds: int = 60
+    ) -> Tuple[bool, Optional[int]]:
+        """
+        Check if request is allowed for tenant.
+        Returns (is_allowed, retry_after_seconds)
+        """
+        try:
+            allowed, wait = self._script(
+                keys=[f"{self.PREFIX}:{tenant_id}"],
+                args=[window_seconds / limit, window_seconds]
+            )
+        except Exception as e:
+            if time.monotonic() - self._last_error_log > 60:
+                self._last_error_log = time.monotonic()
+                print(f"[RateLimiter] Redis error, allowing request: {e}", flush=True)
+            return True, None
+        if int(allowed):
             return True, None
+        return False, math.ceil(float(wait))
 
     def cleanup(self, max_age_seconds: int = 3600):
-        """Remove old entries to prevent memory leak"""
-        now = time.time()
-        cutoff = now - max_age_seconds
+        """Keys expire in Redis on their own"""
+        pass
 
-        with self._lock:
-            for tenant_id in list(self._requests.keys()):
-                timestamps = self._requests[tenant_id]
-                timestamps[:] = [ts for ts in timestamps if ts > cutoff]
 
-                # Remove tenant if no recent requests
-                if not timestamps:
-                    del self._requests[tenant_id]
+# Global rate limiter instance (created on first use)
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
 
 
-# Global rate limiter instance
-_rate_limiter = RateLimiter()
+def get_rate_limiter():
+    """Get the process-wide rate limiter for RATE_LIMIT_BACKEND"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                limiter = None
+                if RATE_LIMIT_BACKEND == "redis":
+                    try:
+                        limiter = RedisRateLimiter()
+                        limiter.client.ping()
+                    except Exception as e:
+                        print(f"[RateLimiter] Redis unavailable ({e}), using in-memory limiter", flush=True)
+                        limiter = None
+                _rate_limiter = limiter or RateLimiter()
+    return _rate_limiter
 
 
 # ============================================================================
@@ -108,7 +187,7 @@ def rate_limit(
                 return f(*args, **kwargs)
 
             # Check rate limit
-            is_allowed, retry_after = _rate_limiter.is_allowed(
+            is_allowed, retry_after = get_rate_limiter().is_allowed(
                 tenant_id,
                 limit=limit,
                 window_seconds=window_seconds
@@ -212,7 +291,7 @@ def rate_limit_by_plan(action: str = "general"):
             limit, window = get_tenant_plan_rate_limit(plan, action)
 
             # Check rate limit
-            is_allowed, retry_after = _rate_limiter.is_allowed(
+            is_allowed, retry_after = get_rate_limiter().is_allowed(
                 f"{tenant_id}:{action}",  # Unique key per action
                 limit=limit,
                 window_seconds=window
@@ -248,7 +327,7 @@ def start_cleanup_task(interval_seconds: int = 3600):
     def cleanup_loop():
         while True:
             time.sleep(interval_seconds)
-            _rate_limiter.cleanup()
+            get_rate_limiter().cleanup()
 
     thread = threading.Thread(target=cleanup_loop, daemon=True)
     thread.start()
@@ -0,0 +1,67 @@
+"""
+Add Document Full-Text Search Index Migration
+Date: 2026-10-16
+
+PostgreSQL: pg_trgm extension, documents.search_vector (generated tsvector)
+with a GIN index, and trigram GIN indexes on title and sender.
+Adding the generated column rewrites the documents table under an ACCESS
+EXCLUSIVE lock - run it off-peak (it gives up after a 5s lock wait rather
+than stalling traffic). The GIN indexes are built CONCURRENTLY afterwards.
+This is the only place the index is built; app start only checks for it.
+
+SQLite: documents_fts FTS5 table plus sync triggers, backfilled from documents.
+"""
+
+from sqlalchemy import create_engine, text
+from database.config import get_database_url
+from database.document_search import ensure_document_search_index
+
+
+def upgrade():
+    """Create the full-text search index"""
+    engine = create_engine(get_database_url())
+    if ensure_document_search_index(engine):
+        print("\n✓ Document search index created successfully")
+    else:
+        print("\n⚠ Document search index could not be created (search falls back to ILIKE)")
+
+
+def downgrade():
+    """Remove the full-text search index"""
+    engine = create_engine(get_database_url())
+
+    if engine.dialect.name == 'postgresql':
+        statements = [
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_document_sender_trgm",
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_document_title_trgm",
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_document_search_vector",
+            "ALTER TABLE documents DROP COLUMN IF EXISTS search_vector",
+        ]
+    else:
+        statements = [
+            "DROP TRIGGER IF EXISTS documents_fts_update",
+            "DROP TRIGGER IF EXISTS documents_fts_delete",
+            "DROP TRIGGER IF EXISTS documents_fts_insert",
+            "DROP TABLE IF EXISTS documents_fts",
+        ]
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for statement in statements:
+            try:
+                conn.execute(text(statement))
+                print(f"✓ {statement}")
+            except Exception as e:
+                print(f"⚠ Could not run '{statement}': {e}")
+
+    print("\n✓ Document search index removed")
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'downgrade':
+        print("Running downgrade migration...")
+        downgrade()
+    else:
+        print("Running upgrade migration...")
+        upgrade()
@@ -0,0 +1,67 @@
+"""
+Add Local Grant Index Migration
+Date: 2026-10-16
+
+Creates grant_listings, the local index of public grant listings filled by the
+daily grant scrape (tasks.grant_scrape_tasks.scrape_grants_daily), and its
+full-text index. Grant searches read it before fanning out to the live APIs.
+
+PostgreSQL: grant_listings.search_vector (generated tsvector) with a GIN index
+built CONCURRENTLY. The table is new and small, so adding the column is cheap.
+This is the only place the index is built; app start only checks for it.
+
+SQLite: grant_listings_fts FTS5 table plus sync triggers, backfilled from grant_listings.
+"""
+
+from sqlalchemy import create_engine, text
+from database.config import get_database_url
+from database.grant_index import ensure_grant_search_index
+
+
+def upgrade():
+    """Create the grant index table and its full-text index"""
+    engine = create_engine(get_database_url())
+    if ensure_grant_search_index(engine):
+        print("\n✓ Grant index created successfully")
+    else:
+        print("\n⚠ Grant full-text index could not be created (local grant search falls back to ILIKE)")
+
+
+def downgrade():
+    """Remove the grant index"""
+    engine = create_engine(get_database_url())
+
+    if engine.dialect.name == 'postgresql':
+        statements = [
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_grant_listing_search_vector",
+            "DROP TABLE IF EXISTS grant_listings",
+        ]
+    else:
+        statements = [
+            "DROP TRIGGER IF EXISTS grant_listings_fts_update",
+            "DROP TRIGGER IF EXISTS grant_listings_fts_delete",
+            "DROP TRIGGER IF EXISTS grant_listings_fts_insert",
+            "DROP TABLE IF EXISTS grant_listings_fts",
+            "DROP TABLE IF EXISTS grant_listings",
+        ]
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for statement in statements:
+            try:
+                conn.execute(text(statement))
+                print(f"✓ {statement}")
+            except Exception as e:
+                print(f"⚠ Could not run '{statement}': {e}")
+
+    print("\n✓ Grant index removed")
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'downgrade':
+        print("Running downgrade migration...")
+        downgrade()
+    else:
+        print("Running upgrade migration...")
+        upgrade()
@@ -22,6 +22,22 @@ Usage:
 
     # Batch prediction
     results = suite.predict_subfield_batch([("Title1", "Abstract1"), ("Title2", "Abstract2")])
+    results = suite.predict_all_batch([{"title": "T1", "abstract": "A1", "author_count": 5}, ...])
+
+Inference engine:
+    - predict_all / predict_all_batch tokenize each paper once and reuse the
+      encoding for every DistilBERT model whose tokenizer has the same
+      vocabulary (the three encoders are fine-tuned separately, so each
+      still needs its own forward pass)
+    - Inputs are padded to the longest paper in the batch, not MAX_SEQ_LEN;
+      papers are length-sorted before batching
+    - Backends (ONCOLOGY_INFERENCE_BACKEND): "torch", "quantized" (int8
+      dynamic quantization of the Linear layers) or "onnx" (ONNX Runtime,
+      CPU). Missing packages fall back to torch.
+    - enable_micro_batching(): concurrent predict_all calls are queued for up
+      to ONCOLOGY_MAX_WAIT_MS and run as one batch
+    - warmup(): load every model and run one dummy batch; the Celery worker
+      calls it at process start when ONCOLOGY_PREWARM is set
 """
 
 import json
@@ -29,6 +45,8 @@ import logging
 import os
 import pickle
 import tempfile
+import threading
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
 
@@ -37,6 +55,8 @@ import torch
 import torch.nn as nn
 from transformers import DistilBertTokenizer, DistilBertModel
 
+from oncology_model.micro_batcher import MicroBatcher
+
 logger = logging.getLogger(__name__)
 
 # ── Constants ────────────────────────────────────────────────────────────────
@@ -44,6 +64,14 @@ logger = logging.getLogger(__name__)
 MAX_SEQ_LEN = 512
 DISTILBERT_HIDDEN = 768
 
+BACKENDS = ("torch", "quantized", "onnx")
+ONCOLOGY_INFERENCE_BACKEND = os.getenv("ONCOLOGY_INFERENCE_BACKEND", "torch").lower()
+ONCOLOGY_BATCH_SIZE = int(os.getenv("ONCOLOGY_BATCH_SIZE", "16"))
+ONCOLOGY_MAX_WAIT_MS = float(os.getenv("ONCOLOGY_MAX_WAIT_MS", "10"))
+ONCOLOGY_MODEL_DIR = os.getenv("ONCOLOGY_MODEL_DIR")
+ONCOLOGY_MODEL_S3_BUCKET = os.getenv("ONCOLOGY_MODEL_S3_BUCKET")
+ONCOLOGY_MODEL_S3_PREFIX = os.getenv("ONCOLOGY_MODEL_S3_PREFIX", "")
+
 
 # ── Model Definitions (must match training scripts) ─────────────────────────
 
@@ -109,6 +137,59 @@ class PaperTypeClassifier(nn.Module):
         return logits
 
 
+class OnnxClassifier:
+    """
+    ONNX Runtime session with the same call signature as the torch modules.
+
+    The torch model is exported once to `onnx_path` (batch and sequence axes
+    dynamic) and reused on later loads.
+    """
+
+    def __init__(self, model: nn.Module, onnx_path: str, metadata_dim: int = 0):
+        import onnxruntime as ort
+
+        if not os.path.exists(onnx_path):
+            self._export(model, onnx_path, metadata_dim)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    @staticmethod
+    def _export(model: nn.Module, onnx_path: str, metadata_dim: int):
+        input_ids = torch.ones(1, 16, dtype=torch.long)
+        attention_mask = torch.ones(1, 16, dtype=torch.long)
+        args = (input_ids, attention_mask)
+        input_names = ["input_ids", "attention_mask"]
+        dynamic_axes = {
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"},
+        }
+        if metadata_dim:
+            args += (torch.zeros(1, metadata_dim, dtype=torch.float32),)
+            input_names.append("metadata")
+            dynamic_axes["metadata"] = {0: "batch"}
+
+        tmp_path = f"{onnx_path}.tmp"
+        torch.onnx.export(
+            model.cpu().eval(), args, tmp_path,
+            input_names=input_names, output_names=["logits"],
+            dynamic_axes=dynamic_axes, opset_version=14,
+        )
+        os.replace(tmp_path, onnx_path)
+        logger.info(f"Exported ONNX model to {onnx_path}")
+
+    def __call__(self, input_ids, attention_mask, metadata=None):
+        feeds = {
+            "input_ids": input_ids.cpu().numpy(),
+            "attention_mask": attention_mask.cpu().numpy(),
+        }
+        if metadata is not None and "metadata" in self.input_names:
+            feeds["metadata"] = metadata.cpu().numpy()
+        return torch.from_numpy(self.session.run(["logits"], feeds)[0])
+
+
 # ── Oncology Model Suite ─────────────────────────────────────────────────────
 
 PAPER_TYPES_LIST = ["experimental", "review", "meta_analysis", "case_report", "protocol"]
@@ -129,6 +210,7 @@ class OncologyModelSuite:
         s3_bucket: Optional[str] = None,
         s3_prefix: str = "",
         device: Optional[str] = None,
+        backend: str = ONCOLOGY_INFERENCE_BACKEND,
     ):
         """
         Initialize the model suite.
@@ -139,6 +221,7 @@ class OncologyModelSuite:
             s3_bucket: S3 bucket name (alternative to model_dir)
             s3_prefix: Prefix within the S3 bucket
             device: Force device ('cuda', 'mps', 'cpu'). Auto-detects if None.
+            backend: "torch", "quantized" or "onnx" (the latter two are CPU-only)
         """
         if model_dir is None and s3_bucket is None:
             raise ValueError("Must provide either model_dir or s3_bucket")
@@ -157,7 +240,12 @@ class OncologyModelSuite:
         else:
             self.device = torch.device("cpu")
 
-        logger.info(f"OncologyModelSuite initialized on device: {self.device}")
+        self.backend = backend if backend in BACKENDS else "torch"
+        if self.backend != "torch" and self.device.type != "cpu":
+            logger.info(f"Backend '{self.backend}' is CPU-only; using torch on {self.device}")
+            self.backend = "torch"
+
+        logger.info(f"OncologyModelSuite initialized on device: {self.device} (backend: {self.backend})")
 
         # Lazy-loaded model state
         self._subfield_model = None
@@ -177,6 +265,10 @@ class OncologyModelSuite:
 
         self._s3_local_cache = None  # temp dir for S3 downloads
 
+        self._load_lock = threading.RLock()
+        self._shared_tokenizer_cache: Dict[int, bool] = {}
+        self._batcher: Optional[MicroBatcher] = None
+
     # ── S3 Download ──────────────────────────────────────────────────────────
 
     def _ensure_local_dir(self) -> str:
@@ -227,6 +319,29 @@ class OncologyModelSuite:
         logger.info(f"Models downloaded to {temp_dir}")
         return temp_dir
 
+    # ── Inference Backends ───────────────────────────────────────────────────
+
+    def _apply_backend(self, model: nn.Module, model_path: str, metadata_dim: int = 0):
+        """Wrap a loaded torch model for the configured backend (falls back to torch)."""
+        if self.backend == "torch":
+            return model
+        try:
+            if self.backend == "quantized":
+                return torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+            onnx_path = os.path.join(model_path, "model.onnx")
+            weights_path = os.path.join(model_path, "best_model.pt")
+            if (os.path.exists(onnx_path) and os.path.exists(weights_path)
+                    and os.path.getmtime(onnx_path) < os.path.getmtime(weights_path)):
+                os.remove(onnx_path)  # exported from older weights
+            if not os.access(model_path, os.W_OK) and not os.path.exists(onnx_path):
+                onnx_path = os.path.join(tempfile.mkdtemp(prefix="oncology_onnx_"), "model.onnx")
+            return OnnxClassifier(model, onnx_path, metadata_dim=metadata_dim)
+        except ImportError as e:
+            logger.warning(f"Backend '{self.backend}' unavailable ({e}); using torch for {model_path}")
+        except Exception as e:
+            logger.warning(f"Backend '{self.backend}' failed for {model_path} ({e}); using torch")
+        return model
+
     # ── Subfield Classifier (Model 1) ────────────────────────────────────────
 
     def _load_subfield_model(self):
@@ -260,6 +375,7 @@ class OncologyModelSuite:
         self._subfield_model.load_state_dict(state_dict)
         self._subfield_model.to(self.device)
         self._subfield_model.eval()
+        self._subfield_model = self._apply_backend(self._subfield_model, model_path)
 
         logger.info(f"Subfield classifier loaded ({num_classes} classes)")
 
@@ -282,7 +398,7 @@ class OncologyModelSuite:
         encoding = self._subfield_tokenizer(
             text,
             max_length=MAX_SEQ_LEN,
-            padding="max_length",
+            padding=True,
             truncation=True,
             return_tensors="pt",
         )
@@ -328,7 +444,7 @@ class OncologyModelSuite:
             encodings = self._subfield_tokenizer(
                 texts,
                 max_length=MAX_SEQ_LEN,
-                padding="max_length",
+                padding=True,
                 truncation=True,
                 return_tensors="pt",
             )
@@ -382,6 +498,7 @@ class OncologyModelSuite:
         self._tier_model.load_state_dict(state_dict)
         self._tier_model.to(self.device)
         self._tier_model.eval()
+        self._tier_model = self._apply_backend(self._tier_model, model_path, metadata_dim=metadata_dim)
 
         logger.info(f"Tier predictor loaded ({num_classes} classes, metadata_dim={metadata_dim})")
 
@@ -444,7 +561,7 @@ class OncologyModelSuite:
         encoding = self._tier_tokenizer(
             text,
             max_length=MAX_SEQ_LEN,
-            padding="max_length",
+            padding=True,
             truncation=True,
             return_tensors="pt",
         )
@@ -501,7 +618,7 @@ class OncologyModelSuite:
             encodings = self._tier_tokenizer(
                 texts,
                 max_length=MAX_SEQ_LEN,
-                padding="max_length",
+                padding=True,
                 truncation=True,
                 return_tensors="pt",
             )
@@ -592,6 +709,7 @@ class OncologyModelSuite:
             self._paper_type_bert_model.load_state_dict(state_dict)
             self._paper_type_bert_model.to(self.device)
             self._paper_type_bert_model.eval()
+            self._paper_type_bert_model = self._apply_backend(self._paper_type_bert_model, bert_dir)
             self._paper_type_use_bert = True
             logger.info("Paper type classifier loaded (DistilBERT fallback)")
             return
@@ -631,7 +749,7 @@ class OncologyModelSuite:
             encoding = self._paper_type_bert_tokenizer(
                 f"{title} [SEP] {abstract}",
                 max_length=MAX_SEQ_LEN,
-                padding="max_length",
+                padding=True,
                 truncation=True,
                 return_tensors="pt",
             )
@@ -684,7 +802,7 @@ class OncologyModelSuite:
                 encodings = self._paper_type_bert_tokenizer(
                     texts,
                     max_length=MAX_SEQ_LEN,
-                    padding="max_length",
+                    padding=True,
                     truncation=True,
                     return_tensors="pt",
                 )
@@ -705,6 +823,136 @@ class OncologyModelSuite:
 
     # ── Combined Prediction ──────────────────────────────────────────────────
 
+    def _load_all(self):
+        """Load all 3 models (serialized so concurrent callers load once)."""
+        with self._load_lock:
+            self._load_paper_type_model()
+            self._load_subfield_model()
+            self._load_tier_model()
+
+    def _shares_tokenizer(self, tokenizer) -> bool:
+        """True if `tokenizer` produces the same ids as the subfield tokenizer."""
+        base = self._subfield_tokenizer
+        if tokenizer is base:
+            return True
+        key = id(tokenizer)
+        if key not in self._shared_tokenizer_cache:
+            self._shared_tokenizer_cache[key] = (
+                type(tokenizer) is type(base)
+                and getattr(tokenizer, "do_lower_case", None) == getattr(base, "do_lower_case", None)
+                and tokenizer.get_vocab() == base.get_vocab()
+            )
+        return self._shared_tokenizer_cache[key]
+
+    def _encode(self, tokenizer, texts: List[str], shared=None):
+        """(input_ids, attention_mask) for texts, reusing `shared` when the tokenizer matches."""
+        if shared is not None and self._shares_tokenizer(tokenizer):
+            return shared
+        encodings = tokenizer(
+            texts,
+            max_length=MAX_SEQ_LEN,
+            padding=True,
+            truncation=True,
+            return_tensors="pt",
+        )
+        return encodings["input_ids"].to(self.device), encodings["attention_mask"].to(self.device)
+
+    def _predict_all_chunk(self, papers: List[Dict]) -> List[Dict]:
+        """Run all 3 models on one batch of papers with a single shared tokenization."""
+        pairs = [(p.get("title", "") or "", p.get("abstract", "") or "") for p in papers]
+        bert_texts = [f"{title} [SEP] {abstract}" for title, abstract in pairs]
+        shared = self._encode(self._subfield_tokenizer, bert_texts)
+
+        with torch.no_grad():
+            # Paper type first (needed for tier prediction)
+            if not self._paper_type_use_bert:
+                paper_types = self.predict_paper_type_batch(pairs)
+            else:
+                input_ids, attention_mask = self._encode(self._paper_type_bert_tokenizer, bert_texts, shared)
+                pt_probs = torch.softmax(
+                    self._paper_type_bert_model(input_ids, attention_mask), dim=-1
+                ).cpu().numpy()
+                classes = self._paper_type_mappings.get("classes", PAPER_TYPES_LIST)
+                paper_types = [
+                    (classes[int(np.argmax(row))], float(row[int(np.argmax(row))])) for row in pt_probs
+                ]
+
+            # Sub-field
+            sf_probs = torch.softmax(self._subfield_model(*shared), dim=-1).cpu().numpy()
+
+            # Tier (uses paper_type from model 3)
+            input_ids, attention_mask = self._encode(self._tier_tokenizer, bert_texts, shared)
+            metadata = np.array([
+                self._encode_tier_metadata(
+                    author_count=p.get("author_count", 1),
+                    ref_count=p.get("ref_count", 20),
+                    paper_type=paper_type,
+                    has_funding=p.get("has_funding", False),
+                    institution_count=p.get("institution_count", 1),
+                    is_multicenter=p.get("is_multicenter", False),
+                )
+                for p, (paper_type, _) in zip(papers, paper_types)
+            ])
+            metadata_tensor = torch.tensor(metadata, dtype=torch.float32).to(self.device)
+            tier_probs = torch.softmax(
+                self._tier_model(input_ids, attention_mask, metadata_tensor), dim=-1
+            ).cpu().numpy()
+
+        sf_id2label = self._subfield_mappings["id2label"]
+        tier_id2label = self._tier_mappings["id2label"]
+        results = []
+        for j, (paper_type, pt_confidence) in enumerate(paper_types):
+            sf_idx = int(np.argmax(sf_probs[j]))
+            tier_idx = int(np.argmax(tier_probs[j]))
+            results.append({
+                "subfield": {
+                    "label": sf_id2label[str(sf_idx)],
+                    "confidence": float(sf_probs[j][sf_idx]),
+                    "probabilities": {sf_id2label[str(k)]: float(p) for k, p in enumerate(sf_probs[j])},
+                },
+                "tier": {
+                    "label": tier_id2label[str(tier_idx)],
+                    "confidence": float(tier_probs[j][tier_idx]),
+                    "probabilities": {tier_id2label[str(k)]: float(p) for k, p in enumerate(tier_probs[j])},
+                },
+                "paper_type": {
+                    "label": paper_type,
+                    "confidence": pt_confidence,
+                },
+            })
+        return results
+
+    def predict_all_batch(
+        self, papers: List[Dict], batch_size: int = ONCOLOGY_BATCH_SIZE
+    ) -> List[Dict]:
+        """
+        Run all 3 models on many papers.
+
+        Args:
+            papers: List of dicts with keys: title, abstract and optionally
+                    author_count, ref_count, has_funding, institution_count,
+                    is_multicenter
+            batch_size: Papers per forward pass
+
+        Returns:
+            One predict_all() result per paper, in input order
+        """
+        if not papers:
+            return []
+        self._load_all()
+
+        # Length-sorted so each batch pads to papers of similar length
+        order = sorted(
+            range(len(papers)),
+            key=lambda i: len(papers[i].get("title", "") or "") + len(papers[i].get("abstract", "") or ""),
+        )
+        results: List[Optional[Dict]] = [None] * len(papers)
+        for start in range(0, len(order), max(1, batch_size)):
+            idx = order[start : start + batch_size]
+            for i, result in zip(idx, self._predict_all_chunk([papers[i] for i in idx])):
+                results[i] = result
+        return results
+
     def predict_all(
         self,
         title: str,
@@ -718,6 +966,8 @@ class OncologyModelSuite:
         """
         Run all 3 models on a single paper.
 
+        With micro-batching enabled, concurrent calls share one batch.
+
         Returns:
             {
                 "subfield": {"label": str, "confidence": float, "probabilities": dict},
@@ -725,40 +975,38 @@ class OncologyModelSuite:
                 "paper_type": {"label": str, "confidence": float},
             }
         """
-        # Predict paper type first (needed for tier prediction)
-        paper_type, pt_confidence = self.predict_paper_type(title, abstract)
-
-        # Sub-field
-        sf_label, sf_conf, sf_probs = self.predict_subfield(title, abstract)
-
-        # Tier (uses paper_type from model 3)
-        tier_label, tier_conf, tier_probs = self.predict_tier(
-            title,
-            abstract,
-            author_count=author_count,
-            ref_count=ref_count,
-            paper_type=paper_type,
-            has_funding=has_funding,
-            institution_count=institution_count,
-            is_multicenter=is_multicenter,
+        paper = {
+            "title": title,
+            "abstract": abstract,
+            "author_count": author_count,
+            "ref_count": ref_count,
+            "has_funding": has_funding,
+            "institution_count": institution_count,
+            "is_multicenter": is_multicenter,
+        }
+        if self._batcher is not None:
+            return self._batcher(paper)
+        return self.predict_all_batch([paper])[0]
+
+    def enable_micro_batching(
+        self, max_batch_size: int = ONCOLOGY_BATCH_SIZE, max_wait_ms: float = ONCOLOGY_MAX_WAIT_MS
+    ):
+        """Queue concurrent predict_all calls and run them as one batch."""
+        self._batcher = MicroBatcher(
+            lambda papers: self.predict_all_batch(papers, batch_size=max_batch_size),
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
         )
 
-        return {
-            "subfield": {
-                "label": sf_label,
-                "confidence": sf_conf,
-                "probabilities": sf_probs,
-            },
-            "tier": {
-                "label": tier_label,
-                "confidence": tier_conf,
-                "probabilities": tier_probs,
-            },
-            "paper_type": {
-                "label": paper_type,
-                "confidence": pt_confidence,
-            },
-        }
+    def warmup(self):
+        """Load every model (and build the ONNX/quantized variants) and run one batch."""
+        start = time.time()
+        self._load_all()
+        self.predict_all_batch([
+            {"title": "Warm-up", "abstract": "Tumor cells were treated and analyzed."},
+            {"title": "Warm-up review", "abstract": "We review recent advances in immunotherapy."},
+        ])
+        logger.info(f"OncologyModelSuite warmed up in {time.time() - start:.1f}s ({self.backend})")
 
     # ── Cleanup ──────────────────────────────────────────────────────────────
 
@@ -776,3 +1024,28 @@ class OncologyModelSuite:
             self.cleanup()
         except Exception:
             pass
+
+
+_suite: Optional[OncologyModelSuite] = None
+_suite_lock = threading.Lock()
+
+
+def get_oncology_suite() -> OncologyModelSuite:
+    """
+    Get the process-wide suite (ONCOLOGY_MODEL_DIR or ONCOLOGY_MODEL_S3_BUCKET).
+
+    Micro-batching is on unless ONCOLOGY_MAX_WAIT_MS is 0.
+    """
+    global _suite
+    if _suite is None:
+        with _suite_lock:
+            if _suite is None:
+                suite = OncologyModelSuite(
+                    model_dir=ONCOLOGY_MODEL_DIR,
+                    s3_bucket=ONCOLOGY_MODEL_S3_BUCKET,
+                    s3_prefix=ONCOLOGY_MODEL_S3_PREFIX,
+                )
+                if ONCOLOGY_MAX_WAIT_MS > 0:
+                    suite.enable_micro_batching()
+                _suite = suite
+    return _suite
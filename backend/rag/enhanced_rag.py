@@ -20,6 +20,8 @@ from openai import AzureOpenAI
 from functools import lru_cache
 import time
 
+from services.text_similarity import shingle_jaccard_matrix
+
 # Azure OpenAI Configuration
 AZURE_OPENAI_ENDPOINT = "https://rishi-mihfdoty-eastus2.cognitiveservices.azure.com"
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
@@ -338,43 +340,24 @@ class ContextDeduplicator:
         if len(chunks) <= 1:
             return chunks
 
-        unique_chunks = [chunks[0]]
-
-        for chunk in chunks[1:]:
-            is_duplicate = False
-            chunk_text = chunk.get('content', '')
+        similarity = ContextDeduplicator._similarity_matrix(chunks)
+        unique_idx = [0]
 
-            for unique in unique_chunks:
-                unique_text = unique.get('content', '')
+        for i in range(1, len(chunks)):
+            if not any(similarity[i, j] > similarity_threshold for j in unique_idx):
+                unique_idx.append(i)
 
-                # Simple overlap check
-                similarity = ContextDeduplicator._text_similarity(chunk_text, unique_text)
-                if similarity > similarity_threshold:
-                    is_duplicate = True
-                    break
+        return [chunks[i] for i in unique_idx]
 
-            if not is_duplicate:
-                unique_chunks.append(chunk)
-
-        return unique_chunks
+    @staticmethod
+    def _similarity_matrix(chunks: List[Dict]) -> np.ndarray:
+        """All-pairs character 3-gram Jaccard similarity"""
+        return shingle_jaccard_matrix([c.get('content', '') for c in chunks], n=3)
 
     @staticmethod
     def _text_similarity(text1: str, text2: str) -> float:
         """Compute text similarity using character n-grams"""
-        def get_ngrams(text, n=3):
-            text = text.lower()
-            return set(text[i:i+n] for i in range(len(text) - n + 1))
-
-        ngrams1 = get_ngrams(text1)
-        ngrams2 = get_ngrams(text2)
-
-        if not ngrams1 or not ngrams2:
-            return 0.0
-
-        intersection = len(ngrams1 & ngrams2)
-        union = len(ngrams1 | ngrams2)
-
-        return intersection / union if union > 0 else 0.0
+        return float(shingle_jaccard_matrix([text1, text2], n=3)[0, 1])
 
 
 class EnhancedRAG:
@@ -35,6 +35,8 @@ from datetime import datetime
 import time
 from collections import defaultdict
 
+from services.text_similarity import shingle_jaccard_matrix
+
 # Azure OpenAI Configuration
 AZURE_OPENAI_ENDPOINT = "https://rishi-mihfdoty-eastus2.cognitiveservices.azure.com"
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
@@ -580,44 +582,32 @@ class ContextDeduplicator:
         if len(chunks) <= 1:
             return chunks
 
-        unique_chunks = [chunks[0]]
+        # All-pairs 4-gram Jaccard in one sparse product, then the same greedy pass
+        similarity = shingle_jaccard_matrix([c.get('content', '') for c in chunks], n=4)
+        unique_idx = [0]
 
-        for chunk in chunks[1:]:
+        for i in range(1, len(chunks)):
+            chunk = chunks[i]
             is_duplicate = False
-            chunk_text = chunk.get('content', '')
 
-            for unique in unique_chunks:
-                unique_text = unique.get('content', '')
-                similarity = ContextDeduplicator._text_similarity(chunk_text, unique_text)
-                if similarity > similarity_threshold:
+            for j in unique_idx:
+                if similarity[i, j] > similarity_threshold:
+                    unique = chunks[j]
                     # Keep the one with higher score
                     if chunk.get('rerank_score', chunk.get('score', 0)) > unique.get('rerank_score', unique.get('score', 0)):
-                        unique_chunks.remove(unique)
-                        unique_chunks.append(chunk)
+                        unique_idx.remove(j)
+                        unique_idx.append(i)
                     is_duplicate = True
                     break
 
             if not is_duplicate:
-                unique_chunks.append(chunk)
+                unique_idx.append(i)
 
-        return unique_chunks
+        return [chunks[i] for i in unique_idx]
 
     @staticmethod
     def _text_similarity(text1: str, text2: str) -> float:
-        def get_ngrams(text, n=4):
-            text = text.lower()
-            return set(text[i:i+n] for i in range(len(text) - n + 1))
-
-        ngrams1 = get_ngrams(text1)
-        ngrams2 = get_ngrams(text2)
-
-        if not ngrams1 or not ngrams2:
-            return 0.0
-
-        intersection = len(ngrams1 & ngrams2)
-        union = len(ngrams1 | ngrams2)
-
-        return intersection / union if union > 0 else 0.0
+        return float(shingle_jaccard_matrix([text1, text2], n=4)[0, 1])
 
 
 class ResultCache:
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark entity resolution in the v3 knowledge graph
+
+Feeds a synthetic stream of entity mentions (people with titles, initials,
+emails and typos; systems and tools with version suffixes) through
+EntityResolver.get_canonical and reports mentions/sec. The pre-index
+resolver (full scan of canonical_map per new name) is run on the first
+--legacy-mentions of the same stream, and its canonical names are compared
+with the indexed resolver's.
+
+Usage:
+    python scripts/benchmark_entity_resolver.py [--mentions 50000] [--legacy-mentions 5000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from difflib import SequenceMatcher
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.knowledge_gap_v3.deep_extractor import EntityType
+from services.knowledge_gap_v3.knowledge_graph import EntityResolver
+
+FIRST = ("john jane alex maria wei priya carlos fatima olga kenji samuel aisha lucas emma "
+         "noah mia omar sofia ivan lena").split()
+LAST = ("smith garcia chen patel kim nguyen rossi muller okafor tanaka silva novak "
+        "johnson brown lee martin walker young khan singh").split()
+SYSTEMS = ("salesforce jira confluence snowflake postgres redis kafka airflow tableau "
+           "okta github jenkins datadog sentry stripe").split()
+
+
+class LegacyEntityResolver(EntityResolver):
+    """get_canonical as it was before the blocking index: compare against every entry."""
+
+    def get_canonical(self, name, entity_type):
+        normalized = self.normalize_name(name)
+        key = f"{entity_type.value}:{normalized}"
+        if key in self.canonical_map:
+            return self.canonical_map[key]
+        for existing_key, canonical in self.canonical_map.items():
+            if existing_key.startswith(f"{entity_type.value}:"):
+                existing_norm = existing_key.split(":", 1)[1]
+                norm1, norm2 = self.normalize_name(normalized), self.normalize_name(existing_norm)
+                if (norm1 == norm2 or self._is_abbreviation(norm1, norm2) or self._is_abbreviation(norm2, norm1)
+                        or SequenceMatcher(None, norm1, norm2).ratio() >= self.similarity_threshold):
+                    self.canonical_map[key] = canonical
+                    return canonical
+        self.canonical_map[key] = name
+        return name
+
+
+def typo(word, rng):
+    if len(word) < 4:
+        return word
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice("aeiounrst") + word[i + 1:]
+
+
+def make_mentions(n, seed=5):
+    rng = random.Random(seed)
+    people = [(rng.choice(FIRST), rng.choice(LAST) + rng.choice(["", "", "son", "ez", "-" + rng.choice(LAST)]))
+              for _ in range(max(50, n // 6))]
+    mentions = []
+    for _ in range(n):
+        if rng.random() < 0.7:
+            first, last = rng.choice(people)
+            form = rng.random()
+            if form < 0.4:
+                name = f"{first.title()} {last.title()}"
+            elif form < 0.55:
+                name = f"{first[0].upper()}. {last.title()}"
+            elif form < 0.65:
+                name = f"Dr. {first.title()} {last.title()}"
+            elif form < 0.75:
+                name = f"{first}.{last}@lab.org"
+            else:
+                name = f"{typo(first, rng).title()} {typo(last, rng).title()}"
+            mentions.append((name, EntityType.PERSON))
+        else:
+            system = rng.choice(SYSTEMS)
+            suffix = rng.choice(["", "", " prod", " v2", f" {rng.randint(1, 400)}", " cluster", " api"])
+            mentions.append((f"{system.title()}{suffix}", rng.choice([EntityType.SYSTEM, EntityType.TOOL])))
+    return mentions
+
+
+def run(resolver, mentions):
+    start = time.perf_counter()
+    names = [resolver.get_canonical(name, entity_type) for name, entity_type in mentions]
+    return names, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark EntityResolver.get_canonical")
+    parser.add_argument("--mentions", type=int, default=50000)
+    parser.add_argument("--legacy-mentions", type=int, default=5000,
+                        help="Prefix of the stream to run through the full-scan resolver")
+    args = parser.parse_args()
+
+    mentions = make_mentions(args.mentions)
+    legacy_n = min(args.legacy_mentions, len(mentions))
+
+    legacy_names, legacy_s = run(LegacyEntityResolver(), mentions[:legacy_n])
+    indexed_names, indexed_s = run(EntityResolver(), mentions)
+    prefix_s = run(EntityResolver(), mentions[:legacy_n])[1]
+
+    mismatches = sum(1 for a, b in zip(legacy_names, indexed_names) if a != b)
+    print(f"{'resolver':<10} {'mentions':>9} {'seconds':>9} {'mentions/s':>11}")
+    print(f"{'full-scan':<10} {legacy_n:>9} {legacy_s:>9.2f} {legacy_n / legacy_s:>11.0f}")
+    print(f"{'indexed':<10} {legacy_n:>9} {prefix_s:>9.2f} {legacy_n / prefix_s:>11.0f}")
+    print(f"{'indexed':<10} {len(mentions):>9} {indexed_s:>9.2f} {len(mentions) / indexed_s:>11.0f}")
+    print(f"canonical names differing from full scan: {mismatches}/{legacy_n}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark OncologyModelSuite throughput (papers/sec) per backend
+
+Scores synthetic title + abstract pairs with the three oncology models in
+four modes:
+  separate   predict_paper_type + predict_subfield + predict_tier per paper
+             (three tokenizer passes, the pre-engine predict_all path)
+  single     predict_all per paper (one shared tokenization)
+  batched    predict_all_batch over all papers
+  concurrent predict_all from --threads threads with micro-batching on
+
+Usage:
+    python scripts/benchmark_oncology_inference.py --model-dir models/oncology [--backends torch,quantized,onnx]
+
+Options:
+    --model-dir     Local model directory (or --s3-bucket)
+    --backends      Comma-separated backends to measure (default: all)
+    --papers        Papers per mode (default: 64)
+    --batch-size    Batch size for batched/concurrent modes (default: 16)
+    --threads       Caller threads in concurrent mode (default: 8)
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from oncology_model.inference import OncologyModelSuite, BACKENDS
+
+WORDS = (
+    "tumor cancer cells patients survival cohort expression mutation therapy "
+    "immunotherapy checkpoint inhibitor chemotherapy radiotherapy metastasis "
+    "progression biomarker sequencing trial randomized response resistance "
+    "breast lung colorectal leukemia lymphoma melanoma glioma prostate"
+).split()
+
+
+def make_papers(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    papers = []
+    for i in range(n):
+        length = rng.choice([80, 150, 250, 350])  # abstract words; short to long
+        papers.append({
+            "title": " ".join(rng.choice(WORDS) for _ in range(12)),
+            "abstract": " ".join(rng.choice(WORDS) for _ in range(length)),
+            "author_count": rng.randint(1, 30),
+            "ref_count": rng.randint(10, 120),
+        })
+    return papers
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_backend(args, backend: str, papers):
+    suite = OncologyModelSuite(model_dir=args.model_dir, s3_bucket=args.s3_bucket, device="cpu", backend=backend)
+    suite.warmup()
+    n = len(papers)
+
+    def separate():
+        for p in papers:
+            paper_type, _ = suite.predict_paper_type(p["title"], p["abstract"])
+            suite.predict_subfield(p["title"], p["abstract"])
+            suite.predict_tier(p["title"], p["abstract"], author_count=p["author_count"],
+                               ref_count=p["ref_count"], paper_type=paper_type)
+
+    def single():
+        for p in papers:
+            suite.predict_all(p["title"], p["abstract"], author_count=p["author_count"], ref_count=p["ref_count"])
+
+    def batched():
+        suite.predict_all_batch(papers, batch_size=args.batch_size)
+
+    def concurrent():
+        suite.enable_micro_batching(max_batch_size=args.batch_size)
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(lambda p: suite.predict_all(
+                p["title"], p["abstract"], author_count=p["author_count"], ref_count=p["ref_count"]), papers))
+
+    rates = [n / timed(mode) for mode in (separate, single, batched, concurrent)]
+    print(f"{backend:<10} {n:>6} " + " ".join(f"{r:>11.1f}" for r in rates))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark oncology model inference")
+    parser.add_argument("--model-dir")
+    parser.add_argument("--s3-bucket")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--papers", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    if not args.model_dir and not args.s3_bucket:
+        parser.error("--model-dir or --s3-bucket is required")
+
+    papers = make_papers(args.papers)
+    print(f"{'backend':<10} {'papers':>6} {'separate/s':>11} {'single/s':>11} {'batched/s':>11} {'concurrent/s':>11}")
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        if backend not in BACKENDS:
+            print(f"{backend:<10} unknown backend (choose from {', '.join(BACKENDS)})")
+            continue
+        bench_backend(args, backend, papers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark rate limit decisions under contention
+
+N threads call is_allowed() on a mix of tenant keys (a few hot tenants plus
+a long tail) and the script reports decisions/sec and the memory held per
+key. The pre-GCRA limiter (one timestamp list per key behind one global
+lock) is run on the same workload for comparison. The Redis backend is
+included when REDIS_URL answers a ping.
+
+Usage:
+    python scripts/benchmark_rate_limiter.py [--threads 8] [--decisions 200000] [--tenants 1000] [--limit 1000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from middleware.rate_limit import RateLimiter, RedisRateLimiter
+
+
+class LegacyRateLimiter:
+    """RateLimiter as it was before GCRA: sliding log of timestamps, one global lock."""
+
+    def __init__(self):
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    def is_allowed(self, tenant_id, limit=100, window_seconds=60):
+        now = time.time()
+        window_start = now - window_seconds
+        with self._lock:
+            if tenant_id not in self._requests:
+                self._requests[tenant_id] = []
+            timestamps = self._requests[tenant_id]
+            timestamps[:] = [ts for ts in timestamps if ts > window_start]
+            if len(timestamps) >= limit:
+                return False, int(timestamps[0] - window_start) + 1
+            timestamps.append(now)
+            return True, None
+
+
+def make_keys(n, tenants, seed=7):
+    """80% of traffic on 10 hot tenants, the rest spread over the tail."""
+    rng = random.Random(seed)
+    hot = [f"tenant-{i}" for i in range(min(10, tenants))]
+    return [rng.choice(hot) if rng.random() < 0.8 else f"tenant-{rng.randrange(tenants)}"
+            for _ in range(n)]
+
+
+def run(limiter, keys, threads, limit):
+    chunks = [keys[i::threads] for i in range(threads)]
+    allowed = [0] * threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index):
+        barrier.wait()
+        count = 0
+        for key in chunks[index]:
+            if limiter.is_allowed(key, limit=limit, window_seconds=60)[0]:
+                count += 1
+        allowed[index] = count
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in workers:
+        t.join()
+    return sum(allowed), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RateLimiter.is_allowed")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--decisions", type=int, default=200000)
+    parser.add_argument("--tenants", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=1000, help="Requests per 60s window")
+    args = parser.parse_args()
+
+    keys = make_keys(args.decisions, args.tenants)
+    limiters = [("sliding-log", LegacyRateLimiter()), ("gcra", RateLimiter())]
+    try:
+        redis_limiter = RedisRateLimiter()
+        redis_limiter.client.ping()
+        redis_limiter.client.delete(*[f"{RedisRateLimiter.PREFIX}:{k}" for k in set(keys)])
+        limiters.append(("gcra-redis", redis_limiter))
+    except Exception as e:
+        print(f"(skipping redis backend: {e})")
+
+    print(f"{'limiter':<12} {'threads':>7} {'decisions':>10} {'allowed':>8} {'seconds':>8} {'decisions/s':>12} {'floats/key':>10}")
+    for name, limiter in limiters:
+        allowed, seconds = run(limiter, keys, args.threads, args.limit)
+        if isinstance(limiter, LegacyRateLimiter):
+            per_key = sum(len(v) for v in limiter._requests.values()) / max(1, len(limiter._requests))
+        elif isinstance(limiter, RateLimiter):
+            per_key = 1.0
+        else:
+            per_key = float("nan")
+        print(f"{name:<12} {args.threads:>7} {len(keys):>10} {allowed:>8} {seconds:>8.2f} "
+              f"{len(keys) / seconds:>12.0f} {per_key:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
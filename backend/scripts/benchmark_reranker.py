@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark cross-encoder reranking latency per backend
+
+Scores synthetic (query, chunk) candidate sets of 30 and 60 pairs - the
+sizes search sends the reranker for top_k=10 and top_k=20 - with each
+RerankEngine backend, on CPU, with the score cache disabled. A final
+column shows a repeated query served from the score cache.
+
+Usage:
+    python scripts/benchmark_reranker.py [--backends torch,quantized,onnx] [--runs 10]
+
+Options:
+    --backends      Comma-separated backends to measure (default: all)
+    --sizes         Candidate counts (default: 30,60)
+    --runs          Timed runs per size after one warm-up run (default: 10)
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.rerank_engine import RerankEngine, BACKENDS
+
+WORDS = (
+    "protocol assay buffer incubation antibody western blot cell culture sample "
+    "concentration grant budget renewal compliance IRB consent cohort analysis "
+    "sequencing primer PCR reagent inventory freezer centrifuge dilution control"
+).split()
+
+
+def make_candidates(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    candidates = []
+    for i in range(n):
+        length = rng.choice([40, 120, 250, 350])  # words; mix of short and full chunks
+        candidates.append({
+            'chunk_id': f"bench-{n}-{i}",
+            'content': " ".join(rng.choice(WORDS) for _ in range(length)),
+        })
+    return candidates
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench_backend(backend: str, sizes, runs: int):
+    engine = RerankEngine(backend=backend, cache_entries=0, max_workers=1, timeout=600)
+    if not engine.available or engine.backend != backend:
+        print(f"{backend:<10} unavailable (loaded: {engine.backend})")
+        return
+
+    query = "What is the incubation protocol for the western blot antibody?"
+    for n in sizes:
+        candidates = make_candidates(n)
+        engine.rerank(query, [dict(c) for c in candidates], top_k=10)  # warm-up
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            engine.rerank(query, [dict(c) for c in candidates], top_k=10)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        cached_engine = RerankEngine(backend=backend, max_workers=1, timeout=600)
+        cached_engine._scorer, cached_engine.backend = engine._scorer, engine.backend
+        cached_engine.rerank(query, [dict(c) for c in candidates], top_k=10)
+        start = time.perf_counter()
+        cached_engine.rerank(query, [dict(c) for c in candidates], top_k=10)
+        cached_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{backend:<10} {n:>5} {statistics.median(timings):>10.1f} "
+              f"{percentile(timings, 95):>10.1f} {n / (statistics.median(timings) / 1000):>10.0f} {cached_ms:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cross-encoder reranking backends")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--sizes", default="30,60")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    print(f"{'backend':<10} {'pairs':>5} {'p50 ms':>10} {'p95 ms':>10} {'pairs/s':>10} {'cached ms':>10}")
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        if backend not in BACKENDS:
+            print(f"{backend:<10} unknown backend (choose from {', '.join(BACKENDS)})")
+            continue
+        bench_backend(backend, sizes, args.runs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
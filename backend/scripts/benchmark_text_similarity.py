@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the vectorized text-similarity paths
+
+Runs context compression, claim verification and chunk deduplication over
+a synthetic answer context (30 sources x 20 claims by default) and compares
+against the per-sentence / per-claim / per-pair loops they replaced (kept
+here as reference implementations). Also checks both paths agree.
+
+Usage:
+    python scripts/benchmark_text_similarity.py [--sources 30] [--claims 20] [--runs 20]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import statistics
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.enhanced_search_service import ContextCompressor, HallucinationDetector
+from rag.enhanced_rag_v2 import ContextDeduplicator
+
+WORDS = (
+    "protocol assay buffer incubation antibody western blot cell culture sample "
+    "concentration grant budget renewal compliance IRB consent cohort analysis "
+    "sequencing primer PCR reagent inventory freezer centrifuge dilution control "
+    "temperature minutes overnight membrane storage approval facility training"
+).split()
+STOPWORDS = {'this', 'that', 'with', 'from', 'have', 'been', 'were', 'will', 'would', 'could', 'should'}
+
+
+def make_sources(n: int, rng: random.Random):
+    sources = []
+    for i in range(n):
+        sentences = []
+        for _ in range(rng.randint(15, 40)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(6, 18))]
+            if rng.random() < 0.3:
+                words.append(str(rng.randint(1, 500)))
+            sentences.append(" ".join(words).capitalize() + ".")
+        content = " ".join(sentences)
+        if i % 5 == 4:  # near-duplicate chunks, as overlapping chunk windows produce
+            content = sources[i - 1]['content'][:-40] + " extra trailing words."
+        sources.append({'title': f"Doc {i}", 'content': content, 'score': rng.random()})
+    return sources
+
+
+def make_claims(n: int, n_sources: int, rng: random.Random):
+    claims = []
+    for i in range(n):
+        text = "The " + " ".join(rng.choice(WORDS) for _ in range(12)) + " was approved"
+        kind = i % 4
+        if kind == 0:
+            claims.append({'type': 'statement', 'text': text, 'value': None})
+        elif kind == 1:
+            claims.append({'type': 'numerical', 'text': text, 'value': str(rng.randint(1, 500))})
+        elif kind == 2:
+            claims.append({'type': 'citation', 'source_num': rng.randint(1, n_sources + 2),
+                           'context': f"{text} {rng.randint(1, 500)} [Source 1]"})
+        else:
+            claims.append({'type': 'entity', 'text': text, 'value': "Western Blot"})
+    return claims
+
+
+# --- Reference implementations (pre-vectorization) ---------------------------
+
+def reference_extract(query, content, max_sentences=10):
+    query_words = set(w.lower() for w in re.findall(r'\b\w{3,}\b', query))
+    scored = []
+    for sent in re.split(r'(?<=[.!?])\s+', content):
+        sent = sent.strip()
+        if len(sent) < 20:
+            continue
+        overlap = len(query_words & set(w.lower() for w in re.findall(r'\b\w{3,}\b', sent)))
+        if overlap > 0:
+            scored.append((sent, overlap))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return ' '.join(s for s, _ in scored[:max_sentences])
+
+
+def reference_verify(claims, sources):
+    verified = 0
+    all_text = ' '.join(s.get('content', '') + ' ' + s.get('title', '') for s in sources).lower()
+    for claim in claims:
+        if claim['type'] == 'citation':
+            if claim['source_num'] <= len(sources):
+                source_numbers = set(re.findall(r'\d+\.?\d*', sources[claim['source_num'] - 1]['content']))
+                verified += bool(set(re.findall(r'\d+\.?\d*', claim['context'])) & source_numbers)
+        elif claim['type'] == 'numerical':
+            verified += claim['value'] in all_text.replace(',', '')
+        elif claim['type'] == 'entity':
+            verified += claim['value'].lower() in all_text
+        elif claim['type'] == 'statement':
+            words = [w for w in re.findall(r'\b[a-z]{4,}\b', claim['text'].lower()) if w not in STOPWORDS]
+            verified += bool(words) and sum(w in all_text for w in words) / len(words) > 0.5
+    return verified
+
+
+def reference_similarity(text1, text2):
+    a = set(text1.lower()[i:i + 4] for i in range(len(text1) - 3))
+    b = set(text2.lower()[i:i + 4] for i in range(len(text2) - 3))
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def reference_dedup(chunks, threshold=0.75):
+    unique = [chunks[0]]
+    for chunk in chunks[1:]:
+        for u in unique:
+            if reference_similarity(chunk['content'], u['content']) > threshold:
+                if chunk.get('score', 0) > u.get('score', 0):
+                    unique.remove(u)
+                    unique.append(chunk)
+                break
+        else:
+            unique.append(chunk)
+    return unique
+
+
+def timed(fn, runs):
+    fn()  # warm-up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized text similarity")
+    parser.add_argument("--sources", type=int, default=30)
+    parser.add_argument("--claims", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    sources = make_sources(args.sources, rng)
+    claims = make_claims(args.claims, args.sources, rng)
+    query = "What is the overnight incubation protocol for the western blot antibody?"
+    detector = HallucinationDetector(client=None)
+
+    compressed = ContextCompressor.compress_sources(query, sources)
+    assert [s['content'] for s in compressed] == [
+        reference_extract(query, s['content']) or s['content'] for s in sources
+    ], "compression output differs from reference"
+    assert detector.verify_claims([dict(c) for c in claims], sources)['verified'] == reference_verify(claims, sources)
+    assert ContextDeduplicator.deduplicate(sources) == reference_dedup(sources)
+
+    rows = [
+        ("compress", lambda: [reference_extract(query, s['content']) for s in sources],
+         lambda: ContextCompressor.compress_sources(query, sources)),
+        ("verify", lambda: reference_verify(claims, sources),
+         lambda: detector.verify_claims([dict(c) for c in claims], sources)),
+        ("dedup", lambda: reference_dedup(sources),
+         lambda: ContextDeduplicator.deduplicate(sources)),
+    ]
+    print(f"{args.sources} sources x {args.claims} claims, median of {args.runs} runs")
+    print(f"{'step':<10} {'loop ms':>10} {'matrix ms':>10} {'speedup':>8}")
+    for name, reference, vectorized in rows:
+        ref_ms, vec_ms = timed(reference, args.runs), timed(vectorized, args.runs)
+        print(f"{name:<10} {ref_ms:>10.2f} {vec_ms:>10.2f} {ref_ms / vec_ms:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -39,6 +39,7 @@ from vector_stores.pinecone_store import (
     SHARED_CTSI_TENANT_ID,
     EMBEDDING_DIMENSIONS,
 )
+from services.answer_cache import bump_corpus_version
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -46,7 +47,7 @@ from vector_stores.pinecone_store import (
 CHUNK_SIZE = 2000
 CHUNK_OVERLAP = 400
 BATCH_SIZE = 200  # Matches PineconeVectorStore.BATCH_SIZE
-EMBEDDING_BATCH_SIZE = 50  # Matches PineconeVectorStore.EMBEDDING_BATCH_SIZE
+EMBEDDING_BATCH_SIZE = 50  # Texts per _embed_batch call (store pipeline re-packs by tokens)
 MAX_EMBEDDING_CHARS = 30000  # Safety limit per chunk
 
 DATA_DIR = os.path.join(BACKEND_DIR, "scraped_data", "ctsi")
@@ -610,6 +611,9 @@ Examples:
     print("-" * 70)
 
     result = embed_and_upsert(store, all_vectors, dry_run=args.dry_run)
+    if not args.dry_run and result['upserted']:
+        # Every tenant's answers may cite CTSI content; invalidate cached answers
+        bump_corpus_version(SHARED_CTSI_TENANT_ID)
 
     # ------------------------------------------------------------------
     # Summary
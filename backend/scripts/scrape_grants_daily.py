@@ -1,7 +1,8 @@
 """
 Daily Grant Scraper
 Fetches grants from NIH RePORTER, Grants.gov, NSF, SBIR, and Federal RePORTER.
-Saves as Documents, embeds into Pinecone.
+Refreshes the local grant index (grant_listings) that interactive grant
+searches read, saves new grants as Documents and embeds them into Pinecone.
 
 Usage:
     cd backend
@@ -40,6 +41,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# The scrape isn't interactive: give each source far longer than a live search
+GRANT_SCRAPE_SOURCE_DEADLINE_SECONDS = float(os.getenv("GRANT_SCRAPE_SOURCE_DEADLINE_SECONDS", "120"))
+
 # Broad research topics (always searched)
 BASE_SEARCH_QUERIES = [
     # Life sciences / biomedical
@@ -129,10 +133,16 @@ def grant_to_document_content(grant: dict) -> str:
     return "\n".join(parts)
 
 
-def scrape_and_ingest(tenant_id: str = None, dry_run: bool = False, limit_per_query: int = 20):
-    """Main scraper logic. If tenant_id is None, scrape for all tenants."""
+def scrape_and_ingest(tenant_id: str = None, dry_run: bool = False, limit_per_query: int = 20) -> dict:
+    """
+    Main scraper logic. If tenant_id is None, scrape for all tenants.
+
+    Returns:
+        {'tenants': [...], 'grants_indexed': int, 'grants_pruned': int}
+    """
     init_database()
     db = SessionLocal()
+    summary = {'tenants': [], 'grants_indexed': 0, 'grants_pruned': 0}
 
     try:
         # Auto-detect tenants if none specified
@@ -140,7 +150,7 @@ def scrape_and_ingest(tenant_id: str = None, dry_run: bool = False, limit_per_qu
             tenants = db.query(Tenant).all()
             if not tenants:
                 logger.warning("No tenants found in database. Nothing to scrape for.")
-                return
+                return summary
             tenant_ids = [t.id for t in tenants]
             logger.info(f"Auto-detected {len(tenant_ids)} tenant(s): {tenant_ids}")
         else:
@@ -151,14 +161,18 @@ def scrape_and_ingest(tenant_id: str = None, dry_run: bool = False, limit_per_qu
                 tenants = db.query(Tenant).all()
                 if not tenants:
                     logger.warning("No tenants found in database. Nothing to scrape for.")
-                    return
+                    return summary
                 tenant_ids = [t.id for t in tenants]
             else:
                 tenant_ids = [tenant_id]
 
         for tid in tenant_ids:
             logger.info(f"--- Scraping grants for tenant: {tid} ---")
-            _scrape_for_tenant(db, tid, dry_run, limit_per_query)
+            summary['grants_indexed'] += _scrape_for_tenant(db, tid, dry_run, limit_per_query)
+            summary['tenants'].append(tid)
+
+        if not dry_run:
+            summary['grants_pruned'] = GrantFinderService().prune_index(db)
 
     except Exception as e:
         db.rollback()
@@ -166,9 +180,12 @@ def scrape_and_ingest(tenant_id: str = None, dry_run: bool = False, limit_per_qu
     finally:
         db.close()
 
+    return summary
+
 
-def _scrape_for_tenant(db, tenant_id: str, dry_run: bool = False, limit_per_query: int = 20):
-    """Scrape and ingest grants for a single tenant."""
+def _scrape_for_tenant(db, tenant_id: str, dry_run: bool = False, limit_per_query: int = 20) -> int:
+    """Scrape and ingest grants for a single tenant; returns the number of grants indexed."""
+    indexed = 0
     try:
         finder = GrantFinderService()
 
@@ -183,25 +200,18 @@ def _scrape_for_tenant(db, tenant_id: str, dry_run: bool = False, limit_per_quer
         queries = list(dict.fromkeys(q.lower().strip() for q in queries))
         logger.info(f"Searching {len(queries)} queries across NIH RePORTER + Grants.gov + NSF + Federal RePORTER + SBIR")
 
-        # Collect all grant results
+        # Collect all grant results (the four sources are searched concurrently per query)
         all_grants = {}  # keyed by external_id for dedup
         for query in queries:
             try:
-                nih_results = finder.search_nih_reporter(query=query, limit=limit_per_query)
-                for g in nih_results:
-                    all_grants[g['id']] = g
-
-                gov_results = finder.search_grants_gov(query=query, limit=limit_per_query)
-                for g in gov_results:
-                    all_grants[g['id']] = g
-
-                nsf_results = finder.search_nsf_awards(query=query, limit=limit_per_query)
-                for g in nsf_results:
-                    all_grants[g['id']] = g
-
-                fed_results = finder.search_federal_reporter(query=query, limit=limit_per_query)
-                for g in fed_results:
-                    all_grants[g['id']] = g
+                for source, results, timed_out in finder.iter_source_results(
+                    query=query,
+                    limit=limit_per_query,
+                    fetch_details=True,
+                    deadline=GRANT_SCRAPE_SOURCE_DEADLINE_SECONDS
+                ):
+                    for g in results:
+                        all_grants[g['id']] = g
             except Exception as e:
                 logger.warning(f"Error searching '{query}': {e}")
 
@@ -226,7 +236,11 @@ def _scrape_for_tenant(db, tenant_id: str, dry_run: bool = False, limit_per_quer
 
         if not all_grants:
             logger.info("No grants found. Exiting.")
-            return
+            return indexed
+
+        # Refresh the shared local grant index (also marks known grants as seen)
+        if not dry_run:
+            indexed = finder.index_grants(db, deduped_list)
 
         # Check which grants already exist in DB
         existing_ids = set()
@@ -245,7 +259,7 @@ def _scrape_for_tenant(db, tenant_id: str, dry_run: bool = False, limit_per_quer
 
         if not new_grants:
             logger.info("All grants already in database. Nothing to do.")
-            return
+            return indexed
 
         if dry_run:
             logger.info("[DRY RUN] Would ingest these grants:")
@@ -253,7 +267,7 @@ def _scrape_for_tenant(db, tenant_id: str, dry_run: bool = False, limit_per_quer
                 logger.info(f"  - [{grant['source']}] {grant['title'][:80]}...")
             if len(new_grants) > 10:
                 logger.info(f"  ... and {len(new_grants) - 10} more")
-            return
+            return indexed
 
         # Create Document records
         now = datetime.now(timezone.utc)
@@ -317,6 +331,8 @@ def _scrape_for_tenant(db, tenant_id: str, dry_run: bool = False, limit_per_quer
         db.rollback()
         logger.error(f"Scraper failed for tenant {tenant_id}: {e}", exc_info=True)
 
+    return indexed
+
 
 def main():
     parser = argparse.ArgumentParser(description='Daily grant scraper for 2nd Brain')
@@ -0,0 +1,346 @@
+"""
+Answer Cache - tenant-scoped cache of generated RAG answers
+
+Lab members ask the same onboarding questions over and over; each repeat
+used to pay for retrieval, reranking and generation again. Entries are:
+- Scoped by tenant and by a per-tenant corpus version. Any embed or delete
+  for the tenant bumps the version (`bump_corpus_version()`), so answers
+  built on an older corpus are never served. The shared CTSI namespace has
+  its own version, which is folded into every tenant's.
+- Matched by exact normalized query first, then by query-embedding cosine
+  similarity above ANSWER_CACHE_SIMILARITY (same tenant/version/params only).
+- Stored as JSON so hits are fresh copies; streaming entries keep the event
+  list so the SSE endpoint can replay them.
+
+Backends (ANSWER_CACHE_BACKEND):
+- "redis" (default): shared via REDIS_URL; versions are INCR counters, so a
+  sync or delete on any gunicorn worker or Celery process invalidates every
+  worker's answers at once. If Redis is unreachable the cache is disabled
+  (re-checked every ANSWER_CACHE_RETRY_SECONDS) - per-process versions would
+  let the other workers keep serving answers from before the change.
+- "memory": per-process LRU and versions. Single-process only (local dev,
+  tests): bumps made by other processes are never seen.
+- "off": disabled.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Any
+
+import numpy as np
+
+ANSWER_CACHE_BACKEND = os.getenv("ANSWER_CACHE_BACKEND", "redis").lower()
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "1800"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+# Most recent entries per (tenant, version, params) considered for similarity matching
+ANSWER_CACHE_SEMANTIC_CANDIDATES = int(os.getenv("ANSWER_CACHE_SEMANTIC_CANDIDATES", "200"))
+# How long to run without a cache after Redis was unreachable before trying again
+ANSWER_CACHE_RETRY_SECONDS = int(os.getenv("ANSWER_CACHE_RETRY_SECONDS", "60"))
+
+# Must match vector_stores.pinecone_store.SHARED_CTSI_TENANT_ID
+SHARED_CORPUS_ID = "__system__"
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation, collapse whitespace."""
+    query = _PUNCT_RE.sub(" ", (query or "").lower())
+    return _WHITESPACE_RE.sub(" ", query).strip()
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()[:32]
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class InMemoryAnswerCacheBackend:
+    """Per-process LRU with TTL plus per-namespace query vectors."""
+
+    def __init__(self, max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+                 max_vectors: int = ANSWER_CACHE_SEMANTIC_CANDIDATES):
+        self.max_entries = max_entries
+        self.max_vectors = max_vectors
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._vectors: Dict[str, "OrderedDict[str, np.ndarray]"] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get_versions(self, corpus_ids: List[str]) -> List[int]:
+        with self._lock:
+            return [self._versions.get(c, 0) for c in corpus_ids]
+
+    def bump_version(self, corpus_id: str) -> int:
+        with self._lock:
+            self._versions[corpus_id] = self._versions.get(corpus_id, 0) + 1
+            # Entries under the old version can never be hit again; drop them now
+            prefix = f"{corpus_id}:"
+            for namespace in [n for n in self._vectors if n.startswith(prefix)]:
+                del self._vectors[namespace]
+            return self._versions[corpus_id]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key: str, payload: str, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add_vector(self, namespace: str, key: str, vector: np.ndarray, ttl: int):
+        with self._lock:
+            vectors = self._vectors.setdefault(namespace, OrderedDict())
+            vectors[key] = vector
+            vectors.move_to_end(key)
+            while len(vectors) > self.max_vectors:
+                vectors.popitem(last=False)
+
+    def get_vectors(self, namespace: str) -> List[Tuple[str, np.ndarray]]:
+        with self._lock:
+            return list(self._vectors.get(namespace, {}).items())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+
+
+class RedisAnswerCacheBackend:
+    """Shared backend: entries as JSON strings, vectors in one hash per namespace."""
+
+    PREFIX = "answer_cache"
+
+    def __init__(self, url: Optional[str] = None,
+                 max_vectors: int = ANSWER_CACHE_SEMANTIC_CANDIDATES):
+        import redis
+        self.client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.max_vectors = max_vectors
+
+    def _version_key(self, corpus_id: str) -> str:
+        return f"{self.PREFIX}:version:{corpus_id}"
+
+    def get_versions(self, corpus_ids: List[str]) -> List[int]:
+        values = self.client.mget([self._version_key(c) for c in corpus_ids])
+        return [int(v) if v is not None else 0 for v in values]
+
+    def bump_version(self, corpus_id: str) -> int:
+        return int(self.client.incr(self._version_key(corpus_id)))
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(f"{self.PREFIX}:entry:{key}")
+        return value.decode("utf-8") if value is not None else None
+
+    def put(self, key: str, payload: str, ttl: int):
+        self.client.setex(f"{self.PREFIX}:entry:{key}", ttl, payload)
+
+    def add_vector(self, namespace: str, key: str, vector: np.ndarray, ttl: int):
+        hash_key = f"{self.PREFIX}:vectors:{namespace}"
+        pipe = self.client.pipeline()
+        pipe.hset(hash_key, key, vector.astype(np.float32).tobytes())
+        pipe.expire(hash_key, ttl)
+        pipe.hlen(hash_key)
+        size = pipe.execute()[-1]
+        if size > self.max_vectors:
+            # Rare; entries expire with the namespace TTL anyway
+            self.client.hdel(hash_key, *list(self.client.hkeys(hash_key))[:size - self.max_vectors])
+
+    def get_vectors(self, namespace: str) -> List[Tuple[str, np.ndarray]]:
+        raw = self.client.hgetall(f"{self.PREFIX}:vectors:{namespace}")
+        return [(k.decode("utf-8"), np.frombuffer(v, dtype=np.float32)) for k, v in raw.items()]
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{self.PREFIX}:entry:*"):
+            self.client.delete(key)
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class AnswerCache:
+    """
+    Tenant-scoped answer cache.
+
+    Usage:
+        cached, version = cache.lookup(tenant_id, query, "answer", params, embedding)
+        if cached is None:
+            result = ...generate...
+            cache.store(tenant_id, query, "answer", params, result, version, embedding)
+    """
+
+    def __init__(self, backend, ttl_seconds: int = ANSWER_CACHE_TTL_SECONDS,
+                 similarity_threshold: float = ANSWER_CACHE_SIMILARITY):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def corpus_version(self, tenant_id: str) -> str:
+        tenant_version, shared_version = self.backend.get_versions([tenant_id, SHARED_CORPUS_ID])
+        return f"{tenant_version}.{shared_version}"
+
+    @staticmethod
+    def _namespace(tenant_id: str, version: str, kind: str, params: Dict) -> str:
+        params_hash = _hash(json.dumps(params, sort_keys=True, default=str))[:16]
+        return f"{tenant_id}:{version}:{kind}:{params_hash}"
+
+    def lookup(self, tenant_id: str, query: str, kind: str, params: Dict,
+               embedding: Optional[List[float]] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Returns (cached value or None, corpus version). Pass the version back to
+        store() so an answer generated while the corpus changed is filed under
+        the old version and never served.
+        """
+        try:
+            version = self.corpus_version(tenant_id)
+            namespace = self._namespace(tenant_id, version, kind, params)
+
+            payload = self.backend.get(f"{namespace}:{_hash(normalize_query(query))}")
+            if payload is not None:
+                with self._lock:
+                    self.exact_hits += 1
+                return json.loads(payload), version
+
+            if embedding is not None and self.similarity_threshold < 1.0:
+                match = self._nearest(namespace, embedding)
+                if match is not None:
+                    payload = self.backend.get(match)
+                    if payload is not None:
+                        with self._lock:
+                            self.semantic_hits += 1
+                        return json.loads(payload), version
+
+            with self._lock:
+                self.misses += 1
+            return None, version
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"[AnswerCache] Lookup failed: {e}", flush=True)
+            return None, None
+
+    def _nearest(self, namespace: str, embedding: List[float]) -> Optional[str]:
+        candidates = self.backend.get_vectors(namespace)
+        if not candidates:
+            return None
+        query_vec = np.asarray(embedding, dtype=np.float32)
+        query_vec = query_vec / (np.linalg.norm(query_vec) + 1e-8)
+        keys = [k for k, _ in candidates]
+        matrix = np.vstack([v for _, v in candidates])  # stored normalized
+        sims = matrix @ query_vec
+        best = int(np.argmax(sims))
+        return keys[best] if sims[best] >= self.similarity_threshold else None
+
+    def store(self, tenant_id: str, query: str, kind: str, params: Dict, value: Dict,
+              version: Optional[str], embedding: Optional[List[float]] = None):
+        if version is None:
+            return
+        try:
+            namespace = self._namespace(tenant_id, version, kind, params)
+            key = f"{namespace}:{_hash(normalize_query(query))}"
+            self.backend.put(key, json.dumps(value, default=str), self.ttl_seconds)
+            if embedding is not None:
+                vector = np.asarray(embedding, dtype=np.float32)
+                vector = vector / (np.linalg.norm(vector) + 1e-8)
+                self.backend.add_vector(namespace, key, vector, self.ttl_seconds)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"[AnswerCache] Store failed: {e}", flush=True)
+
+    def bump_corpus_version(self, tenant_id: str):
+        try:
+            self.backend.bump_version(tenant_id)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"[AnswerCache] Failed to bump corpus version for {tenant_id}: {e}", flush=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+def replay_stream_events(events: List[Dict], chunk_chars: int = 80):
+    """Yield cached SSE events, re-splitting the answer into small chunks."""
+    for event in events:
+        if event.get('type') != 'chunk':
+            if event.get('type') == 'done':
+                event = dict(event, cached=True)
+            yield event
+            continue
+        content = event.get('content', '')
+        for i in range(0, len(content), chunk_chars):
+            yield {'type': 'chunk', 'content': content[i:i + chunk_chars]}
+
+
+_answer_cache: Optional[AnswerCache] = None
+_answer_cache_unavailable_until = 0.0
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> Optional[AnswerCache]:
+    """Get or create the process-wide AnswerCache (None when disabled or Redis is down)"""
+    global _answer_cache, _answer_cache_unavailable_until
+    if ANSWER_CACHE_BACKEND == "off":
+        return None
+    if _answer_cache is None:
+        if time.time() < _answer_cache_unavailable_until:
+            return None
+        with _answer_cache_lock:
+            if _answer_cache is None and time.time() >= _answer_cache_unavailable_until:
+                if ANSWER_CACHE_BACKEND == "memory":
+                    _answer_cache = AnswerCache(InMemoryAnswerCacheBackend())
+                else:
+                    try:
+                        backend = RedisAnswerCacheBackend()
+                        backend.client.ping()
+                        _answer_cache = AnswerCache(backend)
+                    except Exception as e:
+                        # No per-process fallback: its versions would miss other workers' bumps
+                        _answer_cache_unavailable_until = time.time() + ANSWER_CACHE_RETRY_SECONDS
+                        print(f"[AnswerCache] Redis unavailable ({e}), answer cache disabled "
+                              f"for {ANSWER_CACHE_RETRY_SECONDS}s", flush=True)
+    return _answer_cache
+
+
+def bump_corpus_version(tenant_id: str):
+    """Invalidate cached answers for a tenant (call after any embed or delete)."""
+    if not tenant_id:
+        return
+    cache = get_answer_cache()
+    if cache is not None:
+        cache.bump_corpus_version(tenant_id)
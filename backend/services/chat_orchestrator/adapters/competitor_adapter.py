@@ -3,7 +3,7 @@
 import logging
 from typing import Dict, Any, Optional, List
 
-from services.competitor_finder_service import CompetitorFinderService
+from services.competitor_finder_service import get_competitor_finder_service
 from . import make_result_envelope
 
 logger = logging.getLogger(__name__)
@@ -16,7 +16,7 @@ def run_competitor_finder(
     context_package: Optional[Dict] = None,
 ) -> Dict[str, Any]:
     try:
-        service = CompetitorFinderService()
+        service = get_competitor_finder_service()
 
         # Use context to enhance search
         if context_package and context_package.get("research_profile"):
@@ -43,10 +43,11 @@ def run_competitor_finder(
                 error="No topics or paper text provided for competitor search.",
             )
 
-        # Call the actual service methods with correct signatures
-        openalex_results = service.search_openalex_competitors(keywords, domain)
-        arxiv_results = service.search_arxiv_preprints(keywords, arxiv_cats)
-        nih_results = service.search_nih_grants(keywords, domain)
+        # OpenAlex, arXiv and NIH are searched concurrently
+        results = dict(service.iter_source_results(keywords, domain, arxiv_cats))
+        openalex_results = results.get("competitors", [])
+        arxiv_results = results.get("preprints", [])
+        nih_results = results.get("grants", [])
 
         total_competitors = len(openalex_results) + len(arxiv_results) + len(nih_results)
         if total_competitors > 15:
@@ -122,8 +122,8 @@ class IntentGate:
             if not self._embedding_client or not self._power_embeddings:
                 return []
 
-            from azure_openai_config import get_embedding
-            msg_embedding = get_embedding(message)
+            from services.embedding_cache import get_cached_embedding
+            msg_embedding = get_cached_embedding(message)
 
             detected = []
             for power, power_emb in self._power_embeddings.items():
@@ -139,7 +139,7 @@ class IntentGate:
         if self._power_embeddings is not None:
             return
         try:
-            from azure_openai_config import get_embedding
+            from services.embedding_cache import get_cached_embedding
             power_descriptions = {
                 "hij": "Score and evaluate a research manuscript or paper for journal publication. Analyze methodology, impact, citations, and match to journals.",
                 "competitor_finder": "Find competing research labs, recent preprints, and active grants in a research area or field.",
@@ -148,7 +148,7 @@ class IntentGate:
             }
             self._power_embeddings = {}
             for power, desc in power_descriptions.items():
-                self._power_embeddings[power] = get_embedding(desc)
+                self._power_embeddings[power] = get_cached_embedding(desc)
             self._embedding_client = True
         except Exception as e:
             logger.warning(f"Failed to load power embeddings: {e}")
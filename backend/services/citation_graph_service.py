@@ -1,17 +1,162 @@
 """
 Citation Graph Service — Build and analyze citation networks around seed papers.
 Uses OpenAlex API for citation/reference data and NetworkX for graph analysis.
+
+The graph is expanded one BFS level at a time. For each frontier:
+  - referenced_works for up to 50 works come from one
+    `ids.openalex:A|B|C` request
+  - citing works are fetched per node, concurrently
+  - metadata for every newly discovered work is fetched in
+    `ids.openalex` batches
+All requests go through the shared OpenAlex client, which provides the
+rate governor, response cache and concurrency bound. Work metadata and
+citation/reference edges are also cached per work ID (SQLite,
+CITATION_GRAPH_CACHE_TTL_SECONDS), so overlapping graphs for different
+users reuse them even though their batched queries differ.
 """
 
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
 import networkx as nx
-from services.openalex_search_service import OpenAlexSearchService
+
+from services.openalex_client import (
+    OPENALEX_BASE, OPENALEX_CACHE_TTL_SECONDS, OpenAlexClient, ResponseCache, get_openalex_client,
+)
+
+CITATION_GRAPH_MAX_DEPTH = 3
+CITATION_GRAPH_MAX_NODES = 500
+CITATIONS_PER_NODE = 10
+REFERENCES_PER_NODE = 25
+# Values per OR-filter in one OpenAlex request (the API allows up to 100)
+IDS_PER_REQUEST = 50
+# Most frontier nodes expanded per round (fewer when the graph is nearly full)
+FRONTIER_SLICE = 50
+
+CITATION_GRAPH_CACHE_TTL_SECONDS = int(os.getenv("CITATION_GRAPH_CACHE_TTL_SECONDS", str(OPENALEX_CACHE_TTL_SECONDS)))
+# Empty string disables the on-disk cache
+CITATION_GRAPH_CACHE_PATH = os.getenv(
+    "CITATION_GRAPH_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "citation_graph_cache.sqlite3"),
+)
+
+WORK_FIELDS = 'id,doi,title,publication_year,cited_by_count'
+
+
+def _short_id(work_id: str) -> str:
+    """'https://openalex.org/W123' -> 'W123'"""
+    return work_id.rstrip('/').rsplit('/', 1)[-1]
+
+
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
 
 class CitationGraphService:
     """Build citation graphs and find influential papers via PageRank."""
 
-    def __init__(self):
-        self.openalex = OpenAlexSearchService()
+    def __init__(self, cache_path: Optional[str] = CITATION_GRAPH_CACHE_PATH,
+                 client: Optional[OpenAlexClient] = None):
+        self.client = client or get_openalex_client()
+        self.cache = None
+        if cache_path:
+            try:
+                self.cache = ResponseCache(cache_path, ttl_seconds=CITATION_GRAPH_CACHE_TTL_SECONDS)
+            except Exception as e:
+                print(f"[CitationGraph] Cache disabled ({cache_path}): {e}", flush=True)
+
+    # ── Cached OpenAlex lookups ──────────────────────────────────────────────
+
+    def _cached_split(self, prefix: str, work_ids: Iterable[str]) -> Tuple[Dict[str, object], List[str]]:
+        """Split short work IDs into (cached values, IDs still to fetch)."""
+        found, missing = {}, []
+        for wid in dict.fromkeys(_short_id(w) for w in work_ids):
+            value = self.cache.get(f"{prefix}:{wid}") if self.cache is not None else None
+            if value is None:
+                missing.append(wid)
+            else:
+                found[wid] = value
+        return found, missing
+
+    def _cache_put(self, prefix: str, wid: str, value):
+        if self.cache is not None:
+            try:
+                self.cache.put(f"{prefix}:{wid}", value)
+            except Exception as e:
+                print(f"[CitationGraph] Cache write failed: {e}", flush=True)
+
+    def _store_work(self, work: Dict) -> Dict:
+        record = {
+            'openalex_id': work.get('id', ''),
+            'title': work.get('title', '') or '',
+            'year': work.get('publication_year'),
+            'cited_by_count': work.get('cited_by_count', 0),
+        }
+        self._cache_put('work', _short_id(record['openalex_id']), record)
+        return record
+
+    def get_works(self, work_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Metadata per short work ID, fetched in ids.openalex batches."""
+        works, missing = self._cached_split('work', work_ids)
+        requests = [
+            (f'{OPENALEX_BASE}/works', {'filter': f"ids.openalex:{'|'.join(batch)}",
+                                        'per_page': len(batch), 'select': WORK_FIELDS})
+            for batch in _chunks(missing, IDS_PER_REQUEST)
+        ]
+        for data in self.client.get_many(requests):
+            for work in (data or {}).get('results', []):
+                record = self._store_work(work)
+                works[_short_id(record['openalex_id'])] = record
+        return works
+
+    def get_reference_ids(self, work_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """Referenced work IDs (first REFERENCES_PER_NODE) per short work ID."""
+        references, missing = self._cached_split('refs', work_ids)
+        requests = [
+            (f'{OPENALEX_BASE}/works', {'filter': f"ids.openalex:{'|'.join(batch)}",
+                                        'per_page': len(batch), 'select': 'id,referenced_works'})
+            for batch in _chunks(missing, IDS_PER_REQUEST)
+        ]
+        for data in self.client.get_many(requests):
+            for work in (data or {}).get('results', []):
+                wid = _short_id(work.get('id', ''))
+                references[wid] = (work.get('referenced_works') or [])[:REFERENCES_PER_NODE]
+                self._cache_put('refs', wid, references[wid])
+        return references
+
+    def get_citing_ids(self, work_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """Most-cited CITATIONS_PER_NODE citing work IDs per short work ID."""
+        citing, missing = self._cached_split('cites', work_ids)
+
+        def fetch(wid: str) -> Optional[List[str]]:
+            data = self.client.get_json(f'{OPENALEX_BASE}/works', params={
+                'filter': f'cites:{wid}',
+                'per_page': CITATIONS_PER_NODE,
+                'sort': 'cited_by_count:desc',
+                'select': WORK_FIELDS,
+            })
+            if data is None:
+                return None
+            ids = [self._store_work(work)['openalex_id'] for work in data.get('results', [])]
+            self._cache_put('cites', wid, ids)
+            return ids
+
+        for wid, ids in zip(missing, self.client.run_concurrently(fetch, missing)):
+            if ids is not None:
+                citing[wid] = ids
+        return citing
+
+    def _expand(self, nodes: List[str]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]], Dict[str, Dict]]:
+        """(citing IDs, referenced IDs, neighbor metadata) for a slice of the frontier."""
+        citing, references = self.client.run_concurrently(
+            lambda lookup: lookup(nodes), [self.get_citing_ids, self.get_reference_ids]
+        )
+        citing, references = citing or {}, references or {}
+        neighbors = [n for ids in list(citing.values()) + list(references.values()) for n in ids]
+        return citing, references, self.get_works(neighbors)
+
+    # ── Graph ────────────────────────────────────────────────────────────────
 
     def build_citation_graph(self, seed_openalex_id: str, depth: int = 1,
                               max_nodes: int = 50) -> dict:
@@ -19,63 +164,61 @@ class CitationGraphService:
 
         Args:
             seed_openalex_id: OpenAlex work ID (e.g., 'https://openalex.org/W...')
-            depth: How many hops to traverse (1 = direct citations/references, max 2)
-            max_nodes: Maximum nodes in the graph
+            depth: How many hops to traverse (1 = direct citations/references, max 3)
+            max_nodes: Maximum nodes in the graph (max 500)
 
         Returns:
             Dict with nodes, edges, influential papers (by PageRank), and stats
         """
-        depth = min(depth, 2)  # Safety cap
+        depth = max(0, min(depth, CITATION_GRAPH_MAX_DEPTH))  # Safety cap
+        max_nodes = min(max_nodes, CITATION_GRAPH_MAX_NODES)
         G = nx.DiGraph()
-        visited = set()
-        queue = [(seed_openalex_id, 0)]
 
         # Add seed node
-        try:
-            seed_works = self.openalex.search_works(seed_openalex_id.split('/')[-1], max_results=1)
-            if seed_works:
-                seed = seed_works[0]
-                G.add_node(seed_openalex_id, title=seed.get('title', ''),
-                          year=seed.get('year'), cited_by_count=seed.get('cited_by_count', 0),
-                          is_seed=True)
-        except Exception:
+        seed = self.get_works([seed_openalex_id]).get(_short_id(seed_openalex_id))
+        if seed:
+            G.add_node(seed_openalex_id, title=seed['title'], year=seed['year'],
+                       cited_by_count=seed['cited_by_count'], is_seed=True)
+        else:
             G.add_node(seed_openalex_id, title='Seed Paper', is_seed=True)
 
-        while queue and len(G.nodes) < max_nodes:
-            current_id, current_depth = queue.pop(0)
-            if current_id in visited or current_depth > depth:
-                continue
-            visited.add(current_id)
+        def add_neighbor(work_id: str, works: Dict[str, Dict]) -> None:
+            work = works.get(_short_id(work_id), {})
+            G.add_node(work_id, title=work.get('title', ''), year=work.get('year'),
+                       cited_by_count=work.get('cited_by_count', 0))
 
-            # Get papers that cite this one
-            try:
-                citations = self.openalex.get_citations(current_id, max_results=10)
-                for cit in citations:
-                    cit_id = cit['openalex_id']
-                    if len(G.nodes) >= max_nodes:
-                        break
-                    G.add_node(cit_id, title=cit.get('title', ''),
-                              year=cit.get('year'), cited_by_count=cit.get('cited_by_count', 0))
-                    G.add_edge(cit_id, current_id)  # cit cites current
-                    if current_depth + 1 <= depth:
-                        queue.append((cit_id, current_depth + 1))
-            except Exception as e:
-                print(f"[CitationGraph] Citations fetch failed for {current_id}: {e}")
+        visited = set()
+        frontier = [seed_openalex_id]
+        level = 0
+        while frontier and len(G.nodes) < max_nodes and level <= depth:
+            next_frontier = []
+            pos = 0
+            while pos < len(frontier) and len(G.nodes) < max_nodes:
+                # Expand only as many nodes as could still fit in the graph
+                room = max_nodes - len(G.nodes)
+                size = min(FRONTIER_SLICE, -(-room // (CITATIONS_PER_NODE + REFERENCES_PER_NODE)))
+                nodes = [n for n in frontier[pos:pos + size] if n not in visited]
+                pos += size
+                visited.update(nodes)
+                citing, references, works = self._expand(nodes)
 
-            # Get papers this one references
-            try:
-                references = self.openalex.get_references(current_id)
-                for ref in references:
-                    ref_id = ref['openalex_id']
-                    if len(G.nodes) >= max_nodes:
-                        break
-                    G.add_node(ref_id, title=ref.get('title', ''),
-                              year=ref.get('year'), cited_by_count=ref.get('cited_by_count', 0))
-                    G.add_edge(current_id, ref_id)  # current cites ref
-                    if current_depth + 1 <= depth:
-                        queue.append((ref_id, current_depth + 1))
-            except Exception as e:
-                print(f"[CitationGraph] References fetch failed for {current_id}: {e}")
+                for current_id in nodes:
+                    wid = _short_id(current_id)
+                    for cit_id in citing.get(wid, []):
+                        if len(G.nodes) >= max_nodes:
+                            break
+                        add_neighbor(cit_id, works)
+                        G.add_edge(cit_id, current_id)  # cit cites current
+                        next_frontier.append(cit_id)
+                    for ref_id in references.get(wid, []):
+                        if len(G.nodes) >= max_nodes:
+                            break
+                        add_neighbor(ref_id, works)
+                        G.add_edge(current_id, ref_id)  # current cites ref
+                        next_frontier.append(ref_id)
+
+            frontier = [n for n in dict.fromkeys(next_frontier) if n not in visited]
+            level += 1
 
         # Compute PageRank for influence scoring
         try:
@@ -116,3 +259,17 @@ class CitationGraphService:
             'edges': edges,
             'influential': influential,
         }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_citation_graph_service() -> CitationGraphService:
+    """Get the process-wide citation graph service (shares its edge cache)"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = CitationGraphService()
+    return _service
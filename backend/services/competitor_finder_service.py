@@ -1,18 +1,44 @@
 """
 Competitor Finder Service - "Find My Competitors"
 Finds labs, researchers, and preprints working on similar problems.
+
+Once the research focus is extracted, the OpenAlex, arXiv and NIH searches
+run concurrently and each source is streamed as soon as it lands. Focus
+extraction and source results are cached (SQLite, COMPETITOR_CACHE_TTL_SECONDS)
+keyed by the manuscript hash and the normalized keyword set; OpenAlex
+queries are additionally cached per keyword by the shared OpenAlex client,
+so manuscripts with overlapping keywords reuse those searches.
 """
 
+import os
 import re
 import json
+import hashlib
+import threading
 import requests
-from typing import Dict, List, Optional, Generator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Generator, Iterable, List, Optional, Tuple
 from collections import defaultdict
 from datetime import datetime, timedelta
 
+from services.openalex_client import ResponseCache
 from services.openalex_search_service import OpenAlexSearchService
 from services.openai_client import get_openai_client
 
+COMPETITOR_CACHE_TTL_SECONDS = int(os.getenv("COMPETITOR_CACHE_TTL_SECONDS", str(6 * 3600)))
+# Empty string disables the on-disk cache
+COMPETITOR_CACHE_PATH = os.getenv(
+    "COMPETITOR_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "competitor_cache.sqlite3"),
+)
+
+# Source name -> SSE event emitted when its results land
+SOURCE_EVENTS = {
+    "competitors": "competitors_found",
+    "preprints": "preprints_found",
+    "grants": "grants_found",
+}
+
 
 def _sse(event: str, data: dict) -> str:
     """Format SSE event."""
@@ -25,13 +51,47 @@ class CompetitorFinderService:
     ARXIV_API = "http://export.arxiv.org/api/query"
     NIH_REPORTER_API = "https://api.reporter.nih.gov/v2/projects/search"
 
-    def __init__(self):
+    def __init__(self, cache_path: Optional[str] = COMPETITOR_CACHE_PATH):
         self.openalex = OpenAlexSearchService()
         self.openai = get_openai_client()
         self.session = requests.Session()
 
+        self.cache = None
+        if cache_path:
+            try:
+                self.cache = ResponseCache(cache_path, ttl_seconds=COMPETITOR_CACHE_TTL_SECONDS)
+            except Exception as e:
+                print(f"[CompetitorFinder] Cache disabled ({cache_path}): {e}", flush=True)
+
+    @staticmethod
+    def _cache_key(source: str, keywords: Iterable[str], *extra) -> str:
+        """Order- and case-insensitive key for a keyword set."""
+        terms = sorted({k.strip().lower() for k in keywords if k and k.strip()})
+        return json.dumps([source, terms] + [str(e or "").strip().lower() for e in extra])
+
+    def _cached(self, key: str, fetch: Callable[[], object]):
+        """Return the cached value for key, or fetch it (empty results are not cached)."""
+        if self.cache is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                return hit
+        result = fetch()
+        if result and self.cache is not None:
+            try:
+                self.cache.put(key, result)
+            except Exception as e:
+                print(f"[CompetitorFinder] Cache write failed: {e}", flush=True)
+        return result
+
     def extract_research_focus(self, text: str) -> Dict:
         """Extract key research focus from manuscript."""
+        key = "focus:" + hashlib.sha256(text[:15000].encode("utf-8", errors="replace")).hexdigest()
+        focus = self._cached(key, lambda: self._extract_research_focus(text))
+        if not focus:
+            return {"domain": "unknown", "search_keywords": [], "arxiv_categories": []}
+        return focus
+
+    def _extract_research_focus(self, text: str) -> Optional[Dict]:
         try:
             response = self.openai.chat_completion(
                 messages=[{
@@ -65,26 +125,29 @@ Return JSON:
             if content.startswith("```"):
                 content = content.split("\n", 1)[1].rsplit("```", 1)[0]
 
-            return json.loads(content)
+            focus = json.loads(content)
+            # Only a focus with keywords is worth caching
+            return focus if focus.get("search_keywords") else None
         except Exception as e:
             print(f"[CompetitorFinder] Focus extraction failed: {e}")
-            return {"domain": "unknown", "search_keywords": [], "arxiv_categories": []}
+            return None
 
     def search_openalex_competitors(self, keywords: List[str], domain: str,
                                      from_year: int = 2023) -> List[Dict]:
         """Search OpenAlex for recent papers and group by institution."""
+        key = self._cache_key("openalex", keywords[:5], domain, from_year)
+        return self._cached(key, lambda: self._search_openalex_competitors(keywords, domain, from_year))
 
+    def _search_openalex_competitors(self, keywords: List[str], domain: str,
+                                      from_year: int) -> List[Dict]:
         all_papers = []
 
-        # Search by domain + keywords
-        for kw in keywords[:5]:
-            query = f"{domain} {kw}"
-            results = self.openalex.search_works(
-                query=query,
-                max_results=15,
-                from_year=from_year
-            )
-            all_papers.extend(results)
+        # Search by domain + keywords (one query per keyword, run concurrently)
+        for results in self.openalex.client.run_concurrently(
+            lambda kw: self.openalex.search_works(query=f"{domain} {kw}", max_results=15, from_year=from_year),
+            keywords[:5],
+        ):
+            all_papers.extend(results or [])
 
         # Group by institution
         labs = defaultdict(lambda: {"papers": [], "authors": set(), "total_citations": 0})
@@ -129,7 +192,10 @@ Return JSON:
     def search_arxiv_preprints(self, keywords: List[str], categories: List[str],
                                 days_back: int = 60) -> List[Dict]:
         """Search arXiv for recent preprints."""
+        key = self._cache_key("arxiv", keywords[:5])
+        return self._cached(key, lambda: self._search_arxiv_preprints(keywords))
 
+    def _search_arxiv_preprints(self, keywords: List[str]) -> List[Dict]:
         preprints = []
         query_terms = ' OR '.join([f'all:{kw}' for kw in keywords[:5]])
 
@@ -199,7 +265,10 @@ Return JSON:
 
     def search_nih_grants(self, keywords: List[str], domain: str) -> List[Dict]:
         """Search NIH Reporter for active grants on similar topics."""
+        key = self._cache_key("nih", keywords[:3], domain)
+        return self._cached(key, lambda: self._search_nih_grants(keywords, domain))
 
+    def _search_nih_grants(self, keywords: List[str], domain: str) -> List[Dict]:
         grants = []
 
         try:
@@ -307,6 +376,48 @@ Return JSON:
         # TODO: Use field/keywords overrides if provided
         yield from self.analyze_stream(manuscript_text)
 
+    def iter_source_results(self, keywords: List[str], domain: str,
+                            categories: List[str]) -> Generator[Tuple[str, List[Dict]], None, None]:
+        """
+        Run the OpenAlex, arXiv and NIH searches concurrently.
+
+        Yields:
+            (source, results) as each search finishes; source is one of
+            "competitors", "preprints", "grants". A failed search yields [].
+        """
+        pool = ThreadPoolExecutor(max_workers=len(SOURCE_EVENTS), thread_name_prefix="competitor-search")
+        futures = {
+            pool.submit(self.search_openalex_competitors, keywords, domain): "competitors",
+            pool.submit(self.search_arxiv_preprints, keywords, categories): "preprints",
+            pool.submit(self.search_nih_grants, keywords, domain): "grants",
+        }
+        try:
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    print(f"[CompetitorFinder] {source} search failed: {e}", flush=True)
+                    results = []
+                yield source, results
+        finally:
+            # Client disconnects close the generator; don't block on the rest
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _source_event(source: str, results: List[Dict]) -> Dict:
+        if source == "competitors":
+            return {"count": len(results), "labs": results[:5]}
+        if source == "preprints":
+            very_recent = [p for p in results if p.get('is_very_recent')]
+            return {
+                "count": len(results),
+                "very_recent": len(very_recent),
+                "alert": len(very_recent) > 0,
+                "preprints": results,
+            }
+        return {"count": len(results), "grants": results}
+
     def analyze_stream(self, manuscript_text: str) -> Generator[str, None, None]:
         """Stream competitor analysis results."""
 
@@ -315,57 +426,42 @@ Return JSON:
             yield _sse("progress", {"step": 1, "message": "Analyzing your research focus...", "percent": 10})
 
             focus = self.extract_research_focus(manuscript_text)
+            keywords = focus.get('search_keywords', [])
 
             yield _sse("focus", {
                 "domain": focus.get('domain'),
                 "research_question": focus.get('research_question', '')[:200],
                 "methodology": focus.get('methodology', '')[:150],
                 "innovation": focus.get('innovation', '')[:150],
-                "keywords": focus.get('search_keywords', [])[:8]
+                "keywords": keywords[:8]
             })
 
-            # Step 2: Search OpenAlex for competing labs
-            yield _sse("progress", {"step": 2, "message": "Finding competing labs...", "percent": 30})
-
-            competitors = self.search_openalex_competitors(
-                keywords=focus.get('search_keywords', []),
-                domain=focus.get('domain', '')
-            )
-
-            yield _sse("competitors_found", {
-                "count": len(competitors),
-                "labs": competitors[:5]
-            })
-
-            # Step 3: Search arXiv for recent preprints
-            yield _sse("progress", {"step": 3, "message": "Scanning recent preprints...", "percent": 55})
-
-            preprints = self.search_arxiv_preprints(
-                keywords=focus.get('search_keywords', []),
-                categories=focus.get('arxiv_categories', [])
-            )
+            # Steps 2-4: search labs, preprints and grants concurrently;
+            # each source is streamed as soon as it lands
+            yield _sse("progress", {"step": 2, "message": "Searching labs, preprints and active grants...", "percent": 30})
+
+            results = {source: [] for source in SOURCE_EVENTS}
+            for done, (source, source_results) in enumerate(self.iter_source_results(
+                keywords=keywords,
+                domain=focus.get('domain', ''),
+                categories=focus.get('arxiv_categories', []),
+            ), start=1):
+                results[source] = source_results
+                yield _sse(SOURCE_EVENTS[source], self._source_event(source, source_results))
+
+                # Overlap analysis only depends on labs and preprints
+                if source != "grants":
+                    analysis = self.calculate_overlap_analysis(focus, results["competitors"], results["preprints"])
+                    yield _sse("analysis_update", {**analysis, "sources_complete": done})
+
+                yield _sse("progress", {
+                    "step": 2 + done,
+                    "message": f"{done}/{len(SOURCE_EVENTS)} sources searched",
+                    "percent": 30 + 20 * done,
+                })
 
+            competitors, preprints, grants = results["competitors"], results["preprints"], results["grants"]
             very_recent = [p for p in preprints if p.get('is_very_recent')]
-
-            yield _sse("preprints_found", {
-                "count": len(preprints),
-                "very_recent": len(very_recent),
-                "alert": len(very_recent) > 0
-            })
-
-            # Step 4: Search NIH for active grants
-            yield _sse("progress", {"step": 4, "message": "Checking active NIH grants...", "percent": 75})
-
-            grants = self.search_nih_grants(
-                keywords=focus.get('search_keywords', []),
-                domain=focus.get('domain', '')
-            )
-
-            yield _sse("grants_found", {"count": len(grants)})
-
-            # Step 5: Generate overlap analysis
-            yield _sse("progress", {"step": 5, "message": "Analyzing competition landscape...", "percent": 90})
-
             analysis = self.calculate_overlap_analysis(focus, competitors, preprints)
 
             # Final result
@@ -395,9 +491,12 @@ Return JSON:
 
 # Singleton
 _service = None
+_service_lock = threading.Lock()
 
 def get_competitor_finder_service() -> CompetitorFinderService:
     global _service
     if _service is None:
-        _service = CompetitorFinderService()
+        with _service_lock:
+            if _service is None:
+                _service = CompetitorFinderService()
     return _service
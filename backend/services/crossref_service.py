@@ -1,28 +1,68 @@
 """
 CrossRef Service — Verifies DOIs and retrieves citation counts.
 Used by the journal scorer to validate references found in manuscripts.
+
+verify_batch() serves previously verified DOIs from a persistent cache
+(CROSSREF_CACHE_PATH, SQLite) and looks up the rest concurrently through a
+pooled session, under a rate governor shared by all threads in the worker
+(CROSSREF_REQUESTS_PER_SECOND / CROSSREF_MAX_CONCURRENT, within CrossRef's
+polite-pool limits). A DOI cited by many manuscripts is verified once.
 """
 
+import os
 import re
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from services.openalex_client import RateGovernor, ResponseCache
 
 
 CROSSREF_BASE = "https://api.crossref.org"
 POLITE_EMAIL = "prmogathala@gmail.com"
 MAX_VERIFY = 10  # max DOIs to verify per manuscript (rate limit friendly)
 
+CROSSREF_REQUESTS_PER_SECOND = float(os.getenv("CROSSREF_REQUESTS_PER_SECOND", "8"))
+CROSSREF_MAX_CONCURRENT = int(os.getenv("CROSSREF_MAX_CONCURRENT", "3"))
+# Empty string disables the persistent cache
+CROSSREF_CACHE_PATH = os.getenv(
+    "CROSSREF_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "crossref_cache.sqlite3"),
+)
+CROSSREF_CACHE_TTL_SECONDS = int(os.getenv("CROSSREF_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# "DOI not found" is cached for less time (newly registered DOIs appear later)
+CROSSREF_NOT_FOUND_TTL_SECONDS = int(os.getenv("CROSSREF_NOT_FOUND_TTL_SECONDS", str(24 * 3600)))
+
 
 class CrossRefService:
     """Lightweight CrossRef API client for DOI verification."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache_path: Optional[str] = CROSSREF_CACHE_PATH,
+        max_concurrent: int = CROSSREF_MAX_CONCURRENT,
+        requests_per_second: float = CROSSREF_REQUESTS_PER_SECOND,
+        session: Optional[requests.Session] = None,
+    ):
         self._headers = {
             "User-Agent": f"2ndBrain/1.0 (mailto:{POLITE_EMAIL})",
             "Accept": "application/json",
         }
+        self.max_concurrent = max(1, max_concurrent)
+        self.governor = RateGovernor(requests_per_second)
+        self.session = session or requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrent))
+        self.session.headers.update(self._headers)
+
+        self.cache = None
+        if cache_path:
+            try:
+                self.cache = ResponseCache(cache_path, ttl_seconds=CROSSREF_CACHE_TTL_SECONDS)
+            except Exception as e:
+                print(f"[CrossRef] DOI cache disabled ({cache_path}): {e}", flush=True)
 
     def extract_dois_from_text(self, text: str) -> List[str]:
         """Extract DOI strings from manuscript text using regex."""
@@ -41,17 +81,67 @@ class CrossRefService:
 
     def verify_dois(self, dois: List[str]) -> Dict[str, Dict]:
         """Verify a list of DOIs against CrossRef. Returns dict keyed by DOI."""
+        return self.verify_batch(dois)
+
+    def verify_batch(self, dois: List[str], max_dois: int = MAX_VERIFY) -> Dict[str, Dict]:
+        """
+        Verify DOIs, serving previously verified ones from the cache.
+
+        Args:
+            dois: DOI strings (duplicates and case variants are looked up once)
+            max_dois: Cap on distinct DOIs per call
+
+        Returns:
+            Dict keyed by DOI (as given), in input order
+        """
+        # DOIs are case-insensitive
+        unique = list(dict.fromkeys(doi.lower() for doi in dois))[:max_dois]
+        found: Dict[str, Dict] = {}
+        misses = []
+        for key in unique:
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is not None:
+                found[key] = cached
+            else:
+                misses.append(key)
+
+        if misses:
+            if len(misses) == 1:
+                fetched = [self._verify_single(misses[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.max_concurrent, len(misses))) as pool:
+                    fetched = list(pool.map(self._verify_single, misses))
+            for key, info in zip(misses, fetched):
+                found[key] = info
+                self._cache_result(key, info)
+
+        print(f"[CrossRef] Verified {len(unique)} DOIs ({len(unique) - len(misses)} cached, "
+              f"{len(misses)} looked up)", flush=True)
+
         results = {}
-        for doi in dois[:MAX_VERIFY]:
-            results[doi] = self._verify_single(doi)
-            time.sleep(0.12)  # ~8 req/sec, within polite pool limits
+        for doi in dois:
+            if doi.lower() in found and doi not in results:
+                results[doi] = found[doi.lower()]
         return results
 
+    def _cache_result(self, key: str, info: Dict):
+        """Cache definitive answers only (never network errors or 5xx)."""
+        if self.cache is None:
+            return
+        try:
+            if info.get("valid"):
+                self.cache.put(key, info)
+            elif info.get("error") == "DOI not found":
+                self.cache.put(key, info, ttl_seconds=CROSSREF_NOT_FOUND_TTL_SECONDS)
+        except Exception as e:
+            print(f"[CrossRef] Cache write failed: {e}", flush=True)
+
     def _verify_single(self, doi: str) -> Dict:
         """Verify a single DOI and return metadata."""
         url = f"{CROSSREF_BASE}/works/{requests.utils.quote(doi, safe='')}"
         try:
-            resp = requests.get(url, headers=self._headers, timeout=10)
+            self.governor.acquire()
+            resp = self.session.get(url, timeout=10)
             if resp.status_code == 200:
                 work = resp.json().get("message", {})
                 title_parts = work.get("title", [])
@@ -69,6 +159,9 @@ class CrossRefService:
                 }
             elif resp.status_code == 404:
                 return {"valid": False, "error": "DOI not found"}
+            elif resp.status_code == 429:
+                self.governor.pause(1.0)  # back off everyone sharing this service
+                return {"valid": False, "error": "HTTP 429"}
             else:
                 return {"valid": False, "error": f"HTTP {resp.status_code}"}
         except Exception as e:
@@ -78,10 +171,13 @@ class CrossRefService:
 # ── Singleton ───────────────────────────────────────────────────────────────
 
 _service = None
+_service_lock = threading.Lock()
 
 
 def get_crossref_service() -> CrossRefService:
     global _service
     if _service is None:
-        _service = CrossRefService()
+        with _service_lock:
+            if _service is None:
+                _service = CrossRefService()
     return _service
@@ -0,0 +1,338 @@
+"""
+Query Embedding Cache
+
+Two layers so a chat turn never pays for the same embedding twice:
+- Request scope: a per-turn memo opened with `embedding_scope()`. The intent
+  gate, context injector, Pinecone search and the CTSI shared-namespace lookup
+  all read from it, so each distinct string is embedded at most once per turn.
+- Process scope: a content-hash LRU with a TTL shared by all requests in the
+  worker (power descriptions, repeated questions, follow-ups).
+
+Hit/miss counters are kept for both layers so we can see how many Azure
+round-trips a chat saves (`get_embedding_cache_stats()`).
+"""
+
+import os
+import time
+import hashlib
+import inspect
+import functools
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+# Must match vector_stores.pinecone_store.EMBEDDING_DIMENSIONS (kept here to
+# avoid importing pinecone just to read a constant)
+DEFAULT_EMBEDDING_DIMENSIONS = 1536
+
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "2000"))
+EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "3600"))
+
+
+def embedding_cache_key(text: str, model: str, dimensions: int) -> str:
+    """Content hash for a (model, dimensions, text) triple."""
+    payload = f"{model}\x00{dimensions}\x00{text}".encode("utf-8", errors="replace")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingLRUCache:
+    """Thread-safe LRU with per-entry TTL, keyed by content hash."""
+
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+                 ttl_seconds: int = EMBEDDING_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, vector)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[List[float]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, vector = entry
+            if expires_at < now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector: List[float]):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class EmbeddingScope:
+    """Per-turn memo. Lives in a contextvar for the duration of a chat turn."""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self._vectors: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self.request_hits = 0   # served from this turn's memo
+        self.process_hits = 0   # served from the process-wide LRU
+        self.api_calls = 0      # texts actually sent to the embeddings API
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is not None:
+                self.request_hits += 1
+            return vector
+
+    def put(self, key: str, vector: List[float], source: str):
+        with self._lock:
+            self._vectors[key] = vector
+            if source == "process":
+                self.process_hits += 1
+            else:
+                self.api_calls += 1
+
+    def stats(self) -> Dict:
+        return {
+            "label": self.label,
+            "distinct_texts": len(self._vectors),
+            "request_hits": self.request_hits,
+            "process_hits": self.process_hits,
+            "api_calls": self.api_calls,
+            "saved_calls": self.request_hits + self.process_hits,
+        }
+
+
+_process_cache = EmbeddingLRUCache()
+_current_scope: contextvars.ContextVar[Optional[EmbeddingScope]] = contextvars.ContextVar(
+    "embedding_scope", default=None
+)
+
+# Lifetime counters across all scopes (for /metrics-style inspection)
+_totals_lock = threading.Lock()
+_totals = {"request_hits": 0, "process_hits": 0, "api_calls": 0, "scopes": 0}
+
+
+@contextmanager
+def embedding_scope(label: str = ""):
+    """
+    Open a request-scoped embedding memo for one chat turn.
+
+    Nested calls reuse the outer scope, so search_and_answer can open a scope
+    and still share it with a caller (e.g. the orchestrator) that opened one first.
+    """
+    existing = _current_scope.get()
+    if existing is not None:
+        yield existing
+        return
+
+    scope = EmbeddingScope(label)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        try:
+            _current_scope.reset(token)
+        except ValueError:
+            # Generator-driven scopes (SSE) can close in a different context
+            _current_scope.set(None)
+        with _totals_lock:
+            _totals["request_hits"] += scope.request_hits
+            _totals["process_hits"] += scope.process_hits
+            _totals["api_calls"] += scope.api_calls
+            _totals["scopes"] += 1
+        if scope.api_calls or scope.request_hits or scope.process_hits:
+            print(f"[EmbeddingCache] {label or 'scope'}: {scope.api_calls} API calls, "
+                  f"{scope.request_hits} turn hits, {scope.process_hits} LRU hits", flush=True)
+
+
+def embedding_scoped(label: str = ""):
+    """
+    Decorator form of `embedding_scope()`. Works for plain functions and for
+    generator functions (SSE streams), where the scope spans the whole iteration.
+    """
+    def decorator(func):
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def gen_wrapper(*args, **kwargs):
+                with embedding_scope(label or func.__name__):
+                    yield from func(*args, **kwargs)
+            return gen_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with embedding_scope(label or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_embedding_scope() -> Optional[EmbeddingScope]:
+    """Return the active per-turn scope, if any."""
+    return _current_scope.get()
+
+
+def _default_embed_fn(text: str, dimensions: int) -> List[float]:
+    from services.openai_client import get_openai_client
+    response = get_openai_client().create_embedding(text=text, dimensions=dimensions)
+    return response.data[0].embedding
+
+
+def _default_model() -> str:
+    from services.openai_client import get_openai_client
+    return get_openai_client().get_embedding_model()
+
+
+def get_cached_embedding(
+    text: str,
+    dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS,
+    embed_fn: Optional[Callable[[str, int], List[float]]] = None,
+    model: Optional[str] = None,
+) -> List[float]:
+    """
+    Embed `text`, going through the turn memo and the process LRU first.
+
+    Args:
+        text: Text to embed (callers truncate before calling)
+        dimensions: Embedding dimensions (part of the cache key)
+        embed_fn: Callable(text, dimensions) -> vector; defaults to the shared OpenAI client
+        model: Embedding model name for the cache key
+
+    Returns:
+        Embedding vector as a list of floats
+    """
+    key = embedding_cache_key(text, model or _default_model(), dimensions)
+    scope = _current_scope.get()
+
+    if scope is not None:
+        vector = scope.get(key)
+        if vector is not None:
+            return vector
+
+    vector = _process_cache.get(key)
+    if vector is not None:
+        if scope is not None:
+            scope.put(key, vector, source="process")
+        else:
+            with _totals_lock:
+                _totals["process_hits"] += 1
+        return vector
+
+    vector = list((embed_fn or _default_embed_fn)(text, dimensions))
+    _process_cache.put(key, vector)
+    if scope is not None:
+        scope.put(key, vector, source="api")
+    else:
+        with _totals_lock:
+            _totals["api_calls"] += 1
+    return vector
+
+
+def get_cached_embeddings(
+    texts: List[str],
+    dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS,
+    embed_batch_fn: Optional[Callable[[List[str], int], List[List[float]]]] = None,
+    model: Optional[str] = None,
+) -> List[List[float]]:
+    """
+    Batch form of `get_cached_embedding`: cached texts are served locally and
+    all remaining distinct texts go to the API in a single request.
+
+    Args:
+        texts: Texts to embed (order preserved in the result)
+        dimensions: Embedding dimensions (part of the cache key)
+        embed_batch_fn: Callable(texts, dimensions) -> vectors; defaults to the shared OpenAI client
+        model: Embedding model name for the cache key
+
+    Returns:
+        One vector per input text
+    """
+    model = model or _default_model()
+    scope = _current_scope.get()
+    keys = [embedding_cache_key(t, model, dimensions) for t in texts]
+    resolved: Dict[str, List[float]] = {}
+    pending: Dict[str, str] = {}  # key -> text, preserves first-seen order
+
+    for key, text in zip(keys, texts):
+        if key in resolved or key in pending:
+            continue
+        vector = scope.get(key) if scope is not None else None
+        if vector is None:
+            vector = _process_cache.get(key)
+            if vector is not None:
+                if scope is not None:
+                    scope.put(key, vector, source="process")
+                else:
+                    with _totals_lock:
+                        _totals["process_hits"] += 1
+        if vector is not None:
+            resolved[key] = vector
+        else:
+            pending[key] = text
+
+    if pending:
+        batch_fn = embed_batch_fn or _default_embed_batch_fn
+        vectors = batch_fn(list(pending.values()), dimensions)
+        for key, vector in zip(pending.keys(), vectors):
+            vector = list(vector)
+            resolved[key] = vector
+            _process_cache.put(key, vector)
+            if scope is not None:
+                scope.put(key, vector, source="api")
+        if scope is None:
+            with _totals_lock:
+                _totals["api_calls"] += len(pending)
+
+    return [resolved[key] for key in keys]
+
+
+def _default_embed_batch_fn(texts: List[str], dimensions: int) -> List[List[float]]:
+    from services.openai_client import get_openai_client
+    response = get_openai_client().create_embedding(text=texts, dimensions=dimensions)
+    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+
+def get_embedding_cache_stats() -> Dict:
+    """Process LRU stats plus lifetime per-turn counters."""
+    with _totals_lock:
+        totals = dict(_totals)
+    lookups = totals["request_hits"] + totals["process_hits"] + totals["api_calls"]
+    totals["saved_calls"] = totals["request_hits"] + totals["process_hits"]
+    totals["saved_ratio"] = round(totals["saved_calls"] / lookups, 4) if lookups else 0.0
+    scope = _current_scope.get()
+    return {
+        "process_cache": _process_cache.stats(),
+        "totals": totals,
+        "current_scope": scope.stats() if scope else None,
+    }
+
+
+def clear_embedding_cache():
+    """Drop all process-level entries (tests, model/deployment switch)."""
+    _process_cache.clear()
@@ -20,6 +20,8 @@ from sqlalchemy.orm import Session
 
 from database.models import Document, Tenant, InventoryItem
 from vector_stores.pinecone_store import get_vector_store, PineconeVectorStore
+from vector_stores.chunk_fingerprints import ChunkFingerprintStore
+from vector_stores.bm25_index import get_bm25_index
 
 # Chunking configuration - 2000 chars with 400 overlap for optimal RAG
 CHUNK_SIZE = 2000
@@ -69,6 +71,55 @@ class EmbeddingService:
                 raise
         return self._vector_store
 
+    def fingerprint_store(self, db: Session, tenant_id: str) -> ChunkFingerprintStore:
+        """Chunk fingerprints for this tenant's Pinecone namespace"""
+        embedding_model = os.getenv('AZURE_EMBEDDING_DEPLOYMENT', 'text-embedding-3-large')
+        return ChunkFingerprintStore(db, tenant_id, model=embedding_model)
+
+    def clear_tenant_index_state(self, tenant_id: str, db: Session):
+        """Forget chunk fingerprints and the BM25 index after a tenant's namespace is wiped"""
+        self.fingerprint_store(db, tenant_id).delete_tenant()
+        try:
+            get_bm25_index(tenant_id).clear()
+        except Exception as e:
+            print(f"[EmbeddingService] Failed to clear BM25 index for {tenant_id}: {e}", flush=True)
+
+    def rebuild_bm25_index(self, tenant_id: str, db: Session, batch_size: int = 200) -> Dict:
+        """
+        Rebuild a tenant's BM25 index from its embedded documents (backfill for
+        tenants embedded before the sparse index existed). No embeddings are
+        computed - only chunking and tokenization.
+        """
+        index = get_bm25_index(tenant_id)
+        index.clear()
+        documents = 0
+        chunks = 0
+        query = db.query(Document).filter(
+            Document.tenant_id == tenant_id,
+            Document.is_deleted == False,
+            Document.embedded_at != None
+        )
+        for start in range(0, query.count(), batch_size):
+            batch = []
+            for doc in query.order_by(Document.id).offset(start).limit(batch_size).all():
+                pinecone_doc = self._prepare_pinecone_doc(doc)
+                if not pinecone_doc:
+                    continue
+                for chunk_text, chunk_idx in self.vector_store._iter_chunks(
+                    pinecone_doc['content'], CHUNK_SIZE, CHUNK_OVERLAP
+                ):
+                    batch.append((
+                        self.vector_store._generate_vector_id(pinecone_doc['id'], chunk_idx),
+                        pinecone_doc['id'],
+                        f"{pinecone_doc['title']}\n{chunk_text}"
+                    ))
+                documents += 1
+            chunks += len(batch)
+            index.upsert_documents(batch)
+
+        print(f"[EmbeddingService] Rebuilt BM25 index for {tenant_id}: {documents} documents, {chunks} chunks", flush=True)
+        return {'success': True, 'documents': documents, 'chunks': chunks, **index.stats()}
+
     def _prepare_pinecone_doc(self, doc: 'Document') -> Optional[Dict]:
         """Prepare a Document model instance for Pinecone ingestion."""
         if not doc.content:
@@ -138,10 +189,13 @@ class EmbeddingService:
         total = len(documents)
         embedded_count = 0
         total_chunks = 0
+        unchanged_chunks = 0
+        reused_chunks = 0
         skipped = 0
         errors = []
         now = utc_now()
         embedding_model = os.getenv('AZURE_EMBEDDING_DEPLOYMENT', 'text-embedding-3-large')
+        fingerprints = self.fingerprint_store(db, tenant_id)
         start_time = _time.time()
 
         # Filter and prepare docs
@@ -182,9 +236,14 @@ class EmbeddingService:
                     tenant_id=tenant_id,
                     chunk_size=CHUNK_SIZE,
                     chunk_overlap=CHUNK_OVERLAP,
-                    show_progress=False
+                    show_progress=False,
+                    fingerprint_store=fingerprints,
+                    force_upsert=force_reembed,
+                    sparse_index=get_bm25_index(tenant_id)
                 )
 
+                unchanged_chunks += result.get('unchanged', 0)
+                reused_chunks += result.get('reused_embeddings', 0)
                 if result.get('success') or result.get('upserted', 0) > 0:
                     for doc in db_docs:
                         doc.embedded_at = now
@@ -207,13 +266,16 @@ class EmbeddingService:
         elapsed = _time.time() - start_time
         rate = len(docs_to_embed) / elapsed if elapsed > 0 else 0
         print(f"[EmbeddingService] Done: {embedded_count} chunks from {len(docs_to_embed)} docs, "
-              f"skipped={skipped}, errors={len(errors)}, {elapsed:.1f}s ({rate:.1f} docs/sec)", flush=True)
+              f"skipped={skipped}, unchanged_chunks={unchanged_chunks}, reused={reused_chunks}, "
+              f"errors={len(errors)}, {elapsed:.1f}s ({rate:.1f} docs/sec)", flush=True)
 
         return {
             'success': len(errors) == 0,
             'total': total,
             'embedded': embedded_count,
             'chunks': total_chunks,
+            'unchanged_chunks': unchanged_chunks,
+            'reused_embeddings': reused_chunks,
             'skipped': skipped,
             'errors': errors,
             'namespace': tenant_id
@@ -297,6 +359,9 @@ class EmbeddingService:
             )
 
             if success:
+                self.fingerprint_store(db, tenant_id).delete_documents(document_ids)
+                get_bm25_index(tenant_id).delete_documents(document_ids)
+
                 # Update database to clear embedded_at
                 db.query(Document).filter(
                     Document.id.in_(document_ids),
@@ -335,6 +400,8 @@ class EmbeddingService:
             success = self.vector_store.delete_tenant_data(tenant_id)
 
             if success:
+                self.clear_tenant_index_state(tenant_id, db)
+
                 # Clear embedded_at for all tenant documents
                 db.query(Document).filter(
                     Document.tenant_id == tenant_id
@@ -517,11 +584,14 @@ class EmbeddingService:
                 tenant_id=tenant_id,
                 chunk_size=CHUNK_SIZE,
                 chunk_overlap=CHUNK_OVERLAP,
-                show_progress=False
+                show_progress=False,
+                fingerprint_store=self.fingerprint_store(db, tenant_id),
+                sparse_index=get_bm25_index(tenant_id)
             )
 
             if result.get('success') or result.get('upserted', 0) > 0:
                 embedded_count = result.get('upserted', 0)
+                db.commit()
                 print(f"[EmbeddingService] Embedded {embedded_count} inventory chunks", flush=True)
             else:
                 errors.extend(result.get('errors', []))
@@ -577,13 +647,15 @@ class EmbeddingService:
         """
         return self.embed_inventory_items([item], tenant_id, db)
 
-    def delete_inventory_embeddings(self, item_ids: List[str], tenant_id: str) -> Dict:
+    def delete_inventory_embeddings(self, item_ids: List[str], tenant_id: str,
+                                    db: Optional[Session] = None) -> Dict:
         """
         Delete embeddings for inventory items.
 
         Args:
             item_ids: List of inventory item IDs
             tenant_id: Tenant ID
+            db: Optional database session (clears chunk fingerprints when given)
 
         Returns:
             Dict with deletion stats
@@ -595,6 +667,11 @@ class EmbeddingService:
                 doc_ids=prefixed_ids,
                 tenant_id=tenant_id
             )
+            if success:
+                get_bm25_index(tenant_id).delete_documents(prefixed_ids)
+            if success and db is not None:
+                self.fingerprint_store(db, tenant_id).delete_documents(prefixed_ids)
+                db.commit()
             return {'success': success, 'deleted': len(item_ids) if success else 0}
         except Exception as e:
             print(f"[EmbeddingService] Error deleting inventory embeddings: {e}")
@@ -16,13 +16,25 @@ import os
 import re
 import json
 import time
-import hashlib
+import threading
+import functools
+import contextvars
 import numpy as np
 from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 from services.openai_client import get_openai_client
+from services.embedding_cache import embedding_scoped, get_cached_embedding
+from services.rerank_engine import get_rerank_engine, RERANKER_MODEL_NAME
+from services.answer_cache import get_answer_cache, replay_stream_events
+from vector_stores.rank_fusion import reciprocal_rank_fusion
+from services.text_similarity import SentenceMatrix, term_coverage, top_sentences_per_source, word_set
+
+# Must match vector_stores.pinecone_store.PineconeVectorStore.MAX_EMBEDDING_CHARS
+# so a query embedded here hits the same cache key as the retrieval path
+MAX_QUERY_EMBEDDING_CHARS = 30000
 
 
 # =============================================================================
@@ -406,30 +418,25 @@ class ContextCompressor:
         if not content:
             return ""
 
-        query_words = set(w.lower() for w in re.findall(r'\b\w{3,}\b', query))
-        sentences = re.split(r'(?<=[.!?])\s+', content)
-
-        scored = []
-        for sent in sentences:
-            sent = sent.strip()
-            if len(sent) < 20:
-                continue
-            sent_words = set(w.lower() for w in re.findall(r'\b\w{3,}\b', sent))
-            overlap = len(query_words & sent_words)
-            if overlap > 0:
-                scored.append((sent, overlap))
-
-        scored.sort(key=lambda x: x[1], reverse=True)
-        return ' '.join(s for s, _ in scored[:max_sentences])
+        picked = top_sentences_per_source(SentenceMatrix([content]), word_set(query), max_sentences)
+        return ' '.join(picked.get(0, []))
 
     @classmethod
     def compress_sources(cls, query: str, sources: List[Dict]) -> List[Dict]:
+        # Sentence-split and tokenize every long source once, score all sentences in one pass
+        long_idx = [i for i, src in enumerate(sources) if len(src.get('content', '')) > 500]
+        picked = {}
+        if long_idx:
+            matrix = SentenceMatrix([sources[i].get('content', '') for i in long_idx])
+            picked = top_sentences_per_source(matrix, word_set(query), 10)
+
         compressed = []
-        for src in sources:
+        long_pos = {src_idx: pos for pos, src_idx in enumerate(long_idx)}
+        for i, src in enumerate(sources):
             content = src.get('content', '')
             original_len = len(content)
-            if original_len > 500:
-                relevant = cls.extract_relevant_sentences(query, content)
+            if i in long_pos:
+                relevant = ' '.join(picked.get(long_pos[i], []))
                 if relevant:
                     src = dict(src)
                     src['content'] = relevant
@@ -859,68 +866,30 @@ class QueryExpander:
 # =============================================================================
 
 class CrossEncoderReranker:
-    """Cross-encoder for accurate reranking"""
+    """
+    Cross-encoder for accurate reranking.
+
+    Thin wrapper over the process-wide RerankEngine (services/rerank_engine.py),
+    which owns the model, the score cache and the shared worker pool.
+    """
 
-    MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-12-v2"
+    MODEL_NAME = RERANKER_MODEL_NAME
 
     def __init__(self):
-        self.model = None
-        self._load_model()
+        self.engine = get_rerank_engine()
 
-    def _load_model(self):
-        if not CROSS_ENCODER_AVAILABLE:
-            return
-        try:
-            self.model = CrossEncoder(self.MODEL_NAME)
-            print(f"[EnhancedSearch] Cross-encoder loaded: {self.MODEL_NAME}")
-        except Exception as e:
-            print(f"[EnhancedSearch] Failed to load cross-encoder: {e}")
-            self.model = None
+    @property
+    def model(self):
+        """The loaded engine, or None if reranking is unavailable"""
+        if self.engine is None or not self.engine.available:
+            return None
+        return self.engine
 
     def rerank(self, query: str, results: List[Dict], top_k: int = 10) -> List[Dict]:
-        """Rerank results using cross-encoder with batched predictions for speed"""
+        """Rerank results using cross-encoder (cached, length-bucketed batches)"""
         if not self.model or not results:
             return results[:top_k]
-
-        # OPTIMIZATION: Batch all predictions at once instead of one-by-one
-        # This is MUCH faster as model inference is batched
-        pairs = []
-        result_indices = []
-
-        for i, result in enumerate(results):
-            content = result.get('content', '') or result.get('content_preview', '')
-            if not content:
-                continue
-            # Use first 2000 chars for better relevance scoring (ms-marco handles up to ~512 tokens)
-            pairs.append((query, content[:2000]))
-            result_indices.append(i)
-
-        if not pairs:
-            return results[:top_k]
-
-        # Single batched prediction - MUCH faster than individual calls
-        try:
-            scores = self.model.predict(pairs)
-        except Exception as e:
-            print(f"[EnhancedSearch] Reranking failed: {e}")
-            return results[:top_k]
-
-        # Assign scores back to results
-        scored_results = []
-        score_idx = 0
-        for i, result in enumerate(results):
-            if i in result_indices:
-                score = float(scores[score_idx])
-                score_idx += 1
-            else:
-                score = 0.0
-            result['rerank_score'] = score
-            scored_results.append((result, score))
-
-        # Sort by rerank score
-        scored_results.sort(key=lambda x: x[1], reverse=True)
-
-        return [r for r, _ in scored_results[:top_k]]
+        return self.engine.rerank(query, results, top_k=top_k)
 
 
 # =============================================================================
@@ -1078,14 +1047,27 @@ class HallucinationDetector:
 
         return claims[:50]  # Limit to 50 claims to avoid performance issues
 
+    STATEMENT_STOPWORDS = {'this', 'that', 'with', 'from', 'have', 'been', 'were', 'will', 'would', 'could', 'should'}
+
     def verify_claims(self, claims: List[Dict], sources: List[Dict]) -> Dict:
         """Verify claims against sources - Enhanced for all claim types"""
         verified = []
         unverified = []
         hallucinated = []
 
-        # Build combined source text for faster searching
+        # Build combined source text once; per-source numbers are extracted on first use
         all_source_text = ' '.join(s.get('content', '') + ' ' + s.get('title', '') for s in sources).lower()
+        all_source_text_plain = all_source_text.replace(',', '')
+        source_numbers: Dict[int, set] = {}
+
+        # Statement claims: claims x significant words (4+ chars, not stopwords) times a
+        # corpus-presence vector; each distinct word is looked up once
+        statements = [c for c in claims if c['type'] == 'statement']
+        coverage = term_coverage([
+            [w for w in re.findall(r'\b[a-z]{4,}\b', c['text'].lower()) if w not in self.STATEMENT_STOPWORDS]
+            for c in statements
+        ], all_source_text)
+        statement_coverage = {id(c): cov for c, cov in zip(statements, coverage)}
 
         for claim in claims:
             claim_type = claim['type']
@@ -1093,11 +1075,11 @@ class HallucinationDetector:
             if claim_type == 'citation':
                 source_num = claim['source_num']
                 if source_num <= len(sources):
-                    source_content = sources[source_num - 1].get('content', '')
+                    if source_num not in source_numbers:
+                        source_numbers[source_num] = set(re.findall(r'\d+\.?\d*', sources[source_num - 1].get('content', '')))
                     claim_numbers = set(re.findall(r'\d+\.?\d*', claim['context']))
-                    source_numbers = set(re.findall(r'\d+\.?\d*', source_content))
 
-                    if claim_numbers & source_numbers:
+                    if claim_numbers & source_numbers[source_num]:
                         verified.append(claim)
                     else:
                         unverified.append(claim)
@@ -1106,7 +1088,7 @@ class HallucinationDetector:
 
             elif claim_type == 'numerical':
                 claim_value = claim['value'].replace(',', '').replace('$', '').replace('%', '')
-                if claim_value in all_source_text.replace(',', ''):
+                if claim_value in all_source_text_plain:
                     verified.append(claim)
                 else:
                     unverified.append(claim)
@@ -1128,18 +1110,12 @@ class HallucinationDetector:
                     unverified.append(claim)
 
             elif claim_type == 'statement':
-                # For statements, check if key words appear in sources
-                # Extract significant words (4+ chars, not stopwords)
-                stopwords = {'this', 'that', 'with', 'from', 'have', 'been', 'were', 'will', 'would', 'could', 'should'}
-                words = re.findall(r'\b[a-z]{4,}\b', claim['text'].lower())
-                significant_words = [w for w in words if w not in stopwords]
-
-                if not significant_words:
+                claim_coverage = statement_coverage[id(claim)]
+                if np.isnan(claim_coverage):
                     continue
 
                 # If >50% of significant words found in sources, consider verified
-                found_count = sum(1 for w in significant_words if w in all_source_text)
-                if found_count / len(significant_words) > 0.5:
+                if claim_coverage > 0.5:
                     verified.append(claim)
                 else:
                     unverified.append(claim)
@@ -1254,6 +1230,31 @@ class FreshnessScorer:
             return 0.9
 
 
+# =============================================================================
+# PARALLEL RETRIEVAL (sub-query fan-out + reciprocal-rank fusion)
+# =============================================================================
+
+# Wall-clock budget for one retrieval stage (all sub-queries + shared namespace)
+RETRIEVAL_STAGE_TIMEOUT = float(os.getenv('RETRIEVAL_STAGE_TIMEOUT', '8'))
+# Shared across requests so concurrent chats don't each spin up a pool
+RETRIEVAL_MAX_WORKERS = int(os.getenv('RETRIEVAL_MAX_WORKERS', '16'))
+
+_retrieval_pool: Optional[ThreadPoolExecutor] = None
+_retrieval_pool_lock = threading.Lock()
+
+
+def _get_retrieval_pool() -> ThreadPoolExecutor:
+    global _retrieval_pool
+    if _retrieval_pool is None:
+        with _retrieval_pool_lock:
+            if _retrieval_pool is None:
+                _retrieval_pool = ThreadPoolExecutor(
+                    max_workers=RETRIEVAL_MAX_WORKERS,
+                    thread_name_prefix='retrieval'
+                )
+    return _retrieval_pool
+
+
 # =============================================================================
 # ENHANCED SEARCH SERVICE
 # =============================================================================
@@ -1284,9 +1285,6 @@ class EnhancedSearchService:
         self.source_synthesizer = SourceSynthesizer(self.client)
         self.answer_evaluator = AnswerEvaluator(self.client)
 
-        # Cache for embeddings
-        self._embedding_cache = {}
-
         print("[EnhancedSearch] Service initialized with advanced query understanding")
         print(f"[EnhancedSearch] Cross-encoder available: {self.reranker.model is not None}")
         print(f"[EnhancedSearch] Intent extraction: enabled")
@@ -1399,25 +1397,9 @@ class EnhancedSearchService:
         return [query]
 
     def _get_embedding(self, text: str) -> np.ndarray:
-        """Get embedding with caching"""
-        cache_key = hashlib.md5(text.encode()).hexdigest()
-        if cache_key in self._embedding_cache:
-            return self._embedding_cache[cache_key]
-
-        response = self.client.create_embedding(
-            text=text,
-            dimensions=1536
-        )
-        embedding = np.array(response.data[0].embedding, dtype=np.float32)
-
-        self._embedding_cache[cache_key] = embedding
-        if len(self._embedding_cache) > 500:
-            # Evict oldest
-            keys = list(self._embedding_cache.keys())[:100]
-            for k in keys:
-                del self._embedding_cache[k]
-
-        return embedding
+        """Get embedding via the shared per-turn / process embedding cache"""
+        embedding = get_cached_embedding(text, dimensions=1536)
+        return np.array(embedding, dtype=np.float32)
 
     def _fast_diversity_select(self, results: List[Dict], k: int) -> List[Dict]:
         """
@@ -1476,6 +1458,67 @@ class EnhancedSearchService:
 
         return selected[:k]
 
+    @staticmethod
+    def _retrieve_tenant(vector_store, query: str, tenant_id: str, top_k: int, source_filter: Optional[Dict]) -> List[Dict]:
+        """One tenant-namespace retrieval (hybrid when the store supports it)."""
+        if hasattr(vector_store, 'hybrid_search'):
+            return vector_store.hybrid_search(
+                query=query,
+                tenant_id=tenant_id,
+                top_k=top_k,
+                filter=source_filter
+            )
+        return vector_store.search(
+            query=query,
+            tenant_id=tenant_id,
+            top_k=top_k,
+            filter=source_filter
+        )
+
+    @staticmethod
+    def _retrieve_shared(vector_store, query: str, top_k: int) -> List[Dict]:
+        """CTSI shared-namespace retrieval."""
+        from vector_stores.pinecone_store import SHARED_CTSI_NAMESPACE
+        query_embedding = vector_store.get_query_embedding(query)
+        return vector_store.search_shared_namespace(
+            query_embedding=query_embedding,
+            namespace=SHARED_CTSI_NAMESPACE,
+            top_k=top_k
+        )
+
+    @staticmethod
+    def _run_retrieval_stage(tasks: Dict[str, Any], timeout: float) -> Dict[str, List[Dict]]:
+        """
+        Run retrieval callables concurrently under one stage deadline.
+
+        A task that errors or misses the deadline is logged and left out of the
+        result, so one slow namespace cannot stall the whole turn.
+        """
+        if not tasks:
+            return {}
+
+        pool = _get_retrieval_pool()
+        futures = {}
+        for name, fn in tasks.items():
+            # Each task gets its own context copy so the per-turn embedding memo
+            # (a contextvar) is visible inside the worker thread
+            ctx = contextvars.copy_context()
+            futures[name] = pool.submit(ctx.run, fn)
+
+        deadline = time.time() + timeout
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=max(0.0, deadline - time.time())) or []
+            except FutureTimeoutError:
+                future.cancel()
+                print(f"[EnhancedSearch] Retrieval '{name}' exceeded {timeout}s stage timeout (skipped)")
+            except Exception as e:
+                # A failed namespace/sub-query must never break the rest of the search
+                print(f"[EnhancedSearch] Retrieval '{name}' failed (non-fatal): {e}")
+        return results
+
+    @embedding_scoped("enhanced_search")
     def enhanced_search(
         self,
         query: str,
@@ -1560,59 +1603,8 @@ class EnhancedSearchService:
             features_applied['source_filter'] = source_types
             print(f"[EnhancedSearch] Filtering by source_types: {source_types}")
 
-        if len(sub_queries) > 1:
-            # Multi-sub-query retrieval: search each sub-query, merge by unique ID
-            print(f"[Search] Decomposed into {len(sub_queries)} sub-queries: {sub_queries}")
-            features_applied['decomposition'] = True
-            features_applied['sub_queries'] = sub_queries
-            all_results = []
-            seen_ids = set()
-            per_sq_k = max(8, retrieve_k // len(sub_queries))
-            for sq in sub_queries:
-                if hasattr(vector_store, 'hybrid_search'):
-                    sq_results = vector_store.hybrid_search(
-                        query=sq,
-                        tenant_id=tenant_id,
-                        top_k=per_sq_k,
-                        filter=source_filter
-                    )
-                else:
-                    sq_results = vector_store.search(
-                        query=sq,
-                        tenant_id=tenant_id,
-                        top_k=per_sq_k,
-                        filter=source_filter
-                    )
-                for r in sq_results:
-                    rid = r.get('id') or r.get('doc_id') or r.get('metadata', {}).get('doc_id', '')
-                    if rid and rid not in seen_ids:
-                        seen_ids.add(rid)
-                        all_results.append(r)
-                    elif not rid:
-                        all_results.append(r)
-            initial_results = all_results[:retrieve_k]
-            print(f"[EnhancedSearch] Multi-query retrieval: {len(initial_results)} unique results from {len(sub_queries)} sub-queries")
-        else:
-            # Original single-query path (unchanged)
-            if hasattr(vector_store, 'hybrid_search'):
-                initial_results = vector_store.hybrid_search(
-                    query=search_query,
-                    tenant_id=tenant_id,
-                    top_k=retrieve_k,
-                    filter=source_filter
-                )
-            else:
-                initial_results = vector_store.search(
-                    query=search_query,
-                    tenant_id=tenant_id,
-                    top_k=retrieve_k,
-                    filter=source_filter
-                )
-
-            print(f"[EnhancedSearch] Initial retrieval: {len(initial_results)} results")
-
-        # Step 2b: Adaptive source selection by query intent
-        # Classify query to determine optimal source mix (replaces old personal indicators list)
+        # Adaptive source selection by query intent (decides whether the CTSI
+        # shared namespace joins the retrieval fan-out below)
         source_weights = self._classify_query_intent(query)
         print(f"[Search] Source allocation for query: {source_weights}")
 
@@ -1624,27 +1616,65 @@ class EnhancedSearchService:
         self._last_source_allocation = source_weights
 
         # Skip CTSI shared namespace when weight is 0 (personal queries)
-        if source_weights['ctsi'] <= 0:
+        include_shared = source_weights['ctsi'] > 0
+        if not include_shared:
             print(f"[EnhancedSearch] Skipping CTSI shared namespace (personal query detected, ctsi weight=0)")
+
+        is_multi_query = len(sub_queries) > 1
+        if is_multi_query:
+            print(f"[Search] Decomposed into {len(sub_queries)} sub-queries: {sub_queries}")
+            features_applied['decomposition'] = True
+            features_applied['sub_queries'] = sub_queries
+            retrieval_queries = list(sub_queries)
+            per_query_k = max(8, retrieve_k // len(sub_queries))
         else:
+            retrieval_queries = [search_query]
+            per_query_k = retrieve_k
+
+        # Embed every retrieval string (sub-queries + CTSI query) in ONE call.
+        # The searches below then read these vectors from the per-turn memo.
+        embed_texts = list(retrieval_queries)
+        if include_shared and search_query not in embed_texts:
+            embed_texts.append(search_query)
+        if len(embed_texts) > 1 and hasattr(vector_store, 'get_query_embeddings'):
             try:
-                from vector_stores.pinecone_store import SHARED_CTSI_NAMESPACE
-                query_embedding = vector_store.get_query_embedding(search_query)
-                shared_top_k = max(ctsi_k, 2)
-                shared_results = vector_store.search_shared_namespace(
-                    query_embedding=query_embedding,
-                    namespace=SHARED_CTSI_NAMESPACE,
-                    top_k=shared_top_k
-                )
-                if shared_results:
-                    # Apply 0.9x score multiplier so tenant data gets slight priority
-                    for r in shared_results:
-                        r['score'] = r.get('score', 0) * 0.9
-                    initial_results.extend(shared_results)
-                    print(f"[EnhancedSearch] Added {len(shared_results)} shared CTSI results (weight={source_weights['ctsi']:.2f})")
+                vector_store.get_query_embeddings(embed_texts)
             except Exception as e:
-                # Shared search failure must never break tenant search
-                print(f"[EnhancedSearch] Shared namespace query failed (non-fatal): {e}")
+                print(f"[EnhancedSearch] Batched query embedding failed, falling back to per-query: {e}")
+
+        # Fan out tenant searches and the shared-namespace search concurrently
+        retrieval_tasks = {}
+        for i, rq in enumerate(retrieval_queries):
+            retrieval_tasks[f'query_{i}'] = functools.partial(
+                self._retrieve_tenant, vector_store, rq, tenant_id, per_query_k, source_filter
+            )
+        if include_shared:
+            retrieval_tasks['ctsi_shared'] = functools.partial(
+                self._retrieve_shared, vector_store, search_query, max(ctsi_k, 2)
+            )
+        stage_results = self._run_retrieval_stage(retrieval_tasks, RETRIEVAL_STAGE_TIMEOUT)
+
+        result_lists = [
+            stage_results[f'query_{i}']
+            for i in range(len(retrieval_queries))
+            if f'query_{i}' in stage_results
+        ]
+        if is_multi_query:
+            # Merge sub-query rankings with reciprocal-rank fusion
+            initial_results = reciprocal_rank_fusion(result_lists)[:retrieve_k]
+            features_applied['fusion'] = 'rrf'
+            print(f"[EnhancedSearch] Multi-query retrieval: {len(initial_results)} fused results from {len(result_lists)}/{len(sub_queries)} sub-queries")
+        else:
+            initial_results = result_lists[0] if result_lists else []
+            print(f"[EnhancedSearch] Initial retrieval: {len(initial_results)} results")
+
+        shared_results = stage_results.get('ctsi_shared') or []
+        if shared_results:
+            # Apply 0.9x score multiplier so tenant data gets slight priority
+            for r in shared_results:
+                r['score'] = r.get('score', 0) * 0.9
+            initial_results.extend(shared_results)
+            print(f"[EnhancedSearch] Added {len(shared_results)} shared CTSI results (weight={source_weights['ctsi']:.2f})")
 
         # Step 2c: OpenAlex academic paper search for explicit literature queries only
         # Only trigger for strong literature intent (>0.3) to avoid polluting personal/general queries
@@ -2206,6 +2236,48 @@ CURRENT QUESTION: {query}
                 'error': str(e)
             }
 
+    def _answer_cache_lookup(
+        self,
+        query: str,
+        tenant_id: str,
+        vector_store,
+        kind: str,
+        params: Dict,
+        conversation_history: list = None,
+        boost_doc_ids: list = None
+    ):
+        """
+        Look up a cached answer for a first-turn question.
+
+        Returns (cached value or None, store_fn or None). Follow-ups and
+        boosted searches are never cached: their answer depends on more than
+        the question and the tenant's corpus. The query is embedded through
+        the vector store so the vector lands in the caller's turn memo under
+        the same key the retrieval path uses.
+        """
+        cache = get_answer_cache()
+        if cache is None or conversation_history or boost_doc_ids:
+            return None, None
+
+        try:
+            if hasattr(vector_store, 'get_query_embedding'):
+                embedding = vector_store.get_query_embedding(query)
+            else:
+                embedding = get_cached_embedding(query[:MAX_QUERY_EMBEDDING_CHARS])
+        except Exception as e:
+            print(f"[EnhancedSearch] Answer cache: query embedding failed, exact match only: {e}", flush=True)
+            embedding = None
+
+        cached, version = cache.lookup(tenant_id, query, kind, params, embedding)
+        if cached is not None:
+            print(f"[EnhancedSearch] Answer cache hit ({kind}) for tenant {tenant_id}", flush=True)
+            return cached, None
+
+        def store(value):
+            cache.store(tenant_id, query, kind, params, value, version, embedding)
+        return None, store
+
+    @embedding_scoped("search_and_answer")
     def search_and_answer(
         self,
         query: str,
@@ -2273,6 +2345,20 @@ CURRENT QUESTION: {query}
                     })
             conversation_history = bounded_history
 
+        cache_params = {
+            'top_k': top_k,
+            'validate': validate,
+            'response_mode': response_mode,
+            'source_types': sorted(source_types) if source_types else None,
+            'user_context': user_context,
+        }
+        cached, store_in_cache = self._answer_cache_lookup(
+            query, tenant_id, vector_store, 'answer', cache_params, conversation_history, boost_doc_ids
+        )
+        if cached is not None:
+            cached['cached'] = True
+            return cached
+
         # Search
         search_results = self.enhanced_search(
             query=query,
@@ -2293,7 +2379,7 @@ CURRENT QUESTION: {query}
             user_context=user_context
         )
 
-        return {
+        response = {
             'query': query,
             'expanded_query': search_results.get('expanded_query'),
             'answer': answer_result['answer'],
@@ -2307,6 +2393,9 @@ CURRENT QUESTION: {query}
             'context_chars': answer_result.get('context_chars', 0),
             'answer_confidence': answer_result.get('answer_confidence')
         }
+        if store_in_cache and answer_result['sources'] and not answer_result.get('error'):
+            store_in_cache(response)
+        return response
 
     def generate_answer_stream(
         self,
@@ -2636,6 +2725,7 @@ CURRENT QUESTION: {query}
 
         return "\n".join(parts)
 
+    @embedding_scoped("search_and_answer_stream")
     def search_and_answer_stream(
         self,
         query: str,
@@ -2681,6 +2771,61 @@ CURRENT QUESTION: {query}
                     })
             conversation_history = bounded_history
 
+        cache_params = {
+            'top_k': top_k,
+            'response_mode': response_mode,
+            'source_types': sorted(source_types) if source_types else None,
+            'user_context': user_context,
+        }
+        cached, store_in_cache = self._answer_cache_lookup(
+            query, tenant_id, vector_store, 'stream', cache_params, conversation_history, boost_doc_ids
+        )
+        if cached is not None:
+            yield from replay_stream_events(cached.get('events', []))
+            return
+
+        if store_in_cache:
+            recorded = []
+            for event in self._search_and_answer_stream_events(
+                query, tenant_id, vector_store, top_k, conversation_history,
+                boost_doc_ids, response_mode, user_context, source_types
+            ):
+                recorded.append(event)
+                yield event
+            done = recorded[-1] if recorded else {}
+            if done.get('type') == 'done' and done.get('sources') and not done.get('error'):
+                store_in_cache({'events': self._coalesce_chunks(recorded)})
+            return
+
+        yield from self._search_and_answer_stream_events(
+            query, tenant_id, vector_store, top_k, conversation_history,
+            boost_doc_ids, response_mode, user_context, source_types
+        )
+
+    @staticmethod
+    def _coalesce_chunks(events: List[Dict]) -> List[Dict]:
+        """Merge consecutive 'chunk' events so cached streams stay compact"""
+        merged = []
+        for event in events:
+            if event.get('type') == 'chunk' and merged and merged[-1].get('type') == 'chunk':
+                merged[-1] = {'type': 'chunk', 'content': merged[-1]['content'] + event.get('content', '')}
+            else:
+                merged.append(event)
+        return merged
+
+    def _search_and_answer_stream_events(
+        self,
+        query: str,
+        tenant_id: str,
+        vector_store,
+        top_k: int,
+        conversation_history: list,
+        boost_doc_ids: list,
+        response_mode: int,
+        user_context: dict,
+        source_types: list
+    ):
+        """Search + streamed generation for an already sanitized query"""
         # Classify intent to check for journal/methodology special modes
         intent = self._classify_query_intent(query)
         special_mode = intent.get('special_mode')
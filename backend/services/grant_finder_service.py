@@ -2,6 +2,12 @@
 Grant Finder Service
 Searches NIH RePORTER, Grants.gov, NSF, SBIR, and Federal RePORTER APIs.
 Scores results against lab knowledge base.
+
+Interactive searches read the local grant index (grant_listings, refreshed by
+the daily grant scrape) first and only fan out to the live APIs when the index
+is stale or has too few hits. The live sources run concurrently, each with its
+own deadline, and are streamed as they land; a slow source is dropped from the
+response instead of holding it up.
 """
 
 import os
@@ -10,9 +16,10 @@ import json
 import time
 import logging
 import requests
-from typing import List, Dict, Optional, Any, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Dict, Generator, Optional, Any, Tuple
 from collections import Counter
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from services.openai_client import get_openai_client
 from vector_stores.pinecone_store import get_vector_store
@@ -31,6 +38,21 @@ FEDERAL_REPORTER_URL = "https://api.federalreporter.nih.gov/v1/Projects/search"
 API_REQUEST_DELAY = 0.3  # seconds between requests
 MAX_RETRIES = 3
 
+# Live fan-out: a source that hasn't answered this long after the search
+# started is left out of the response
+GRANT_SOURCE_DEADLINE_SECONDS = float(os.getenv("GRANT_SOURCE_DEADLINE_SECONDS", "8"))
+# Local index: searches top up from the live APIs when the last scrape is
+# older than this (the scrape runs daily)
+GRANT_INDEX_MAX_AGE_HOURS = float(os.getenv("GRANT_INDEX_MAX_AGE_HOURS", "36"))
+# Listings no scrape has returned for this long are pruned from the index
+GRANT_INDEX_RETENTION_DAYS = int(os.getenv("GRANT_INDEX_RETENTION_DAYS", "30"))
+
+# Keyword-searchable sources, in response order (SBIR is searched by agency)
+LIVE_SOURCES = ("nih_reporter", "grants_gov", "nsf", "federal_reporter")
+
+# Per-tenant fields added by _score_results - never stored in the shared index
+SCORE_FIELDS = ("fit_score", "fit_reasons", "matching_docs")
+
 # Activity code descriptions
 ACTIVITY_CODE_LABELS = {
     "R01": "Research Project Grant",
@@ -609,6 +631,12 @@ class GrantFinderService:
         t = re.sub(r'\s+', ' ', t)
         return t
 
+    @staticmethod
+    def _has_more_data(grant: Dict, existing: Dict) -> bool:
+        """Whether grant should replace its cross-source duplicate (longer abstract or higher award)."""
+        return (len(grant.get('abstract') or '') > len(existing.get('abstract') or '')
+                or (grant.get('award_amount') or 0) > (existing.get('award_amount') or 0))
+
     @staticmethod
     def deduplicate_cross_source(grants: List[Dict]) -> List[Dict]:
         """Remove cross-source duplicates by normalized title matching.
@@ -624,10 +652,8 @@ class GrantFinderService:
 
             if norm_title in seen_titles:
                 idx = seen_titles[norm_title]
-                existing = deduped[idx]
                 # Keep the one with more data
-                if (len(grant.get('abstract', '')) > len(existing.get('abstract', ''))
-                        or grant.get('award_amount', 0) > existing.get('award_amount', 0)):
+                if GrantFinderService._has_more_data(grant, deduped[idx]):
                     deduped[idx] = grant
             else:
                 seen_titles[norm_title] = len(deduped)
@@ -635,10 +661,281 @@ class GrantFinderService:
 
         return deduped
 
+    # ========================================================================
+    # LOCAL GRANT INDEX
+    # ========================================================================
+
+    def index_grants(self, db, grants: List[Dict]) -> int:
+        """
+        Upsert scraped grants into the local grant index and commit.
+
+        A listing already indexed under another source's id with the same
+        normalized title is replaced only if the new one has more data;
+        otherwise it is just marked as seen again.
+
+        Returns:
+            Number of grants indexed after cross-source dedup
+        """
+        from database.models import GrantListing
+
+        deduped = self.deduplicate_cross_source(grants)
+        if not deduped:
+            return 0
+
+        keys = {g['id']: self._normalize_title(g.get('title', '')) for g in deduped}
+        ids = list(keys)
+        title_keys = list({k for k in keys.values() if len(k) >= 10})
+
+        by_id = {}
+        by_title = {}
+        for i in range(0, len(ids), 500):
+            for row in db.query(GrantListing).filter(GrantListing.id.in_(ids[i:i + 500])):
+                by_id[row.id] = row
+        for i in range(0, len(title_keys), 500):
+            for row in db.query(GrantListing).filter(GrantListing.title_key.in_(title_keys[i:i + 500])):
+                by_title[row.title_key] = row
+
+        now = datetime.now(timezone.utc)
+        for grant in deduped:
+            data = {k: v for k, v in grant.items() if k not in SCORE_FIELDS}
+            title_key = keys[grant['id']] if len(keys[grant['id']]) >= 10 else None
+
+            row = by_id.get(grant['id'])
+            if row is None and title_key:
+                twin = by_title.get(title_key)
+                if twin is not None and twin.id != grant['id']:
+                    if not self._has_more_data(data, twin.data or {}):
+                        twin.last_seen_at = now
+                        continue
+                    db.delete(twin)
+                    by_id.pop(twin.id, None)
+
+            if row is None:
+                row = GrantListing(id=grant['id'], first_seen_at=now)
+                db.add(row)
+                by_id[row.id] = row
+
+            row.source = grant.get('source', '')
+            row.title_key = title_key
+            row.title = grant.get('title', '')
+            row.abstract = grant.get('abstract', '')
+            row.agency = (grant.get('agency') or '')[:100]
+            row.activity_code = (grant.get('activity_code') or '')[:20]
+            row.award_amount = int(grant.get('award_amount') or 0)
+            row.data = data
+            row.last_seen_at = now
+            if title_key:
+                by_title[title_key] = row
+
+        db.commit()
+        logger.info(f"[GrantFinder] Indexed {len(deduped)} grants")
+        return len(deduped)
+
+    def prune_index(self, db, older_than_days: int = GRANT_INDEX_RETENTION_DAYS) -> int:
+        """Delete listings no scrape has returned for older_than_days; returns the number removed."""
+        from database.models import GrantListing
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        removed = db.query(GrantListing).filter(
+            GrantListing.last_seen_at < cutoff
+        ).delete(synchronize_session=False)
+        db.commit()
+        if removed:
+            logger.info(f"[GrantFinder] Pruned {removed} stale grants from the index")
+        return removed
+
+    def index_age_hours(self, db) -> Optional[float]:
+        """Hours since the index was last refreshed (None if it is empty)."""
+        from sqlalchemy import func
+        from database.models import GrantListing
+
+        last_seen = db.query(func.max(GrantListing.last_seen_at)).scalar()
+        if last_seen is None:
+            return None
+        if last_seen.tzinfo is None:  # SQLite drops the offset
+            last_seen = last_seen.replace(tzinfo=timezone.utc)
+        return (datetime.now(timezone.utc) - last_seen).total_seconds() / 3600
+
+    def search_local(
+        self,
+        db,
+        query: str,
+        agencies: Optional[List[str]] = None,
+        activity_codes: Optional[List[str]] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        limit: int = 20
+    ) -> List[Dict]:
+        """Search the local grant index; returns grant dicts shaped like the live results."""
+        from database.grant_index import search_grant_listings
+
+        rows = search_grant_listings(
+            db, query,
+            agencies=agencies,
+            activity_codes=activity_codes,
+            amount_min=amount_min,
+            amount_max=amount_max,
+            limit=limit
+        )
+        return [{**row.data, "fit_score": 0, "fit_reasons": [], "matching_docs": []} for row in rows]
+
+    # ========================================================================
+    # LIVE FAN-OUT
+    # ========================================================================
+
+    def iter_source_results(
+        self,
+        query: str,
+        agencies: Optional[List[str]] = None,
+        activity_codes: Optional[List[str]] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        limit: int = 20,
+        fetch_details: bool = False,
+        deadline: float = GRANT_SOURCE_DEADLINE_SECONDS,
+        deadlines: Optional[Dict[str, float]] = None,
+        sources: Tuple[str, ...] = LIVE_SOURCES
+    ) -> Generator[Tuple[str, List[Dict], bool], None, None]:
+        """
+        Run the live source searches concurrently.
+
+        Args:
+            deadline: Seconds after the start each source has to answer
+            deadlines: Per-source overrides of deadline
+            sources: Subset of LIVE_SOURCES to search
+
+        Yields:
+            (source, results, timed_out) as each search finishes or misses its
+            deadline. A failed or timed-out search yields [].
+        """
+        searches = {
+            "nih_reporter": lambda: self.search_nih_reporter(
+                query=query, activity_codes=activity_codes,
+                amount_min=amount_min, amount_max=amount_max, limit=limit),
+            "grants_gov": lambda: self.search_grants_gov(
+                query=query, agencies=agencies, amount_min=amount_min, amount_max=amount_max,
+                fetch_details=fetch_details, limit=limit),
+            "nsf": lambda: self.search_nsf_awards(query=query, limit=limit),
+            "federal_reporter": lambda: self.search_federal_reporter(query=query, limit=limit),
+        }
+        deadlines = deadlines or {}
+
+        started = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="grant-search")
+        futures = {pool.submit(searches[source]): source for source in sources}
+        due = {source: started + deadlines.get(source, deadline) for source in sources}
+        pending = set(futures)
+        try:
+            while pending:
+                timeout = max(0.0, min(due[futures[f]] for f in pending) - time.monotonic())
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source = futures[future]
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        logger.error(f"[GrantFinder] {source} search failed: {e}")
+                        results = []
+                    yield source, results, False
+
+                now = time.monotonic()
+                for future in [f for f in pending if due[futures[f]] <= now]:
+                    pending.discard(future)
+                    future.cancel()
+                    source = futures[future]
+                    logger.warning(f"[GrantFinder] {source} missed its {due[source] - started:.1f}s deadline, skipping")
+                    yield source, [], True
+        finally:
+            # Timed-out requests finish in the background; don't block on them
+            pool.shutdown(wait=False, cancel_futures=True)
+
     # ========================================================================
     # COMBINED SEARCH + SCORING
     # ========================================================================
 
+    def stream_search(
+        self,
+        query: str,
+        tenant_id: str,
+        lab_profile: Optional[Dict] = None,
+        agencies: Optional[List[str]] = None,
+        activity_codes: Optional[List[str]] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        limit: int = 20,
+        db=None
+    ) -> Generator[Dict, None, None]:
+        """
+        Search the local index, then the live APIs if needed, streaming scored results.
+
+        Yields, in order:
+            {"event": "local", "results", "index_age_hours"}
+            {"event": "source", "source", "results", "timed_out"} per live source,
+                only when the index is stale or had fewer than limit hits;
+                results are the source's grants not already streamed
+            {"event": "done", "results", "total", "sources", "timed_out"}
+                with the merged top-limit results (the search() response)
+        """
+        from database.models import SessionLocal
+
+        lab_profile = lab_profile or {}
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        try:
+            try:
+                local = self.search_local(
+                    db, query,
+                    agencies=agencies,
+                    activity_codes=activity_codes,
+                    amount_min=amount_min,
+                    amount_max=amount_max,
+                    limit=limit
+                )
+                index_age = self.index_age_hours(db)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"[GrantFinder] Local grant index unavailable: {e}")
+                local, index_age = [], None
+        finally:
+            if own_session:
+                db.close()
+
+        seen = {g['id'] for g in local}
+        local = self._score_results(local, tenant_id, lab_profile)
+        collected = list(local)
+        yield {"event": "local", "results": local, "index_age_hours": index_age}
+
+        counts = {source: 0 for source in LIVE_SOURCES}
+        timed_out = []
+        if len(local) < limit or index_age is None or index_age > GRANT_INDEX_MAX_AGE_HOURS:
+            for source, results, source_timed_out in self.iter_source_results(
+                query=query,
+                agencies=agencies,
+                activity_codes=activity_codes,
+                amount_min=amount_min,
+                amount_max=amount_max,
+                limit=limit
+            ):
+                counts[source] = len(results)
+                if source_timed_out:
+                    timed_out.append(source)
+                fresh = [g for g in results if g['id'] not in seen]
+                seen.update(g['id'] for g in fresh)
+                fresh = self._score_results(fresh, tenant_id, lab_profile)
+                collected.extend(fresh)
+                yield {"event": "source", "source": source, "results": fresh, "timed_out": source_timed_out}
+
+        merged = self.deduplicate_cross_source(collected)
+        merged.sort(key=lambda x: x["fit_score"], reverse=True)
+        yield {
+            "event": "done",
+            "results": merged[:limit],
+            "total": len(merged),
+            "sources": {**counts, "local_index": len(local)},
+            "timed_out": timed_out
+        }
+
     def search(
         self,
         query: str,
@@ -648,62 +945,31 @@ class GrantFinderService:
         activity_codes: Optional[List[str]] = None,
         amount_min: Optional[int] = None,
         amount_max: Optional[int] = None,
-        limit: int = 20
+        limit: int = 20,
+        db=None
     ) -> Dict:
         """
-        Search all APIs, score results against lab context, return ranked results.
+        Search the local index and live APIs, score results against lab context, return ranked results.
         """
-        # Query all APIs
-        nih_results = self.search_nih_reporter(
-            query=query,
-            activity_codes=activity_codes,
-            amount_min=amount_min,
-            amount_max=amount_max,
-            limit=limit
-        )
-        grants_gov_results = self.search_grants_gov(
+        result = {}
+        for event in self.stream_search(
             query=query,
+            tenant_id=tenant_id,
+            lab_profile=lab_profile,
             agencies=agencies,
+            activity_codes=activity_codes,
             amount_min=amount_min,
             amount_max=amount_max,
-            fetch_details=False,  # Skip detail API in live search for speed
-            limit=limit
-        )
-        nsf_results = self.search_nsf_awards(
-            query=query,
-            limit=limit
-        )
-        federal_results = self.search_federal_reporter(
-            query=query,
-            limit=limit
-        )
-
-        # Combine and deduplicate
-        all_results = nih_results + grants_gov_results + nsf_results + federal_results
-        all_results = self.deduplicate_cross_source(all_results)
-
-        if not all_results:
-            return {
-                "results": [],
-                "total": 0,
-                "sources": {"nih_reporter": 0, "grants_gov": 0, "nsf": 0, "federal_reporter": 0}
-            }
-
-        # Score against lab context
-        scored = self._score_results(all_results, tenant_id, lab_profile or {})
-
-        # Sort by fit_score descending
-        scored.sort(key=lambda x: x["fit_score"], reverse=True)
+            limit=limit,
+            db=db
+        ):
+            result = event
 
         return {
-            "results": scored[:limit],
-            "total": len(all_results),
-            "sources": {
-                "nih_reporter": len(nih_results),
-                "grants_gov": len(grants_gov_results),
-                "nsf": len(nsf_results),
-                "federal_reporter": len(federal_results)
-            }
+            "results": result["results"],
+            "total": result["total"],
+            "sources": result["sources"],
+            "timed_out": result["timed_out"]
         }
 
     def _score_results(
@@ -16,6 +16,7 @@ from openai import AzureOpenAI, OpenAI
 
 from parsers.document_parser import DocumentParser
 from services.openai_client import get_openai_client
+from services.openalex_client import OPENALEX_BASE, OPENALEX_EMAIL, get_openalex_client
 from services.openalex_search_service import OpenAlexSearchService
 
 # HIJ-specific timeout: 5 minutes total, 60s connect (longer for complex analyses)
@@ -2514,12 +2515,11 @@ Return JSON:
 
             print(f"[Journal] Dynamically discovering safe journals for '{core_discipline}' in '{broad_field}'...")
 
-            response = req.get(search_url, timeout=15)
-            if response.status_code != 200:
-                print(f"[Journal] OpenAlex query failed: {response.status_code}")
+            data = get_openalex_client().get_json(search_url, timeout=15)
+            if data is None:
+                print(f"[Journal] OpenAlex query failed")
                 return []
 
-            data = response.json()
             results = data.get("results", [])
 
             for src in results:
@@ -2580,11 +2580,10 @@ Return JSON:
                 f"&mailto={OPENALEX_EMAIL}"
             )
 
-            response = req.get(search_url, timeout=10)
-            if response.status_code != 200:
+            data = get_openalex_client().get_json(search_url, timeout=10)
+            if data is None:
                 return variants
 
-            data = response.json()
             results = data.get("results", [])
 
             if results:
@@ -2883,13 +2882,7 @@ Return JSON:
         import requests as req
         from collections import Counter
 
-        OPENALEX_BASE = "https://api.openalex.org"
-        OPENALEX_EMAIL = "prmogathala@gmail.com"
-        HEADERS = {"User-Agent": f"2ndBrain/1.0 (mailto:{OPENALEX_EMAIL})", "Accept": "application/json"}
-
-        def _api_get(url: str, timeout: int = 15):
-            resp = req.get(url, headers=HEADERS, timeout=timeout)
-            return resp.json() if resp.status_code == 200 else None
+        client = get_openalex_client()
 
         def _is_mega(name: str) -> bool:
             return name.lower().strip() in self.MEGA_JOURNALS
@@ -2953,7 +2946,12 @@ Return JSON:
             if field_concepts:
                 concept_filter_clause = f",concepts.id:{('|'.join(field_concepts))}"
 
-            # ── Step 1a: TIER 1 SEARCH (Core discipline) - 10x weight ─────────
+            # ── Step 1a-1c: Build the tiered author searches ─────────────────
+            # The tier searches are independent, so they are fetched together
+            # and then tallied in tier order (same weights as before).
+            tier_searches = []  # (counter, weight, authors per work, url)
+
+            # TIER 1 SEARCH (Core discipline) - 10x weight
             # This is THE MOST IMPORTANT search — defines what the paper IS about
             if tier1_keywords:
                 tier1_queries = [
@@ -2975,20 +2973,9 @@ Return JSON:
                         f"&select=id,authorships,cited_by_count"
                         f"&mailto={OPENALEX_EMAIL}"
                     )
-                    data = _api_get(url)
-                    if not data:
-                        continue
-                    for work in data.get("results", []):
-                        cited = work.get("cited_by_count", 0)
-                        for authorship in work.get("authorships", [])[:5]:
-                            author = authorship.get("author", {})
-                            aid = author.get("id", "")
-                            if aid:
-                                tier1_author_ids[aid] += cited * 10  # 10x weight for CORE discipline
-
-            print(f"[Journal] Tier 1 (core) search found {len(tier1_author_ids)} authors")
+                    tier_searches.append((tier1_author_ids, 10, 5, url))  # 10x weight for CORE discipline
 
-            # ── Step 1b: TIER 2 SEARCH (Substantial topics) - 3x weight ───────
+            # TIER 2 SEARCH (Substantial topics) - 3x weight
             if tier2_keywords:
                 tier2_queries = [
                     " ".join(tier2_keywords[:6]),
@@ -3005,20 +2992,9 @@ Return JSON:
                         f"&select=id,authorships,cited_by_count"
                         f"&mailto={OPENALEX_EMAIL}"
                     )
-                    data = _api_get(url)
-                    if not data:
-                        continue
-                    for work in data.get("results", []):
-                        cited = work.get("cited_by_count", 0)
-                        for authorship in work.get("authorships", [])[:5]:
-                            author = authorship.get("author", {})
-                            aid = author.get("id", "")
-                            if aid:
-                                tier2_author_ids[aid] += cited * 3  # 3x weight for substantial topics
-
-            print(f"[Journal] Tier 2 (substantial) search found {len(tier2_author_ids)} authors")
+                    tier_searches.append((tier2_author_ids, 3, 5, url))  # 3x weight for substantial topics
 
-            # ── Step 1c: TIER 3 SEARCH (Contextual) - 0.5x weight (penalized) ─
+            # TIER 3 SEARCH (Contextual) - 0.5x weight (penalized)
             # IMPORTANT: Tier 3 keywords should NOT drive journal selection
             # We still search to understand the landscape, but heavily discount these
             if tier3_keywords:
@@ -3032,16 +3008,22 @@ Return JSON:
                     f"&select=id,authorships,cited_by_count"
                     f"&mailto={OPENALEX_EMAIL}"
                 )
-                data = _api_get(url)
-                if data:
-                    for work in data.get("results", []):
-                        cited = work.get("cited_by_count", 0)
-                        for authorship in work.get("authorships", [])[:3]:
-                            author = authorship.get("author", {})
-                            aid = author.get("id", "")
-                            if aid:
-                                tier3_author_ids[aid] += cited * 0.5  # 0.5x weight - minimal contribution
+                tier_searches.append((tier3_author_ids, 0.5, 3, url))  # 0.5x weight - minimal contribution
 
+            tier_results = client.get_many([url for _, _, _, url in tier_searches])
+            for (author_ids, weight, max_authors, _), data in zip(tier_searches, tier_results):
+                if not data:
+                    continue
+                for work in data.get("results", []):
+                    cited = work.get("cited_by_count", 0)
+                    for authorship in work.get("authorships", [])[:max_authors]:
+                        author = authorship.get("author", {})
+                        aid = author.get("id", "")
+                        if aid:
+                            author_ids[aid] += cited * weight
+
+            print(f"[Journal] Tier 1 (core) search found {len(tier1_author_ids)} authors")
+            print(f"[Journal] Tier 2 (substantial) search found {len(tier2_author_ids)} authors")
             print(f"[Journal] Tier 3 (contextual) search found {len(tier3_author_ids)} authors")
 
             # ── Combine authors with weighted tiers ──────────────────────────
@@ -3063,10 +3045,11 @@ Return JSON:
             journal_counts = Counter()  # source_id -> paper count
             journal_names = {}          # source_id -> display_name
 
+            group_urls = []
             for batch_start in range(0, len(top_authors), 50):
                 batch = top_authors[batch_start:batch_start + 50]
                 author_filter = "|".join(batch)
-                url = (
+                group_urls.append(
                     f"{OPENALEX_BASE}/works"
                     f"?filter=authorships.author.id:{author_filter},"
                     f"{type_filter},"
@@ -3076,7 +3059,7 @@ Return JSON:
                     f"&per_page=50"
                     f"&mailto={OPENALEX_EMAIL}"
                 )
-                data = _api_get(url)
+            for data in client.get_many(group_urls):
                 if not data:
                     continue
                 for g in data.get("group_by", []):
@@ -3103,8 +3086,20 @@ Return JSON:
                 f"&mailto={OPENALEX_EMAIL}"
             )
 
+            # Metadata for IDs 30-40 (if we have them) is fetched alongside the first page
+            meta_urls = [meta_url]
+            if len(top_journal_ids) > 30:
+                pipe_filter2 = "|".join(top_journal_ids[30:40])
+                meta_urls.append(
+                    f"{OPENALEX_BASE}/sources"
+                    f"?filter=ids.openalex:{pipe_filter2}"
+                    f"&per_page=10"
+                    f"&mailto={OPENALEX_EMAIL}"
+                )
+            meta_pages = client.get_many(meta_urls)
+
             enriched = []
-            data = _api_get(meta_url)
+            data = meta_pages[0]
             if data:
                 for src in data.get("results", []):
                     oa_id = src.get("id", "")
@@ -3129,15 +3124,8 @@ Return JSON:
                     })
 
             # Also enrich IDs 30-40 if we have them
-            if len(top_journal_ids) > 30:
-                pipe_filter2 = "|".join(top_journal_ids[30:40])
-                meta_url2 = (
-                    f"{OPENALEX_BASE}/sources"
-                    f"?filter=ids.openalex:{pipe_filter2}"
-                    f"&per_page=10"
-                    f"&mailto={OPENALEX_EMAIL}"
-                )
-                data2 = _api_get(meta_url2)
+            if len(meta_pages) > 1:
+                data2 = meta_pages[1]
                 if data2:
                     for src in data2.get("results", []):
                         oa_id = src.get("id", "")
@@ -3203,20 +3191,26 @@ Return JSON:
             if all_discipline_journals:
                 print(f"[Journal] Checking {len(all_discipline_journals)} discipline-specific journals for injection (including {len(safe_journals_list)} safe options)...")
 
+                def _in_pool(journal_name: str) -> bool:
+                    return any(journal_name.lower() in existing.lower() or existing.lower() in journal_name.lower()
+                               for existing in existing_names)
+
+                # Look up every journal not already in the pool by name, concurrently
+                lookup_names = list(dict.fromkeys(n for n in all_discipline_journals if not _in_pool(n)))
+                lookups = dict(zip(lookup_names, client.get_many([
+                    f"{OPENALEX_BASE}/sources"
+                    f"?search={req.utils.quote(journal_name)}"
+                    f"&per_page=1"
+                    f"&mailto={OPENALEX_EMAIL}"
+                    for journal_name in lookup_names
+                ])))
+
                 for journal_name in all_discipline_journals:
-                    # Skip if already in pool
-                    if any(journal_name.lower() in existing.lower() or existing.lower() in journal_name.lower()
-                           for existing in existing_names):
+                    # Skip if already in pool (including journals injected earlier in this loop)
+                    if _in_pool(journal_name):
                         continue
 
-                    # Look up journal in OpenAlex by name
-                    search_url = (
-                        f"{OPENALEX_BASE}/sources"
-                        f"?search={req.utils.quote(journal_name)}"
-                        f"&per_page=1"
-                        f"&mailto={OPENALEX_EMAIL}"
-                    )
-                    data = _api_get(search_url)
+                    data = lookups.get(journal_name)
                     if not data or not data.get("results"):
                         print(f"[Journal] Could not find '{journal_name}' in OpenAlex")
                         continue
@@ -3431,13 +3425,12 @@ Return JSON:
                     all_core_names.extend(variants)
 
                 # Dynamically add variants for core journals not in the hardcoded mapping
-                for core_j in (core_journals or []):
-                    if core_j not in name_variants:
-                        # Dynamically get variants from OpenAlex
-                        dynamic_variants = self._get_journal_name_variants(core_j)
-                        for v in dynamic_variants:
-                            if v not in all_core_names:
-                                all_core_names.append(v)
+                unmapped_core = [core_j for core_j in (core_journals or []) if core_j not in name_variants]
+                # Dynamically get variants from OpenAlex (same lookups as injection, so mostly cached)
+                for dynamic_variants in client.run_concurrently(self._get_journal_name_variants, unmapped_core):
+                    for v in dynamic_variants or []:
+                        if v not in all_core_names:
+                            all_core_names.append(v)
 
                 for j in enriched:
                     name_lower = j["name"].lower()
@@ -3567,10 +3560,27 @@ Return JSON:
             # Using broader keywords (tier2) creates false positives because terms
             # like "ROS" or "oxidative stress" appear in hundreds of journals.
             # We need the CORE discipline terms to validate true fit.
-            validated_enriched = []
-            for j in enriched[:25]:  # Validate top 25 to keep API calls reasonable
+            def _auto_validated(j) -> bool:
                 # Discipline-matched journals get automatic validation (they're definitionally appropriate)
-                if j.get("discipline_boost", 0) >= 100 or j.get("injected_core_journal"):
+                return j.get("discipline_boost", 0) >= 100 or j.get("injected_core_journal")
+
+            # Validate top 25 to keep API calls reasonable; the checks are independent, so run them concurrently
+            to_validate = [j for j in enriched[:25] if not _auto_validated(j)]
+            validations = client.run_concurrently(
+                lambda j: self._validate_journal_fit(
+                    journal_name=j["name"],
+                    journal_oa_id=j.get("openalex_id", ""),
+                    paper_type=paper_type,
+                    keywords=tier1_keywords[:6],  # Use ONLY top tier1 keywords (core discipline)
+                    field=field,
+                ),
+                to_validate,
+            )
+            validation_by_journal = {id(j): v for j, v in zip(to_validate, validations)}
+
+            validated_enriched = []
+            for j in enriched[:25]:
+                if _auto_validated(j):
                     j["validation"] = {
                         "validated": True,
                         "confidence": "high",
@@ -3579,13 +3589,9 @@ Return JSON:
                     validated_enriched.append(j)
                     continue
 
-                validation = self._validate_journal_fit(
-                    journal_name=j["name"],
-                    journal_oa_id=j.get("openalex_id", ""),
-                    paper_type=paper_type,
-                    keywords=tier1_keywords[:6],  # Use ONLY top tier1 keywords (core discipline)
-                    field=field,
-                )
+                validation = validation_by_journal.get(id(j)) or {
+                    "validated": True, "confidence": "unknown", "reason": "Validation skipped",
+                }
                 j["validation"] = validation
                 if validation.get("validated", True):
                     validated_enriched.append(j)
@@ -3861,8 +3867,6 @@ Return JSON:
         """
         TOC_OVERLAP_THRESHOLD = 0.25  # 25% minimum keyword overlap required
         import requests as req
-        OPENALEX_EMAIL = "prmogathala@gmail.com"
-        HEADERS = {"User-Agent": f"2ndBrain/1.0 (mailto:{OPENALEX_EMAIL})", "Accept": "application/json"}
 
         type_map = {
             "experimental": "article",
@@ -3900,7 +3904,7 @@ Return JSON:
             source_filter = f"primary_location.source.id:{journal_oa_id}" if journal_oa_id else f"primary_location.source.display_name.search:{req.utils.quote(journal_name)}"
 
             url = (
-                f"https://api.openalex.org/works"
+                f"{OPENALEX_BASE}/works"
                 f"?filter={source_filter},"
                 f"type:{work_type},"
                 f"publication_year:2022-2026"
@@ -3910,11 +3914,10 @@ Return JSON:
                 f"&select=id,title,publication_year,cited_by_count"
                 f"&mailto={OPENALEX_EMAIL}"
             )
-            resp = req.get(url, headers=HEADERS, timeout=10)
-            if resp.status_code != 200:
+            data = get_openalex_client().get_json(url, timeout=10)
+            if data is None:
                 return {"validated": True, "confidence": "unknown", "reason": "Could not verify"}
 
-            data = resp.json()
             results = data.get("results", [])
             total = data.get("meta", {}).get("count", 0)
 
@@ -4154,7 +4157,8 @@ Return JSON:
             if not dois:
                 return {"verified": [], "unverified": [], "verification_rate": 0, "total_dois_found": 0}
 
-            results = crossref.verify_dois(dois)
+            # Cached DOIs are served locally, the rest are looked up concurrently
+            results = crossref.verify_batch(dois)
 
             verified = []
             unverified = []
@@ -4821,33 +4825,27 @@ Respond in JSON format:
 
         Journals cited ≥3 times get a citation network boost in journal matching.
         """
-        import requests as req
-        OPENALEX_EMAIL = "prmogathala@gmail.com"
-        HEADERS = {"User-Agent": f"2ndBrain/1.0 (mailto:{OPENALEX_EMAIL})", "Accept": "application/json"}
-
-        journal_counts = {}
+        client = get_openalex_client()
 
+        cleaned = []
         for doi in dois[:20]:  # Cap at 20 DOIs for speed
-            try:
-                # Clean DOI
-                doi = doi.strip().rstrip('.,;')
-                if not doi.startswith('10.'):
-                    continue
-
-                # Look up this DOI in OpenAlex
-                url = f"https://api.openalex.org/works/doi:{doi}?mailto={OPENALEX_EMAIL}"
-                resp = req.get(url, headers=HEADERS, timeout=5)
-                if resp.status_code != 200:
-                    continue
+            # Clean DOI
+            doi = doi.strip().rstrip('.,;')
+            if doi.startswith('10.'):
+                cleaned.append(doi)
 
-                data = resp.json()
-                source = data.get("primary_location", {}).get("source", {})
-                journal_name = source.get("display_name", "")
+        # Look up the DOIs in OpenAlex concurrently
+        works = client.get_many([f"{OPENALEX_BASE}/works/doi:{doi}" for doi in cleaned], timeout=5)
 
-                if journal_name and len(journal_name) > 2:
-                    journal_counts[journal_name] = journal_counts.get(journal_name, 0) + 1
-            except Exception:
+        journal_counts = {}
+        for data in works:
+            if not data:
                 continue
+            source = (data.get("primary_location") or {}).get("source") or {}
+            journal_name = source.get("display_name", "")
+
+            if journal_name and len(journal_name) > 2:
+                journal_counts[journal_name] = journal_counts.get(journal_name, 0) + 1
 
         return journal_counts
 
@@ -4873,16 +4871,15 @@ Respond in JSON format:
         openalex = OpenAlexSearchService()
         journal_counts = {}
 
-        for ref in references[:15]:  # Cap at 15 references for speed
-            try:
-                # Search OpenAlex for this reference
-                works = openalex.search_works(ref, max_results=3)
-                for work in works:
-                    journal = work.get('journal', '')
-                    if journal and len(journal) > 2:
-                        journal_counts[journal] = journal_counts.get(journal, 0) + 1
-            except Exception:
-                continue
+        # Search OpenAlex for each reference concurrently (capped at 15 references for speed)
+        searches = openalex.client.run_concurrently(
+            lambda ref: openalex.search_works(ref, max_results=3), references[:15]
+        )
+        for works in searches:
+            for work in works or []:
+                journal = work.get('journal', '')
+                if journal and len(journal) > 2:
+                    journal_counts[journal] = journal_counts.get(journal, 0) + 1
 
         # Sort by frequency — journals appearing most often in citation neighborhood
         neighbor_journals = sorted(journal_counts.items(), key=lambda x: x[1], reverse=True)[:10]
@@ -4906,6 +4903,16 @@ Respond in JSON format:
         if not refs:
             return []
 
+        # Search OpenAlex for every suggested title concurrently
+        titles = list(dict.fromkeys(
+            ref.get("title") for ref in refs
+            if isinstance(ref, dict) and ref.get("title")
+            and not (manuscript_title and self._is_self_reference(manuscript_title, ref.get("title")))
+        ))
+        title_results = dict(zip(titles, self.openalex.client.run_concurrently(
+            lambda title: self.openalex.search_works(title, max_results=1, min_citations=0), titles
+        )))
+
         enriched = []
         for ref in refs:
             if not isinstance(ref, dict):
@@ -4923,9 +4930,9 @@ Respond in JSON format:
                 print(f"[JournalScorer] Filtered self-reference from suggested refs: {title[:60]}...")
                 continue
 
-            # Search OpenAlex for this paper by title
+            # OpenAlex match for this paper by title
             try:
-                results = self.openalex.search_works(title, max_results=1, min_citations=0)
+                results = title_results.get(title)
                 if results:
                     paper = results[0]
                     paper_title = paper.get("title", "")
@@ -4975,14 +4982,20 @@ Respond in JSON format:
 
         # Search with top keywords (combine first 3-4 for relevance)
         primary_query = " ".join(keywords[:4])
+        search_args = [dict(query=primary_query, max_results=10, min_citations=5,
+                            from_year=from_year, to_year=to_year)]
+        # The secondary search (different keyword combo) is only used if the primary one
+        # returns fewer than 10 papers; it is fetched alongside it to save a round-trip
+        if len(keywords) > 2:
+            secondary_query = " ".join(keywords[1:5]) if len(keywords) > 4 else " ".join(keywords[:3])
+            search_args.append(dict(query=secondary_query, max_results=8, min_citations=3,
+                                    from_year=from_year, to_year=to_year))
+        searches = self.openalex.client.run_concurrently(
+            lambda kwargs: self.openalex.search_works(**kwargs), search_args
+        )
+
         try:
-            results = self.openalex.search_works(
-                query=primary_query,
-                max_results=10,
-                min_citations=5,
-                from_year=from_year,
-                to_year=to_year,
-            )
+            results = searches[0] or []
             for paper in results:
                 doi = paper.get("doi", "")
                 paper_title = paper.get("title", "")
@@ -5004,16 +5017,9 @@ Respond in JSON format:
             print(f"[JournalScorer] OpenAlex primary search failed: {e}")
 
         # If we have fewer than 10, do a secondary search with different keyword combos
-        if len(all_papers) < 10 and len(keywords) > 2:
-            secondary_query = " ".join(keywords[1:5]) if len(keywords) > 4 else " ".join(keywords[:3])
+        if len(all_papers) < 10 and len(searches) > 1:
             try:
-                results2 = self.openalex.search_works(
-                    query=secondary_query,
-                    max_results=8,
-                    min_citations=3,
-                    from_year=from_year,
-                    to_year=to_year,
-                )
+                results2 = searches[1] or []
                 for paper in results2:
                     doi = paper.get("doi", "")
                     paper_title = paper.get("title", "")
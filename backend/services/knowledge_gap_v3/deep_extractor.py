@@ -9,9 +9,12 @@ This replaces regex-based pattern matching with semantic understanding.
 """
 
 import json
+import time
 import logging
 import hashlib
-from typing import Dict, List, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
@@ -379,6 +382,55 @@ Identify single points of failure where only one person is mentioned for a criti
 Return ONLY valid JSON, no other text."""
 
 
+# Changes whenever either prompt is edited; part of every extraction cache key
+EXTRACTION_PROMPT_VERSION = hashlib.md5(
+    (DEEP_EXTRACTION_SYSTEM_PROMPT + DEEP_EXTRACTION_USER_PROMPT).encode()
+).hexdigest()[:12]
+
+MAX_CONTENT_LENGTH = 100000  # chars sent to the model (GPT-4 context limit)
+
+# Batch extraction throttling: in-flight calls are bounded by max_concurrent,
+# and calls are admitted against a per-minute token budget (prompt estimate
+# plus expected completion size)
+EXTRACTION_TOKENS_PER_MINUTE = int(os.getenv("EXTRACTION_TOKENS_PER_MINUTE", "150000"))
+EXTRACTION_COMPLETION_TOKENS_ESTIMATE = 2000
+EXTRACTION_MAX_ATTEMPTS = 3
+RATE_LIMIT_PAUSE_SECONDS = 20.0
+
+
+class _TokenRateLimiter:
+    """Token bucket over a per-minute budget, shared by the batch workers."""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = max(1, tokens_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int):
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.tokens >= tokens:
+                        self.tokens -= tokens
+                        return
+                    wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Rate limited by the API: hold every worker for `seconds`."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
 # =============================================================================
 # DEEP EXTRACTOR CLASS
 # =============================================================================
@@ -405,36 +457,34 @@ class DeepDocumentExtractor:
         Returns:
             DocumentExtraction with all extracted information
         """
+        extraction, _ = self._extract(doc_id, title, content)
+        return extraction
+
+    def cache_key(self, doc_id: str, title: str, content: str) -> str:
+        """Hash of everything that determines the extraction (see ExtractionCache)."""
+        payload = f"{EXTRACTION_PROMPT_VERSION}|{self.model}|{doc_id}|{title}|{content[:MAX_CONTENT_LENGTH]}"
+        return hashlib.sha256(payload.encode("utf-8", errors="replace")).hexdigest()
+
+    def _extract(
+        self,
+        doc_id: str,
+        title: str,
+        content: str,
+        limiter: Optional[_TokenRateLimiter] = None
+    ) -> Tuple[DocumentExtraction, Optional[Dict]]:
+        """extract() plus the raw extraction JSON (None when extraction failed)."""
         logger.info(f"[DeepExtractor] Extracting from: {title} ({len(content)} chars)")
 
         # Truncate if too long (GPT-4 context limit)
-        max_content_length = 100000
-        if len(content) > max_content_length:
-            content = content[:max_content_length]
-            logger.warning(f"[DeepExtractor] Truncated content to {max_content_length} chars")
+        if len(content) > MAX_CONTENT_LENGTH:
+            content = content[:MAX_CONTENT_LENGTH]
+            logger.warning(f"[DeepExtractor] Truncated content to {MAX_CONTENT_LENGTH} chars")
 
         # Calculate content hash for caching/deduplication
         content_hash = hashlib.md5(content.encode()).hexdigest()
 
         try:
-            # Call GPT-4 for extraction
-            response = self.client.chat_completion(
-                messages=[
-                    {"role": "system", "content": DEEP_EXTRACTION_SYSTEM_PROMPT},
-                    {"role": "user", "content": DEEP_EXTRACTION_USER_PROMPT.format(
-                        title=title,
-                        doc_id=doc_id,
-                        content=content
-                    )}
-                ],
-                temperature=0.1,  # Low temperature for consistent extraction
-                max_tokens=8000,
-                response_format={"type": "json_object"}
-            )
-
-            # Parse response
-            raw_json = response.choices[0].message.content
-            extracted = json.loads(raw_json)
+            extracted = self._request_extraction(doc_id, title, content, limiter)
 
             logger.info(f"[DeepExtractor] Extracted: {len(extracted.get('entities', []))} entities, "
                        f"{len(extracted.get('decisions', []))} decisions, "
@@ -442,14 +492,51 @@ class DeepDocumentExtractor:
                        f"{len(extracted.get('knowledge_signals', []))} signals")
 
             # Convert to dataclass structure
-            return self._parse_extraction(doc_id, title, extracted, content_hash)
+            return self._parse_extraction(doc_id, title, extracted, content_hash), extracted
 
         except json.JSONDecodeError as e:
             logger.error(f"[DeepExtractor] JSON parse error: {e}")
-            return self._create_empty_extraction(doc_id, title, content_hash, str(e))
+            return self._create_empty_extraction(doc_id, title, content_hash, str(e)), None
         except Exception as e:
             logger.error(f"[DeepExtractor] Extraction error: {e}")
-            return self._create_empty_extraction(doc_id, title, content_hash, str(e))
+            return self._create_empty_extraction(doc_id, title, content_hash, str(e)), None
+
+    def _request_extraction(
+        self,
+        doc_id: str,
+        title: str,
+        content: str,
+        limiter: Optional[_TokenRateLimiter] = None
+    ) -> Dict:
+        """Call GPT-4 for extraction and parse the JSON (raises on failure)."""
+        user_prompt = DEEP_EXTRACTION_USER_PROMPT.format(
+            title=title,
+            doc_id=doc_id,
+            content=content
+        )
+        estimated_tokens = (len(DEEP_EXTRACTION_SYSTEM_PROMPT) + len(user_prompt)) // 4 \
+            + EXTRACTION_COMPLETION_TOKENS_ESTIMATE
+
+        for attempt in range(EXTRACTION_MAX_ATTEMPTS):
+            if limiter is not None:
+                limiter.acquire(estimated_tokens)
+            try:
+                response = self.client.chat_completion(
+                    messages=[
+                        {"role": "system", "content": DEEP_EXTRACTION_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.1,  # Low temperature for consistent extraction
+                    max_tokens=8000,
+                    response_format={"type": "json_object"}
+                )
+                return json.loads(response.choices[0].message.content)
+            except Exception as e:
+                rate_limited = getattr(e, "status_code", None) == 429 or "rate limit" in str(e).lower()
+                if limiter is None or not rate_limited or attempt == EXTRACTION_MAX_ATTEMPTS - 1:
+                    raise
+                logger.warning(f"[DeepExtractor] Rate limited on {title}, pausing {RATE_LIMIT_PAUSE_SECONDS:.0f}s")
+                limiter.pause(RATE_LIMIT_PAUSE_SECONDS)
 
     def _parse_extraction(
         self,
@@ -626,27 +713,90 @@ class DeepDocumentExtractor:
     def extract_batch(
         self,
         documents: List[Dict[str, str]],
-        max_concurrent: int = 5
+        max_concurrent: int = 5,
+        cache=None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
     ) -> List[DocumentExtraction]:
         """
-        Extract from multiple documents.
+        Extract from multiple documents concurrently.
+
+        At most max_concurrent LLM calls are in flight, admitted against
+        EXTRACTION_TOKENS_PER_MINUTE. With a cache, documents whose prompt inputs
+        are unchanged are served from it, and every new extraction is stored as
+        soon as it completes (so an interrupted batch resumes where it stopped).
 
         Args:
             documents: List of {"doc_id", "title", "content"} dicts
             max_concurrent: Maximum concurrent extractions
+            cache: Optional ExtractionCache (used from the calling thread only)
+            progress_callback: Optional callback(done, total, doc_title), once per document
 
         Returns:
-            List of DocumentExtraction objects
+            List of DocumentExtraction objects, in input order
         """
-        results = []
-
-        for doc in documents:
-            extraction = self.extract(
-                doc_id=doc["doc_id"],
-                title=doc["title"],
-                content=doc["content"]
+        total = len(documents)
+        results: List[Optional[DocumentExtraction]] = [None] * total
+        keys = [self.cache_key(str(d["doc_id"]), d["title"], d["content"]) for d in documents]
+        done = 0
+
+        cached = {}
+        if cache is not None and documents:
+            cached = cache.get_many({str(d["doc_id"]): key for d, key in zip(documents, keys)})
+
+        pending = []
+        for i, doc in enumerate(documents):
+            hit = cached.get(str(doc["doc_id"]))
+            if hit is None:
+                pending.append(i)
+                continue
+            content = doc["content"][:MAX_CONTENT_LENGTH]
+            extraction = self._parse_extraction(
+                doc["doc_id"], doc["title"], hit["extraction"], hashlib.md5(content.encode()).hexdigest()
             )
-            results.append(extraction)
-
-        logger.info(f"[DeepExtractor] Batch complete: {len(results)} documents")
+            extraction.extracted_at = hit["extracted_at"] or extraction.extracted_at
+            results[i] = extraction
+            done += 1
+            if progress_callback:
+                progress_callback(done, total, doc["title"])
+
+        if cached:
+            logger.info(f"[DeepExtractor] {len(cached)}/{total} documents unchanged, served from cache")
+
+        limiter = _TokenRateLimiter(EXTRACTION_TOKENS_PER_MINUTE)
+        queue = iter(pending)
+        in_flight = {}
+        failed = 0
+
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrent), thread_name_prefix="deep-extract") as pool:
+            def submit_next() -> bool:
+                i = next(queue, None)
+                if i is None:
+                    return False
+                doc = documents[i]
+                in_flight[pool.submit(self._extract, doc["doc_id"], doc["title"], doc["content"], limiter)] = i
+                return True
+
+            for _ in range(max(1, max_concurrent)):
+                if not submit_next():
+                    break
+
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i = in_flight.pop(future)
+                    doc = documents[i]
+                    extraction, raw = future.result()
+                    results[i] = extraction
+                    if raw is None:
+                        failed += 1
+                    elif cache is not None:
+                        cache.put(doc["doc_id"], keys[i], raw, EXTRACTION_PROMPT_VERSION,
+                                  self.model, extraction.extracted_at)
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done, total, doc["title"])
+                    submit_next()
+
+        logger.info(f"[DeepExtractor] Batch complete: {len(results)} documents "
+                    f"({len(cached)} cached, {len(pending) - failed} extracted, {failed} failed)")
         return results
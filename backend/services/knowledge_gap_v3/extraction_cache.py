@@ -0,0 +1,92 @@
+"""
+Extraction Cache
+================
+
+Persists each document's Stage 1 extraction (the raw LLM JSON) in the
+document_extraction_cache table, keyed by a hash of everything that goes
+into the prompt (prompt version, model, document id, title, content).
+
+- A re-run of gap analysis only re-extracts documents whose key changed
+- Entries are written as each document finishes, so a run interrupted by a
+  worker restart picks up where it stopped
+
+The cache is an optimization: any failure here is logged and extraction
+proceeds as if the entry were missing.
+"""
+
+import json
+import logging
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from database.models import DocumentExtractionCache
+
+logger = logging.getLogger(__name__)
+
+_IN_CLAUSE_BATCH = 500
+
+
+class ExtractionCache:
+    """
+    Per-tenant view over document_extraction_cache.
+
+    Args:
+        db: SQLAlchemy session (methods commit their own writes; use from one thread)
+        tenant_id: Tenant ID
+    """
+
+    def __init__(self, db: Session, tenant_id: str):
+        self.db = db
+        self.tenant_id = tenant_id
+
+    def get_many(self, keys: Dict[str, str]) -> Dict[str, Dict]:
+        """
+        Cached extractions whose key still matches.
+
+        Args:
+            keys: doc_id -> current content key
+
+        Returns:
+            doc_id -> {"extraction": raw JSON dict, "extracted_at": str}
+        """
+        result = {}
+        doc_ids: List[str] = [str(d) for d in keys]
+        try:
+            for i in range(0, len(doc_ids), _IN_CLAUSE_BATCH):
+                rows = self.db.query(DocumentExtractionCache).filter(
+                    DocumentExtractionCache.tenant_id == self.tenant_id,
+                    DocumentExtractionCache.document_id.in_(doc_ids[i:i + _IN_CLAUSE_BATCH])
+                ).all()
+                for row in rows:
+                    if keys.get(row.document_id) == row.content_key:
+                        result[row.document_id] = {
+                            "extraction": json.loads(row.extraction),
+                            "extracted_at": row.extracted_at,
+                        }
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"[ExtractionCache] Lookup failed, extracting everything: {e}")
+            return {}
+        return result
+
+    def put(self, doc_id: str, content_key: str, extraction: Dict,
+            prompt_version: str, model: str, extracted_at: str):
+        """Store (or replace) one document's extraction."""
+        try:
+            row = self.db.query(DocumentExtractionCache).filter(
+                DocumentExtractionCache.tenant_id == self.tenant_id,
+                DocumentExtractionCache.document_id == str(doc_id)
+            ).first()
+            if row is None:
+                row = DocumentExtractionCache(tenant_id=self.tenant_id, document_id=str(doc_id))
+                self.db.add(row)
+            row.content_key = content_key
+            row.prompt_version = prompt_version
+            row.extraction_model = model
+            row.extraction = json.dumps(extraction)
+            row.extracted_at = extracted_at
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"[ExtractionCache] Failed to store extraction for {doc_id}: {e}")
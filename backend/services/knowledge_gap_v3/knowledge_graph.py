@@ -6,16 +6,20 @@ Builds a rich, queryable knowledge graph from extracted document information.
 Supports entity resolution, relationship inference, and graph queries.
 """
 
+import math
 import logging
 from typing import Dict, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass, field
 from collections import defaultdict
+from itertools import chain
 from datetime import datetime
 from difflib import SequenceMatcher
 from enum import Enum
 import hashlib
 import json
 
+import numpy as np
+
 from .deep_extractor import (
     DocumentExtraction, ExtractedEntity, ExtractedDecision,
     ExtractedProcess, ExtractedDependency, KnowledgeSignal,
@@ -138,6 +142,110 @@ class Relationship:
 # ENTITY RESOLVER
 # =============================================================================
 
+class _SimilarityIndex:
+    """
+    Candidate generation for EntityResolver (one entity type).
+
+    Every entry is reachable through a key that any similar name must share, so
+    the candidates are a superset of the matches and verification in insertion
+    order yields exactly what a full scan would:
+    - exact name
+    - word initials: an abbreviation ('j. smith' ~ 'john smith') has the same
+      word count and the same first letter in every word
+    - character bigrams: if ratio >= t, the indel distance d between the names is
+      at most (1 - t)(la + lb), so by the q-gram lemma they share at least
+      max(la, lb) - 1 - 2d bigrams (counted with multiplicity). Any
+      bigram postings are counted (numpy bincount) and entries sharing fewer
+      than T bigrams are dropped
+    - length buckets: scanned directly for the (very short) lengths where the
+      bigram bound is vacuous
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.names: List[str] = []
+        self.canonicals: List[str] = []
+        self._lengths = np.zeros(64, dtype=np.int64)  # name length per entry (capacity doubles)
+        self._by_name: Dict[str, int] = {}
+        self._by_initials: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+        self._by_length: Dict[int, List[int]] = defaultdict(list)
+        self._by_bigram: Dict[Tuple[str, int], List[int]] = defaultdict(list)
+
+    @staticmethod
+    def _bigrams(name: str) -> List[Tuple[str, int]]:
+        """Bigram occurrences as (bigram, nth occurrence) so set overlap = multiset overlap"""
+        seen: Dict[str, int] = defaultdict(int)
+        tokens = []
+        for i in range(len(name) - 1):
+            gram = name[i:i + 2]
+            tokens.append((gram, seen[gram]))
+            seen[gram] += 1
+        return tokens
+
+    @staticmethod
+    def _initials(name: str) -> Tuple[str, ...]:
+        return tuple(w[0] for w in name.split())
+
+    def add(self, name: str, canonical: str):
+        entry = len(self.names)
+        self.names.append(name)
+        self.canonicals.append(canonical)
+        self._by_name.setdefault(name, entry)
+        self._by_initials[self._initials(name)].append(entry)
+        self._by_length[len(name)].append(entry)
+        if entry == len(self._lengths):
+            self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+        self._lengths[entry] = len(name)
+        for token in self._bigrams(name):
+            self._by_bigram[token].append(entry)
+
+    def candidates(self, name: str) -> Set[int]:
+        t = self.threshold
+        la = len(name)
+        found: Set[int] = set()
+
+        exact = self._by_name.get(name)
+        if exact is not None:
+            found.add(exact)
+        found.update(self._by_initials.get(self._initials(name), ()))
+
+        if t <= 0:
+            return set(range(len(self.names)))
+        if t > 1:
+            return found  # ratio never exceeds 1
+
+        # Lengths that can reach the ratio at all: 2 * min / (la + lb) >= t
+        eps = 1e-9
+        lo = max(0, math.ceil(la * t / (2 - t) - eps))
+        hi = math.floor(la * (2 - t) / t + eps)
+
+        tokens = self._bigrams(name)
+        min_shared = {}  # candidate length -> bigrams it must share with `name`
+        for lb in range(lo, hi + 1):
+            if lb not in self._by_length:
+                continue
+            max_indels = math.floor((1 - t) * (la + lb) + eps)
+            shared = max(la, lb) - 1 - 2 * max_indels
+            if shared <= 0:
+                found.update(self._by_length[lb])
+            else:
+                min_shared[lb] = shared
+
+        if min_shared:
+            postings = [self._by_bigram[tok] for tok in tokens if tok in self._by_bigram]
+            if postings:
+                n = len(self.names)
+                hits = np.bincount(
+                    np.fromiter(chain.from_iterable(postings), dtype=np.int64), minlength=n
+                )
+                required = np.full(hi + 2, la + hi + 1, dtype=np.int64)  # unreachable by default
+                for lb, shared in min_shared.items():
+                    required[lb] = shared
+                lengths = np.minimum(self._lengths[:n], hi + 1)
+                found.update(np.flatnonzero(hits >= required[lengths]).tolist())
+        return found
+
+
 class EntityResolver:
     """Resolves and merges similar entities"""
 
@@ -148,6 +256,8 @@ class EntityResolver:
     def __init__(self, similarity_threshold: float = 0.85):
         self.similarity_threshold = similarity_threshold
         self.canonical_map: Dict[str, str] = {}  # normalized -> canonical
+        self._indexes: Dict[str, _SimilarityIndex] = {}
+        self._indexed = 0  # canonical_map entries reflected in _indexes
 
     def normalize_name(self, name: str) -> str:
         """Normalize a name for comparison"""
@@ -171,9 +281,9 @@ class EntityResolver:
 
     def are_similar(self, name1: str, name2: str) -> bool:
         """Check if two names are similar enough to be the same entity"""
-        norm1 = self.normalize_name(name1)
-        norm2 = self.normalize_name(name2)
+        return self._similar_normalized(self.normalize_name(name1), self.normalize_name(name2))
 
+    def _similar_normalized(self, norm1: str, norm2: str) -> bool:
         # Exact match after normalization
         if norm1 == norm2:
             return True
@@ -182,9 +292,11 @@ class EntityResolver:
         if self._is_abbreviation(norm1, norm2) or self._is_abbreviation(norm2, norm1):
             return True
 
-        # Sequence matching
-        ratio = SequenceMatcher(None, norm1, norm2).ratio()
-        return ratio >= self.similarity_threshold
+        # Sequence matching (cheap upper bounds first; they never reject a match)
+        matcher = SequenceMatcher(None, norm1, norm2)
+        return (matcher.real_quick_ratio() >= self.similarity_threshold
+                and matcher.quick_ratio() >= self.similarity_threshold
+                and matcher.ratio() >= self.similarity_threshold)
 
     def _is_abbreviation(self, short: str, long: str) -> bool:
         """Check if short is an abbreviation of long (e.g., 'J. Smith' for 'John Smith')"""
@@ -208,25 +320,50 @@ class EntityResolver:
         return True
 
     def get_canonical(self, name: str, entity_type: EntityType) -> str:
-        """Get or create canonical name for an entity"""
+        """
+        Get or create canonical name for an entity.
+
+        Returns the canonical name of the earliest known name of this type that is
+        similar (same result as comparing against every entry of canonical_map in
+        order), but only candidates from the blocking index are compared.
+        """
         normalized = self.normalize_name(name)
         key = f"{entity_type.value}:{normalized}"
 
         if key in self.canonical_map:
             return self.canonical_map[key]
 
-        # Check for similar existing entries
-        for existing_key, canonical in self.canonical_map.items():
-            if existing_key.startswith(f"{entity_type.value}:"):
-                existing_norm = existing_key.split(":", 1)[1]
-                if self.are_similar(normalized, existing_norm):
-                    self.canonical_map[key] = canonical
-                    return canonical
+        self._sync_index()
+        index = self._indexes.setdefault(entity_type.value, _SimilarityIndex(self.similarity_threshold))
+
+        # are_similar() normalizes both sides again, so compare on that form
+        compare_name = self.normalize_name(normalized)
+        canonical = None
+        for entry in sorted(index.candidates(compare_name)):
+            if self._similar_normalized(compare_name, index.names[entry]):
+                canonical = index.canonicals[entry]
+                break
 
         # Create new canonical entry
         # Use the longest version as canonical (has most info)
-        self.canonical_map[key] = name
-        return name
+        if canonical is None:
+            canonical = name
+        self.canonical_map[key] = canonical
+        index.add(compare_name, canonical)
+        self._indexed += 1
+        return canonical
+
+    def _sync_index(self):
+        """Rebuild the blocking index if canonical_map or the threshold changed outside get_canonical."""
+        if self._indexed == len(self.canonical_map) and all(
+                index.threshold == self.similarity_threshold for index in self._indexes.values()):
+            return
+        self._indexes = {}
+        for key, canonical in self.canonical_map.items():
+            type_value, normalized = key.split(":", 1)
+            index = self._indexes.setdefault(type_value, _SimilarityIndex(self.similarity_threshold))
+            index.add(self.normalize_name(normalized), canonical)
+        self._indexed = len(self.canonical_map)
 
 
 # =============================================================================
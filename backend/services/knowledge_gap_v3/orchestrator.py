@@ -8,7 +8,7 @@ Main entry point that coordinates all 6 stages of the knowledge gap detection sy
 import os
 import logging
 import json
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from datetime import datetime
 
@@ -135,7 +135,10 @@ class KnowledgeGapOrchestrator:
         documents: List[Dict[str, str]],
         tenant_id: str,
         project_id: Optional[str] = None,
-        top_n_questions: int = 20
+        top_n_questions: int = 20,
+        extraction_cache=None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        max_concurrent_extractions: int = 5
     ) -> AnalysisResult:
         """
         Run complete analysis on documents.
@@ -145,6 +148,9 @@ class KnowledgeGapOrchestrator:
             tenant_id: Tenant identifier
             project_id: Optional project identifier
             top_n_questions: Number of top questions to include in result
+            extraction_cache: Optional ExtractionCache; unchanged documents are not re-extracted
+            progress_callback: Optional callback(done, total, doc_title) per extracted document
+            max_concurrent_extractions: Maximum in-flight extraction calls
 
         Returns:
             AnalysisResult with all findings
@@ -167,13 +173,16 @@ class KnowledgeGapOrchestrator:
         # =====================================================================
         logger.info("[Orchestrator] Stage 1: Deep Document Extraction")
 
-        for doc in documents:
-            extraction = self.extractor.extract(
-                doc_id=doc.get("doc_id") or doc.get("id"),
-                title=doc.get("title", "Untitled"),
-                content=doc.get("content", "")
-            )
-            self.extractions.append(extraction)
+        self.extractions = self.extractor.extract_batch(
+            [{
+                "doc_id": doc.get("doc_id") or doc.get("id"),
+                "title": doc.get("title", "Untitled"),
+                "content": doc.get("content", "")
+            } for doc in documents],
+            max_concurrent=max_concurrent_extractions,
+            cache=extraction_cache,
+            progress_callback=progress_callback
+        )
 
         logger.info(f"[Orchestrator] Extracted from {len(self.extractions)} documents")
 
@@ -50,6 +50,7 @@ from services.intelligent_gap_detector import (
 # Import v3.0 Knowledge Gap System
 try:
     from services.knowledge_gap_v3 import KnowledgeGapOrchestrator
+    from services.knowledge_gap_v3.extraction_cache import ExtractionCache
     V3_AVAILABLE = True
 except ImportError as e:
     V3_AVAILABLE = False
@@ -1409,7 +1410,8 @@ Return JSON:
         project_id: Optional[str] = None,
         force_reanalyze: bool = False,
         include_pending: bool = True,
-        max_documents: int = 100
+        max_documents: int = 100,
+        progress_callback: Optional[callable] = None
     ) -> GapAnalysisResult:
         """
         Analyze documents using Knowledge Gap Detection v3.0 (Enhanced).
@@ -1438,6 +1440,7 @@ Return JSON:
             force_reanalyze: Re-analyze even if gaps exist
             include_pending: Include pending documents
             max_documents: Maximum documents to analyze
+            progress_callback: Optional callback(done, total, doc_title) per extracted document
 
         Returns:
             GapAnalysisResult with gaps and metadata
@@ -1517,7 +1520,9 @@ Return JSON:
                 documents=doc_list,
                 tenant_id=tenant_id,
                 project_id=project_id,
-                top_n_questions=30
+                top_n_questions=30,
+                extraction_cache=ExtractionCache(self.db, tenant_id),
+                progress_callback=progress_callback
             )
 
             # Convert to knowledge gaps and save
@@ -2015,12 +2020,29 @@ Return JSON:
                     "message": "No content to index"
                 }
 
+            # Reuse vectors for chunk text we've embedded before; only new text
+            # goes to the embeddings API
+            from vector_stores.chunk_fingerprints import ChunkFingerprintStore
+            fingerprints = ChunkFingerprintStore(
+                self.db, tenant_id,
+                model=self.client.get_embedding_model(),
+                dimensions=1536,
+                index_name="local"
+            )
+            for c in chunks:
+                c["content_hash"] = fingerprints.content_hash(c["text"])
+            try:
+                known_vectors = fingerprints.vectors_for_hashes([c["content_hash"] for c in chunks])
+            except Exception as e:
+                print(f"[KnowledgeService] Fingerprint lookup failed, embedding all chunks: {e}", flush=True)
+                known_vectors = {}
+
             # Generate embeddings in batches
-            embeddings = []
+            missing = [c for c in chunks if c["content_hash"] not in known_vectors]
             batch_size = 100
 
-            for i in range(0, len(chunks), batch_size):
-                batch = chunks[i:i + batch_size]
+            for i in range(0, len(missing), batch_size):
+                batch = missing[i:i + batch_size]
                 batch_texts = [c["text"] for c in batch]
 
                 response = self.client.create_embedding(
@@ -2028,8 +2050,26 @@ Return JSON:
                     dimensions=1536  # Match existing index
                 )
 
-                for j, emb in enumerate(response.data):
-                    embeddings.append(emb.embedding)
+                for c, emb in zip(batch, sorted(response.data, key=lambda d: d.index)):
+                    known_vectors[c["content_hash"]] = emb.embedding
+
+            embeddings = [known_vectors[c["content_hash"]] for c in chunks]
+            print(f"[KnowledgeService] Embedding index: {len(chunks) - len(missing)} chunks reused, "
+                  f"{len(missing)} embedded", flush=True)
+
+            # Fingerprints mirror the rebuilt index
+            fingerprints.delete_tenant()
+            fingerprints.record([
+                {
+                    "vector_id": c["id"],
+                    "document_id": c["doc_id"],
+                    "chunk_index": c["chunk_index"],
+                    "content_hash": c["content_hash"],
+                    "embedding": known_vectors[c["content_hash"]],
+                }
+                for c in chunks
+            ])
+            self.db.commit()
 
             # Build index structure
             import numpy as np
@@ -2068,11 +2108,15 @@ Return JSON:
                 with open(index_path, "wb") as f:
                     pickle.dump(index_data, f)
 
+                from services.answer_cache import bump_corpus_version
+                bump_corpus_version(tenant_id)
+
             return {
                 "success": True,
                 "documents_processed": len(documents),
                 "answers_included": len(answers),
                 "chunks_created": len(chunks),
+                "chunks_embedded": len(missing),
                 "index_path": str(index_path) if tenant.data_directory else None
             }
 
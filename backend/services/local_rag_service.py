@@ -1,15 +1,38 @@
 """
 Local RAG Service - Development/Fallback for when Pinecone is not available
 Uses local pickle-based vector index for search and retrieval
+
+The pickle written by the indexers stays the source of truth. On first use it is
+converted into two sidecars next to it:
+- embedding_index.npy: L2-normalized float32 matrix, opened with np.memmap so
+  every request (and every worker on the host) shares the OS page cache
+- embedding_index.meta.pkl: chunks + doc_index only (no vectors)
+Loaded indexes are kept in a bounded per-tenant LRU and invalidated by the
+pickle's mtime.
 """
 
 import os
 import pickle
+import threading
 import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from services.openai_client import get_openai_client
 
+# Max tenant indexes kept open at once (each is a memmap + chunk list)
+LOCAL_INDEX_CACHE_SIZE = int(os.getenv("LOCAL_RAG_INDEX_CACHE_SIZE", "8"))
+
+
+@dataclass
+class _TenantIndex:
+    """A loaded, search-ready tenant index"""
+    matrix: np.ndarray          # (n, dim) float32, rows L2-normalized (memmap)
+    chunks: List[Any]
+    doc_index: Dict[int, Dict]
+    mtime: float
+
 
 class LocalRAGService:
     """
@@ -20,9 +43,17 @@ class LocalRAGService:
     def __init__(self):
         self.openai_client = get_openai_client()
         self.base_dir = Path(__file__).parent.parent / "tenant_data"
+        self._slugs: Dict[str, str] = {}
+        self._indexes: "OrderedDict[str, _TenantIndex]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def _get_tenant_slug(self, tenant_id: str) -> Optional[str]:
+        """Resolve tenant slug once per process (slugs don't change)"""
+        slug = self._slugs.get(tenant_id)
+        if slug:
+            return slug
 
-    def _load_index(self, tenant_id: str) -> Dict[str, Any]:
-        """Load the local vector index for a tenant"""
         from database.models import SessionLocal, Tenant
 
         db = SessionLocal()
@@ -30,37 +61,123 @@ class LocalRAGService:
             tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
             if not tenant:
                 return None
-
-            index_path = self.base_dir / tenant.slug / "embedding_index.pkl"
-
-            if not index_path.exists():
-                print(f"[LocalRAG] No index found at {index_path}")
-                return None
-
-            with open(index_path, 'rb') as f:
-                index_data = pickle.load(f)
-
-            print(f"[LocalRAG] Loaded index with {len(index_data.get('embeddings', []))} vectors")
-            return index_data
-
+            self._slugs[tenant_id] = tenant.slug
+            return tenant.slug
         finally:
             db.close()
 
-    def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """Calculate cosine similarity between two vectors"""
-        # Ensure vectors are 1D numpy arrays
-        vec1 = np.array(vec1).flatten()
-        vec2 = np.array(vec2).flatten()
-
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-
-        # Check for zero vectors using small epsilon
-        if norm1 < 1e-10 or norm2 < 1e-10:
-            return 0.0
+    def _load_index(self, tenant_id: str) -> Optional[_TenantIndex]:
+        """Return the cached index for a tenant, (re)loading it if the pickle changed"""
+        slug = self._get_tenant_slug(tenant_id)
+        if not slug:
+            return None
 
-        return float(dot_product / (norm1 * norm2))
+        index_path = self.base_dir / slug / "embedding_index.pkl"
+        try:
+            mtime = index_path.stat().st_mtime
+        except FileNotFoundError:
+            print(f"[LocalRAG] No index found at {index_path}")
+            with self._cache_lock:
+                self._indexes.pop(tenant_id, None)
+            return None
+
+        with self._cache_lock:
+            cached = self._indexes.get(tenant_id)
+            if cached is not None and cached.mtime == mtime:
+                self._indexes.move_to_end(tenant_id)
+                return cached
+            load_lock = self._load_locks.setdefault(tenant_id, threading.Lock())
+
+        # One loader per tenant; concurrent requests wait and reuse its result
+        with load_lock:
+            with self._cache_lock:
+                cached = self._indexes.get(tenant_id)
+                if cached is not None and cached.mtime == mtime:
+                    return cached
+
+            index = self._open_index(index_path, mtime)
+
+            with self._cache_lock:
+                self._indexes[tenant_id] = index
+                self._indexes.move_to_end(tenant_id)
+                while len(self._indexes) > LOCAL_INDEX_CACHE_SIZE:
+                    self._indexes.popitem(last=False)
+
+        print(f"[LocalRAG] Loaded index with {index.matrix.shape[0]} vectors")
+        return index
+
+    def _open_index(self, index_path: Path, mtime: float) -> _TenantIndex:
+        """Memory-map the sidecars, rebuilding them from the pickle if stale"""
+        matrix_path = index_path.with_suffix(".npy")
+        meta_path = index_path.with_suffix(".meta.pkl")
+
+        fresh = (
+            matrix_path.exists() and meta_path.exists()
+            and matrix_path.stat().st_mtime >= mtime
+            and meta_path.stat().st_mtime >= mtime
+        )
+        if not fresh:
+            self._build_sidecars(index_path, matrix_path, meta_path)
+
+        matrix = np.load(matrix_path, mmap_mode='r')
+        with open(meta_path, 'rb') as f:
+            meta = pickle.load(f)
+
+        return _TenantIndex(
+            matrix=matrix,
+            chunks=meta.get('chunks', []),
+            doc_index=meta.get('doc_index', {}),
+            mtime=mtime,
+        )
+
+    @staticmethod
+    def _build_sidecars(index_path: Path, matrix_path: Path, meta_path: Path):
+        """Convert embedding_index.pkl into a normalized .npy matrix + metadata pickle"""
+        with open(index_path, 'rb') as f:
+            index_data = pickle.load(f)
+
+        embeddings = np.asarray(index_data.get('embeddings', []), dtype=np.float32)
+        if embeddings.ndim != 2:
+            embeddings = embeddings.reshape(len(embeddings), -1) if len(embeddings) else np.zeros((0, 0), np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True) if embeddings.size else None
+        if norms is not None:
+            # Zero vectors stay zero (score 0), matching the old epsilon check
+            embeddings = embeddings / np.where(norms < 1e-10, 1.0, norms)
+
+        # Write to temp files and rename so readers never see a partial file
+        tmp_matrix = matrix_path.with_name(matrix_path.name + f".{os.getpid()}.tmp")
+        with open(tmp_matrix, 'wb') as f:
+            np.save(f, np.ascontiguousarray(embeddings, dtype=np.float32))
+        os.replace(tmp_matrix, matrix_path)
+
+        tmp_meta = meta_path.with_name(meta_path.name + f".{os.getpid()}.tmp")
+        with open(tmp_meta, 'wb') as f:
+            pickle.dump({
+                'chunks': index_data.get('chunks', []),
+                'doc_index': index_data.get('doc_index', {}),
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_meta, meta_path)
+
+        print(f"[LocalRAG] Built memory-mapped index sidecars for {index_path.parent.name} ({len(embeddings)} vectors)")
+
+    @staticmethod
+    def _top_k(matrix: np.ndarray, query_embedding: np.ndarray, top_k: int):
+        """Cosine top-k via one matrix-vector product + argpartition"""
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm < 1e-10:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        scores = matrix @ (query / norm)
+        k = min(top_k, scores.shape[0])
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        if k < scores.shape[0]:
+            idx = np.argpartition(-scores, k - 1)[:k]
+        else:
+            idx = np.arange(scores.shape[0])
+        idx = idx[np.argsort(-scores[idx], kind='stable')]
+        return idx, scores[idx]
 
     def search(self, query: str, tenant_id: str, top_k: int = 5) -> Dict[str, Any]:
         """
@@ -74,10 +191,10 @@ class LocalRAGService:
         Returns:
             Dict with answer, sources, and metadata
         """
-        # Load the index
-        index_data = self._load_index(tenant_id)
+        # Load the index (cached, memory-mapped)
+        index = self._load_index(tenant_id)
 
-        if not index_data:
+        if not index:
             return {
                 "answer": "Your knowledge base is empty. Please add and confirm some documents first.",
                 "confidence": 1.0,
@@ -96,35 +213,33 @@ class LocalRAGService:
                 "sources": []
             }
 
-        # Search through the index
-        embeddings = index_data.get('embeddings', np.array([]))
-        chunks = index_data.get('chunks', [])
-        doc_index = index_data.get('doc_index', {})
+        chunks = index.chunks
+        doc_index = index.doc_index
 
-        if len(embeddings) == 0:
+        if index.matrix.shape[0] == 0:
             return {
                 "answer": "No embeddings found in the index.",
                 "confidence": 0.0,
                 "sources": []
             }
 
-        # Calculate similarities
-        similarities = []
-        for i in range(len(embeddings)):
-            score = self._cosine_similarity(query_embedding, embeddings[i])
-            chunk_text = chunks[i] if i < len(chunks) else ""
-            doc_info = doc_index.get(i, {})
-
-            similarities.append({
+        # Score every vector in one pass and keep the top_k
+        top_idx, top_scores = self._top_k(index.matrix, query_embedding, top_k)
+        top_results = []
+        for i, score in zip(top_idx.tolist(), top_scores.tolist()):
+            top_results.append({
                 'index': i,
                 'score': float(score),
-                'text': chunk_text,
-                'doc_info': doc_info
+                'text': chunks[i] if i < len(chunks) else "",
+                'doc_info': doc_index.get(i, {})
             })
 
-        # Sort by score and get top_k
-        similarities.sort(key=lambda x: x['score'], reverse=True)
-        top_results = similarities[:top_k]
+        if not top_results:
+            return {
+                "answer": "No embeddings found in the index.",
+                "confidence": 0.0,
+                "sources": []
+            }
 
         print(f"[LocalRAG] Found {len(top_results)} results, top score: {top_results[0]['score']:.3f}")
 
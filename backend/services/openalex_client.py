@@ -0,0 +1,290 @@
+"""
+OpenAlex Client
+Shared HTTP layer for every OpenAlex caller (journal scorer, OpenAlexSearchService).
+
+- Pooled requests.Session (keep-alive instead of a new TLS handshake per call)
+- Polite-pool rate governor shared by all threads in the worker
+  (OPENALEX_REQUESTS_PER_SECOND, default 10) that backs off on 429s
+- On-disk TTL response cache (SQLite) keyed by normalized URL, so the same
+  query from another manuscript or after a restart is not re-fetched
+- Request coalescing: identical in-flight queries from concurrent manuscript
+  analyses share one HTTP call
+- run_concurrently()/get_many() for independent queries, bounded by
+  OPENALEX_MAX_CONCURRENT
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+OPENALEX_BASE = "https://api.openalex.org"
+OPENALEX_EMAIL = os.getenv("OPENALEX_EMAIL", "prmogathala@gmail.com")
+OPENALEX_MAX_CONCURRENT = int(os.getenv("OPENALEX_MAX_CONCURRENT", "6"))
+OPENALEX_REQUESTS_PER_SECOND = float(os.getenv("OPENALEX_REQUESTS_PER_SECOND", "10"))
+OPENALEX_CACHE_TTL_SECONDS = int(os.getenv("OPENALEX_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Empty string disables the on-disk cache
+OPENALEX_CACHE_PATH = os.getenv(
+    "OPENALEX_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "openalex_cache.sqlite3"),
+)
+
+# Query parameters that identify the caller, not the query
+_IDENTITY_PARAMS = {"mailto", "api_key"}
+
+
+def normalize_url(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Canonical form of an OpenAlex URL for cache keys.
+
+    Relative paths are resolved against OPENALEX_BASE, `params` are merged
+    into the query string, parameters are sorted, and mailto/api_key are
+    dropped so every caller shares the same entry.
+    """
+    if not url.startswith("http"):
+        url = f"{OPENALEX_BASE}/{url.lstrip('/')}"
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((k, str(v)) for k, v in params.items() if v is not None)
+    query = sorted((k, v) for k, v in query if k not in _IDENTITY_PARAMS)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), urlencode(query), ""))
+
+
+class ResponseCache:
+    """SQLite key/value store of JSON bodies with a per-entry expiry."""
+
+    def __init__(self, path: str, ttl_seconds: int = OPENALEX_CACHE_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, body TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[0] < time.time():
+            return None
+        return json.loads(row[1])
+
+    def put(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        body = json.dumps(value)
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, expires_at, body) VALUES (?, ?, ?)",
+                (key, time.time() + ttl, body),
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+
+class RateGovernor:
+    """Spaces request starts at least 1/rate apart across all threads."""
+
+    def __init__(self, requests_per_second: float = OPENALEX_REQUESTS_PER_SECOND):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause(self, seconds: float):
+        """Push every caller back (server asked us to slow down)."""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+class OpenAlexClient:
+    """Thread-safe OpenAlex GET client. Returns parsed JSON or None."""
+
+    MAX_RETRIES = 2
+
+    def __init__(
+        self,
+        email: str = OPENALEX_EMAIL,
+        cache_path: Optional[str] = OPENALEX_CACHE_PATH,
+        max_concurrent: int = OPENALEX_MAX_CONCURRENT,
+        requests_per_second: float = OPENALEX_REQUESTS_PER_SECOND,
+        session: Optional[requests.Session] = None,
+    ):
+        self.email = email
+        self.max_concurrent = max(1, max_concurrent)
+        self.governor = RateGovernor(requests_per_second)
+        self._http_slots = threading.BoundedSemaphore(self.max_concurrent)
+
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrent)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": f"2ndBrain/1.0 (mailto:{email})",
+            "Accept": "application/json",
+        })
+
+        self.cache = None
+        if cache_path:
+            try:
+                self.cache = ResponseCache(cache_path)
+            except Exception as e:
+                print(f"[OpenAlex] Response cache disabled ({cache_path}): {e}", flush=True)
+
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "errors": 0}
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: int = 15) -> Optional[Any]:
+        """
+        GET an OpenAlex URL (absolute, or a path like "/works").
+
+        Returns:
+            Parsed JSON body, or None on a non-200 response or network error
+        """
+        key = normalize_url(url, params)
+
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count("cache_hits")
+                return cached
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if not leader:
+            self._count("coalesced")
+            return future.result()
+
+        result = None
+        try:
+            result = self._fetch(key, timeout)
+            if result is not None and self.cache is not None:
+                try:
+                    self.cache.put(key, result)
+                except Exception as e:
+                    print(f"[OpenAlex] Cache write failed: {e}", flush=True)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            future.set_result(result)
+        return result
+
+    def _fetch(self, key: str, timeout: int) -> Optional[Any]:
+        params = {"mailto": self.email} if self.email else None
+        for attempt in range(self.MAX_RETRIES + 1):
+            self.governor.acquire()
+            self._count("requests")
+            try:
+                with self._http_slots:
+                    resp = self.session.get(key, params=params, timeout=timeout)
+            except requests.RequestException as e:
+                self._count("errors")
+                print(f"[OpenAlex] GET {key[:120]} failed: {e}", flush=True)
+                return None
+
+            if resp.status_code == 200:
+                try:
+                    return resp.json()
+                except ValueError:
+                    self._count("errors")
+                    return None
+            if resp.status_code in (429, 503) and attempt < self.MAX_RETRIES:
+                try:
+                    wait = float(resp.headers.get("Retry-After", 1))
+                except ValueError:
+                    wait = 1.0
+                self.governor.pause(min(wait, 30.0))
+                continue
+            self._count("errors")
+            if resp.status_code != 404:
+                print(f"[OpenAlex] GET {key[:120]} returned {resp.status_code}", flush=True)
+            return None
+        return None
+
+    def run_concurrently(self, func: Callable, items: Iterable) -> List[Any]:
+        """
+        Apply func to each item on up to max_concurrent threads.
+
+        Results keep input order. Exceptions are logged and become None.
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        def call(item):
+            try:
+                return func(item)
+            except Exception as e:
+                print(f"[OpenAlex] Concurrent call failed: {e}", flush=True)
+                return None
+
+        if len(items) == 1:
+            return [call(items[0])]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent, len(items))) as pool:
+            return list(pool.map(call, items))
+
+    def get_many(self, urls: Iterable, timeout: int = 15) -> List[Optional[Any]]:
+        """
+        get_json for several independent queries at once.
+
+        Args:
+            urls: URL strings, or (url, params) tuples
+
+        Returns:
+            One result per URL, in input order
+        """
+        def fetch(entry: Tuple):
+            url, params = entry if isinstance(entry, tuple) else (entry, None)
+            return self.get_json(url, params=params, timeout=timeout)
+
+        return self.run_concurrently(fetch, urls)
+
+
+_openalex_client = None
+_openalex_client_lock = threading.Lock()
+
+
+def get_openalex_client() -> OpenAlexClient:
+    """Get the process-wide OpenAlex client"""
+    global _openalex_client
+    if _openalex_client is None:
+        with _openalex_client_lock:
+            if _openalex_client is None:
+                _openalex_client = OpenAlexClient()
+    return _openalex_client
@@ -1,29 +1,23 @@
 """
 OpenAlex Search Service — Search academic papers via the OpenAlex API.
 Used for literature search in co-work RAG pipeline.
+
+HTTP goes through the shared OpenAlexClient (pooled session, polite-pool
+rate governor, on-disk response cache, request coalescing).
 """
 
-import time
-import requests
 from typing import Optional
 
+from services.openalex_client import OPENALEX_EMAIL, OpenAlexClient, get_openalex_client
+
 
 class OpenAlexSearchService:
     """Search OpenAlex for academic papers, citations, and references."""
 
     BASE_URL = "https://api.openalex.org"
 
-    def __init__(self, email: str = "prmogathala@gmail.com"):
-        self.session = requests.Session()
-        self.session.headers['User-Agent'] = f'2ndBrain/1.0 (mailto:{email})'
-        self._last_request = 0
-
-    def _rate_limit(self):
-        """Respect OpenAlex polite pool: max 10 req/sec."""
-        elapsed = time.time() - self._last_request
-        if elapsed < 0.1:
-            time.sleep(0.1 - elapsed)
-        self._last_request = time.time()
+    def __init__(self, email: str = OPENALEX_EMAIL):
+        self.client = get_openalex_client() if email == OPENALEX_EMAIL else OpenAlexClient(email=email)
 
     def search_works(self, query: str, max_results: int = 10,
                      from_year: Optional[int] = None,
@@ -41,7 +35,6 @@ class OpenAlexSearchService:
         Returns:
             List of paper dicts with title, authors, abstract, DOI, etc.
         """
-        self._rate_limit()
         params = {
             'search': query,
             'per_page': min(max_results, 50),
@@ -59,15 +52,13 @@ class OpenAlexSearchService:
         if filters:
             params['filter'] = ','.join(filters)
 
-        try:
-            resp = self.session.get(f'{self.BASE_URL}/works', params=params, timeout=15)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"[OpenAlex] Search failed: {e}")
+        data = self.client.get_json(f'{self.BASE_URL}/works', params=params, timeout=15)
+        if data is None:
+            print(f"[OpenAlex] Search failed: {query[:80]}")
             return []
 
         results = []
-        for work in resp.json().get('results', []):
+        for work in data.get('results', []):
             abstract = self._reconstruct_abstract(work.get('abstract_inverted_index'))
 
             authors = [a.get('author', {}).get('display_name', '')
@@ -104,7 +95,6 @@ class OpenAlexSearchService:
         Returns:
             List of citing paper dicts
         """
-        self._rate_limit()
         work_id = openalex_id.replace('https://openalex.org/', '')
         params = {
             'filter': f'cites:{work_id}',
@@ -113,11 +103,9 @@ class OpenAlexSearchService:
             'select': 'id,doi,title,publication_year,cited_by_count,authorships,primary_location',
         }
 
-        try:
-            resp = self.session.get(f'{self.BASE_URL}/works', params=params, timeout=15)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"[OpenAlex] Citations fetch failed: {e}")
+        data = self.client.get_json(f'{self.BASE_URL}/works', params=params, timeout=15)
+        if data is None:
+            print(f"[OpenAlex] Citations fetch failed: {work_id}")
             return []
 
         return [{
@@ -128,7 +116,7 @@ class OpenAlexSearchService:
             'cited_by_count': w.get('cited_by_count', 0),
             'authors': [a.get('author', {}).get('display_name', '') for a in w.get('authorships', [])[:3]],
             'journal': (w.get('primary_location') or {}).get('source', {}).get('display_name', '') if w.get('primary_location') else '',
-        } for w in resp.json().get('results', [])]
+        } for w in data.get('results', [])]
 
     def get_references(self, openalex_id: str) -> list:
         """Get papers referenced by a given work.
@@ -139,34 +127,28 @@ class OpenAlexSearchService:
         Returns:
             List of referenced paper dicts
         """
-        self._rate_limit()
         work_id = openalex_id.replace('https://openalex.org/', '')
 
-        try:
-            resp = self.session.get(f'{self.BASE_URL}/works/{work_id}',
+        data = self.client.get_json(f'{self.BASE_URL}/works/{work_id}',
                                     params={'select': 'referenced_works'}, timeout=15)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"[OpenAlex] References fetch failed: {e}")
+        if data is None:
+            print(f"[OpenAlex] References fetch failed: {work_id}")
             return []
 
-        ref_ids = resp.json().get('referenced_works', [])
+        ref_ids = data.get('referenced_works', [])
         if not ref_ids:
             return []
 
         # Batch fetch referenced works (max 25)
         filter_str = '|'.join(r.replace('https://openalex.org/', '') for r in ref_ids[:25])
-        self._rate_limit()
-
-        try:
-            resp2 = self.session.get(f'{self.BASE_URL}/works',
-                                      params={'filter': f'openalex:{filter_str}',
-                                              'per_page': 25,
-                                              'select': 'id,doi,title,publication_year,cited_by_count'},
-                                      timeout=15)
-            resp2.raise_for_status()
-        except Exception as e:
-            print(f"[OpenAlex] Batch reference fetch failed: {e}")
+
+        data2 = self.client.get_json(f'{self.BASE_URL}/works',
+                                     params={'filter': f'openalex:{filter_str}',
+                                             'per_page': 25,
+                                             'select': 'id,doi,title,publication_year,cited_by_count'},
+                                     timeout=15)
+        if data2 is None:
+            print(f"[OpenAlex] Batch reference fetch failed: {work_id}")
             return []
 
         return [{
@@ -175,7 +157,7 @@ class OpenAlexSearchService:
             'title': w.get('title', ''),
             'year': w.get('publication_year'),
             'cited_by_count': w.get('cited_by_count', 0),
-        } for w in resp2.json().get('results', [])]
+        } for w in data2.get('results', [])]
 
     def _reconstruct_abstract(self, inverted_index: Optional[dict]) -> str:
         """Reconstruct abstract from OpenAlex inverted index format."""
@@ -11,6 +11,9 @@ from sqlalchemy import or_
 
 logger = logging.getLogger(__name__)
 
+# Rows per upsert / IN (...) lookup
+COOCCURRENCE_BATCH_SIZE = int(os.getenv("COOCCURRENCE_BATCH_SIZE", "1000"))
+
 
 class ProtocolGraphService:
     """Extract and query protocol knowledge graphs."""
@@ -161,63 +164,90 @@ Only extract entities clearly mentioned. Do not infer or guess. Keep attributes
             'relation_count': len(relations),
         }
 
-    def build_cooccurrences_from_corpus(self, db, tenant_id=None):
+    def build_cooccurrences_from_corpus(self, db, tenant_id=None, incremental=False, since=None):
         """
         Build co-occurrence table from existing protocol graph entities.
-        Scans all documents with extracted entities and creates technique-target pairs.
+        Pairs every technique with every non-technique entity of the same document.
+
+        One self-join over protocol_entities produces all pairs; counts are
+        aggregated in memory and written with batched upserts.
+
+        Args:
+            db: Database session
+            tenant_id: Only entities of this tenant (None = all)
+            incremental: Only pairs involving entities created after the newest
+                entity already in the table (documents extracted since the last build)
+            since: Explicit watermark for incremental builds (overrides the derived one)
+
+        Returns:
+            Number of co-occurrence rows written
         """
+        from sqlalchemy.orm import aliased
+
+        technique = aliased(ProtocolEntity)
+        target = aliased(ProtocolEntity)
+
+        watermark = None
+        if incremental:
+            watermark = since or self._entity_cooccurrence_watermark(db, tenant_id)
+
+        pairs_query = db.query(
+            technique.id, target.id, target.entity_type, technique.document_id,
+        ).join(
+            target, target.document_id == technique.document_id
+        ).filter(
+            technique.entity_type == 'technique',
+            target.entity_type != 'technique',
+            technique.document_id.isnot(None),
+        )
+        if tenant_id:
+            pairs_query = pairs_query.filter(technique.tenant_id == tenant_id)
+        if watermark is not None:
+            pairs_query = pairs_query.filter(or_(
+                technique.created_at > watermark,
+                target.created_at > watermark,
+            ))
+
+        # (technique_id, target_id) -> [target_type, document_ids]
+        pairs = {}
+        for tech_id, target_id, target_type, doc_id in pairs_query.yield_per(5000):
+            entry = pairs.setdefault((tech_id, target_id), [target_type, []])
+            if doc_id not in entry[1]:
+                entry[1].append(doc_id)
+
+        logger.info(f"[ProtocolGraph] Building co-occurrences: {len(pairs)} pairs"
+                    f"{f' (entities since {watermark})' if watermark is not None else ''}")
+
+        rows = [{
+            'technique_entity_id': tech_id,
+            'target_entity_id': target_id,
+            'target_type': target_type,
+            'cooccurrence_count': len(doc_ids),
+            'source_protocols': [{"document_id": d} for d in doc_ids],
+        } for (tech_id, target_id), (target_type, doc_ids) in pairs.items()]
+
+        written = upsert_cooccurrences(db, rows, tenant_id=tenant_id, additive=incremental)
+        logger.info(f"[ProtocolGraph] Wrote {written} co-occurrence records")
+        return written
+
+    def _entity_cooccurrence_watermark(self, db, tenant_id=None):
+        """Newest created_at among entities already paired in the table (None if empty)."""
         from sqlalchemy import func
-
-        # Get all documents that have entities
-        doc_ids_query = db.query(ProtocolEntity.document_id).distinct()
+        from sqlalchemy.orm import aliased
+
+        technique = aliased(ProtocolEntity)
+        target = aliased(ProtocolEntity)
+        query = db.query(
+            func.max(technique.created_at), func.max(target.created_at)
+        ).select_from(ProtocolCooccurrence).join(
+            technique, technique.id == ProtocolCooccurrence.technique_entity_id
+        ).join(
+            target, target.id == ProtocolCooccurrence.target_entity_id
+        ).filter(technique.document_id.isnot(None))
         if tenant_id:
-            doc_ids_query = doc_ids_query.filter(ProtocolEntity.tenant_id == tenant_id)
-        doc_ids = [r[0] for r in doc_ids_query.all() if r[0]]
-
-        logger.info(f"[ProtocolGraph] Building co-occurrences from {len(doc_ids)} documents")
-
-        cooc_count = 0
-        for doc_id in doc_ids:
-            entities = db.query(ProtocolEntity).filter(
-                ProtocolEntity.document_id == doc_id
-            ).all()
-
-            techniques = [e for e in entities if e.entity_type == 'technique']
-            targets = [e for e in entities if e.entity_type != 'technique']
-
-            for tech in techniques:
-                for target in targets:
-                    # Upsert co-occurrence
-                    existing = db.query(ProtocolCooccurrence).filter(
-                        ProtocolCooccurrence.technique_entity_id == tech.id,
-                        ProtocolCooccurrence.target_entity_id == target.id,
-                    ).first()
-
-                    if existing:
-                        existing.cooccurrence_count += 1
-                        if existing.source_protocols is None:
-                            existing.source_protocols = []
-                        existing.source_protocols.append({"document_id": doc_id})
-                        existing.confidence = min(1.0, existing.cooccurrence_count / 10.0)
-                    else:
-                        cooc = ProtocolCooccurrence(
-                            tenant_id=tenant_id,
-                            technique_entity_id=tech.id,
-                            target_entity_id=target.id,
-                            target_type=target.entity_type,
-                            cooccurrence_count=1,
-                            source_protocols=[{"document_id": doc_id}],
-                            confidence=0.1,
-                        )
-                        db.add(cooc)
-                        cooc_count += 1
-
-            if cooc_count % 100 == 0 and cooc_count > 0:
-                db.commit()
-
-        db.commit()
-        logger.info(f"[ProtocolGraph] Created {cooc_count} new co-occurrence records")
-        return cooc_count
+            query = query.filter(technique.tenant_id == tenant_id)
+        newest = [t for t in query.one() if t is not None]
+        return max(newest) if newest else None
 
     def embed_entities_to_pinecone(self, db, vector_store, embedding_client, tenant_id=None):
         """
@@ -283,6 +313,11 @@ Only extract entities clearly mentioned. Do not infer or guess. Keep attributes
         """
         Build co-occurrences directly from unified_corpus.jsonl without LLM extraction.
         Uses structured fields (steps, reagents, equipment) from the corpus.
+
+        The corpus is the full source of truth, so counts are recomputed and
+        replaced (re-running does not double count). Pair counts are aggregated
+        in memory, entities are resolved in bulk, and rows are written with
+        batched upserts.
         """
         from pathlib import Path
 
@@ -293,40 +328,17 @@ Only extract entities clearly mentioned. Do not infer or guess. Keep attributes
 
         logger.info(f"[ProtocolGraph] Building co-occurrences from corpus: {corpus_file}")
 
-        # First pass: collect all unique entities and normalize
-        entity_cache = {}  # normalized_name -> ProtocolEntity
-
-        def get_or_create_entity(name: str, entity_type: str) -> str:
-            """Get or create a protocol entity, return its ID."""
-            normalized = name.lower().strip()
-            cache_key = f"{entity_type}:{normalized}"
-
-            if cache_key in entity_cache:
-                return entity_cache[cache_key]
-
-            existing = db.query(ProtocolEntity).filter(
-                ProtocolEntity.normalized_name == normalized,
-                ProtocolEntity.entity_type == entity_type,
-            ).first()
-
-            if existing:
-                entity_cache[cache_key] = existing
-                return existing
-
-            entity = ProtocolEntity(
-                tenant_id=tenant_id,
-                entity_type=entity_type,
-                name=name.strip(),
-                normalized_name=normalized,
-            )
-            db.add(entity)
-            db.flush()
-            entity_cache[cache_key] = entity
-            return entity
-
-        cooc_count = 0
+        names = {}  # (entity_type, normalized_name) -> display name (first seen)
+        pairs = {}  # (technique key, target key) -> [protocol count, first source]
         protocols_processed = 0
 
+        def entity_key(name, entity_type):
+            if not isinstance(name, str) or len(name.strip()) < 2 or len(name) > 500:
+                return None
+            key = (entity_type, name.lower().strip())
+            names.setdefault(key, name.strip())
+            return key
+
         with open(corpus_path, "r") as f:
             for line in f:
                 try:
@@ -348,65 +360,186 @@ Only extract entities clearly mentioned. Do not infer or guess. Keep attributes
                 if not techniques or (not reagents and not equipment):
                     continue
 
-                # Create entities and co-occurrences
-                for tech_name in techniques:
-                    tech_entity = get_or_create_entity(tech_name, "technique")
-
-                    for reagent_name in reagents[:10]:
-                        if not reagent_name or len(reagent_name) < 2:
-                            continue
-                        target_entity = get_or_create_entity(reagent_name, "reagent")
-
-                        existing = db.query(ProtocolCooccurrence).filter(
-                            ProtocolCooccurrence.technique_entity_id == tech_entity.id,
-                            ProtocolCooccurrence.target_entity_id == target_entity.id,
-                        ).first()
+                targets = dict.fromkeys(
+                    [entity_key(n, "reagent") for n in reagents[:10]] +
+                    [entity_key(n, "equipment") for n in equipment[:10]]
+                )
+                targets.pop(None, None)
 
-                        if existing:
-                            existing.cooccurrence_count += 1
-                            existing.confidence = min(1.0, existing.cooccurrence_count / 10.0)
-                        else:
-                            db.add(ProtocolCooccurrence(
-                                tenant_id=tenant_id,
-                                technique_entity_id=tech_entity.id,
-                                target_entity_id=target_entity.id,
-                                target_type="reagent",
-                                cooccurrence_count=1,
-                                source_protocols=[{"source": protocol.get("source", ""), "title": protocol.get("title", "")}],
-                                confidence=0.1,
-                            ))
-                            cooc_count += 1
-
-                    for equip_name in equipment[:10]:
-                        if not equip_name or len(equip_name) < 2:
-                            continue
-                        target_entity = get_or_create_entity(equip_name, "equipment")
-
-                        existing = db.query(ProtocolCooccurrence).filter(
-                            ProtocolCooccurrence.technique_entity_id == tech_entity.id,
-                            ProtocolCooccurrence.target_entity_id == target_entity.id,
-                        ).first()
-
-                        if existing:
-                            existing.cooccurrence_count += 1
-                            existing.confidence = min(1.0, existing.cooccurrence_count / 10.0)
+                for tech_name in techniques:
+                    tech_key = entity_key(tech_name, "technique")
+                    if tech_key is None:
+                        continue
+                    for target_key in targets:
+                        entry = pairs.get((tech_key, target_key))
+                        if entry:
+                            entry[0] += 1
                         else:
-                            db.add(ProtocolCooccurrence(
-                                tenant_id=tenant_id,
-                                technique_entity_id=tech_entity.id,
-                                target_entity_id=target_entity.id,
-                                target_type="equipment",
-                                cooccurrence_count=1,
-                                source_protocols=[{"source": protocol.get("source", ""), "title": protocol.get("title", "")}],
-                                confidence=0.1,
-                            ))
-                            cooc_count += 1
+                            pairs[(tech_key, target_key)] = [
+                                1, {"source": protocol.get("source", ""), "title": protocol.get("title", "")}
+                            ]
 
                 protocols_processed += 1
-                if protocols_processed % 1000 == 0:
-                    db.commit()
-                    logger.info(f"[ProtocolGraph] Processed {protocols_processed} protocols, {cooc_count} co-occurrences")
+                if protocols_processed % 10000 == 0:
+                    logger.info(f"[ProtocolGraph] Read {protocols_processed} protocols, {len(pairs)} pairs")
 
-        db.commit()
+        entity_ids = self._resolve_corpus_entities(db, names, tenant_id)
+
+        rows = [{
+            'technique_entity_id': entity_ids[tech_key],
+            'target_entity_id': entity_ids[target_key],
+            'target_type': target_key[0],
+            'cooccurrence_count': count,
+            'source_protocols': [source],
+        } for (tech_key, target_key), (count, source) in pairs.items()]
+
+        cooc_count = upsert_cooccurrences(db, rows, tenant_id=tenant_id)
         logger.info(f"[ProtocolGraph] Corpus processing complete: {protocols_processed} protocols, {cooc_count} co-occurrences")
         return cooc_count
+
+    def _resolve_corpus_entities(self, db, names: dict, tenant_id=None) -> dict:
+        """
+        Map (entity_type, normalized_name) -> ProtocolEntity.id for corpus entities,
+        creating the missing ones. Only corpus-level entities (no document) of the
+        same tenant scope are reused, never a tenant document's extracted entities.
+        """
+        import uuid
+        from collections import defaultdict
+        from datetime import datetime, timezone
+
+        by_type = defaultdict(list)
+        for entity_type, normalized in names:
+            by_type[entity_type].append(normalized)
+
+        entity_ids = {}
+        for entity_type, normalized_names in by_type.items():
+            for start in range(0, len(normalized_names), COOCCURRENCE_BATCH_SIZE):
+                batch = normalized_names[start:start + COOCCURRENCE_BATCH_SIZE]
+                query = db.query(ProtocolEntity.id, ProtocolEntity.normalized_name).filter(
+                    ProtocolEntity.entity_type == entity_type,
+                    ProtocolEntity.normalized_name.in_(batch),
+                    ProtocolEntity.document_id.is_(None),
+                    ProtocolEntity.tenant_id == tenant_id if tenant_id else ProtocolEntity.tenant_id.is_(None),
+                )
+                for entity_id, normalized in query:
+                    entity_ids.setdefault((entity_type, normalized), entity_id)
+
+        now = datetime.now(timezone.utc)
+        missing = [{
+            'id': str(uuid.uuid4()),
+            'tenant_id': tenant_id,
+            'document_id': None,
+            'entity_type': key[0],
+            'name': names[key],
+            'normalized_name': key[1],
+            'attributes': {},
+            'created_at': now,
+        } for key in names if key not in entity_ids]
+
+        for start in range(0, len(missing), COOCCURRENCE_BATCH_SIZE):
+            db.execute(ProtocolEntity.__table__.insert(), missing[start:start + COOCCURRENCE_BATCH_SIZE])
+        db.commit()
+        for row in missing:
+            entity_ids[(row['entity_type'], row['normalized_name'])] = row['id']
+
+        logger.info(f"[ProtocolGraph] Resolved {len(names)} corpus entities ({len(missing)} new)")
+        return entity_ids
+
+
+def upsert_cooccurrences(db, rows: list, tenant_id=None, additive: bool = False) -> int:
+    """
+    Write co-occurrence rows in batches, keyed by (technique_entity_id, target_entity_id).
+
+    Args:
+        db: Database session
+        rows: Dicts with technique_entity_id, target_entity_id, target_type,
+            cooccurrence_count and source_protocols
+        tenant_id: tenant_id for newly inserted rows
+        additive: Add counts and sources to existing rows instead of replacing them
+
+    Returns:
+        Number of rows written
+    """
+    import uuid
+    from datetime import datetime, timezone
+    from sqlalchemy import bindparam, tuple_
+
+    if not rows:
+        return 0
+
+    table = ProtocolCooccurrence.__table__
+    key_columns = (table.c.technique_entity_id, table.c.target_entity_id)
+    dialect = db.get_bind().dialect.name
+    now = datetime.now(timezone.utc)
+
+    for start in range(0, len(rows), COOCCURRENCE_BATCH_SIZE):
+        batch = rows[start:start + COOCCURRENCE_BATCH_SIZE]
+
+        existing = {}
+        if additive or dialect not in ('postgresql', 'sqlite'):
+            keys = [(r['technique_entity_id'], r['target_entity_id']) for r in batch]
+            for row in db.execute(
+                table.select().with_only_columns(
+                    table.c.id, *key_columns, table.c.cooccurrence_count, table.c.source_protocols
+                ).where(tuple_(*key_columns).in_(keys))
+            ):
+                existing[(row.technique_entity_id, row.target_entity_id)] = row
+
+        values = []
+        for r in batch:
+            count = r['cooccurrence_count']
+            sources = list(r['source_protocols'])
+            current = existing.get((r['technique_entity_id'], r['target_entity_id']))
+            if additive and current is not None:
+                count += current.cooccurrence_count or 0
+                sources = list(current.source_protocols or []) + sources
+            values.append({
+                'id': current.id if current is not None else str(uuid.uuid4()),
+                'tenant_id': tenant_id,
+                'technique_entity_id': r['technique_entity_id'],
+                'target_entity_id': r['target_entity_id'],
+                'target_type': r['target_type'],
+                'cooccurrence_count': count,
+                'source_protocols': sources,
+                'confidence': min(1.0, count / 10.0),
+                'first_seen': now,
+                'last_seen': now,
+            })
+
+        if dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['technique_entity_id', 'target_entity_id'],
+                set_={
+                    'target_type': stmt.excluded.target_type,
+                    'cooccurrence_count': stmt.excluded.cooccurrence_count,
+                    'source_protocols': stmt.excluded.source_protocols,
+                    'confidence': stmt.excluded.confidence,
+                    'last_seen': stmt.excluded.last_seen,
+                },
+            )
+            db.execute(stmt, values)
+        else:
+            updates = [v for v in values if (v['technique_entity_id'], v['target_entity_id']) in existing]
+            inserts = [v for v in values if (v['technique_entity_id'], v['target_entity_id']) not in existing]
+            if updates:
+                db.execute(
+                    table.update().where(table.c.id == bindparam('row_id')).values(
+                        cooccurrence_count=bindparam('new_count'),
+                        source_protocols=bindparam('new_sources'),
+                        confidence=bindparam('new_confidence'),
+                        last_seen=bindparam('new_last_seen'),
+                    ),
+                    [{'row_id': v['id'], 'new_count': v['cooccurrence_count'],
+                      'new_sources': v['source_protocols'], 'new_confidence': v['confidence'],
+                      'new_last_seen': v['last_seen']} for v in updates],
+                )
+            if inserts:
+                db.execute(table.insert(), inserts)
+        db.commit()
+
+    return len(rows)
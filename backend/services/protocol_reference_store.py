@@ -1,17 +1,48 @@
 """
 Protocol Reference Store
 =========================
-In-memory TF-IDF index of protocol corpus for gap comparison.
+TF-IDF index of protocol corpus for gap comparison.
 
 Provides:
   - find_similar_protocols(text, top_k) → matched protocols
   - find_missing_steps(protocol_steps, domain) → expected steps not found
   - get_domain_stats(domain) → typical step count, common reagents, etc.
+
+The fitted index is persisted under PROTOCOL_INDEX_DIR so a worker start
+memory-maps it instead of re-reading the corpus and refitting:
+
+  CURRENT                        name of the active version directory
+  .lock                          file lock serializing save + prune across processes
+  <version>/manifest.json        vectorizer params, shape, corpus fingerprint
+  <version>/vocabulary.json      fitted terms in column order
+  <version>/idf.npy
+  <version>/tfidf_data.npy       CSR matrix arrays (memory-mapped on load)
+  <version>/tfidf_indices.npy
+  <version>/tfidf_indptr.npy
+  <version>/metadata.json        result fields, one list per column
+  <version>/domains.npz          row indices per domain
+  <version>/domain_stats.json
+
+Protocols appended to the unified corpus are transformed with the fitted
+vocabulary and appended to the index without a refit, until they exceed
+PROTOCOL_INDEX_REFIT_RATIO of the fitted rows. A rewritten corpus (e.g. a
+re-run of the normalizer) triggers a full rebuild.
+
+Building and updating are offline work (the update_reference_store Celery
+task, via reload_store()). Web workers only memory-map the current version
+in get_store(); a missing or stale index queues that task instead of fitting
+TF-IDF inside a request.
 """
 
 import os
 import json
+import time
+import shutil
+import hashlib
 import logging
+import fcntl
+import threading
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional, Tuple
 from collections import Counter, defaultdict
 
@@ -19,80 +50,281 @@ logger = logging.getLogger(__name__)
 
 CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'protocol_corpus')
 UNIFIED_CORPUS = os.path.join(CORPUS_DIR, 'unified_corpus.jsonl')
+PROTOCOL_INDEX_DIR = os.getenv('PROTOCOL_INDEX_DIR', os.path.join(CORPUS_DIR, 'reference_index'))
+# Appended rows beyond this fraction of the fitted rows force a refit (IDF drift)
+PROTOCOL_INDEX_REFIT_RATIO = float(os.getenv('PROTOCOL_INDEX_REFIT_RATIO', '0.2'))
+# How often get_store() looks for a newer index written by another process
+PROTOCOL_INDEX_CHECK_SECONDS = float(os.getenv('PROTOCOL_INDEX_CHECK_SECONDS', '30'))
+
+MAX_PROTOCOLS = 30000
+INDEX_FORMAT_VERSION = 1
+VECTORIZER_PARAMS = {
+    'max_features': 10000,
+    'ngram_range': (1, 2),
+    'min_df': 2,
+    'max_df': 0.95,
+    'sublinear_tf': True,
+}
+METADATA_COLUMNS = ('title', 'domain', 'source', 'num_steps', 'step_verbs', 'reagents', 'equipment')
 
 _store = None
 _store_loaded = False
+_store_checked_at = 0.0
+_store_lock = threading.Lock()
+_index_update_queued = False
+
+
+def _protocol_text(p: Dict) -> str:
+    """Title + step text used for matching."""
+    step_texts = ' '.join(s.get('text', '') for s in p.get('steps', []))
+    return f"{p.get('title', '')} {step_texts}"[:5000]
+
+
+def _read_corpus(path: str, start: int = 0, limit: int = MAX_PROTOCOLS) -> Tuple[List[Dict], int]:
+    """
+    Read protocols from a JSONL corpus starting at byte offset `start`.
+
+    Returns:
+        (protocols, offset) where offset is the end of the last line consumed.
+        Reading stops before the first protocol past `limit`, and before a
+        trailing partial line that is still being written.
+    """
+    protocols = []
+    offset = start
+    with open(path, 'rb') as f:
+        f.seek(start)
+        for raw in f:
+            line = raw.strip()
+            if line and len(protocols) >= limit:
+                break
+            if line:
+                try:
+                    protocols.append(json.loads(line))
+                except json.JSONDecodeError:
+                    if not raw.endswith(b'\n'):
+                        break
+            offset += len(raw)
+    return protocols, offset
+
+
+def _version_ns(name: Optional[str]) -> Optional[int]:
+    """Creation time encoded in a version directory name (v<time_ns>)."""
+    if not name or not name.startswith('v'):
+        return None
+    try:
+        return int(name[1:])
+    except ValueError:
+        return None
+
+
+def _md5_prefix(path: str, length: int) -> str:
+    """md5 of the first `length` bytes of a file."""
+    digest = hashlib.md5()
+    remaining = length
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+class ProtocolColumns:
+    """Protocol fields needed for results and domain stats, stored column-wise."""
+
+    def __init__(self, columns: Optional[Dict[str, List]] = None):
+        self.columns = columns or {name: [] for name in METADATA_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.columns['title'])
+
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        return {name: column[idx] for name, column in self.columns.items()}
+
+    def extend(self, protocols: List[Dict]):
+        for p in protocols:
+            steps = p.get('steps', [])
+            self.columns['title'].append(p.get('title', ''))
+            self.columns['domain'].append(p.get('domain', ''))
+            self.columns['source'].append(p.get('source', ''))
+            self.columns['num_steps'].append(len(steps))
+            self.columns['step_verbs'].append([s.get('action_verb', '') for s in steps if s.get('action_verb')])
+            self.columns['reagents'].append(p.get('reagents', []))
+            self.columns['equipment'].append(p.get('equipment', []))
 
 
 class ProtocolReferenceStore:
-    """In-memory TF-IDF index over protocol corpus."""
+    """TF-IDF index over protocol corpus, persisted as memory-mapped arrays."""
 
-    def __init__(self):
-        self.protocols: List[Dict] = []
+    def __init__(self, corpus_path: str = UNIFIED_CORPUS, index_dir: str = PROTOCOL_INDEX_DIR):
+        self.corpus_path = corpus_path
+        self.index_dir = index_dir
+        self.protocols = ProtocolColumns()
         self.vectorizer = None
         self.tfidf_matrix = None
         self.domain_stats: Dict[str, Dict] = {}
-        self.domain_protocols: Dict[str, List[int]] = defaultdict(list)
-
-    def load(self, max_protocols: int = 30000) -> bool:
-        """Load corpus and build TF-IDF index."""
-        if not os.path.exists(UNIFIED_CORPUS):
+        self.domain_protocols: Dict[str, Any] = {}
+        self.manifest: Dict[str, Any] = {}
+        self.version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return len(self.protocols) > 0
+
+    def load(self) -> bool:
+        """Memory-map the persisted index (never builds; see refresh())."""
+        if self.load_index():
+            return True
+        if not os.path.exists(self.corpus_path):
+            logger.warning('[RefStore] Unified corpus not found')
+        return False
+
+    def refresh(self, max_protocols: Optional[int] = None, full_rebuild: bool = False) -> bool:
+        """Load the persisted index and bring it up to date with the corpus (offline)."""
+        if not full_rebuild and self.load_index():
+            if self.needs_update():
+                self.update_from_corpus(max_protocols)
+            return True
+        return self.build(max_protocols or MAX_PROTOCOLS)
+
+    def needs_update(self) -> bool:
+        """True if the corpus has changed since the loaded index was written."""
+        return os.path.exists(self.corpus_path) and (not self.manifest or self._corpus_changed())
+
+    def build(self, max_protocols: int = MAX_PROTOCOLS) -> bool:
+        """Read the corpus, fit the TF-IDF index and persist it."""
+        if not os.path.exists(self.corpus_path):
             logger.warning('[RefStore] Unified corpus not found')
             return False
 
-        # Load protocols
-        self.protocols = []
-        with open(UNIFIED_CORPUS, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and len(self.protocols) < max_protocols:
-                    try:
-                        self.protocols.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
-
-        if not self.protocols:
+        protocols, offset = _read_corpus(self.corpus_path, limit=max_protocols)
+        if not protocols:
             logger.warning('[RefStore] No protocols loaded')
             return False
 
-        logger.info(f'[RefStore] Loaded {len(self.protocols)} protocols')
+        logger.info(f'[RefStore] Loaded {len(protocols)} protocols')
 
-        # Index by domain
-        for i, p in enumerate(self.protocols):
-            domain = p.get('domain', 'unknown')
-            self.domain_protocols[domain].append(i)
+        self.protocols = ProtocolColumns()
+        self.protocols.extend(protocols)
+        self.domain_protocols = {}
+        self._index_domains(protocols, start=0)
+        self.vectorizer = None
+        self.tfidf_matrix = None
 
-        # Build TF-IDF index
         try:
             from sklearn.feature_extraction.text import TfidfVectorizer
 
-            texts = []
-            for p in self.protocols:
-                # Combine title + steps for matching
-                step_texts = ' '.join(s.get('text', '') for s in p.get('steps', []))
-                texts.append(f"{p.get('title', '')} {step_texts}"[:5000])
-
-            self.vectorizer = TfidfVectorizer(
-                max_features=10000,
-                ngram_range=(1, 2),
-                min_df=2,
-                max_df=0.95,
-                sublinear_tf=True,
-            )
-            self.tfidf_matrix = self.vectorizer.fit_transform(texts)
+            self.vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+            self.tfidf_matrix = self.vectorizer.fit_transform([_protocol_text(p) for p in protocols])
             logger.info(f'[RefStore] Built TF-IDF index: {self.tfidf_matrix.shape}')
 
         except ImportError:
             logger.warning('[RefStore] scikit-learn not installed, search disabled')
-            self.vectorizer = None
 
-        # Compute domain stats
         self._compute_domain_stats()
-
+        self.manifest = {
+            'format': INDEX_FORMAT_VERSION,
+            'fitted_rows': len(protocols),
+            'max_protocols': max_protocols,
+        }
+        self._record_corpus(offset)
+        if self.vectorizer is not None:
+            self._save_quietly()
         return True
 
+    def append(self, protocols: List[Dict], corpus_offset: Optional[int] = None) -> int:
+        """
+        Add protocols to the index using the fitted vocabulary and IDF.
+
+        Returns:
+            Number of protocols appended
+        """
+        if not protocols or self.vectorizer is None or self.tfidf_matrix is None:
+            return 0
+
+        from scipy import sparse
+
+        start = len(self.protocols)
+        new_rows = self.vectorizer.transform([_protocol_text(p) for p in protocols])
+        self.tfidf_matrix = sparse.vstack([self.tfidf_matrix, new_rows], format='csr')
+        self.protocols.extend(protocols)
+        self._index_domains(protocols, start=start)
+        self._compute_domain_stats()
+        if corpus_offset is not None:
+            self._record_corpus(corpus_offset)
+        self._save_quietly()
+        logger.info(f'[RefStore] Appended {len(protocols)} protocols: {self.tfidf_matrix.shape}')
+        return len(protocols)
+
+    def update_from_corpus(self, max_protocols: Optional[int] = None) -> int:
+        """
+        Bring the index up to date with the corpus file.
+
+        Lines appended since the last build are added via append(); a
+        rewritten corpus, or too many appended rows, triggers build().
+
+        Returns:
+            Number of protocols added (or indexed, after a rebuild)
+        """
+        if max_protocols is None:
+            max_protocols = self.manifest.get('max_protocols', MAX_PROTOCOLS)
+        if not os.path.exists(self.corpus_path):
+            return 0
+
+        indexed = self.manifest.get('corpus_bytes', 0)
+        size = os.path.getsize(self.corpus_path)
+        appended_only = (
+            self.vectorizer is not None
+            and self.manifest.get('max_protocols') == max_protocols
+            and size >= indexed
+            and _md5_prefix(self.corpus_path, indexed) == self.manifest.get('corpus_md5')
+        )
+        if not appended_only:
+            logger.info('[RefStore] Corpus rewritten, rebuilding index')
+            return len(self.protocols) if self.build(max_protocols) else 0
+
+        new, offset = _read_corpus(self.corpus_path, start=indexed, limit=max_protocols - len(self.protocols))
+        if not new:
+            return 0
+        if len(self.protocols) + len(new) > self.manifest['fitted_rows'] * (1 + PROTOCOL_INDEX_REFIT_RATIO):
+            logger.info(f'[RefStore] {len(new)} new protocols exceed refit ratio, rebuilding index')
+            return len(self.protocols) if self.build(max_protocols) else 0
+        return self.append(new, corpus_offset=offset)
+
+    def _index_domains(self, protocols: List[Dict], start: int):
+        import numpy as np
+
+        grouped = defaultdict(list)
+        for i, p in enumerate(protocols, start):
+            grouped[p.get('domain', 'unknown')].append(i)
+        for domain, rows in grouped.items():
+            rows = np.asarray(rows, dtype=np.int32)
+            if domain in self.domain_protocols:
+                rows = np.concatenate([self.domain_protocols[domain], rows])
+            self.domain_protocols[domain] = rows
+
+    def _record_corpus(self, offset: int):
+        self.manifest['corpus_bytes'] = offset
+        self.manifest['corpus_md5'] = _md5_prefix(self.corpus_path, offset)
+        stat = os.stat(self.corpus_path)
+        self.manifest['corpus_size'] = stat.st_size
+        self.manifest['corpus_mtime'] = stat.st_mtime
+
+    def _corpus_changed(self) -> bool:
+        try:
+            stat = os.stat(self.corpus_path)
+        except OSError:
+            return False
+        return (stat.st_size != self.manifest.get('corpus_size')
+                or stat.st_mtime != self.manifest.get('corpus_mtime'))
+
     def _compute_domain_stats(self):
         """Compute per-domain statistics."""
+        columns = self.protocols.columns
+        self.domain_stats = {}
         for domain, indices in self.domain_protocols.items():
             step_counts = []
             action_verbs = Counter()
@@ -100,19 +332,15 @@ class ProtocolReferenceStore:
             equipment_counts = Counter()
 
             for idx in indices:
-                p = self.protocols[idx]
-                steps = p.get('steps', [])
-                step_counts.append(len(steps))
+                step_counts.append(columns['num_steps'][idx])
 
-                for step in steps:
-                    v = step.get('action_verb')
-                    if v:
-                        action_verbs[v.lower()] += 1
+                for v in columns['step_verbs'][idx]:
+                    action_verbs[v.lower()] += 1
 
-                for r in p.get('reagents', []):
+                for r in columns['reagents'][idx]:
                     reagent_counts[r.lower()] += 1
 
-                for e in p.get('equipment', []):
+                for e in columns['equipment'][idx]:
                     equipment_counts[e.lower()] += 1
 
             self.domain_stats[domain] = {
@@ -124,41 +352,183 @@ class ProtocolReferenceStore:
                 'top_equipment': [e for e, _ in equipment_counts.most_common(20)],
             }
 
+    @contextmanager
+    def _exclusive(self):
+        """Thread lock plus the cross-process file lock that serializes save + prune."""
+        os.makedirs(self.index_dir, exist_ok=True)
+        with self._lock, open(os.path.join(self.index_dir, '.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def save(self):
+        """Write the index to a new version directory and point CURRENT at it."""
+        with self._exclusive():
+            self._save_version()
+
+    def _save_version(self):
+        import numpy as np
+
+        version = f'v{time.time_ns()}'
+        path = os.path.join(self.index_dir, version)
+        os.makedirs(path)
+
+        matrix = self.tfidf_matrix
+        np.save(os.path.join(path, 'tfidf_data.npy'), np.asarray(matrix.data))
+        np.save(os.path.join(path, 'tfidf_indices.npy'), np.asarray(matrix.indices))
+        np.save(os.path.join(path, 'tfidf_indptr.npy'), np.asarray(matrix.indptr))
+        np.save(os.path.join(path, 'idf.npy'), self.vectorizer.idf_)
+
+        vocabulary = sorted(self.vectorizer.vocabulary_, key=self.vectorizer.vocabulary_.get)
+        domains = list(self.domain_protocols)
+        np.savez(os.path.join(path, 'domains.npz'),
+                 **{f'd{i}': self.domain_protocols[d] for i, d in enumerate(domains)})
+
+        self.manifest.update({
+            'shape': list(matrix.shape),
+            'vectorizer': {k: list(v) if isinstance(v, tuple) else v for k, v in VECTORIZER_PARAMS.items()},
+            'domains': domains,
+            'saved_at': time.time(),
+        })
+        for name, value in (('vocabulary.json', vocabulary),
+                            ('metadata.json', self.protocols.columns),
+                            ('domain_stats.json', self.domain_stats),
+                            ('manifest.json', self.manifest)):
+            with open(os.path.join(path, name), 'w') as f:
+                json.dump(value, f)
+
+        replaced = self.current_version()
+        pointer = os.path.join(self.index_dir, 'CURRENT')
+        with open(pointer + '.tmp', 'w') as f:
+            f.write(version)
+        os.replace(pointer + '.tmp', pointer)
+        self.version = version
+        # Web workers may still be mapping the version CURRENT pointed at until now
+        self._prune_versions(keep={replaced})
+
+    def _save_quietly(self):
+        # A read-only data dir still leaves a usable in-memory index
+        try:
+            self.save()
+        except OSError as e:
+            logger.warning(f'[RefStore] Could not persist index: {e}')
+
+    def _prune_versions(self, keep: set):
+        """
+        Remove versions older than CURRENT, except `keep`. Caller holds _exclusive().
+
+        Processes still mapping an older version keep their open file handles.
+        """
+        current = _version_ns(self.current_version())
+        if current is None:
+            return
+        for name in os.listdir(self.index_dir):
+            created = _version_ns(name)
+            if created is not None and created < current and name not in keep:
+                shutil.rmtree(os.path.join(self.index_dir, name), ignore_errors=True)
+
+    def current_version(self) -> Optional[str]:
+        """Version named by the CURRENT pointer on disk, if any."""
+        try:
+            with open(os.path.join(self.index_dir, 'CURRENT')) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def load_index(self) -> bool:
+        """Memory-map the persisted index. Returns False if there is none."""
+        version = self.current_version()
+        if not version:
+            return False
+        path = os.path.join(self.index_dir, version)
+
+        try:
+            import numpy as np
+            from scipy import sparse
+            from sklearn.feature_extraction.text import TfidfVectorizer
+
+            with open(os.path.join(path, 'manifest.json')) as f:
+                manifest = json.load(f)
+            if manifest.get('format') != INDEX_FORMAT_VERSION:
+                return False
+            with open(os.path.join(path, 'vocabulary.json')) as f:
+                vocabulary = {term: i for i, term in enumerate(json.load(f))}
+            with open(os.path.join(path, 'metadata.json')) as f:
+                columns = json.load(f)
+            with open(os.path.join(path, 'domain_stats.json')) as f:
+                domain_stats = json.load(f)
+
+            params = dict(manifest['vectorizer'])
+            params['ngram_range'] = tuple(params['ngram_range'])
+            vectorizer = TfidfVectorizer(vocabulary=vocabulary, **params)
+            vectorizer.idf_ = np.load(os.path.join(path, 'idf.npy'))
+
+            matrix = sparse.csr_matrix(
+                (np.load(os.path.join(path, 'tfidf_data.npy'), mmap_mode='r'),
+                 np.load(os.path.join(path, 'tfidf_indices.npy'), mmap_mode='r'),
+                 np.load(os.path.join(path, 'tfidf_indptr.npy'), mmap_mode='r')),
+                shape=tuple(manifest['shape']),
+                copy=False,
+            )
+            with np.load(os.path.join(path, 'domains.npz')) as arrays:
+                domain_protocols = {d: arrays[f'd{i}'] for i, d in enumerate(manifest['domains'])}
+
+        except (OSError, ValueError, KeyError, ImportError) as e:
+            logger.warning(f'[RefStore] Could not load index {version}: {e}')
+            return False
+
+        self.manifest = manifest
+        self.vectorizer = vectorizer
+        self.tfidf_matrix = matrix
+        self.protocols = ProtocolColumns(columns)
+        self.domain_protocols = domain_protocols
+        self.domain_stats = domain_stats
+        self.version = version
+        logger.info(f'[RefStore] Loaded index {version}: {matrix.shape}')
+        return True
+
     def find_similar_protocols(self, text: str, top_k: int = 5,
                                 domain: Optional[str] = None) -> List[Dict]:
         """Find protocols most similar to the given text."""
-        if self.vectorizer is None or self.tfidf_matrix is None:
+        if self.vectorizer is None or self.tfidf_matrix is None or top_k <= 0:
             return []
 
         try:
-            from sklearn.metrics.pairwise import cosine_similarity
             import numpy as np
 
             query_vec = self.vectorizer.transform([text[:5000]])
-            similarities = cosine_similarity(query_vec, self.tfidf_matrix).flatten()
 
-            # Filter by domain if specified
+            # Rows are L2-normalized, so cosine similarity is a dot product.
+            # A domain filter scores only that domain's rows.
+            rows = None
+            matrix = self.tfidf_matrix
             if domain and domain in self.domain_protocols:
-                mask = set(self.domain_protocols[domain])
-                for i in range(len(similarities)):
-                    if i not in mask:
-                        similarities[i] = 0.0
+                rows = self.domain_protocols[domain]
+                matrix = matrix[rows]
+            similarities = (matrix @ query_vec.T).toarray().ravel()
+            if similarities.size == 0:
+                return []
 
-            top_indices = np.argsort(similarities)[-top_k:][::-1]
+            k = min(top_k, similarities.size)
+            top = np.argpartition(-similarities, k - 1)[:k]
+            top = top[np.argsort(-similarities[top], kind='stable')]
 
+            columns = self.protocols.columns
             results = []
-            for idx in top_indices:
-                if similarities[idx] > 0.05:  # Minimum similarity threshold
-                    p = self.protocols[idx]
+            for pos in top:
+                if similarities[pos] > 0.05:  # Minimum similarity threshold
+                    idx = int(rows[pos]) if rows is not None else int(pos)
                     results.append({
-                        'title': p.get('title', ''),
-                        'domain': p.get('domain', ''),
-                        'source': p.get('source', ''),
-                        'num_steps': len(p.get('steps', [])),
-                        'similarity': round(float(similarities[idx]), 3),
-                        'step_verbs': [s.get('action_verb', '') for s in p.get('steps', []) if s.get('action_verb')],
-                        'reagents': p.get('reagents', [])[:10],
-                        'equipment': p.get('equipment', [])[:10],
+                        'title': columns['title'][idx],
+                        'domain': columns['domain'][idx],
+                        'source': columns['source'][idx],
+                        'num_steps': columns['num_steps'][idx],
+                        'similarity': round(float(similarities[pos]), 3),
+                        'step_verbs': list(columns['step_verbs'][idx]),
+                        'reagents': columns['reagents'][idx][:10],
+                        'equipment': columns['equipment'][idx][:10],
                     })
 
             return results
@@ -221,23 +591,68 @@ class ProtocolReferenceStore:
 
 
 def get_store() -> ProtocolReferenceStore:
-    """Get or create the singleton reference store."""
-    global _store, _store_loaded
+    """
+    Get or create the singleton reference store.
+
+    Every PROTOCOL_INDEX_CHECK_SECONDS the on-disk CURRENT pointer is checked,
+    so an index updated by the Celery worker is picked up without a restart.
+    The index is only memory-mapped here; building it is queued to Celery.
+    """
+    global _store, _store_loaded, _store_checked_at
 
     if _store_loaded:
+        now = time.monotonic()
+        if now - _store_checked_at >= PROTOCOL_INDEX_CHECK_SECONDS:
+            _store_checked_at = now
+            version = _store.current_version()
+            if version and version != _store.version:
+                store = ProtocolReferenceStore()
+                if store.load_index():
+                    _store = store
         return _store
 
-    _store_loaded = True
-    _store = ProtocolReferenceStore()
-    if not _store.load():
-        logger.info('[RefStore] Reference store not available (corpus not ingested yet)')
+    with _store_lock:
+        if not _store_loaded:
+            store = ProtocolReferenceStore()
+            if not store.load():
+                logger.info('[RefStore] Reference index not available yet')
+            if store.needs_update():
+                _queue_index_update()
+            _store = store
+            _store_checked_at = time.monotonic()
+            _store_loaded = True
 
     return _store
 
 
-def reload_store():
-    """Force reload the reference store."""
-    global _store, _store_loaded
-    _store = None
-    _store_loaded = False
-    get_store()
+def _queue_index_update():
+    """Ask the Celery worker to build / update the index (once per process)."""
+    global _index_update_queued
+    if _index_update_queued:
+        return
+    _index_update_queued = True
+    try:
+        from tasks.protocol_training_tasks import update_reference_store
+        update_reference_store.delay()
+        logger.info('[RefStore] Queued reference index update')
+    except Exception as e:
+        logger.warning(f'[RefStore] Could not queue reference index update: {e}')
+
+
+def reload_store(full_rebuild: bool = False) -> ProtocolReferenceStore:
+    """
+    Bring the persisted index up to date with the corpus and swap it in.
+
+    New corpus lines are appended without a refit unless full_rebuild is set.
+    Runs in the Celery worker (update_reference_store), not in web requests.
+    """
+    global _store, _store_loaded, _store_checked_at
+
+    store = ProtocolReferenceStore()
+    store.refresh(full_rebuild=full_rebuild)
+
+    with _store_lock:
+        _store = store
+        _store_checked_at = time.monotonic()
+        _store_loaded = True
+    return store
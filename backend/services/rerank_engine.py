@@ -0,0 +1,269 @@
+"""
+Rerank Engine - shared, batched cross-encoder scoring for CPU-only pods
+
+One engine per process (`get_rerank_engine()`) instead of one model per
+search service instance:
+- Backends: "torch" (sentence-transformers, full precision), "quantized"
+  (same model with int8 dynamic quantization of the Linear layers) and
+  "onnx" (ONNX Runtime via optimum). Falls back to torch if the requested
+  backend's packages are missing. Select with RERANKER_BACKEND.
+- Length-bucketed batching: pairs are sorted by length and scored in small
+  batches so short chunks are not padded to the longest chunk in the set.
+- Score cache: LRU keyed by (query hash, chunk id + content hash), so
+  repeated and paginated queries only score candidates they haven't seen.
+- Bounded worker pool shared by all requests: concurrent chats queue for
+  RERANKER_MAX_WORKERS model slots instead of all running the model at once.
+"""
+
+import os
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.embedding_cache import EmbeddingLRUCache
+
+RERANKER_MODEL_NAME = os.getenv("RERANKER_MODEL_NAME", "cross-encoder/ms-marco-MiniLM-L-12-v2")
+RERANKER_BACKEND = os.getenv("RERANKER_BACKEND", "torch").lower()  # torch | quantized | onnx
+RERANKER_BATCH_SIZE = int(os.getenv("RERANKER_BATCH_SIZE", "16"))
+RERANKER_MAX_WORKERS = int(os.getenv("RERANKER_MAX_WORKERS", "2"))
+RERANKER_TIMEOUT_SECONDS = float(os.getenv("RERANKER_TIMEOUT_SECONDS", "10"))
+RERANKER_CACHE_MAX_ENTRIES = int(os.getenv("RERANKER_CACHE_MAX_ENTRIES", "20000"))
+RERANKER_CACHE_TTL_SECONDS = int(os.getenv("RERANKER_CACHE_TTL_SECONDS", "1800"))
+
+# ms-marco handles ~512 tokens; 2000 chars is roughly that
+MAX_PASSAGE_CHARS = 2000
+
+BACKENDS = ("torch", "quantized", "onnx")
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+def _load_torch_backend(model_name: str) -> Callable[[List[Tuple[str, str]]], List[float]]:
+    from sentence_transformers import CrossEncoder
+    model = CrossEncoder(model_name, device="cpu")
+
+    def score(pairs):
+        return [float(s) for s in model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)]
+    return score
+
+
+def _load_quantized_backend(model_name: str) -> Callable[[List[Tuple[str, str]]], List[float]]:
+    import torch
+    from sentence_transformers import CrossEncoder
+    model = CrossEncoder(model_name, device="cpu")
+    model.model = torch.quantization.quantize_dynamic(
+        model.model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+    def score(pairs):
+        return [float(s) for s in model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)]
+    return score
+
+
+def _load_onnx_backend(model_name: str) -> Callable[[List[Tuple[str, str]]], List[float]]:
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+
+    def score(pairs):
+        inputs = tokenizer(
+            [q for q, _ in pairs], [p for _, p in pairs],
+            padding=True, truncation=True, max_length=512, return_tensors="np"
+        )
+        logits = model(**inputs).logits
+        # Single-logit relevance head, same scale as CrossEncoder.predict
+        return [float(row[0]) for row in logits]
+    return score
+
+
+_BACKEND_LOADERS = {
+    "torch": _load_torch_backend,
+    "quantized": _load_quantized_backend,
+    "onnx": _load_onnx_backend,
+}
+
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+def _query_hash(query: str) -> str:
+    return hashlib.sha256(query.strip().lower().encode("utf-8", errors="replace")).hexdigest()[:16]
+
+
+def _chunk_key(result: Dict, passage: str) -> str:
+    """Chunk ID plus a short content hash (same ID can carry new text after a re-sync)."""
+    chunk_id = result.get('chunk_id') or result.get('id') or result.get('doc_id') or ''
+    digest = hashlib.md5(passage.encode("utf-8", errors="replace")).hexdigest()[:12]
+    return f"{chunk_id}:{digest}"
+
+
+class RerankEngine:
+    """
+    Cross-encoder scoring with caching and a shared worker pool.
+
+    Args:
+        backend: "torch", "quantized" or "onnx"
+        model_name: HuggingFace cross-encoder model
+        batch_size: Pairs per forward pass (after length bucketing)
+        max_workers: Concurrent scoring jobs across all requests
+        timeout: Seconds a request waits for scores before falling back
+        scorer: Optional callable(pairs) -> scores (tests/benchmarks; skips model loading)
+        cache_entries: Score cache size (0 disables the cache)
+    """
+
+    def __init__(
+        self,
+        backend: str = RERANKER_BACKEND,
+        model_name: str = RERANKER_MODEL_NAME,
+        batch_size: int = RERANKER_BATCH_SIZE,
+        max_workers: int = RERANKER_MAX_WORKERS,
+        timeout: float = RERANKER_TIMEOUT_SECONDS,
+        scorer: Optional[Callable[[List[Tuple[str, str]]], List[float]]] = None,
+        cache_entries: int = RERANKER_CACHE_MAX_ENTRIES,
+    ):
+        self.requested_backend = backend if backend in BACKENDS else "torch"
+        self.backend = None
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self._scorer = scorer
+        self._load_lock = threading.Lock()
+        self._load_failed = False
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="rerank")
+        self._cache = EmbeddingLRUCache(max_entries=cache_entries, ttl_seconds=RERANKER_CACHE_TTL_SECONDS) \
+            if cache_entries > 0 else None
+        self.pairs_scored = 0
+        self.timeouts = 0
+        if scorer is not None:
+            self.backend = "custom"
+
+    # ------------------------------------------------------------------ model
+
+    def _ensure_loaded(self) -> bool:
+        if self._scorer is not None:
+            return True
+        if self._load_failed:
+            return False
+        with self._load_lock:
+            if self._scorer is not None:
+                return True
+            candidates = [self.requested_backend] + (["torch"] if self.requested_backend != "torch" else [])
+            for backend in candidates:
+                try:
+                    start = time.time()
+                    self._scorer = _BACKEND_LOADERS[backend](self.model_name)
+                    self.backend = backend
+                    print(f"[RerankEngine] Loaded {self.model_name} ({backend}) in {time.time() - start:.1f}s", flush=True)
+                    return True
+                except ImportError as e:
+                    print(f"[RerankEngine] Backend '{backend}' unavailable: {e}", flush=True)
+                except Exception as e:
+                    print(f"[RerankEngine] Failed to load backend '{backend}': {e}", flush=True)
+            self._load_failed = True
+            return False
+
+    @property
+    def available(self) -> bool:
+        return self._ensure_loaded()
+
+    # ---------------------------------------------------------------- scoring
+
+    def _score_bucketed(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """Score pairs in length-sorted batches; returns scores in input order."""
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][1]))
+        scores = [0.0] * len(pairs)
+        for start in range(0, len(order), self.batch_size):
+            batch_idx = order[start:start + self.batch_size]
+            batch_scores = self._scorer([pairs[i] for i in batch_idx])
+            for i, s in zip(batch_idx, batch_scores):
+                scores[i] = float(s)
+        self.pairs_scored += len(pairs)
+        return scores
+
+    def score(self, query: str, results: List[Dict]) -> Optional[List[Optional[float]]]:
+        """
+        Cross-encoder score per result (None for results without content).
+
+        Returns None if the model is unavailable or scoring timed out, so the
+        caller can keep the retrieval order.
+        """
+        if not self._ensure_loaded():
+            return None
+
+        qhash = _query_hash(query)
+        scores: List[Optional[float]] = [None] * len(results)
+        pending_pairs, pending = [], []  # pairs to score, (result index, cache key)
+
+        for i, result in enumerate(results):
+            passage = (result.get('content', '') or result.get('content_preview', ''))[:MAX_PASSAGE_CHARS]
+            if not passage:
+                continue
+            key = f"{qhash}:{_chunk_key(result, passage)}"
+            cached = self._cache.get(key) if self._cache is not None else None
+            if cached is not None:
+                scores[i] = cached
+                continue
+            pending_pairs.append((query, passage))
+            pending.append((i, key))
+
+        if pending_pairs:
+            future = self._pool.submit(self._score_bucketed, pending_pairs)
+            try:
+                new_scores = future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                self.timeouts += 1
+                print(f"[RerankEngine] Scoring {len(pending_pairs)} pairs timed out after {self.timeout}s", flush=True)
+                return None
+            for (i, key), s in zip(pending, new_scores):
+                scores[i] = s
+                if self._cache is not None:
+                    self._cache.put(key, s)
+
+        return scores
+
+    def rerank(self, query: str, results: List[Dict], top_k: int = 10) -> List[Dict]:
+        """Sort results by cross-encoder score (sets result['rerank_score'])."""
+        if not results:
+            return results[:top_k]
+        try:
+            scores = self.score(query, results)
+        except Exception as e:
+            print(f"[RerankEngine] Reranking failed: {e}", flush=True)
+            return results[:top_k]
+        if scores is None:
+            return results[:top_k]
+
+        for result, s in zip(results, scores):
+            result['rerank_score'] = s if s is not None else 0.0
+        ranked = sorted(results, key=lambda r: r['rerank_score'], reverse=True)
+        return ranked[:top_k]
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.backend,
+            "requested_backend": self.requested_backend,
+            "model": self.model_name,
+            "pairs_scored": self.pairs_scored,
+            "timeouts": self.timeouts,
+            "cache": self._cache.stats() if self._cache is not None else None,
+        }
+
+
+_engine: Optional[RerankEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_rerank_engine() -> RerankEngine:
+    """Get or create the process-wide RerankEngine (model loads on first use)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RerankEngine()
+    return _engine
@@ -10,15 +10,47 @@ Phase-based progress:
   - extracting: 33% - 66%  (per-item accurate)
   - embedding:  66% - 99%  (per-item accurate)
   - complete:   100%
+
+Backends (SYNC_PROGRESS_BACKEND):
+  - "memory": progress and SSE fan-out live in this process only. An SSE
+    client or poll that lands on another gunicorn worker sees nothing.
+  - "redis": progress is stored in one Redis hash per sync and events are
+    published on a per-sync channel, so any worker can serve any SSE stream
+    or status poll. Events on the wire carry only the fields that changed;
+    each worker keeps a snapshot per watched sync and hands its local SSE
+    queues the merged full state (the payload shape is unchanged).
+    Only the worker running a sync keeps it in memory. Every other worker
+    re-reads it from Redis on each access, and all writes touch only the
+    hash fields that changed. A snapshot taken by another worker therefore
+    never goes stale, and a write from one worker cannot overwrite fields
+    set by another.
+
+Rapid increment_processed()/update_progress() calls are coalesced: at most
+one 'progress' event per SYNC_PROGRESS_EVENT_INTERVAL seconds per sync, with
+a trailing event so the last update is never lost. Status changes, completion
+and errors are emitted immediately.
 """
 
+import os
+import json
+import time
+import threading
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, field, fields
 from collections import defaultdict
 import uuid
 import queue  # Standard library thread-safe queue (works with gevent)
 
+SYNC_PROGRESS_BACKEND = os.getenv("SYNC_PROGRESS_BACKEND", "memory").lower()
+# Min seconds between coalesced 'progress' events for one sync
+SYNC_PROGRESS_EVENT_INTERVAL = float(os.getenv("SYNC_PROGRESS_EVENT_INTERVAL", "0.5"))
+# Redis hashes expire this long after their last write (completed syncs are
+# expired sooner by cleanup_old_syncs)
+SYNC_PROGRESS_TTL_SECONDS = int(os.getenv("SYNC_PROGRESS_TTL_SECONDS", "86400"))
+
+_DATETIME_FIELDS = ('started_at', 'completed_at')
+
 
 @dataclass
 class SyncProgress:
@@ -68,6 +100,254 @@ class SyncProgress:
         """Return server-calculated overall percent"""
         return self.overall_percent
 
+    def to_record(self) -> Dict[str, str]:
+        """Field -> JSON string, for storage in a Redis hash"""
+        record = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if f.name in _DATETIME_FIELDS and value is not None:
+                value = value.isoformat()
+            record[f.name] = json.dumps(value)
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict) -> 'SyncProgress':
+        """Inverse of to_record (keys/values may be bytes)"""
+        values = {}
+        for key, raw in record.items():
+            key = key.decode('utf-8') if isinstance(key, bytes) else key
+            values[key] = json.loads(raw)
+        known = {f.name for f in fields(cls)}
+        values = {k: v for k, v in values.items() if k in known}
+        for name in _DATETIME_FIELDS:
+            if values.get(name):
+                values[name] = datetime.fromisoformat(values[name])
+        return cls(**values)
+
+
+# =============================================================================
+# SUBSCRIBERS AND BACKENDS
+# =============================================================================
+
+class LocalSubscribers:
+    """SSE subscriber queues connected to this process."""
+
+    # Max SSE subscribers per sync_id to prevent memory leaks from reconnecting browsers
+    MAX_SUBSCRIBERS_PER_SYNC = 3
+
+    def __init__(self):
+        self._queues: Dict[str, List[queue.Queue]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def add(self, sync_id: str, initial_event: Optional[Dict] = None) -> queue.Queue:
+        """Register a new subscriber queue, evicting the oldest if at capacity"""
+        with self._lock:
+            subs = self._queues[sync_id]
+            while len(subs) >= self.MAX_SUBSCRIBERS_PER_SYNC:
+                old_q = subs.pop(0)
+                # Signal the old subscriber to close
+                try:
+                    old_q.put_nowait({'event': 'evicted', 'data': {'reason': 'new subscriber connected'}})
+                except queue.Full:
+                    pass
+                print(f"[SyncProgress] Evicted oldest subscriber for {sync_id} (was at {len(subs) + 1})")
+
+            q = queue.Queue(maxsize=100)
+            subs.append(q)
+            total = len(subs)
+
+        # Send current state immediately
+        if initial_event:
+            try:
+                q.put_nowait(initial_event)
+            except queue.Full:
+                pass
+
+        print(f"[SyncProgress] New subscriber for {sync_id} (total: {total})")
+        return q
+
+    def remove(self, sync_id: str, q: queue.Queue) -> bool:
+        """Remove a subscriber; True if it was the last one for this sync"""
+        with self._lock:
+            subs = self._queues.get(sync_id)
+            if subs is None:
+                return True
+            if q in subs:
+                subs.remove(q)
+                print(f"[SyncProgress] Unsubscribed from {sync_id}")
+            if not subs:
+                del self._queues[sync_id]
+                return True
+            return False
+
+    def has(self, sync_id: str) -> bool:
+        with self._lock:
+            return bool(self._queues.get(sync_id))
+
+    def deliver(self, sync_id: str, event: Dict):
+        """Send an event to every local subscriber (non-blocking)"""
+        with self._lock:
+            subs = list(self._queues.get(sync_id, ()))
+        for q in subs:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                print(f"[SyncProgress] Queue full for subscriber, skipping event")
+
+    def drop(self, sync_id: str):
+        with self._lock:
+            self._queues.pop(sync_id, None)
+
+
+class InMemorySyncProgressBackend:
+    """Single-process backend: nothing is shared, events go straight to local queues."""
+
+    def __init__(self, subscribers: LocalSubscribers):
+        self.subscribers = subscribers
+
+    def load(self, sync_id: str) -> Optional[SyncProgress]:
+        return None
+
+    def list_all(self) -> List[SyncProgress]:
+        return []
+
+    def emit(self, progress: SyncProgress, event_type: str, data: Dict, delta: Dict,
+             changed: Dict[str, str]):
+        self.subscribers.deliver(progress.sync_id, {'event': event_type, 'data': data})
+
+    def save(self, progress: SyncProgress, changed: Dict[str, str]):
+        pass
+
+    def delete(self, sync_id: str):
+        pass
+
+    def watch(self, sync_id: str, state: Optional[Dict]):
+        pass
+
+    def unwatch(self, sync_id: str):
+        pass
+
+
+class RedisSyncProgressBackend:
+    """
+    Shared backend: one hash per sync (sync_progress:<id>), a set of known
+    sync ids, and pub/sub channels (sync_progress:events:<id>) carrying deltas.
+
+    One listener thread per process (pattern subscription) merges deltas into
+    a snapshot per watched sync and delivers full state to local queues.
+    """
+
+    PREFIX = "sync_progress"
+
+    def __init__(self, subscribers: LocalSubscribers, url: Optional[str] = None,
+                 ttl_seconds: int = SYNC_PROGRESS_TTL_SECONDS, completed_ttl_seconds: int = 3600):
+        import redis
+        self.client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.subscribers = subscribers
+        self.ttl_seconds = ttl_seconds
+        self.completed_ttl_seconds = completed_ttl_seconds
+        self._snapshots: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+
+    def _key(self, sync_id: str) -> str:
+        return f"{self.PREFIX}:{sync_id}"
+
+    def _channel(self, sync_id: str) -> str:
+        return f"{self.PREFIX}:events:{sync_id}"
+
+    def load(self, sync_id: str) -> Optional[SyncProgress]:
+        record = self.client.hgetall(self._key(sync_id))
+        return SyncProgress.from_record(record) if record else None
+
+    def list_all(self) -> List[SyncProgress]:
+        ids = [i.decode('utf-8') for i in self.client.smembers(f"{self.PREFIX}:ids")]
+        if not ids:
+            return []
+        pipe = self.client.pipeline()
+        for sync_id in ids:
+            pipe.hgetall(self._key(sync_id))
+        results, expired = [], []
+        for sync_id, record in zip(ids, pipe.execute()):
+            if record:
+                results.append(SyncProgress.from_record(record))
+            else:
+                expired.append(sync_id)
+        if expired:
+            self.client.srem(f"{self.PREFIX}:ids", *expired)
+        return results
+
+    def _write(self, pipe, progress: SyncProgress, changed: Dict[str, str]):
+        key = self._key(progress.sync_id)
+        if changed:
+            pipe.hset(key, mapping=changed)
+        pipe.expire(key, self.ttl_seconds if progress.completed_at is None else self.completed_ttl_seconds)
+        pipe.sadd(f"{self.PREFIX}:ids", progress.sync_id)
+
+    def emit(self, progress: SyncProgress, event_type: str, data: Dict, delta: Dict,
+             changed: Dict[str, str]):
+        """Write the changed hash fields (SyncProgress.to_record form) and publish the delta"""
+        pipe = self.client.pipeline()
+        self._write(pipe, progress, changed)
+        pipe.publish(self._channel(progress.sync_id), json.dumps({
+            'event': event_type, 'sync_id': progress.sync_id, 'delta': delta
+        }))
+        pipe.execute()
+
+    def save(self, progress: SyncProgress, changed: Dict[str, str]):
+        """Write the changed hash fields without publishing an event"""
+        if changed:
+            pipe = self.client.pipeline()
+            self._write(pipe, progress, changed)
+            pipe.execute()
+
+    def delete(self, sync_id: str):
+        pipe = self.client.pipeline()
+        pipe.delete(self._key(sync_id))
+        pipe.srem(f"{self.PREFIX}:ids", sync_id)
+        pipe.execute()
+
+    def watch(self, sync_id: str, state: Optional[Dict]):
+        """Start merging this sync's deltas for local subscribers"""
+        with self._lock:
+            # Deltas carry absolute values, so one that raced this snapshot
+            # and is applied again on top of it is harmless
+            self._snapshots[sync_id] = dict(state or {'sync_id': sync_id})
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, daemon=True)
+                self._listener.start()
+
+    def unwatch(self, sync_id: str):
+        with self._lock:
+            self._snapshots.pop(sync_id, None)
+
+    def _listen(self):
+        """Pub/sub loop: reconnects on errors"""
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f"{self.PREFIX}:events:*")
+                for message in pubsub.listen():
+                    self.handle_message(message.get('data'))
+            except Exception as e:
+                print(f"[SyncProgress] Redis listener error, reconnecting: {e}", flush=True)
+                time.sleep(1)
+
+    def handle_message(self, raw):
+        """Merge one published delta and deliver the full state locally"""
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        sync_id = message.get('sync_id')
+        with self._lock:
+            snapshot = self._snapshots.get(sync_id)
+            if snapshot is None:
+                return
+            snapshot.update(message.get('delta') or {})
+            data = dict(snapshot)
+        self.subscribers.deliver(sync_id, {'event': message.get('event', 'progress'), 'data': data})
+
 
 class SyncProgressService:
     """
@@ -80,12 +360,24 @@ class SyncProgressService:
     The server calculates overall_percent accurately. The frontend uses it directly.
     """
 
-    def __init__(self):
-        # In-memory storage of sync progress
+    def __init__(self, backend_class=None):
+        # Syncs started by this process. Syncs owned by other workers are
+        # never cached here (see _get_for_update)
         self._progress: Dict[str, SyncProgress] = {}
 
         # Event queues for SSE subscribers (using thread-safe queue)
-        self._subscribers: Dict[str, List[queue.Queue]] = defaultdict(list)
+        self._subscribers = LocalSubscribers()
+
+        # Shared progress store + event fan-out (see module docstring)
+        self.backend = (backend_class or InMemorySyncProgressBackend)(self._subscribers)
+
+        # Event coalescing: last emit time, pending trailing timer, last published payload
+        self._emit_lock = threading.Lock()
+        self._last_emit: Dict[str, float] = {}
+        self._flush_timers: Dict[str, threading.Timer] = {}
+        self._published: Dict[str, Dict] = {}
+        # Last record written to the backend per owned sync (field deltas are diffed against it)
+        self._written: Dict[str, Dict[str, str]] = {}
 
         # Track user email subscriptions for batch completion notification
         # Maps user_id -> email address (user wants email when ALL their syncs complete)
@@ -98,7 +390,6 @@ class SyncProgressService:
         self._cleanup_age = 3600  # 1 hour
 
         # Start periodic cleanup thread
-        import threading
         self._cleanup_thread = threading.Thread(target=self._periodic_cleanup, daemon=True)
         self._cleanup_thread.start()
 
@@ -152,11 +443,12 @@ class SyncProgressService:
         extra_data: Optional[Dict[str, Any]] = None
     ):
         """Update sync progress with any combination of fields"""
-        if sync_id not in self._progress:
+        progress, base = self._get_for_update(sync_id)
+        if progress is None:
             print(f"[SyncProgress] WARNING: sync_id {sync_id} not found")
             return
 
-        progress = self._progress[sync_id]
+        status_changed = bool(status) and status != progress.status
 
         if status:
             progress.status = status
@@ -181,9 +473,11 @@ class SyncProgressService:
         if status in ('complete', 'completed', 'error'):
             progress.completed_at = datetime.now(timezone.utc)
             event_type = 'complete' if status in ('complete', 'completed') else 'error'
-            self._emit_event(sync_id, event_type)
+            self._emit_event(sync_id, event_type, progress, base)
+        elif status_changed or extra_data is not None or base is not None:
+            self._emit_event(sync_id, 'progress', progress, base)
         else:
-            self._emit_event(sync_id, 'progress')
+            self._schedule_progress_event(sync_id)
 
     def increment_processed(
         self,
@@ -192,12 +486,11 @@ class SyncProgressService:
         failed: bool = False,
         overall_percent: Optional[float] = None
     ):
-        """Increment processed item count with smart SSE emission"""
-        if sync_id not in self._progress:
+        """Increment processed item count (events are coalesced, see _schedule_progress_event)"""
+        progress, base = self._get_for_update(sync_id)
+        if progress is None:
             return
 
-        progress = self._progress[sync_id]
-
         if failed:
             progress.failed_items += 1
         else:
@@ -209,41 +502,18 @@ class SyncProgressService:
         if overall_percent is not None:
             progress.overall_percent = overall_percent
 
-        # Emit event for significant milestones
-        should_emit = False
-
-        if progress.total_items > 0:
-            pct = progress.overall_percent
-            # Emit at key milestones (every ~3% overall)
-            milestones = [1, 3, 5, 8, 10, 15, 20, 25, 30, 33, 35, 40, 45, 50,
-                          55, 60, 66, 70, 75, 80, 85, 90, 95, 99]
-            for m in milestones:
-                if pct >= m and (pct - (1.0 if progress.total_items > 1 else 0)) < m:
-                    should_emit = True
-                    break
-
-            # Also emit every 3 items for responsive feedback
-            if not should_emit and progress.processed_items % 3 == 0:
-                should_emit = True
-
-            # Always emit on first and last item
-            if progress.processed_items == 1 or progress.processed_items == progress.total_items:
-                should_emit = True
+        if base is not None:
+            self._emit_event(sync_id, 'progress', progress, base)
         else:
-            # If total unknown, emit every 3 items
-            if progress.processed_items % 3 == 0 or progress.processed_items == 1:
-                should_emit = True
-
-        if should_emit:
-            self._emit_event(sync_id, 'progress')
+            self._schedule_progress_event(sync_id)
 
     def subscribe_email(self, sync_id: str, email: str):
         """Subscribe an email for notification when ALL syncs for this user complete"""
-        if sync_id not in self._progress:
+        progress, base = self._get_for_update(sync_id)
+        if progress is None:
             print(f"[SyncProgress] WARNING: Cannot subscribe email - sync_id {sync_id} not found")
             return False
 
-        progress = self._progress[sync_id]
         user_id = progress.user_id
 
         # Clear the email_sent flag when user explicitly subscribes
@@ -254,6 +524,7 @@ class SyncProgressService:
         self._user_email_subscriptions[user_id] = email
         # Also store on the sync for backward compatibility
         progress.notify_email = email
+        self._save_fields(sync_id, progress, base)
 
         print(f"[SyncProgress] Email notification subscribed for user {user_id}: {email} (will notify when ALL syncs complete)")
         return True
@@ -261,14 +532,14 @@ class SyncProgressService:
     def get_active_syncs_for_user(self, user_id: str) -> List[SyncProgress]:
         """Get all active (non-completed) syncs for a user"""
         return [
-            p for p in self._progress.values()
+            p for p in self._all_progress()
             if p.user_id == user_id and p.status not in ('complete', 'completed', 'error')
         ]
 
     def get_completed_syncs_for_user(self, user_id: str) -> List[SyncProgress]:
         """Get all completed syncs for a user (for aggregated notification)"""
         return [
-            p for p in self._progress.values()
+            p for p in self._all_progress()
             if p.user_id == user_id and p.status in ('complete', 'completed', 'error')
             and p.completed_at is not None
         ]
@@ -279,22 +550,22 @@ class SyncProgressService:
         error_message: Optional[str] = None
     ):
         """Mark sync as complete or failed, send email notification when ALL user syncs complete"""
-        if sync_id not in self._progress:
+        progress, base = self._get_for_update(sync_id)
+        if progress is None:
             return
 
-        progress = self._progress[sync_id]
         progress.completed_at = datetime.now(timezone.utc)
 
         if error_message:
             progress.status = 'error'
             progress.stage = 'Sync failed'
             progress.error_message = error_message
-            self._emit_event(sync_id, 'error')
+            self._emit_event(sync_id, 'error', progress, base)
         else:
             progress.status = 'complete'
             progress.stage = 'Sync complete'
             progress.overall_percent = 100.0
-            self._emit_event(sync_id, 'complete')
+            self._emit_event(sync_id, 'complete', progress, base)
 
         print(f"[SyncProgress] Completed sync: {sync_id} - {progress.status}")
 
@@ -406,15 +677,15 @@ class SyncProgressService:
             print(f"[SyncProgress] Failed to send batch email notification: {e}")
 
     def get_progress(self, sync_id: str) -> Optional[Dict]:
-        """Get current progress for a sync"""
-        progress = self._progress.get(sync_id)
+        """Get current progress for a sync (from any worker when shared, always re-read)"""
+        progress = self._progress.get(sync_id) or self._load(sync_id)
         return progress.to_dict() if progress else None
 
     def get_all_for_tenant(self, tenant_id: str, include_recent_completed: bool = True) -> List[Dict]:
         """Get all active syncs (and optionally recently completed) for a tenant."""
         now = datetime.now(timezone.utc)
         results = []
-        for sync_id, progress in self._progress.items():
+        for progress in self._all_progress():
             if progress.tenant_id != tenant_id:
                 continue
             if progress.status not in ('complete', 'completed', 'error'):
@@ -427,7 +698,7 @@ class SyncProgressService:
 
     def get_active_by_tenant_type(self, tenant_id: str, connector_type: str) -> Optional[Dict]:
         """Find active sync by tenant and connector type (for polling fallback)"""
-        for sync_id, progress in self._progress.items():
+        for progress in self._all_progress():
             if (progress.tenant_id == tenant_id and
                 progress.connector_type == connector_type and
                 progress.status not in ('complete', 'error')):
@@ -435,69 +706,147 @@ class SyncProgressService:
         return None
 
     # Max SSE subscribers per sync_id to prevent memory leaks from reconnecting browsers
-    MAX_SUBSCRIBERS_PER_SYNC = 3
+    MAX_SUBSCRIBERS_PER_SYNC = LocalSubscribers.MAX_SUBSCRIBERS_PER_SYNC
 
     def subscribe(self, sync_id: str) -> queue.Queue:
         """
         Subscribe to progress events for a sync.
         Synchronous method - uses standard library queue for gevent compatibility.
         Limits subscribers to MAX_SUBSCRIBERS_PER_SYNC per sync_id.
+        Works for syncs running on any worker when the backend is shared.
 
         Returns:
             Queue that will receive progress events
         """
-        # Evict oldest subscribers if at capacity
-        subs = self._subscribers[sync_id]
-        while len(subs) >= self.MAX_SUBSCRIBERS_PER_SYNC:
-            old_q = subs.pop(0)
-            # Signal the old subscriber to close
-            try:
-                old_q.put_nowait({'event': 'evicted', 'data': {'reason': 'new subscriber connected'}})
-            except queue.Full:
-                pass
-            print(f"[SyncProgress] Evicted oldest subscriber for {sync_id} (was at {len(subs) + 1})")
+        state = self.get_progress(sync_id)
+        # Watch before queueing the initial state so no event in between is missed
+        self.backend.watch(sync_id, state)
+        initial = {'event': 'current_state', 'data': state} if state else None
+        return self._subscribers.add(sync_id, initial)
 
-        q = queue.Queue(maxsize=100)
-        subs.append(q)
+    def unsubscribe(self, sync_id: str, q: queue.Queue):
+        """Unsubscribe from progress events"""
+        if self._subscribers.remove(sync_id, q):
+            self.backend.unwatch(sync_id)
 
-        # Send current state immediately
-        if sync_id in self._progress:
-            try:
-                q.put_nowait({
-                    'event': 'current_state',
-                    'data': self._progress[sync_id].to_dict()
-                })
-            except queue.Full:
-                pass
+    def _get_for_update(self, sync_id: str) -> Tuple[Optional[SyncProgress], Optional[Dict[str, str]]]:
+        """
+        (progress, base) to mutate.
 
-        print(f"[SyncProgress] New subscriber for {sync_id} (total: {len(subs)})")
-        return q
+        Syncs owned by this process come from self._progress with base None.
+        Syncs owned by another worker are loaded fresh and NOT cached: a cached
+        copy would freeze at the first snapshot. For those, base is the record
+        as loaded, so only the fields the caller changes are written back.
+        """
+        progress = self._progress.get(sync_id)
+        if progress is not None:
+            return progress, None
+        progress = self._load(sync_id)
+        if progress is None:
+            return None, None
+        return progress, progress.to_record()
+
+    def _save_fields(self, sync_id: str, progress: SyncProgress, base: Optional[Dict[str, str]]):
+        """Persist changed fields without an event (owned syncs go out with their next event)"""
+        if base is None:
+            return
+        changed = {k: v for k, v in progress.to_record().items() if base.get(k) != v}
+        try:
+            self.backend.save(progress, changed)
+        except Exception as e:
+            print(f"[SyncProgress] Failed to save {sync_id}: {e}")
 
-    def unsubscribe(self, sync_id: str, q: queue.Queue):
-        """Unsubscribe from progress events"""
-        if sync_id in self._subscribers:
-            if q in self._subscribers[sync_id]:
-                self._subscribers[sync_id].remove(q)
-                print(f"[SyncProgress] Unsubscribed from {sync_id}")
+    def _load(self, sync_id: str) -> Optional[SyncProgress]:
+        try:
+            return self.backend.load(sync_id)
+        except Exception as e:
+            print(f"[SyncProgress] Backend load failed for {sync_id}: {e}")
+            return None
+
+    def _all_progress(self) -> List[SyncProgress]:
+        """Syncs owned here (in-memory state is the latest) plus those of other workers, freshly read"""
+        merged = {}
+        try:
+            for progress in self.backend.list_all():
+                merged[progress.sync_id] = progress
+        except Exception as e:
+            print(f"[SyncProgress] Backend list failed: {e}")
+        merged.update(self._progress)
+        return list(merged.values())
+
+    def _schedule_progress_event(self, sync_id: str):
+        """
+        Emit a 'progress' event now if none went out in the last
+        SYNC_PROGRESS_EVENT_INTERVAL seconds, else make sure one trailing
+        event goes out when the interval ends (carrying the latest state).
+        """
+        with self._emit_lock:
+            elapsed = time.monotonic() - self._last_emit.get(sync_id, 0.0)
+            if elapsed < SYNC_PROGRESS_EVENT_INTERVAL:
+                if sync_id not in self._flush_timers:
+                    timer = threading.Timer(SYNC_PROGRESS_EVENT_INTERVAL - elapsed,
+                                            self._flush_progress_event, args=(sync_id,))
+                    timer.daemon = True
+                    self._flush_timers[sync_id] = timer
+                    timer.start()
+                return
+        self._emit_event(sync_id, 'progress')
+
+    def _flush_progress_event(self, sync_id: str):
+        with self._emit_lock:
+            if self._flush_timers.pop(sync_id, None) is None:
+                return  # superseded by an immediate event
+        self._emit_event(sync_id, 'progress')
 
-    def _emit_event(self, sync_id: str, event_type: str):
-        """Emit event to all subscribers"""
-        if sync_id not in self._progress:
+    def _emit_event(self, sync_id: str, event_type: str, progress: Optional[SyncProgress] = None,
+                    base: Optional[Dict[str, str]] = None):
+        """
+        Store the changed fields and emit an event to all subscribers.
+
+        base: record of a sync owned by another worker as it was loaded (see
+        _get_for_update); its changes are diffed against it and nothing is
+        kept in this process.
+        """
+        progress = progress or self._progress.get(sync_id)
+        if progress is None:
             return
 
-        progress = self._progress[sync_id]
-        event = {
-            'event': event_type,
-            'data': progress.to_dict()
-        }
+        data = progress.to_dict()
+        record = progress.to_record()
+        if base is not None:
+            changed = {k: v for k, v in record.items() if base.get(k) != v}
+            previous = SyncProgress.from_record(base).to_dict()
+            delta = {k: v for k, v in data.items() if previous.get(k, object()) != v}
+        else:
+            with self._emit_lock:
+                timer = self._flush_timers.pop(sync_id, None)
+                if timer:
+                    timer.cancel()
+                self._last_emit[sync_id] = time.monotonic()
+                previous = self._published.get(sync_id, {})
+                delta = {k: v for k, v in data.items() if previous.get(k, object()) != v}
+                self._published[sync_id] = data
+                written = self._written.get(sync_id, {})
+                changed = {k: v for k, v in record.items() if written.get(k) != v}
+                self._written[sync_id] = record
 
-        # Send to all subscribers (non-blocking)
-        if sync_id in self._subscribers:
-            for q in self._subscribers[sync_id]:
-                try:
-                    q.put_nowait(event)
-                except queue.Full:
-                    print(f"[SyncProgress] Queue full for subscriber, skipping event")
+        try:
+            self.backend.emit(progress, event_type, data, delta, changed)
+        except Exception as e:
+            print(f"[SyncProgress] Failed to emit {event_type} for {sync_id}: {e}")
+
+    def _forget(self, sync_id: str):
+        """Drop all per-process state for a sync"""
+        self._progress.pop(sync_id, None)
+        self._subscribers.drop(sync_id)
+        self.backend.unwatch(sync_id)
+        with self._emit_lock:
+            timer = self._flush_timers.pop(sync_id, None)
+            if timer:
+                timer.cancel()
+            self._last_emit.pop(sync_id, None)
+            self._published.pop(sync_id, None)
+            self._written.pop(sync_id, None)
 
     def _periodic_cleanup(self):
         """Periodically clean up old syncs to prevent memory leaks"""
@@ -515,7 +864,8 @@ class SyncProgressService:
         to_remove = []
         stuck_timeout = 1800  # 30 minutes — if no update, assume stuck
 
-        for sync_id, progress in list(self._progress.items()):
+        for progress in self._all_progress():
+            sync_id = progress.sync_id
             if progress.completed_at:
                 # Remove completed syncs after max_age
                 age = (now - progress.completed_at).total_seconds()
@@ -525,12 +875,17 @@ class SyncProgressService:
                 # Detect stuck syncs (no completion after 30 min)
                 age = (now - progress.started_at).total_seconds()
                 if age > stuck_timeout and progress.status not in ('complete', 'error'):
+                    # Re-read right before writing, so another worker's sync that
+                    # finished since the listing is not overwritten with an error
+                    progress, base = self._get_for_update(sync_id)
+                    if progress is None or progress.completed_at or progress.status in ('complete', 'error'):
+                        continue
                     print(f"[SyncProgress] Stuck sync detected: {sync_id} (status={progress.status}, age={age:.0f}s)")
                     progress.status = 'error'
                     progress.stage = 'Sync timed out'
                     progress.error_message = f'Sync appears stuck after {int(age/60)} minutes'
                     progress.completed_at = now
-                    self._emit_event(sync_id, 'error')
+                    self._emit_event(sync_id, 'error', progress, base)
                     # Also reset connector status in DB
                     try:
                         from database.models import SessionLocal, Connector, ConnectorStatus
@@ -554,18 +909,31 @@ class SyncProgressService:
                         print(f"[SyncProgress] Failed to reset stuck connector: {db_err}")
 
         for sync_id in to_remove:
-            del self._progress[sync_id]
-            if sync_id in self._subscribers:
-                del self._subscribers[sync_id]
+            self._forget(sync_id)
+            try:
+                self.backend.delete(sync_id)
+            except Exception as e:
+                print(f"[SyncProgress] Backend delete failed for {sync_id}: {e}")
             print(f"[SyncProgress] Cleaned up old sync: {sync_id}")
 
 
 # Global instance
 _sync_progress_service = None
+_sync_progress_service_lock = threading.Lock()
 
 def get_sync_progress_service() -> SyncProgressService:
     """Get the global SyncProgressService instance"""
     global _sync_progress_service
     if _sync_progress_service is None:
-        _sync_progress_service = SyncProgressService()
+        with _sync_progress_service_lock:
+            if _sync_progress_service is None:
+                backend_class = None
+                if SYNC_PROGRESS_BACKEND == "redis":
+                    try:
+                        import redis
+                        redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")).ping()
+                        backend_class = RedisSyncProgressBackend
+                    except Exception as e:
+                        print(f"[SyncProgress] Redis unavailable ({e}), using in-memory progress", flush=True)
+                _sync_progress_service = SyncProgressService(backend_class)
     return _sync_progress_service
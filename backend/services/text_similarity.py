@@ -0,0 +1,133 @@
+"""
+Vectorized Text Similarity - shared by context compression, claim
+verification and chunk deduplication
+
+Each text is split and tokenized once; overlap and similarity are then
+computed as sparse matrix products instead of per-sentence / per-claim /
+per-pair Python set loops:
+- `SentenceMatrix`: sentences of many sources x word terms (binary), for
+  query-to-sentence overlap
+- `term_coverage`: claims x words matrix times a corpus-presence vector
+  (substring semantics, each distinct word checked once)
+- `shingle_jaccard_matrix`: all-pairs character-shingle Jaccard for chunks
+
+Vocabularies are built per call (exact columns, no hash collisions); the
+matrices are small (tens of sources, hundreds of sentences).
+"""
+
+import re
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+from scipy import sparse
+
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+WORD_RE = re.compile(r'\b\w{3,}\b')
+
+
+def word_set(text: str, pattern: re.Pattern = WORD_RE) -> set:
+    return set(pattern.findall((text or '').lower()))
+
+
+def _binary_matrix(token_sets: Sequence[Iterable[str]], vocab: Dict[str, int],
+                   grow: bool = True) -> sparse.csr_matrix:
+    """Rows = token sets, columns = vocab (extended in place when grow=True)."""
+    indptr = [0]
+    indices = []
+    for tokens in token_sets:
+        if grow:
+            indices.extend([vocab.setdefault(t, len(vocab)) for t in tokens])
+        else:
+            indices.extend([vocab[t] for t in tokens if t in vocab])
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float32)
+    return sparse.csr_matrix(
+        (data, np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(token_sets), max(len(vocab), 1))
+    )
+
+
+class SentenceMatrix:
+    """
+    Sentences of several texts, tokenized once into a binary sentence x term matrix.
+
+    Args:
+        texts: One string per source
+        min_sentence_chars: Shorter sentences are dropped (headers, fragments)
+    """
+
+    def __init__(self, texts: Sequence[str], min_sentence_chars: int = 20):
+        self.sentences: List[str] = []
+        source_of = []
+        for source_idx, text in enumerate(texts):
+            for sent in SENTENCE_SPLIT_RE.split(text or ''):
+                sent = sent.strip()
+                if len(sent) >= min_sentence_chars:
+                    self.sentences.append(sent)
+                    source_of.append(source_idx)
+        self.source_of = np.asarray(source_of, dtype=np.int64)
+        self.vocab: Dict[str, int] = {}
+        self.matrix = _binary_matrix([word_set(s) for s in self.sentences], self.vocab)
+
+    def overlap_counts(self, words: Iterable[str]) -> np.ndarray:
+        """Number of `words` present in each sentence."""
+        query = np.zeros(self.matrix.shape[1], dtype=np.float32)
+        cols = [self.vocab[w] for w in set(words) if w in self.vocab]
+        query[cols] = 1.0
+        return self.matrix @ query
+
+
+def top_sentences_per_source(matrix: SentenceMatrix, words: Iterable[str],
+                             max_sentences: int) -> Dict[int, List[str]]:
+    """
+    Sentences with at least one query word, most overlap first (ties keep
+    document order), grouped by source index.
+    """
+    counts = matrix.overlap_counts(words)
+    hits = np.flatnonzero(counts > 0)
+    if not len(hits):
+        return {}
+    # Sort by (source, -count, position): lexsort keys are last-major
+    order = hits[np.lexsort((hits, -counts[hits], matrix.source_of[hits]))]
+    result: Dict[int, List[str]] = {}
+    for i in order:
+        picked = result.setdefault(int(matrix.source_of[i]), [])
+        if len(picked) < max_sentences:
+            picked.append(matrix.sentences[i])
+    return result
+
+
+def term_coverage(token_lists: Sequence[List[str]], corpus: str) -> np.ndarray:
+    """
+    Fraction of each token list found in `corpus` (substring match against a
+    lowercase corpus; repeated tokens count repeatedly). NaN for empty lists.
+    """
+    vocab: Dict[str, int] = {}
+    counts = _binary_matrix(token_lists, vocab)
+    present = np.zeros(counts.shape[1], dtype=np.float32)
+    for token, col in vocab.items():
+        present[col] = token in corpus
+    totals = np.asarray(counts.sum(axis=1)).ravel()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(totals > 0, (counts @ present) / totals, np.nan)
+
+
+def shingles(text: str, n: int = 4) -> set:
+    text = (text or '').lower()
+    return set(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def shingle_jaccard_matrix(texts: Sequence[str], n: int = 4) -> np.ndarray:
+    """All-pairs Jaccard similarity of character n-gram sets (0 for empty texts)."""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    matrix = _binary_matrix([shingles(t, n) for t in texts], {})
+    sizes = np.asarray(matrix.sum(axis=1)).ravel()
+    inter = (matrix @ matrix.T).toarray()
+    union = sizes[:, None] + sizes[None, :] - inter
+    with np.errstate(divide='ignore', invalid='ignore'):
+        jaccard = np.where(union > 0, inter / union, 0.0)
+    empty = sizes == 0
+    jaccard[empty, :] = 0.0
+    jaccard[:, empty] = 0.0
+    return jaccard.astype(np.float32)
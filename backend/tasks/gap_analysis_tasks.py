@@ -57,7 +57,10 @@ def analyze_gaps_task(
             result = service.analyze_gaps_v3(
                 tenant_id=tenant_id,
                 project_id=project_id,
-                force=force
+                force_reanalyze=force,
+                progress_callback=lambda done, total, title: on_progress(
+                    10 + int(60 * done / max(total, 1)), 100, f'Extracted {done}/{total}: {title}'
+                )
             )
 
         elif mode == 'multistage':
@@ -1,6 +1,7 @@
 """
 Grant Scraping Tasks
 Background task for daily grant ingestion from NIH RePORTER and Grants.gov.
+Also refreshes the local grant index that interactive grant searches read.
 """
 
 import logging
@@ -27,7 +28,7 @@ def scrape_grants_daily_task(self, tenant_id: str = None, limit_per_query: int =
         self.update_progress(0, 100, 'Starting daily grant scrape...')
         logger.info(f"[GrantScrapeTask] Starting for tenant={tenant_id}")
 
-        scrape_and_ingest(
+        summary = scrape_and_ingest(
             tenant_id=tenant_id,
             dry_run=False,
             limit_per_query=limit_per_query
@@ -39,6 +40,8 @@ def scrape_grants_daily_task(self, tenant_id: str = None, limit_per_query: int =
         return {
             'success': True,
             'tenant_id': tenant_id,
+            'grants_indexed': summary['grants_indexed'],
+            'grants_pruned': summary['grants_pruned'],
         }
 
     except Exception as e:
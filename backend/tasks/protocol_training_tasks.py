@@ -114,14 +114,19 @@ def train_protocol_models(self):
 
 
 @celery.task(bind=True, name='tasks.protocol_training_tasks.update_reference_store')
-def update_reference_store(self):
-    """Reload the protocol reference store with latest corpus data."""
+def update_reference_store(self, full_rebuild: bool = False):
+    """
+    Update the persisted protocol reference index with latest corpus data.
+
+    Protocols appended to the corpus are added without refitting TF-IDF;
+    full_rebuild=True refits from scratch.
+    """
     _ensure_app_in_path()
     from services.protocol_reference_store import reload_store
 
     try:
-        reload_store()
-        return {'success': True}
+        store = reload_store(full_rebuild=full_rebuild)
+        return {'success': True, 'protocols': len(store.protocols), 'index_version': store.version}
     except Exception as e:
         logger.error(f'[ProtocolTask] Reference store update failed: {e}')
         return {'error': str(e)}
@@ -191,8 +196,12 @@ def index_journal_abstracts(self, max_per_topic=1000):
 
 
 @celery.task(bind=True, max_retries=2)
-def build_cooccurrence_graph(self):
-    """Build co-occurrence graph from protocol corpus and existing entities."""
+def build_cooccurrence_graph(self, full_rebuild: bool = False):
+    """Build co-occurrence graph from protocol corpus and existing entities.
+
+    Entity co-occurrences are incremental (documents extracted since the last
+    build) unless full_rebuild is set.
+    """
     _ensure_app_in_path()
     try:
         from services.protocol_graph_service import ProtocolGraphService
@@ -212,7 +221,7 @@ def build_cooccurrence_graph(self):
                 logger.info(f"[ProtocolTask] Corpus co-occurrences: {count}")
 
             # Then from existing extracted entities
-            count2 = service.build_cooccurrences_from_corpus(db)
+            count2 = service.build_cooccurrences_from_corpus(db, incremental=not full_rebuild)
             logger.info(f"[ProtocolTask] Entity co-occurrences: {count2}")
 
             return {"corpus_cooccurrences": count if corpus_file.exists() else 0, "entity_cooccurrences": count2}
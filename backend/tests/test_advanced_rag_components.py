@@ -24,7 +24,9 @@ from services.enhanced_search_service import (
     AnswerEvaluator,
     QueryExpander,
     QueryClassifier,
-    QueryContextualizer
+    QueryContextualizer,
+    EnhancedSearchService,
+    reciprocal_rank_fusion,
 )
 
 
@@ -426,5 +428,63 @@ class TestAdvancedRAGIntegration:
         assert compressed_total < original_total
 
 
+# =============================================================================
+# PARALLEL RETRIEVAL TESTS
+# =============================================================================
+
+class TestReciprocalRankFusion:
+    """Test RRF merging of sub-query result lists"""
+
+    def test_results_in_multiple_lists_rank_higher(self):
+        list_a = [{"id": "a", "score": 0.9}, {"id": "shared", "score": 0.5}]
+        list_b = [{"id": "b", "score": 0.8}, {"id": "shared", "score": 0.6}]
+
+        fused = reciprocal_rank_fusion([list_a, list_b])
+
+        assert fused[0]["id"] == "shared"
+        assert len(fused) == 3
+
+    def test_keeps_best_original_score(self):
+        fused = reciprocal_rank_fusion([
+            [{"id": "x", "score": 0.3}],
+            [{"id": "x", "score": 0.7}],
+        ])
+        assert fused[0]["score"] == 0.7
+        assert "rrf_score" in fused[0]
+
+    def test_unkeyed_results_are_kept(self):
+        fused = reciprocal_rank_fusion([[{"score": 0.4}], [{"id": "a", "score": 0.5}]])
+        assert len(fused) == 2
+
+
+class TestRetrievalStage:
+    """Test the concurrent retrieval stage deadline handling"""
+
+    def test_slow_task_is_dropped(self):
+        import time as _time
+
+        def fast():
+            return [{"id": "fast"}]
+
+        def slow():
+            _time.sleep(1.0)
+            return [{"id": "slow"}]
+
+        results = EnhancedSearchService._run_retrieval_stage(
+            {"fast": fast, "slow": slow}, timeout=0.2
+        )
+        assert "fast" in results
+        assert "slow" not in results
+
+    def test_failing_task_is_dropped(self):
+        def boom():
+            raise RuntimeError("namespace down")
+
+        results = EnhancedSearchService._run_retrieval_stage(
+            {"ok": lambda: [{"id": "1"}], "boom": boom}, timeout=1.0
+        )
+        assert list(results) == ["ok"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,99 @@
+"""
+Tests for the tenant-scoped answer cache.
+
+These tests work WITHOUT API keys or Redis (in-memory backend, fixed vectors).
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.answer_cache import (
+    AnswerCache,
+    InMemoryAnswerCacheBackend,
+    SHARED_CORPUS_ID,
+    normalize_query,
+    replay_stream_events,
+)
+
+PARAMS = {'top_k': 10, 'response_mode': 3}
+
+
+class TestAnswerCache:
+    def setup_method(self):
+        self.cache = AnswerCache(InMemoryAnswerCacheBackend(), similarity_threshold=0.95)
+
+    def _store(self, tenant, query, answer, embedding=None):
+        _, version = self.cache.lookup(tenant, query, 'answer', PARAMS, embedding)
+        self.cache.store(tenant, query, 'answer', PARAMS, {'answer': answer}, version, embedding)
+
+    def test_normalized_query_hits_exactly(self):
+        assert normalize_query("  How do I book the Confocal?? ") == "how do i book the confocal"
+        self._store("t1", "How do I book the confocal?", "Use iLab.")
+        cached, _ = self.cache.lookup("t1", "how do i book the CONFOCAL", 'answer', PARAMS)
+        assert cached == {'answer': "Use iLab."}
+
+    def test_similar_embedding_hits_semantically(self):
+        self._store("t1", "How do I book the confocal?", "Use iLab.", embedding=[1.0, 0.0, 0.0])
+        cached, _ = self.cache.lookup("t1", "confocal booking process", 'answer', PARAMS, [0.99, 0.05, 0.0])
+        assert cached == {'answer': "Use iLab."}
+        missed, _ = self.cache.lookup("t1", "freezer inventory", 'answer', PARAMS, [0.0, 1.0, 0.0])
+        assert missed is None
+        assert self.cache.stats()['semantic_hits'] == 1
+
+    def test_tenants_and_params_are_isolated(self):
+        self._store("t1", "onboarding checklist", "A")
+        assert self.cache.lookup("t2", "onboarding checklist", 'answer', PARAMS)[0] is None
+        assert self.cache.lookup("t1", "onboarding checklist", 'answer', {'top_k': 5})[0] is None
+
+    def test_corpus_version_bump_invalidates(self):
+        self._store("t1", "onboarding checklist", "A")
+        self.cache.bump_corpus_version("t1")
+        assert self.cache.lookup("t1", "onboarding checklist", 'answer', PARAMS)[0] is None
+
+    def test_shared_corpus_bump_invalidates_every_tenant(self):
+        self._store("t1", "core facility hours", "9-5")
+        self.cache.bump_corpus_version(SHARED_CORPUS_ID)
+        assert self.cache.lookup("t1", "core facility hours", 'answer', PARAMS)[0] is None
+
+    def test_answer_generated_during_reindex_is_never_served(self):
+        _, version = self.cache.lookup("t1", "q", 'answer', PARAMS)
+        self.cache.bump_corpus_version("t1")  # documents re-embedded mid-generation
+        self.cache.store("t1", "q", 'answer', PARAMS, {'answer': "stale"}, version)
+        assert self.cache.lookup("t1", "q", 'answer', PARAMS)[0] is None
+
+    def test_stream_replay_splits_chunks_and_marks_done(self):
+        events = [
+            {'type': 'search_complete', 'num_sources': 1},
+            {'type': 'chunk', 'content': "x" * 20},
+            {'type': 'done', 'confidence': 0.9, 'sources': [{}]},
+        ]
+        replayed = list(replay_stream_events(events, chunk_chars=8))
+        assert [e['type'] for e in replayed] == ['search_complete', 'chunk', 'chunk', 'chunk', 'done']
+        assert "".join(e['content'] for e in replayed if e['type'] == 'chunk') == "x" * 20
+        assert replayed[-1]['cached'] is True
+
+    def test_bump_from_another_worker_is_seen(self):
+        backend = InMemoryAnswerCacheBackend()  # stands in for the shared Redis
+        worker_a, worker_b = AnswerCache(backend), AnswerCache(backend)
+        _, version = worker_a.lookup("t1", "q", 'answer', PARAMS)
+        worker_a.store("t1", "q", 'answer', PARAMS, {'answer': "old"}, version)
+        worker_b.bump_corpus_version("t1")
+        assert worker_a.lookup("t1", "q", 'answer', PARAMS)[0] is None
+
+
+class TestGetAnswerCache:
+    def test_unreachable_redis_disables_cache_instead_of_going_per_process(self, monkeypatch):
+        import services.answer_cache as answer_cache
+
+        def unreachable(*args, **kwargs):
+            raise ConnectionError("connection refused")
+
+        monkeypatch.setattr(answer_cache, "ANSWER_CACHE_BACKEND", "redis")
+        monkeypatch.setattr(answer_cache, "RedisAnswerCacheBackend", unreachable)
+        monkeypatch.setattr(answer_cache, "_answer_cache", None)
+        monkeypatch.setattr(answer_cache, "_answer_cache_unavailable_until", 0.0)
+        assert answer_cache.get_answer_cache() is None
+        assert answer_cache._answer_cache_unavailable_until > 0
+        answer_cache.bump_corpus_version("t1")  # no-op, must not raise
@@ -0,0 +1,112 @@
+"""
+Tests for the per-tenant BM25 index and hybrid (dense + BM25) fusion.
+
+These tests work WITHOUT API keys (temp directory, fake Pinecone index).
+"""
+
+import sys
+import os
+import fcntl
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vector_stores.bm25_index as bm25_module
+from vector_stores.bm25_index import BM25Index, tokenize
+from vector_stores.pinecone_store import HybridPineconeStore, _matches_filter
+
+
+DOCS = [
+    ("c1", "d1", "Western blot protocol using anti-GAPDH antibody ab9485"),
+    ("c2", "d1", "Incubate the membrane overnight at 4C"),
+    ("c3", "d2", "PCR protocol PRT-2024-17 for TP53 amplification"),
+    ("c4", "d3", "Lab onboarding checklist and safety training"),
+]
+
+
+class TestBM25Index:
+    def test_identifiers_are_kept_whole(self):
+        assert "prt_2024_17" in tokenize("See protocol PRT-2024-17")
+
+    def test_exact_identifier_ranks_first(self, tmp_path):
+        index = BM25Index(tmp_path)
+        index.upsert_documents(DOCS)
+        hits = index.search("ab9485", top_k=3)
+        assert hits[0]['id'] == "c1"
+        assert index.search("PRT-2024-17")[0]['doc_id'] == "d2"
+
+    def test_upsert_replaces_and_delete_removes(self, tmp_path):
+        index = BM25Index(tmp_path)
+        index.upsert_documents(DOCS)
+        index.upsert_documents([("c5", "d2", "Updated qPCR protocol for BRCA1")])
+        assert index.search("TP53") == []
+        assert index.search("BRCA1")[0]['id'] == "c5"
+        index.delete_documents(["d3"])
+        assert index.search("onboarding") == []
+
+    def test_other_process_writes_and_compaction_are_picked_up(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(bm25_module, "BM25_COMPACT_MIN_CHUNKS", 3)
+        writer, reader = BM25Index(tmp_path), BM25Index(tmp_path)
+        writer.upsert_documents(DOCS[:2])
+        assert reader.search("ab9485")[0]['id'] == "c1"
+        writer.upsert_documents(DOCS[2:])  # crosses the threshold -> compaction
+        assert writer.stats()['base_chunks'] == 4
+        assert reader.search("onboarding")[0]['id'] == "c4"
+        assert reader.search("ab9485")[0]['id'] == "c1"
+
+    def test_clear_waits_for_the_writer_lock(self, tmp_path):
+        index = BM25Index(tmp_path)
+        index.upsert_documents(DOCS)
+        with open(index.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)  # another process mid-write
+            clearer = threading.Thread(target=index.clear)
+            clearer.start()
+            clearer.join(timeout=0.2)
+            assert clearer.is_alive() and index.log_path.exists()
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        clearer.join(timeout=5)
+        assert not clearer.is_alive()
+        assert BM25Index(tmp_path).search("ab9485") == []
+
+
+class FakeIndex:
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def query(self, vector, namespace, top_k, filter, include_metadata):
+        matches = [SimpleNamespace(id=vid, score=0.8 - i * 0.1, metadata=v.metadata)
+                   for i, (vid, v) in enumerate(self.vectors.items()) if vid != "c3"]
+        return SimpleNamespace(matches=matches[:top_k])
+
+    def fetch(self, ids, namespace):
+        return SimpleNamespace(vectors={i: self.vectors[i] for i in ids if i in self.vectors})
+
+
+class TestHybridSearch:
+    def test_bm25_only_hit_is_recovered(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(bm25_module, "BM25_INDEX_DIR", str(tmp_path))
+        monkeypatch.setattr(bm25_module, "_indexes", bm25_module.OrderedDict())
+        bm25_module.get_bm25_index("t1").upsert_documents(DOCS)
+
+        vectors = {
+            cid: SimpleNamespace(values=[1.0, 0.0], metadata={
+                'tenant_id': 't1', 'doc_id': doc, 'content_preview': text, 'source_type': 'box'})
+            for cid, doc, text in DOCS
+        }
+        store = HybridPineconeStore.__new__(HybridPineconeStore)
+        store.index = FakeIndex(vectors)
+        store.sparse_weight = store.dense_weight = 1.0
+        store._get_embedding = lambda q: [1.0, 0.0]
+
+        results = store.hybrid_search("PRT-2024-17", "t1", top_k=4)
+        ids = [r['id'] for r in results]
+        assert "c3" in ids  # dense search never returned it
+        recovered = results[ids.index("c3")]
+        assert recovered['bm25_score'] > 0 and recovered['score'] > 0.99
+
+    def test_filter_matching(self):
+        meta = {'source_type': 'slack'}
+        assert _matches_filter(meta, {'source_type': {'$in': ['slack', 'box']}})
+        assert not _matches_filter(meta, {'source_type': {'$eq': 'box'}})
+        assert not _matches_filter(meta, {'source_type': {'$gt': 1}})
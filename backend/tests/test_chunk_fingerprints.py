@@ -0,0 +1,171 @@
+"""
+Tests for content-hash chunk fingerprints (skip re-embedding unchanged text).
+
+These tests work WITHOUT API keys (in-memory SQLite, fake Pinecone index,
+fake embeddings client).
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database.models import (
+    ChunkFingerprint, Document, DocumentClassification, DocumentStatus, GapAnswer, KnowledgeGap, Tenant,
+)
+from services.knowledge_service import KnowledgeService
+from vector_stores.chunk_fingerprints import ChunkFingerprintStore, chunk_content_hash
+from vector_stores.pinecone_store import PineconeVectorStore
+
+
+class FakeIndex:
+    def __init__(self):
+        self.vectors = {}
+        self.deleted = []
+
+    def upsert(self, vectors, namespace):
+        for v in vectors:
+            self.vectors[v['id']] = v
+
+    def delete(self, ids, namespace):
+        self.deleted.extend(ids)
+        for vid in ids:
+            self.vectors.pop(vid, None)
+
+
+class CountingStore(PineconeVectorStore):
+    def __init__(self):
+        self.index = FakeIndex()
+        self.embedded = []
+
+    def _get_embeddings_batch(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(t)), 1.0, 0.0] for t in texts]
+
+
+def make_session():
+    engine = create_engine("sqlite:///:memory:")
+    ChunkFingerprint.__table__.create(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+class TestChunkFingerprints:
+    def setup_method(self):
+        self.db = make_session()
+        self.fingerprints = ChunkFingerprintStore(self.db, "t1", model="m", dimensions=3)
+        self.store = CountingStore()
+
+    def _embed(self, documents, **kwargs):
+        return self.store.embed_and_upsert_documents(
+            documents, tenant_id="t1", chunk_size=50, chunk_overlap=0,
+            show_progress=False, fingerprint_store=self.fingerprints, **kwargs
+        )
+
+    def test_hash_ignores_whitespace_but_not_model(self):
+        assert chunk_content_hash("a  b\n", "m", 3) == chunk_content_hash("a b", "m", 3)
+        assert chunk_content_hash("a b", "m", 3) != chunk_content_hash("a b", "other", 3)
+
+    def test_resync_of_unchanged_document_embeds_nothing(self):
+        doc = {'id': 'd1', 'title': 'Doc', 'content': 'Alpha protocol text.'}
+        self._embed([doc])
+        assert len(self.store.embedded) == 1
+
+        result = self._embed([doc])
+        assert len(self.store.embedded) == 1
+        assert result['unchanged'] == 1
+        assert result['upserted'] == 0
+
+    def test_identical_text_in_other_document_reuses_vector(self):
+        self._embed([{'id': 'd1', 'title': 'A', 'content': 'Shared boilerplate.'}])
+        result = self._embed([{'id': 'd2', 'title': 'B', 'content': 'Shared boilerplate.'}])
+        assert len(self.store.embedded) == 1
+        assert result['reused_embeddings'] == 1
+        assert result['upserted'] == 1
+
+    def test_force_upsert_rewrites_without_embedding(self):
+        doc = {'id': 'd1', 'title': 'Doc', 'content': 'Alpha protocol text.'}
+        self._embed([doc])
+        result = self._embed([doc], force_upsert=True)
+        assert len(self.store.embedded) == 1
+        assert result['upserted'] == 1
+
+    def test_shrunk_document_deletes_stale_chunks(self):
+        long_doc = {'id': 'd1', 'title': 'Doc', 'content': ' '.join(['word'] * 40)}
+        self._embed([long_doc])
+        assert len(self.store.index.vectors) > 1
+
+        result = self._embed([{'id': 'd1', 'title': 'Doc', 'content': 'word word'}])
+        assert result['stale_deleted'] == len(self.store.index.deleted) > 0
+        assert len(self.store.index.vectors) == 1
+        assert len(self.fingerprints.get_for_documents(['d1'])) == 1
+
+    def test_writes_leave_the_callers_transaction_alone(self):
+        pending = ChunkFingerprint(tenant_id="t2", index_name="pinecone", vector_id="v-other",
+                                   document_id="x", content_hash="h")
+        self.db.add(pending)
+        entry = {'vector_id': 'd1#0', 'document_id': 'd1', 'content_hash': 'abc', 'embedding': [1.0, 0.0, 0.0]}
+        self.fingerprints.record([entry])
+        # A failing write rolls back only its own savepoint
+        self.fingerprints.record([{'vector_id': 'd1#1', 'document_id': 'd1'}])
+        assert pending in self.db
+        assert list(self.fingerprints.get_for_documents(['d1'])) == ['d1#0']
+
+        # Nothing was committed: the caller's rollback discards both writes
+        self.db.rollback()
+        assert self.db.query(ChunkFingerprint).count() == 0
+
+
+class FakeEmbeddingClient:
+    def __init__(self):
+        self.embedded = []
+
+    def get_embedding_model(self):
+        return "m"
+
+    def create_embedding(self, text, dimensions):
+        self.embedded.extend(text)
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=[float(len(t))] + [0.0] * (dimensions - 1))
+            for i, t in enumerate(text)
+        ])
+
+
+class TestLocalIndexRebuild:
+    def test_second_rebuild_reuses_the_stored_vectors(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+
+        # Real transactions, as on PostgreSQL: pysqlite would otherwise
+        # commit a savepoint opened outside BEGIN when it is released
+        @event.listens_for(engine, "connect")
+        def _no_pysqlite_transactions(dbapi_connection, _):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def _begin(connection):
+            connection.exec_driver_sql("BEGIN")
+
+        for model in (Tenant, Document, KnowledgeGap, GapAnswer, ChunkFingerprint):
+            model.__table__.create(bind=engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        db.add(Tenant(id="t1", name="Lab", slug="lab", data_directory=str(tmp_path / "t1")))
+        db.add(Document(id="d1", tenant_id="t1", title="Protocol", content="Alpha protocol text.",
+                        status=DocumentStatus.CONFIRMED, classification=DocumentClassification.WORK))
+        db.commit()
+        db.close()
+
+        client = FakeEmbeddingClient()
+        for expected_embedded in (1, 0):
+            # A fresh session per rebuild, as the /rebuild-index route uses
+            db = Session()
+            service = KnowledgeService(db)
+            service._client = client
+            result = service.rebuild_embedding_index("t1", force=True)
+            db.close()
+            assert result["success"] is True
+            assert result["chunks_embedded"] == expected_embedded
+        assert len(client.embedded) == 1
@@ -0,0 +1,113 @@
+"""
+Tests for level-synchronous citation graph expansion and its edge cache.
+
+These tests work WITHOUT API keys or network access (a fake session serves
+a small synthetic OpenAlex citation network).
+"""
+
+import sys
+import os
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.openalex_client import OpenAlexClient
+from services.citation_graph_service import CitationGraphService
+
+PREFIX = "https://openalex.org/"
+N_WORKS = 80
+
+
+def refs_of(i):
+    """W<i> references the next three works."""
+    return [j for j in (i + 1, i + 2, i + 3) if j <= N_WORKS]
+
+
+def work(i, fields):
+    record = {"id": f"{PREFIX}W{i}", "title": f"Paper {i}", "publication_year": 2000 + i % 20,
+              "cited_by_count": 100 - i}
+    if "referenced_works" in fields:
+        record["referenced_works"] = [f"{PREFIX}W{j}" for j in refs_of(i)]
+    return {k: v for k, v in record.items() if k in fields}
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, body):
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class FakeOpenAlex:
+    """Session answering /works?filter=ids.openalex:... and filter=cites:..."""
+
+    def __init__(self):
+        self.headers = {}
+        self.filters = []
+        self._lock = threading.Lock()
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, params=None, timeout=None):
+        query = parse_qs(urlsplit(url).query)
+        flt = query["filter"][0]
+        fields = query["select"][0].split(",")
+        with self._lock:
+            self.filters.append(flt)
+        if flt.startswith("ids.openalex:"):
+            ids = [int(w[1:]) for w in flt.split(":", 1)[1].split("|")]
+            results = [work(i, fields) for i in ids if 1 <= i <= N_WORKS]
+        else:
+            target = int(flt.split(":", 1)[1][1:])
+            citing = sorted((i for i in range(1, N_WORKS + 1) if target in refs_of(i)),
+                            key=lambda i: -(100 - i))
+            results = [work(i, fields) for i in citing[:int(query["per_page"][0])]]
+        return FakeResponse({"results": results})
+
+
+def make_service(tmp_path, session):
+    client = OpenAlexClient(cache_path=None, session=session, requests_per_second=1000)
+    return CitationGraphService(cache_path=str(tmp_path / "graph.sqlite3"), client=client)
+
+
+class TestCitationGraph:
+    def test_seed_expansion_has_citations_and_references(self, tmp_path):
+        graph = make_service(tmp_path, FakeOpenAlex()).build_citation_graph(f"{PREFIX}W10", depth=0)
+        edges = {(e["source"].rsplit("/", 1)[1], e["target"].rsplit("/", 1)[1]) for e in graph["edges"]}
+        assert edges == {("W7", "W10"), ("W8", "W10"), ("W9", "W10"),
+                         ("W10", "W11"), ("W10", "W12"), ("W10", "W13")}
+        seed = next(n for n in graph["nodes"] if n["is_seed"])
+        assert seed["title"] == "Paper 10"
+        assert {n["title"] for n in graph["nodes"]} >= {"Paper 7", "Paper 13"}
+
+    def test_frontier_lookups_are_batched(self, tmp_path):
+        session = FakeOpenAlex()
+        graph = make_service(tmp_path, session).build_citation_graph(f"{PREFIX}W40", depth=3, max_nodes=500)
+        assert graph["node_count"] > 20
+        batched = [f for f in session.filters if f.startswith("ids.openalex:")]
+        cites = [f for f in session.filters if f.startswith("cites:")]
+        # One references batch and at most one metadata batch per level, plus the seed lookup
+        assert len(batched) <= 1 + 2 * 4
+        assert len(cites) == len(set(cites))
+        assert max(len(f.split("|")) for f in batched) > 1
+
+    def test_overlapping_graphs_reuse_cached_works_and_edges(self, tmp_path):
+        make_service(tmp_path, FakeOpenAlex()).build_citation_graph(f"{PREFIX}W40", depth=2, max_nodes=500)
+
+        session = FakeOpenAlex()
+        service = make_service(tmp_path, session)
+        first = service.build_citation_graph(f"{PREFIX}W40", depth=2, max_nodes=500)
+        assert session.filters == []
+        service.build_citation_graph(f"{PREFIX}W41", depth=1, max_nodes=500)
+        assert len(session.filters) < 5
+        assert first["node_count"] > 0
+
+    def test_max_nodes_is_respected(self, tmp_path):
+        graph = make_service(tmp_path, FakeOpenAlex()).build_citation_graph(f"{PREFIX}W40", depth=3, max_nodes=15)
+        assert graph["node_count"] == 15
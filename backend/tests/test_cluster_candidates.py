@@ -0,0 +1,114 @@
+"""
+Tests for scalable LLM-first clustering: blocked nearest-neighbour candidate
+pairs and batched, cached LLM pair adjudication.
+
+These tests work WITHOUT API keys (random embeddings, fake chat client).
+"""
+
+import sys
+import os
+import json
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from clustering.neighbor_candidates import candidate_pairs
+
+
+def dense_pairs(embeddings, threshold):
+    """The old candidate loop over the full cosine matrix."""
+    from sklearn.metrics.pairwise import cosine_similarity
+    sim = cosine_similarity(embeddings)
+    return [(i, j) for i in range(len(sim)) for j in range(i + 1, len(sim)) if sim[i][j] >= threshold]
+
+
+class TestCandidatePairs:
+    def test_threshold_mode_matches_dense_matrix(self):
+        embeddings = np.random.default_rng(0).normal(size=(90, 8))
+        pairs = candidate_pairs(embeddings, 0.3, block_size=16)
+        assert [(i, j) for i, j, _ in pairs] == dense_pairs(embeddings, 0.3)
+
+    def test_top_k_keeps_nearest_neighbours_above_threshold(self):
+        embeddings = np.random.default_rng(1).normal(size=(60, 8))
+        pairs = candidate_pairs(embeddings, 0.1, top_k=3, block_size=7)
+        for i, j, s in pairs:
+            assert i < j and s >= 0.1
+        # Every pair is some document's top-3 choice, so there are at most 3n pairs
+        assert len(pairs) <= 3 * 60
+        exact = {(i, j) for i, j in dense_pairs(embeddings, 0.1)}
+        assert {(i, j) for i, j, _ in pairs} <= exact
+
+    def test_single_document_has_no_pairs(self):
+        assert candidate_pairs(np.ones((1, 4)), 0.0, top_k=5) == []
+
+
+class FakeChatClient:
+    def __init__(self, skip_pairs=()):
+        self.prompts = []
+        self.skip_pairs = set(skip_pairs)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, **kwargs):
+        prompt = messages[0]["content"]
+        with self._lock:
+            self.prompts.append(prompt)
+        if "PAIR P" in prompt:
+            count = prompt.count("PAIR P")
+            body = {"comparisons": [
+                {"pair": f"P{n}", "decision": "YES", "confidence": 0.9, "reasoning": "batched"}
+                for n in range(1, count + 1) if f"P{n}" not in self.skip_pairs
+            ]}
+        else:
+            body = {"decision": "NO", "confidence": 0.8, "reasoning": "single"}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(body)))])
+
+
+def make_clusterer(tmp_path, client):
+    pytest.importorskip("sentence_transformers")
+    from clustering.llm_first_clusterer import LLMFirstClusterer
+    clusterer = LLMFirstClusterer.__new__(LLMFirstClusterer)
+    clusterer.client = client
+    clusterer.cache_dir = tmp_path
+    return clusterer
+
+
+def signature(n, deliverable=None):
+    from clustering.llm_first_clusterer import ProjectSignature
+    return ProjectSignature(
+        doc_id=f"d{n}", core_deliverable=deliverable or f"Deliverable {n}", project_goal="Goal",
+        key_entities=[], technical_keywords=[], timeline_phase="development",
+        unique_identifiers=[], content_summary="", confidence=0.9
+    )
+
+
+class TestPairAdjudication:
+    def test_pairs_are_packed_into_prompts_and_cached(self, tmp_path):
+        client = FakeChatClient()
+        clusterer = make_clusterer(tmp_path, client)
+        pairs = [(signature(i), signature(i + 1)) for i in range(10)]
+        results = clusterer.adjudicate_pairs(pairs, pairs_per_prompt=4, max_concurrent=3)
+        assert len(client.prompts) == 3
+        assert results == [("YES", 0.9, "batched")] * 10
+
+        # Re-clustering with one new document only adjudicates the new pairs
+        again = clusterer.adjudicate_pairs(pairs + [(signature(3), signature(99))], pairs_per_prompt=4)
+        assert len(client.prompts) == 4 and again[:10] == results
+
+    def test_pair_cache_is_order_free_and_tracks_signature_changes(self, tmp_path):
+        clusterer = make_clusterer(tmp_path, FakeChatClient())
+        a, b = signature(1), signature(2)
+        assert clusterer._pair_cache_key(a, b) == clusterer._pair_cache_key(b, a)
+        assert clusterer._pair_cache_key(a, b) != clusterer._pair_cache_key(signature(1, "Changed"), b)
+
+    def test_pairs_missing_from_batched_reply_fall_back_to_single_prompt(self, tmp_path):
+        client = FakeChatClient(skip_pairs={"P2"})
+        clusterer = make_clusterer(tmp_path, client)
+        pairs = [(signature(i), signature(i + 1)) for i in range(3)]
+        results = clusterer.adjudicate_pairs(pairs, pairs_per_prompt=3)
+        assert [r[0] for r in results] == ["YES", "NO", "YES"]
+        assert len(client.prompts) == 2
@@ -0,0 +1,113 @@
+"""
+Tests for concurrent, streamed competitor analysis and its keyword cache.
+
+These tests work WITHOUT API keys or network access (source searches and
+focus extraction are replaced with stubs).
+"""
+
+import sys
+import os
+import json
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.competitor_finder_service as competitor_module
+from services.competitor_finder_service import CompetitorFinderService
+
+FOCUS = {
+    "domain": "oncology",
+    "research_question": "Does X inhibit Y?",
+    "search_keywords": ["CAR-T", "solid tumors", "exhaustion"],
+    "arxiv_categories": ["q-bio.CB"],
+}
+
+
+def make_service(monkeypatch, tmp_path):
+    monkeypatch.setattr(competitor_module, "get_openai_client", lambda: None)
+    return CompetitorFinderService(cache_path=str(tmp_path / "competitors.sqlite3"))
+
+
+def parse_events(stream):
+    events = []
+    for chunk in stream:
+        header, data = chunk.strip().split("\n", 1)
+        events.append((header[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def delayed(seconds, value):
+    def search(*args, **kwargs):
+        time.sleep(seconds)
+        return value
+    return search
+
+
+class TestCompetitorFinderStream:
+    def test_sources_run_concurrently_and_stream_as_they_land(self, monkeypatch, tmp_path):
+        service = make_service(monkeypatch, tmp_path)
+        monkeypatch.setattr(service, "extract_research_focus", lambda text: FOCUS)
+        monkeypatch.setattr(service, "search_openalex_competitors",
+                            delayed(0.4, [{"name": "Smith", "recent_papers": 3, "total_citations": 10}]))
+        monkeypatch.setattr(service, "search_arxiv_preprints",
+                            delayed(0.05, [{"title": "New preprint", "is_very_recent": True}]))
+        monkeypatch.setattr(service, "search_nih_grants", delayed(0.2, [{"title": "R01"}]))
+
+        start = time.time()
+        events = parse_events(service.analyze_stream("manuscript"))
+        elapsed = time.time() - start
+
+        assert elapsed < 0.6  # not 0.65 s of sequential latency
+        names = [name for name, _ in events]
+        source_order = [n for n in names if n.endswith("_found")]
+        assert source_order == ["preprints_found", "grants_found", "competitors_found"]
+
+        updates = [data for name, data in events if name == "analysis_update"]
+        assert [u["urgency_level"] for u in updates] == ["high", "high"]
+        assert updates[0]["total_competitors"] == 0 and updates[-1]["total_competitors"] == 1
+
+        complete = dict(events)["complete"]
+        assert complete["summary"] == {
+            "total_competitors": 1, "total_preprints": 1,
+            "very_recent_preprints": 1, "active_grants": 1,
+        }
+
+    def test_failed_source_does_not_break_the_stream(self, monkeypatch, tmp_path):
+        service = make_service(monkeypatch, tmp_path)
+        monkeypatch.setattr(service, "extract_research_focus", lambda text: FOCUS)
+        monkeypatch.setattr(service, "search_openalex_competitors", delayed(0, []))
+        monkeypatch.setattr(service, "search_arxiv_preprints", delayed(0, []))
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("NIH down")
+
+        monkeypatch.setattr(service, "search_nih_grants", broken)
+        events = dict(parse_events(service.analyze_stream("manuscript")))
+        assert events["grants_found"]["count"] == 0
+        assert events["complete"]["success"] is True
+
+    def test_source_results_are_cached_by_keyword_set(self, monkeypatch, tmp_path):
+        service = make_service(monkeypatch, tmp_path)
+        calls = []
+
+        def fetch(keywords, domain):
+            calls.append(keywords)
+            return [{"title": "R01"}]
+
+        monkeypatch.setattr(service, "_search_nih_grants", fetch)
+        first = service.search_nih_grants(["CAR-T", "Exhaustion", "solid tumors"], "Oncology")
+        again = make_service(monkeypatch, tmp_path)
+        monkeypatch.setattr(again, "_search_nih_grants", fetch)
+        second = again.search_nih_grants(["exhaustion", "solid tumors", "car-t"], "oncology")
+        assert first == second
+        assert len(calls) == 1
+
+    def test_focus_is_cached_per_manuscript_but_failures_are_not(self, monkeypatch, tmp_path):
+        service = make_service(monkeypatch, tmp_path)
+        responses = [None, FOCUS]
+        monkeypatch.setattr(service, "_extract_research_focus", lambda text: responses.pop(0))
+
+        assert service.extract_research_focus("manuscript")["search_keywords"] == []
+        assert service.extract_research_focus("manuscript") == FOCUS
+        assert service.extract_research_focus("manuscript") == FOCUS
+        assert responses == []
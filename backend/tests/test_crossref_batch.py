@@ -0,0 +1,81 @@
+"""
+Tests for batched, cached CrossRef DOI verification.
+
+These tests work WITHOUT API keys or network access (a fake session stands
+in for requests.Session).
+"""
+
+import sys
+import os
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.crossref_service import CrossRefService
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    """DOIs containing 'missing' are 404, 'flaky' are 503, the rest resolve."""
+
+    def __init__(self, delay=0.0):
+        self.headers = {}
+        self.delay = delay
+        self.urls = []
+        self._lock = threading.Lock()
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, timeout=None):
+        with self._lock:
+            self.urls.append(url)
+        time.sleep(self.delay)
+        if "missing" in url:
+            return FakeResponse(404)
+        if "flaky" in url:
+            return FakeResponse(503)
+        return FakeResponse(200, {"message": {
+            "title": ["A paper"], "issued": {"date-parts": [[2020]]},
+            "is-referenced-by-count": 7, "container-title": ["Cell"], "type": "journal-article",
+        }})
+
+
+def make_service(tmp_path, session, **kwargs):
+    kwargs.setdefault("requests_per_second", 1000)
+    return CrossRefService(cache_path=str(tmp_path / "crossref.sqlite3"), session=session, **kwargs)
+
+
+class TestCrossRefBatch:
+    def test_results_keep_input_keys_and_dedupe_case_variants(self, tmp_path):
+        session = FakeSession()
+        results = make_service(tmp_path, session).verify_batch(
+            ["10.1000/ABC", "10.1000/missing", "10.1000/abc"])
+        assert list(results) == ["10.1000/ABC", "10.1000/missing", "10.1000/abc"]
+        assert results["10.1000/ABC"]["valid"] and results["10.1000/ABC"]["journal"] == "Cell"
+        assert results["10.1000/missing"] == {"valid": False, "error": "DOI not found"}
+        assert len(session.urls) == 2
+
+    def test_verified_dois_are_served_from_cache_but_errors_are_retried(self, tmp_path):
+        session = FakeSession()
+        make_service(tmp_path, session).verify_batch(["10.1/a", "10.1/missing", "10.1/flaky"])
+        later = make_service(tmp_path, session)  # e.g. another worker, after a restart
+        results = later.verify_batch(["10.1/a", "10.1/missing", "10.1/flaky"])
+        assert results["10.1/a"]["valid"]
+        assert len(session.urls) == 4  # only the 503 was looked up again
+
+    def test_lookups_run_concurrently(self, tmp_path):
+        session = FakeSession(delay=0.2)
+        service = make_service(tmp_path, session, max_concurrent=3)
+        start = time.perf_counter()
+        service.verify_batch([f"10.1/{i}" for i in range(6)])
+        assert time.perf_counter() - start < 0.7  # serial would be 1.2s
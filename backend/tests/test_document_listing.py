@@ -0,0 +1,102 @@
+"""
+Tests for keyset-paginated, column-projected document listing.
+
+These tests work WITHOUT API keys (SQLite in a temp directory).
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Document, DocumentChunk
+from database.document_listing import (
+    InvalidCursor,
+    cached_count,
+    iter_summaries,
+    keyset_page,
+    summary_row_to_dict,
+)
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'docs.db'}")
+    Document.__table__.create(bind=engine)
+    DocumentChunk.__table__.create(bind=engine)
+    session = sessionmaker(bind=engine)()
+    docs = []
+    for i in range(25):
+        docs.append(Document(
+            id=f"d{i:02d}", tenant_id="t1", title=f"Doc {i}", content="x" * 1000,
+            # pairs of documents share a timestamp, so id must break ties
+            created_at=BASE + timedelta(minutes=i // 2),
+            classification_confidence=None if i % 5 == 0 else i / 100,
+            doc_metadata={"file_size": i * 10, "is_protocol": i % 2 == 0},
+        ))
+    docs.append(Document(id="other", tenant_id="t2", title="Other tenant", created_at=BASE))
+    session.add_all(docs)
+    session.commit()
+    yield session
+    session.close()
+
+
+def tenant_query(db):
+    return db.query(Document).filter(Document.tenant_id == "t1")
+
+
+def all_pages(db, sort, order, limit):
+    ids, cursor = [], None
+    while True:
+        rows, cursor = keyset_page(tenant_query(db), sort, order, cursor, limit)
+        ids.extend(row.id for row in rows)
+        if cursor is None:
+            return ids
+
+
+class TestDocumentListing:
+    def test_summary_matches_to_dict_without_content(self, db):
+        rows, _ = keyset_page(tenant_query(db), limit=3)
+        for row in rows:
+            expected = db.get(Document, row.id).to_dict()
+            assert summary_row_to_dict(row) == expected
+
+    def test_cursor_pages_cover_every_document_once_in_order(self, db):
+        expected_desc = [d.id for d in tenant_query(db).order_by(
+            Document.created_at.desc(), Document.id.desc())]
+        assert all_pages(db, 'created_at', 'desc', 4) == expected_desc
+        assert all_pages(db, 'created_at', 'asc', 7) == expected_desc[::-1]
+
+    def test_nullable_confidence_sort_keeps_nulls_last(self, db):
+        ids = all_pages(db, 'classification_confidence', 'desc', 6)
+        assert len(ids) == len(set(ids)) == 25
+        assert ids[0] == "d24"
+        assert set(ids[-5:]) == {"d00", "d05", "d10", "d15", "d20"}
+
+    def test_cursor_from_another_sort_is_rejected(self, db):
+        _, cursor = keyset_page(tenant_query(db), 'created_at', 'desc', None, 2)
+        with pytest.raises(InvalidCursor):
+            keyset_page(tenant_query(db), 'classification_confidence', 'desc', cursor, 2)
+        with pytest.raises(InvalidCursor):
+            keyset_page(tenant_query(db), 'created_at', 'desc', "not-a-cursor", 2)
+
+    def test_export_streams_every_summary_in_batches(self, db):
+        summaries = list(iter_summaries(tenant_query(db), batch_size=10))
+        assert len(summaries) == 25
+        assert all("content" not in s for s in summaries)
+        assert summaries[0]["file_size"] == 240 and summaries[0]["is_protocol"] is True
+
+    def test_cached_count_is_reused_until_ttl(self, db):
+        assert cached_count(tenant_query(db), "t1", "sig-a") == 25
+        db.add(Document(id="late", tenant_id="t1", title="Late", created_at=BASE))
+        db.commit()
+        assert cached_count(tenant_query(db), "t1", "sig-a") == 25
+        assert cached_count(tenant_query(db), "t1", "sig-b") == 26
@@ -0,0 +1,81 @@
+"""
+Tests for the document full-text search index (SQLite FTS5 path).
+
+These tests work WITHOUT API keys (in-memory SQLite).
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Document, DocumentChunk
+from database.document_search import (
+    apply_ranked_search,
+    document_search_index_exists,
+    ensure_document_search_index,
+    probe_document_search_index,
+    to_fts5_query,
+    to_tsquery_text,
+)
+
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'docs.db'}")
+    Document.__table__.create(bind=engine)
+    DocumentChunk.__table__.create(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        Document(id="old", tenant_id="t1", title="Lab meeting notes", sender="Ana",
+                 content="We agreed the western blot protocol needs a new antibody."),
+        Document(id="other-tenant", tenant_id="t2", title="Western blot SOP", content=""),
+    ])
+    db.commit()
+    return engine, db
+
+
+def ranked_ids(db, search, tenant_id="t1"):
+    query = db.query(Document).filter(Document.tenant_id == tenant_id)
+    query, order = apply_ranked_search(db, query, search)
+    return [d.id for d in query.order_by(order).all()]
+
+
+class TestDocumentSearch:
+    def test_query_builders_strip_syntax_and_prefix_match(self):
+        assert to_tsquery_text("western BLO!") == "western & blo:*"
+        assert to_fts5_query('western "blo') == '"western" "blo"*'
+        assert to_fts5_query("!!") is None
+
+    def test_backfills_existing_rows_and_ranks_title_matches_first(self, tmp_path):
+        engine, db = make_session(tmp_path)
+        assert ensure_document_search_index(engine)
+        db.add(Document(id="new", tenant_id="t1", title="Western blot troubleshooting", content="Bands are faint."))
+        db.commit()
+        assert ranked_ids(db, "western blo") == ["new", "old"]
+        assert ranked_ids(db, "antibod") == ["old"]
+
+    def test_updates_and_deletes_stay_in_sync(self, tmp_path):
+        engine, db = make_session(tmp_path)
+        ensure_document_search_index(engine)
+        doc = db.get(Document, "old")
+        doc.content = "Freezer inventory for the confocal room."
+        db.commit()
+        assert ranked_ids(db, "antibody") == []
+        assert ranked_ids(db, "confocal") == ["old"]
+        db.delete(doc)
+        db.commit()
+        assert ranked_ids(db, "confocal") == []
+
+    def test_falls_back_when_index_missing(self, tmp_path):
+        engine, db = make_session(tmp_path)
+        assert apply_ranked_search(db, db.query(Document), "western") is None
+
+    def test_probe_never_builds_the_index(self, tmp_path):
+        engine, db = make_session(tmp_path)
+        assert not probe_document_search_index(engine)
+        assert not document_search_index_exists(db)
+        ensure_document_search_index(engine)
+        assert probe_document_search_index(engine)
@@ -0,0 +1,83 @@
+"""
+Tests for the query embedding cache (per-turn memo + process LRU).
+
+These tests work WITHOUT API keys (embed_fn is a local counter).
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.embedding_cache import (
+    EmbeddingLRUCache,
+    embedding_scope,
+    get_cached_embedding,
+    clear_embedding_cache,
+)
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text, dimensions):
+        self.calls.append(text)
+        return [float(len(text))] * 4
+
+
+class TestEmbeddingScope:
+    def setup_method(self):
+        clear_embedding_cache()
+
+    def test_same_text_embedded_once_per_turn(self):
+        embed = CountingEmbedder()
+        with embedding_scope("test") as scope:
+            for _ in range(3):
+                get_cached_embedding("what is our PCR protocol", embed_fn=embed, model="m")
+        assert embed.calls == ["what is our PCR protocol"]
+        assert scope.api_calls == 1
+        assert scope.request_hits == 2
+
+    def test_nested_scope_reuses_outer(self):
+        embed = CountingEmbedder()
+        with embedding_scope("outer") as outer:
+            get_cached_embedding("q", embed_fn=embed, model="m")
+            with embedding_scope("inner") as inner:
+                assert inner is outer
+                get_cached_embedding("q", embed_fn=embed, model="m")
+        assert len(embed.calls) == 1
+
+    def test_process_cache_shared_across_turns(self):
+        embed = CountingEmbedder()
+        with embedding_scope():
+            get_cached_embedding("q", embed_fn=embed, model="m")
+        with embedding_scope() as second:
+            get_cached_embedding("q", embed_fn=embed, model="m")
+        assert len(embed.calls) == 1
+        assert second.process_hits == 1
+
+    def test_dimensions_and_model_are_part_of_key(self):
+        embed = CountingEmbedder()
+        get_cached_embedding("q", dimensions=1536, embed_fn=embed, model="m")
+        get_cached_embedding("q", dimensions=3072, embed_fn=embed, model="m")
+        get_cached_embedding("q", dimensions=1536, embed_fn=embed, model="other")
+        assert len(embed.calls) == 3
+
+
+class TestEmbeddingLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = EmbeddingLRUCache(max_entries=2, ttl_seconds=60)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")
+        cache.put("c", [3.0])
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0]
+        assert cache.stats()["evictions"] == 1
+
+    def test_expired_entries_miss(self):
+        cache = EmbeddingLRUCache(max_entries=10, ttl_seconds=-1)
+        cache.put("a", [1.0])
+        assert cache.get("a") is None
+        assert cache.stats()["misses"] == 1
@@ -0,0 +1,81 @@
+"""
+Tests for the concurrent embedding pipeline (vector_stores/embedding_pipeline.py).
+
+These tests work WITHOUT API keys (a fake embeddings client is injected).
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_stores.embedding_pipeline import EmbeddingPipeline
+
+
+class _Item:
+    def __init__(self, index, embedding):
+        self.index = index
+        self.embedding = embedding
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _RateLimitResponse:
+    status_code = 429
+    headers = {"retry-after-ms": "10"}
+
+
+class _RateLimitError(Exception):
+    status_code = 429
+    response = _RateLimitResponse()
+
+
+class FakeEmbeddings:
+    def __init__(self, rate_limit_first=0, poison="POISON"):
+        self.calls = 0
+        self.rate_limit_first = rate_limit_first
+        self.poison = poison
+
+    def create(self, model, input, dimensions):
+        self.calls += 1
+        if self.calls <= self.rate_limit_first:
+            raise _RateLimitError("429")
+        if self.poison in input:
+            raise ValueError("bad input")
+        # Return out of order to check index-based reordering
+        return _Response([_Item(i, [float(len(t))]) for i, t in reversed(list(enumerate(input)))])
+
+
+class FakeClient:
+    def __init__(self, **kwargs):
+        self.embeddings = FakeEmbeddings(**kwargs)
+
+
+class TestEmbeddingPipeline:
+    def test_results_aligned_with_inputs(self):
+        pipeline = EmbeddingPipeline(client=FakeClient(), model="m", max_batch_tokens=20)
+        texts = ["a" * n for n in range(1, 40)]
+        vectors = pipeline.embed(texts)
+        assert [v[0] for v in vectors] == [float(len(t)) for t in texts]
+        assert pipeline.last_stats.requests > 1
+
+    def test_batches_packed_by_tokens(self):
+        pipeline = EmbeddingPipeline(client=FakeClient(), model="m", max_batch_tokens=11)
+        batches = pipeline._pack(["x" * 36] * 4, [0, 1, 2, 3])  # 10 tokens each
+        assert [len(b.indices) for b in batches] == [1, 1, 1, 1]
+
+    def test_rate_limited_batches_are_requeued(self):
+        pipeline = EmbeddingPipeline(client=FakeClient(rate_limit_first=2), model="m")
+        vectors = pipeline.embed(["hello", "world"])
+        assert all(v is not None for v in vectors)
+        assert pipeline.last_stats.rate_limited == 2
+
+    def test_poison_input_isolated_and_never_zero_vector(self):
+        pipeline = EmbeddingPipeline(client=FakeClient(), model="m", max_attempts=1)
+        texts = ["ok-1", "ok-2", "POISON", "ok-3"]
+        vectors = pipeline.embed(texts)
+        assert vectors[2] is None
+        assert all(vectors[i] is not None for i in (0, 1, 3))
@@ -0,0 +1,76 @@
+"""
+Tests for the blocking-key index behind EntityResolver.get_canonical.
+
+These tests work WITHOUT API keys (pure string matching).
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.knowledge_gap_v3.deep_extractor import EntityType
+from services.knowledge_gap_v3.knowledge_graph import EntityResolver
+
+
+def full_scan_canonical(resolver, name, entity_type):
+    """get_canonical before the index: compare against every earlier entry."""
+    normalized = resolver.normalize_name(name)
+    key = f"{entity_type.value}:{normalized}"
+    if key in resolver.canonical_map:
+        return resolver.canonical_map[key]
+    for existing_key, canonical in resolver.canonical_map.items():
+        if existing_key.startswith(f"{entity_type.value}:"):
+            if resolver.are_similar(normalized, existing_key.split(":", 1)[1]):
+                resolver.canonical_map[key] = canonical
+                return canonical
+    resolver.canonical_map[key] = name
+    return name
+
+
+def corpus(n, seed):
+    rng = random.Random(seed)
+    alphabet = "abcdeilmnorst"
+    words = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 7))) for _ in range(40)]
+    mentions = []
+    for _ in range(n):
+        parts = [rng.choice(words) for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.2:
+            parts[0] = parts[0][0] + "."
+        name = " ".join(parts)
+        if rng.random() < 0.1:
+            name = "Dr. " + name
+        if rng.random() < 0.1:
+            name = name.replace(" ", ".") + "@lab.org"
+        mentions.append((name, rng.choice([EntityType.PERSON, EntityType.SYSTEM])))
+    return mentions
+
+
+class TestEntityResolverIndex:
+    def test_matches_full_scan_on_regression_corpus(self):
+        for seed in (1, 2, 3):
+            mentions = corpus(700, seed)
+            indexed, reference = EntityResolver(), EntityResolver()
+            for name, entity_type in mentions:
+                assert indexed.get_canonical(name, entity_type) == full_scan_canonical(reference, name, entity_type)
+
+    def test_matches_full_scan_at_other_thresholds(self):
+        for threshold in (0.6, 0.95):
+            indexed, reference = EntityResolver(threshold), EntityResolver(threshold)
+            for name, entity_type in corpus(400, 7):
+                assert indexed.get_canonical(name, entity_type) == full_scan_canonical(reference, name, entity_type)
+
+    def test_abbreviations_titles_and_emails_resolve_together(self):
+        resolver = EntityResolver()
+        canonical = resolver.get_canonical("John Smith", EntityType.PERSON)
+        for variant in ("J. Smith", "Dr. John Smith", "john.smith@lab.org", "Jon Smith"):
+            assert resolver.get_canonical(variant, EntityType.PERSON) == canonical
+        assert resolver.get_canonical("John Smith", EntityType.SYSTEM) == "John Smith"
+        assert resolver.get_canonical("Jane Doe", EntityType.PERSON) == "Jane Doe"
+
+    def test_external_canonical_map_changes_are_indexed(self):
+        resolver = EntityResolver()
+        resolver.get_canonical("Salesforce", EntityType.SYSTEM)
+        resolver.canonical_map["SYSTEM:snowflake warehouse"] = "Snowflake"
+        assert resolver.get_canonical("Snowflake Warehouses", EntityType.SYSTEM) == "Snowflake"
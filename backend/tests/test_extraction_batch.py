@@ -0,0 +1,92 @@
+"""
+Tests for concurrent v3 deep extraction with the persistent extraction cache.
+
+These tests work WITHOUT API keys (fake chat client, in-memory SQLite).
+"""
+
+import sys
+import os
+import json
+import time
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.models import DocumentExtractionCache
+from services.knowledge_gap_v3.deep_extractor import DeepDocumentExtractor
+from services.knowledge_gap_v3.extraction_cache import ExtractionCache
+
+
+class FakeChatClient:
+    def __init__(self, fail_titles=()):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_titles = set(fail_titles)
+        self._lock = threading.Lock()
+
+    def chat_completion(self, messages, **kwargs):
+        prompt = messages[1]["content"]
+        with self._lock:
+            self.calls.append(prompt)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02)
+        with self._lock:
+            self.in_flight -= 1
+        if any(t in prompt for t in self.fail_titles):
+            raise RuntimeError("model unavailable")
+        body = {"summary": prompt.split("\n")[2], "entities": [{"name": "LIMS", "entity_type": "SYSTEM"}]}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(body)))])
+
+
+def make_extractor(client):
+    extractor = DeepDocumentExtractor.__new__(DeepDocumentExtractor)
+    extractor.client = client
+    extractor.model = "gpt-test"
+    return extractor
+
+
+def make_cache():
+    engine = create_engine("sqlite:///:memory:")
+    DocumentExtractionCache.__table__.create(bind=engine)
+    return ExtractionCache(sessionmaker(bind=engine)(), "t1")
+
+
+def docs(n, changed=None):
+    return [{"doc_id": f"d{i}", "title": f"Doc {i}",
+             "content": f"Content {i} {'v2' if i == changed else 'v1'}"} for i in range(n)]
+
+
+class TestExtractBatch:
+    def test_runs_concurrently_within_bound_and_keeps_order(self):
+        client = FakeChatClient()
+        progress = []
+        results = make_extractor(client).extract_batch(
+            docs(12), max_concurrent=4, progress_callback=lambda d, t, title: progress.append(d)
+        )
+        assert [r.doc_id for r in results] == [f"d{i}" for i in range(12)]
+        assert 1 < client.max_in_flight <= 4
+        assert progress == list(range(1, 13))
+
+    def test_only_changed_documents_are_re_extracted(self):
+        cache = make_cache()
+        client = FakeChatClient()
+        first = make_extractor(client).extract_batch(docs(5), cache=cache)
+        assert len(client.calls) == 5
+
+        second = make_extractor(client).extract_batch(docs(5, changed=3), cache=cache)
+        assert len(client.calls) == 6 and "Content 3 v2" in client.calls[-1]
+        assert second[0].entities[0].name == "LIMS"
+        assert second[0].extracted_at == first[0].extracted_at
+
+    def test_failed_extractions_are_not_cached(self):
+        cache = make_cache()
+        make_extractor(FakeChatClient(fail_titles={"Doc 1"})).extract_batch(docs(3), cache=cache)
+        retry = FakeChatClient()
+        results = make_extractor(retry).extract_batch(docs(3), cache=cache)
+        assert len(retry.calls) == 1 and results[1].confidence > 0
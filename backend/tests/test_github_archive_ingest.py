@@ -0,0 +1,280 @@
+"""
+Tests for tarball-based GitHub ingestion and blob-SHA incremental syncs.
+
+These tests work WITHOUT API keys or network access (requests.get is
+replaced by a fake GitHub API serving an in-memory repository tarball;
+the sync route runs against SQLite with fake extraction/embedding services).
+"""
+
+import sys
+import os
+import io
+import base64
+import hashlib
+import tarfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import connectors.github_connector as github_module
+from connectors.base_connector import ConnectorConfig
+from connectors.github_connector import GitHubConnector
+from database.models import (
+    Connector, ConnectorStatus, ConnectorType, DeletedDocument, Document as DBDocument, DocumentChunk,
+    utc_now,
+)
+
+
+def blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, text="", body=None, raw=None):
+        self.status_code = status_code
+        self.text = text
+        self._body = body
+        self.raw = raw
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class FakeGitHub:
+    """Serves commits/HEAD, git/trees/<sha>, tarball/<sha> and contents/<path> for one repo."""
+
+    def __init__(self, files):
+        self.commits = {}
+        self.head = None
+        self.calls = []
+        self.tarball_broken = False
+        self.push(files)
+
+    def push(self, files):
+        self.head = hashlib.sha1(repr(sorted(files.items())).encode()).hexdigest()
+        self.commits[self.head] = dict(files)
+
+    def get(self, url, headers=None, params=None, timeout=None, stream=False):
+        if url.endswith("/user/repos"):
+            return FakeResponse(body=[{"full_name": "acme/lab", "description": "Lab pipeline",
+                                       "updated_at": "2025-01-01T00:00:00Z"}])
+        path = url.split("/repos/acme/lab/", 1)[1]
+        self.calls.append(path.split("/")[0])
+        files = self.commits[self.head]
+        if path == "commits/HEAD":
+            return FakeResponse(text=self.head)
+        if path.startswith("git/trees/"):
+            files = self.commits[path.rsplit("/", 1)[1]]
+            tree = [{"path": p, "type": "blob", "sha": blob_sha(d), "size": len(d)} for p, d in files.items()]
+            return FakeResponse(body={"tree": tree})
+        if path.startswith("tarball/"):
+            if self.tarball_broken:
+                return FakeResponse(status_code=502)
+            files = self.commits[path.rsplit("/", 1)[1]]
+            buf = io.BytesIO()
+            with tarfile.open(fileobj=buf, mode="w:gz") as archive:
+                for name, data in files.items():
+                    info = tarfile.TarInfo(f"acme-lab-{self.head[:7]}/{name}")
+                    info.size = len(data)
+                    archive.addfile(info, io.BytesIO(data))
+            buf.seek(0)
+            return FakeResponse(raw=buf)
+        if path.startswith("contents/"):
+            return FakeResponse(body={"content": base64.b64encode(files[path.split("/", 1)[1]]).decode()})
+        return FakeResponse(status_code=404)
+
+
+FILES = {
+    "README.md": b"# Lab pipeline\n",
+    "src/align.py": b"def align(reads):\n    return reads\n",
+    "src/call.py": b"def call(variants):\n    return variants\n",
+    "data/logo.json": b"\xff\xfe not utf-8",
+    "node_modules/pkg/index.js": b"module.exports = {}\n",
+}
+
+
+@pytest.fixture
+def github(monkeypatch, tmp_path):
+    monkeypatch.setattr(github_module, "GITHUB_STATE_PATH", str(tmp_path / "github_state.sqlite3"))
+    fake = FakeGitHub(FILES)
+    monkeypatch.setattr(github_module.requests, "get", fake.get)
+    config = ConnectorConfig(connector_type="github", user_id="u1", connector_id="c1",
+                             credentials={"access_token": "token"})
+    return fake, GitHubConnector(config)
+
+
+class TestGitHubArchiveIngest:
+    def test_full_fetch_reads_every_file_from_one_tarball(self, github):
+        fake, connector = github
+        files = connector.fetch_repository_code("acme", "lab", max_files=100)
+
+        assert fake.calls == ["commits", "git", "tarball"]
+        by_path = {f["path"]: f for f in files}
+        # node_modules is filtered out, the non-UTF-8 file is skipped
+        assert set(by_path) == {"README.md", "src/align.py", "src/call.py"}
+        assert by_path["src/align.py"]["content"] == FILES["src/align.py"].decode()
+        assert by_path["src/align.py"]["language"] == "Python"
+        assert by_path["src/align.py"]["sha"] == blob_sha(FILES["src/align.py"])
+        assert connector.last_commit_sha == fake.head
+
+    def test_incremental_fetch_only_reads_changed_blobs(self, github):
+        fake, connector = github
+        connector.fetch_repository_code("acme", "lab")
+        connector.save_repository_state("acme", "lab", connector.last_commit_sha, connector.last_blob_shas)
+
+        pushed = dict(FILES)
+        pushed["src/align.py"] = b"def align(reads, ref):\n    return reads\n"
+        pushed["src/qc.py"] = b"def qc():\n    pass\n"
+        del pushed["src/call.py"]
+        fake.push(pushed)
+
+        changes = connector.fetch_changed_code("acme", "lab")
+        assert changes["commit"] == fake.head
+        assert sorted(f["path"] for f in changes["files"]) == ["src/align.py", "src/qc.py"]
+        assert changes["removed"] == ["src/call.py"]
+        # README.md and the (binary) JSON file kept their blob SHAs
+        assert changes["unchanged"] == 2
+        assert changes["blobs"]["src/qc.py"] == blob_sha(pushed["src/qc.py"])
+        assert changes["blobs"]["data/logo.json"] == blob_sha(FILES["data/logo.json"])
+        assert "src/call.py" not in changes["blobs"]
+
+    def test_unchanged_head_costs_one_call(self, github):
+        fake, connector = github
+        connector.fetch_repository_code("acme", "lab")
+        connector.save_repository_state("acme", "lab", connector.last_commit_sha, connector.last_blob_shas)
+        fake.calls.clear()
+
+        changes = connector.fetch_changed_code("acme", "lab")
+        assert fake.calls == ["commits"]
+        assert changes["files"] == [] and changes["unchanged"] == 4
+
+    def test_falls_back_to_contents_api_when_tarball_fails(self, github):
+        fake, connector = github
+        fake.tarball_broken = True
+        files = connector.fetch_repository_code("acme", "lab")
+        assert {f["path"] for f in files} == {"README.md", "src/align.py", "src/call.py"}
+        assert fake.calls.count("contents") == 4
+
+
+class FakeExtractionService:
+    def extract_documents(self, documents, db, force=False, progress_callback=None):
+        return {'extracted': 0}
+
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.embedded = []
+        self.deleted = []
+        self.delete_succeeds = True
+
+    def embed_documents(self, documents, tenant_id, db, force_reembed=False, progress_callback=None):
+        for doc in documents:
+            doc.embedded_at = utc_now()
+            self.embedded.append(doc.external_id)
+        db.commit()
+        return {'embedded': len(documents), 'chunks': 0}
+
+    def delete_document_embeddings(self, document_ids, tenant_id, db=None):
+        self.deleted.extend(document_ids)
+        return {'success': self.delete_succeeds}
+
+
+@pytest.fixture
+def sync_route(monkeypatch, tmp_path):
+    import api.integration_routes as routes
+    import services.code_analysis_service as code_analysis
+
+    monkeypatch.setattr(github_module, "GITHUB_STATE_PATH", str(tmp_path / "github_state.sqlite3"))
+    fake = FakeGitHub(FILES)
+    monkeypatch.setattr(github_module.requests, "get", fake.get)
+
+    def no_llm():
+        raise RuntimeError("no API key")
+    monkeypatch.setattr(code_analysis, "CodeAnalysisService", no_llm)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'sync.db'}")
+    for model in (Connector, DBDocument, DocumentChunk, DeletedDocument):
+        model.__table__.create(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    db.add(Connector(id="c1", tenant_id="t1", connector_type=ConnectorType.GITHUB,
+                     status=ConnectorStatus.CONNECTED, access_token="token",
+                     settings={"repository": "acme/lab"}))
+    db.commit()
+    db.close()
+
+    embeddings = FakeEmbeddingService()
+    monkeypatch.setattr(routes, "get_db", session_factory)
+    monkeypatch.setattr(routes, "get_extraction_service", FakeExtractionService)
+    monkeypatch.setattr(routes, "get_embedding_service", lambda: embeddings)
+
+    def run_sync():
+        routes._run_connector_sync("c1", "github", None, "t1", "u1")
+        with session_factory() as session:
+            return {d.external_id: (d.id, d.content, d.embedded_at) for d in session.query(DBDocument)}
+
+    return fake, embeddings, run_sync
+
+
+def push_changes(fake):
+    pushed = dict(FILES)
+    pushed["src/align.py"] = b"def align(reads, ref):\n    return reads\n"
+    del pushed["src/call.py"]
+    fake.push(pushed)
+
+
+def recorded_commit():
+    state = GitHubConnector(ConnectorConfig(connector_type="github", user_id="u1", connector_id="c1"))
+    return state.get_repository_state("acme", "lab")['commit']
+
+
+class TestGitHubSyncRoute:
+    def test_incremental_sync_replaces_changed_files_and_deletes_removed_ones(self, sync_route):
+        fake, embeddings, run_sync = sync_route
+        first = run_sync()
+        assert "github_acme_lab_src_call.py" in first
+        first_head = fake.head
+
+        push_changes(fake)
+        embeddings.embedded.clear()
+        second = run_sync()
+
+        align_id, align_content, align_embedded = second["github_acme_lab_src_align.py"]
+        assert align_id == first["github_acme_lab_src_align.py"][0]
+        assert "def align(reads, ref):" in align_content
+        assert align_embedded is not None
+        assert embeddings.embedded == ["github_acme_lab_src_align.py"]
+        assert "github_acme_lab_src_call.py" not in second
+        assert embeddings.deleted == [first["github_acme_lab_src_call.py"][0]]
+        assert len(second) == len(first) - 1
+        assert recorded_commit() == fake.head != first_head
+
+    def test_state_is_kept_until_removed_documents_are_deleted(self, sync_route):
+        fake, embeddings, run_sync = sync_route
+        run_sync()
+        first_head = fake.head
+
+        push_changes(fake)
+        embeddings.delete_succeeds = False
+        second = run_sync()
+        assert "github_acme_lab_src_call.py" in second
+        assert recorded_commit() == first_head
+
+        # The next sync offers the removal again
+        embeddings.delete_succeeds = True
+        third = run_sync()
+        assert "github_acme_lab_src_call.py" not in third
+        assert recorded_commit() == fake.head
@@ -0,0 +1,199 @@
+"""
+Tests for the concurrent grant source fan-out and the local grant index.
+
+These tests work WITHOUT API keys or network access (source searches are
+stubs, the vector store returns no matches, the index is file SQLite).
+"""
+
+import sys
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.models import GrantListing
+from database.grant_index import ensure_grant_search_index
+from services.grant_finder_service import GrantFinderService
+
+
+class EmptyVectorStore:
+    def search(self, query, tenant_id, top_k):
+        return []
+
+
+def grant(id, title, source="nih_reporter", abstract="", agency="NIH", award_amount=0, activity_code=""):
+    return {
+        "id": id, "source": source, "title": title, "abstract": abstract,
+        "agency": agency, "agency_full": agency, "award_amount": award_amount,
+        "activity_code": activity_code, "url": "",
+        "fit_score": 0, "fit_reasons": [], "matching_docs": [],
+    }
+
+
+def delayed(seconds, value):
+    def search(*args, **kwargs):
+        time.sleep(seconds)
+        return value
+    return search
+
+
+def failing(*args, **kwargs):
+    raise AssertionError("live source searched")
+
+
+@pytest.fixture
+def finder():
+    service = GrantFinderService()
+    service._vector_store = EmptyVectorStore()
+    return service
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'grants.db'}")
+    assert ensure_grant_search_index(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def stub_sources(monkeypatch, finder, nih, grants_gov, nsf, federal_reporter):
+    monkeypatch.setattr(finder, "search_nih_reporter", nih)
+    monkeypatch.setattr(finder, "search_grants_gov", grants_gov)
+    monkeypatch.setattr(finder, "search_nsf_awards", nsf)
+    monkeypatch.setattr(finder, "search_federal_reporter", federal_reporter)
+
+
+class TestSourceFanOut:
+    def test_sources_stream_as_they_land_and_slow_ones_time_out(self, monkeypatch, finder):
+        stub_sources(
+            monkeypatch, finder,
+            nih=delayed(0.3, [grant("nih_1", "Tumor microenvironment imaging")]),
+            grants_gov=delayed(0.05, [grant("grants_gov_1", "Rural health outreach", source="grants_gov")]),
+            nsf=delayed(2.0, [grant("nsf_1", "Never returned in time", source="nsf")]),
+            federal_reporter=failing,
+        )
+
+        started = time.monotonic()
+        events = list(finder.iter_source_results("health", deadline=0.6))
+        elapsed = time.monotonic() - started
+
+        assert [(source, timed_out) for source, _, timed_out in events] == [
+            ("federal_reporter", False), ("grants_gov", False), ("nih_reporter", False), ("nsf", True),
+        ]
+        assert [g["id"] for g in events[1][1]] == ["grants_gov_1"]
+        assert events[0][1] == [] and events[3][1] == []
+        assert elapsed < 1.5
+
+    def test_per_source_deadlines_override_the_default(self, monkeypatch, finder):
+        stub_sources(
+            monkeypatch, finder,
+            nih=delayed(0.3, [grant("nih_1", "Tumor microenvironment imaging")]),
+            grants_gov=delayed(0.0, []),
+            nsf=delayed(0.0, []),
+            federal_reporter=delayed(0.0, []),
+        )
+        events = list(finder.iter_source_results("tumor", deadline=5.0, deadlines={"nih_reporter": 0.1}))
+        assert [(source, timed_out) for source, _, timed_out in events if source == "nih_reporter"] == [
+            ("nih_reporter", True)]
+
+
+class TestGrantIndex:
+    def test_index_dedups_across_sources_and_refreshes_listings(self, finder, db):
+        title = "Single-cell atlas of the aging brain"
+        indexed = finder.index_grants(db, [
+            grant("nih_1", title, abstract="Short."),
+            grant("fedreporter_1", title, source="federal_reporter", abstract="A much longer abstract."),
+            grant("nsf_1", "Coastal erosion sensing", source="nsf", agency="NSF"),
+        ])
+        assert indexed == 2
+        assert sorted(r.id for r in db.query(GrantListing)) == ["fedreporter_1", "nsf_1"]
+
+        first_seen = db.get(GrantListing, "nsf_1").last_seen_at
+        # Next day: NIH now has the richer record, NSF listing is seen again
+        finder.index_grants(db, [
+            grant("nih_1", title, abstract="An even longer abstract than the other record."),
+            grant("nsf_1", "Coastal erosion sensing", source="nsf", agency="NSF", award_amount=5000),
+        ])
+        assert sorted(r.id for r in db.query(GrantListing)) == ["nih_1", "nsf_1"]
+        nsf = db.get(GrantListing, "nsf_1")
+        assert nsf.award_amount == 5000 and nsf.last_seen_at >= first_seen
+        assert "fit_score" not in nsf.data
+
+    def test_search_local_applies_the_live_filters(self, finder, db):
+        finder.index_grants(db, [
+            grant("nih_1", "Cancer immunotherapy trial network", activity_code="R01", award_amount=500000),
+            grant("nih_2", "Cancer screening in rural clinics", activity_code="R21", award_amount=100000),
+            grant("grants_gov_1", "Cancer survivorship programs", source="grants_gov", agency="HHS"),
+            grant("grants_gov_2", "Cancer models in defense labs", source="grants_gov", agency="DOD"),
+            grant("nsf_1", "Ocean carbon sensing", source="nsf", agency="NSF"),
+        ])
+
+        assert {g["id"] for g in finder.search_local(db, "cancer")} == {
+            "nih_1", "nih_2", "grants_gov_1", "grants_gov_2"}
+        assert {g["id"] for g in finder.search_local(db, "canc", agencies=["HHS-NIH11"])} == {
+            "nih_1", "nih_2", "grants_gov_1"}
+        assert {g["id"] for g in finder.search_local(db, "cancer", activity_codes=["R01"], amount_min=200000)} == {
+            "nih_1", "grants_gov_1", "grants_gov_2"}
+        # Title matches outrank abstract-only matches
+        finder.index_grants(db, [grant("nsf_2", "Reef survey", source="nsf", abstract="ocean ocean ocean")])
+        assert [g["id"] for g in finder.search_local(db, "ocean")] == ["nsf_1", "nsf_2"]
+
+    def test_prune_drops_listings_no_scrape_has_returned(self, finder, db):
+        finder.index_grants(db, [grant("nih_1", "Cancer immunotherapy trial network"),
+                                 grant("nih_2", "Cancer screening in rural clinics")])
+        db.get(GrantListing, "nih_1").last_seen_at = datetime.now(timezone.utc) - timedelta(days=45)
+        db.commit()
+        assert finder.prune_index(db, older_than_days=30) == 1
+        assert [r.id for r in db.query(GrantListing)] == ["nih_2"]
+
+
+class TestLocalFirstSearch:
+    def test_fresh_index_with_enough_hits_skips_the_live_apis(self, monkeypatch, finder, db):
+        stub_sources(monkeypatch, finder, failing, failing, failing, failing)
+        finder.index_grants(db, [grant("nih_1", "Cancer immunotherapy trial network"),
+                                 grant("nih_2", "Cancer screening in rural clinics")])
+
+        result = finder.search("cancer", tenant_id="t1", limit=2, db=db)
+        assert {g["id"] for g in result["results"]} == {"nih_1", "nih_2"}
+        assert result["sources"]["local_index"] == 2
+        assert result["sources"]["nih_reporter"] == 0
+        assert result["timed_out"] == []
+
+    def test_sparse_index_tops_up_from_the_live_apis(self, monkeypatch, finder, db):
+        title = "Cancer immunotherapy trial network"
+        stub_sources(
+            monkeypatch, finder,
+            nih=delayed(0.0, [grant("nih_1", title), grant("nih_9", "Cancer vaccine design")]),
+            grants_gov=delayed(0.0, []),
+            nsf=delayed(0.0, [grant("nsf_1", title, source="nsf")]),
+            federal_reporter=delayed(0.0, []),
+        )
+        finder.index_grants(db, [grant("nih_1", title)])
+
+        events = list(finder.stream_search("cancer", tenant_id="t1", limit=5, db=db))
+        assert [e["event"] for e in events][0] == "local"
+        assert [g["id"] for g in events[0]["results"]] == ["nih_1"]
+        assert len([e for e in events if e["event"] == "source"]) == 4
+
+        done = events[-1]
+        assert done["event"] == "done"
+        assert sorted(g["id"] for g in done["results"]) == ["nih_1", "nih_9"]
+        assert done["sources"]["nih_reporter"] == 2 and done["sources"]["local_index"] == 1
+
+    def test_stale_index_is_topped_up(self, monkeypatch, finder, db):
+        stub_sources(monkeypatch, finder, delayed(0.0, [grant("nih_9", "Cancer vaccine design")]),
+                     delayed(0.0, []), delayed(0.0, []), delayed(0.0, []))
+        finder.index_grants(db, [grant("nih_1", "Cancer immunotherapy trial network")])
+        db.get(GrantListing, "nih_1").last_seen_at = datetime.now(timezone.utc) - timedelta(days=3)
+        db.commit()
+
+        result = finder.search("cancer", tenant_id="t1", limit=1, db=db)
+        assert result["total"] == 2
+        assert result["sources"]["nih_reporter"] == 1
@@ -0,0 +1,108 @@
+"""
+Tests for the memory-mapped, per-tenant cached local RAG index.
+
+These tests work WITHOUT API keys or a database (tenant slugs are
+pre-resolved, the OpenAI client is a fake).
+"""
+
+import sys
+import os
+import pickle
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.local_rag_service as local_rag
+from services.local_rag_service import LocalRAGService
+
+
+class FakeClient:
+    def __init__(self, query_embedding):
+        self.query_embedding = query_embedding
+
+    def create_embedding(self, text):
+        return SimpleNamespace(data=[SimpleNamespace(embedding=self.query_embedding)])
+
+    def chat_completion(self, messages, temperature, max_tokens):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="answer"))])
+
+
+def write_index(path, embeddings, mtime):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump({
+            "chunks": [f"chunk {i}" for i in range(len(embeddings))],
+            "embeddings": np.asarray(embeddings, dtype=np.float32),
+            "doc_index": {i: {"doc_id": f"d{i}", "title": f"Doc {i}"} for i in range(len(embeddings))},
+        }, f)
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(local_rag, "get_openai_client", lambda: FakeClient([1.0, 0.0, 0.0]))
+    rag = LocalRAGService()
+    rag.base_dir = tmp_path
+    rag._slugs.update({"t1": "lab-a", "t2": "lab-b", "t3": "lab-c"})
+    return rag
+
+
+class TestLocalRAGIndex:
+    def test_sidecars_are_rebuilt_when_the_index_changes(self, service, tmp_path):
+        index_path = tmp_path / "lab-a" / "embedding_index.pkl"
+        write_index(index_path, [[3.0, 4.0, 0.0], [0.0, 0.0, 2.0]], mtime=1_000_000)
+
+        first = service._load_index("t1")
+        assert isinstance(first.matrix, np.memmap)
+        assert np.allclose(first.matrix, [[0.6, 0.8, 0.0], [0.0, 0.0, 1.0]])
+        assert service._load_index("t1") is first  # unchanged pickle: served from the cache
+
+        # The indexer rewrites the pickle; the sidecars are older now
+        os.utime(index_path.with_suffix(".npy"), (1_000_000, 1_000_000))
+        os.utime(index_path.with_suffix(".meta.pkl"), (1_000_000, 1_000_000))
+        write_index(index_path, [[0.0, 5.0, 0.0]], mtime=2_000_000)
+
+        second = service._load_index("t1")
+        assert second is not first
+        assert np.allclose(second.matrix, [[0.0, 1.0, 0.0]])
+        assert second.chunks == ["chunk 0"]
+        assert index_path.with_suffix(".npy").stat().st_mtime >= 2_000_000
+
+    def test_top_k_matches_a_full_sort(self):
+        rng = np.random.default_rng(7)
+        matrix = rng.standard_normal((200, 16)).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        query = rng.standard_normal(16)
+
+        scores = matrix @ (query / np.linalg.norm(query)).astype(np.float32)
+        expected = np.argsort(-scores, kind="stable")
+        for k in (1, 5, 50, 200, 500):
+            idx, top_scores = LocalRAGService._top_k(matrix, query, k)
+            assert idx.tolist() == expected[:k].tolist()
+            assert np.allclose(top_scores, scores[expected[:k]])
+
+        idx, _ = LocalRAGService._top_k(matrix, np.zeros(16), 5)
+        assert len(idx) == 0
+
+    def test_least_recently_used_tenant_is_evicted(self, service, tmp_path, monkeypatch):
+        monkeypatch.setattr(local_rag, "LOCAL_INDEX_CACHE_SIZE", 2)
+        for slug in ("lab-a", "lab-b", "lab-c"):
+            write_index(tmp_path / slug / "embedding_index.pkl", [[1.0, 0.0, 0.0]], mtime=1_000_000)
+
+        service._load_index("t1")
+        service._load_index("t2")
+        service._load_index("t1")
+        service._load_index("t3")
+        assert list(service._indexes) == ["t1", "t3"]
+
+    def test_search_returns_the_best_chunks_with_their_documents(self, service, tmp_path):
+        write_index(tmp_path / "lab-a" / "embedding_index.pkl",
+                    [[0.0, 1.0, 0.0], [0.9, 0.1, 0.0], [1.0, 0.0, 0.0]], mtime=1_000_000)
+
+        result = service.search("query", "t1", top_k=2)
+        assert [s["doc_id"] for s in result["sources"]] == ["d2", "d1"]
+        assert result["confidence"] == pytest.approx(1.0)
+        assert result["answer"] == "answer"
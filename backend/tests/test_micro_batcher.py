@@ -0,0 +1,71 @@
+"""
+Tests for the inference micro-batcher used by OncologyModelSuite.
+
+These tests work WITHOUT API keys or model weights (a plain function
+stands in for the batched model call).
+"""
+
+import sys
+import os
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from oncology_model.micro_batcher import MicroBatcher
+
+
+class RecordingModel:
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def __call__(self, items):
+        with self._lock:
+            self.batches.append(list(items))
+        return [item * 10 for item in items]
+
+
+def call_concurrently(batcher, items):
+    results = {}
+    barrier = threading.Barrier(len(items))
+
+    def worker(item):
+        barrier.wait()
+        results[item] = batcher(item)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in items]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+class TestMicroBatcher:
+    def test_concurrent_calls_share_batches_and_get_their_own_results(self):
+        model = RecordingModel()
+        batcher = MicroBatcher(model, max_batch_size=8, max_wait_ms=200)
+        results = call_concurrently(batcher, list(range(8)))
+        assert results == {i: i * 10 for i in range(8)}
+        assert len(model.batches) < 8
+        assert sorted(i for batch in model.batches for i in batch) == list(range(8))
+
+    def test_batches_never_exceed_max_batch_size(self):
+        model = RecordingModel()
+        batcher = MicroBatcher(model, max_batch_size=3, max_wait_ms=100)
+        call_concurrently(batcher, list(range(10)))
+        assert max(len(batch) for batch in model.batches) <= 3
+        assert batcher.items == 10
+
+    def test_failures_propagate_to_every_caller_in_the_batch(self):
+        def broken(items):
+            raise RuntimeError("model unavailable")
+
+        batcher = MicroBatcher(broken, max_batch_size=4, max_wait_ms=0)
+        with pytest.raises(RuntimeError, match="model unavailable"):
+            batcher(1)
+        # The worker thread survives and keeps serving
+        batcher.run_batch = lambda items: items
+        assert batcher(2) == 2
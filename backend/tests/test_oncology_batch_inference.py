@@ -0,0 +1,142 @@
+"""
+Tests for OncologyModelSuite.predict_all_batch (shared tokenization, padded batches).
+
+These tests work WITHOUT API keys or model weights (small stub models and a
+whitespace tokenizer stand in for the DistilBERT checkpoints). They need
+torch and transformers, which the inference module imports.
+"""
+
+import sys
+import os
+import zlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+import torch.nn as nn
+
+from oncology_model.inference import OncologyModelSuite, PAPER_TYPES_LIST
+
+VOCAB_SIZE = 64
+
+
+class StubTokenizer:
+    """Whitespace tokenizer with DistilBertTokenizer's call signature (pads to the longest text)."""
+
+    do_lower_case = True
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_vocab(self):
+        return {"[PAD]": 0, "[UNK]": 1, "size": VOCAB_SIZE}
+
+    def __call__(self, texts, max_length, padding, truncation, return_tensors):
+        self.calls += 1
+        if isinstance(texts, str):
+            texts = [texts]
+        ids = [
+            [1 + zlib.crc32(word.encode()) % (VOCAB_SIZE - 1) for word in text.lower().split()][:max_length]
+            for text in texts
+        ]
+        longest = max(len(row) for row in ids)
+        return {
+            "input_ids": torch.tensor([row + [0] * (longest - len(row)) for row in ids]),
+            "attention_mask": torch.tensor([[1] * len(row) + [0] * (longest - len(row)) for row in ids]),
+        }
+
+
+class StubClassifier(nn.Module):
+    """Masked mean of token embeddings -> linear head; padding must not change the logits."""
+
+    def __init__(self, num_classes, metadata_dim=0, seed=0):
+        super().__init__()
+        torch.manual_seed(seed)
+        self.embedding = nn.Embedding(VOCAB_SIZE, 8)
+        self.head = nn.Linear(8 + metadata_dim, num_classes)
+
+    def forward(self, input_ids, attention_mask, metadata=None):
+        mask = attention_mask.unsqueeze(-1).float()
+        pooled = (self.embedding(input_ids) * mask).sum(1) / mask.sum(1)
+        if metadata is not None:
+            pooled = torch.cat([pooled, metadata], dim=-1)
+        return self.head(pooled)
+
+
+def labels(n, prefix):
+    return {"num_classes": n, "id2label": {str(i): f"{prefix}{i}" for i in range(n)}}
+
+
+@pytest.fixture
+def suite(tmp_path):
+    suite = OncologyModelSuite(model_dir=str(tmp_path), device="cpu", backend="torch")
+    suite._subfield_tokenizer = StubTokenizer()
+    suite._subfield_model = StubClassifier(6, seed=1).eval()
+    suite._subfield_mappings = labels(6, "subfield")
+    # Separate instances with the same vocabulary: the batch path reuses the subfield encoding
+    suite._tier_tokenizer = StubTokenizer()
+    suite._tier_model = StubClassifier(3, metadata_dim=10, seed=2).eval()
+    suite._tier_mappings = labels(3, "tier")
+    suite._paper_type_bert_tokenizer = StubTokenizer()
+    suite._paper_type_bert_model = StubClassifier(len(PAPER_TYPES_LIST), seed=3).eval()
+    suite._paper_type_mappings = {"classes": PAPER_TYPES_LIST, "num_classes": len(PAPER_TYPES_LIST)}
+    suite._paper_type_use_bert = True
+    return suite
+
+
+PAPERS = [
+    {"title": "CAR-T persistence", "abstract": "Long abstract " * 30, "author_count": 12, "has_funding": True},
+    {"title": "Short", "abstract": "Tumor"},
+    {"title": "Immunotherapy review", "abstract": "We review checkpoint inhibitors in melanoma.",
+     "ref_count": 180},
+    {"title": "Radiation dosing", "abstract": "A multicenter trial of fractionation schedules " * 5,
+     "institution_count": 9, "is_multicenter": True},
+    {"title": "", "abstract": "Organoid screening of colorectal lines."},
+]
+
+
+def predict_one(suite, paper):
+    title, abstract = paper.get("title", ""), paper.get("abstract", "")
+    paper_type, pt_confidence = suite.predict_paper_type(title, abstract)
+    subfield = suite.predict_subfield(title, abstract)
+    tier = suite.predict_tier(
+        title, abstract,
+        author_count=paper.get("author_count", 1),
+        ref_count=paper.get("ref_count", 20),
+        paper_type=paper_type,
+        has_funding=paper.get("has_funding", False),
+        institution_count=paper.get("institution_count", 1),
+        is_multicenter=paper.get("is_multicenter", False),
+    )
+    return paper_type, pt_confidence, subfield, tier
+
+
+class TestPredictAllBatch:
+    def test_batched_predictions_match_per_paper_predictions(self, suite):
+        # batch_size=2 spreads the length-sorted papers over several padded chunks
+        batched = suite.predict_all_batch(PAPERS, batch_size=2)
+        assert len(batched) == len(PAPERS)
+
+        for paper, result in zip(PAPERS, batched):
+            paper_type, pt_confidence, subfield, tier = predict_one(suite, paper)
+            assert result["paper_type"]["label"] == paper_type
+            assert result["paper_type"]["confidence"] == pytest.approx(pt_confidence, abs=1e-5)
+            assert result["subfield"]["label"] == subfield[0]
+            assert result["subfield"]["probabilities"] == pytest.approx(subfield[2], abs=1e-5)
+            assert result["tier"]["label"] == tier[0]
+            assert result["tier"]["probabilities"] == pytest.approx(tier[2], abs=1e-5)
+
+    def test_each_batch_is_tokenized_once(self, suite):
+        suite.predict_all_batch(PAPERS, batch_size=2)
+        assert suite._subfield_tokenizer.calls == 3
+        assert suite._tier_tokenizer.calls == 0
+        assert suite._paper_type_bert_tokenizer.calls == 0
+
+    def test_predict_all_is_a_batch_of_one(self, suite):
+        paper = PAPERS[2]
+        result = suite.predict_all(paper["title"], paper["abstract"], ref_count=paper["ref_count"])
+        assert result == suite.predict_all_batch([paper])[0]
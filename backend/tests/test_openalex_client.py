@@ -0,0 +1,98 @@
+"""
+Tests for the shared OpenAlex client (cache, coalescing, concurrency).
+
+These tests work WITHOUT API keys or network access (a fake session stands
+in for requests.Session).
+"""
+
+import sys
+import os
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.openalex_client import OpenAlexClient, normalize_url
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = headers or {}
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    """Answers every GET with {"url": ...} after `delay` seconds."""
+
+    def __init__(self, delay=0.0, statuses=None):
+        self.headers = {}
+        self.delay = delay
+        self.statuses = list(statuses or [])
+        self.calls = []
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, params=None, timeout=None):
+        with self._lock:
+            self.calls.append((url, params))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            status = self.statuses.pop(0) if self.statuses else 200
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return FakeResponse(status, {"url": url}, {"Retry-After": "0"})
+
+
+def make_client(tmp_path, session, **kwargs):
+    kwargs.setdefault("requests_per_second", 1000)
+    return OpenAlexClient(cache_path=str(tmp_path / "openalex.sqlite3"), session=session, **kwargs)
+
+
+class TestOpenAlexClient:
+    def test_normalize_url_ignores_param_order_and_mailto(self):
+        a = normalize_url("https://api.openalex.org/works?search=western%20blot&per_page=5&mailto=a@b.org")
+        b = normalize_url("/works", params={"per_page": 5, "search": "western blot"})
+        assert a == b
+        assert "mailto" not in a
+
+    def test_responses_are_cached_on_disk_across_clients(self, tmp_path):
+        session = FakeSession()
+        first = make_client(tmp_path, session).get_json("/works", params={"search": "mitophagy"})
+        second = make_client(tmp_path, session).get_json(
+            "https://api.openalex.org/works?search=mitophagy&mailto=x@y.org")
+        assert first == second
+        assert len(session.calls) == 1
+        assert session.calls[0][1] == {"mailto": "prmogathala@gmail.com"}
+
+    def test_errors_are_not_cached_and_429_is_retried(self, tmp_path):
+        session = FakeSession(statuses=[429, 200, 500])
+        client = make_client(tmp_path, session)
+        assert client.get_json("/works/W1") is not None  # 429 then 200
+        assert client.get_json("/works/W2") is None  # 500
+        assert client.get_json("/works/W2") is not None
+        assert len(session.calls) == 4
+
+    def test_identical_in_flight_requests_share_one_call(self):
+        session = FakeSession(delay=0.2)
+        client = OpenAlexClient(cache_path=None, session=session, requests_per_second=1000)
+        results = client.run_concurrently(lambda _: client.get_json("/sources?search=autophagy"), range(5))
+        assert len(session.calls) == 1
+        assert all(r == results[0] for r in results)
+        assert client.stats["coalesced"] == 4
+
+    def test_get_many_keeps_order_and_bounds_concurrency(self, tmp_path):
+        session = FakeSession(delay=0.05)
+        client = make_client(tmp_path, session, max_concurrent=3)
+        urls = [f"/works/W{i}" for i in range(9)]
+        results = client.get_many(urls)
+        assert [r["url"].rsplit("/", 1)[1] for r in results] == [f"W{i}" for i in range(9)]
+        assert 1 < session.max_in_flight <= 3
@@ -0,0 +1,103 @@
+"""
+Tests for the bulk protocol co-occurrence builders.
+
+These tests work WITHOUT API keys (file-based SQLite, no LLM calls).
+"""
+
+import sys
+import os
+import json
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.models import ProtocolCooccurrence, ProtocolEntity
+from services.protocol_graph_service import ProtocolGraphService, upsert_cooccurrences
+
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'graph.db'}")
+    ProtocolEntity.__table__.create(bind=engine)
+    ProtocolCooccurrence.__table__.create(bind=engine)
+    return engine, sessionmaker(bind=engine)()
+
+
+def add_document(db, doc_id, entities, tenant_id="t1"):
+    for entity_type, name in entities:
+        db.add(ProtocolEntity(tenant_id=tenant_id, document_id=doc_id, entity_type=entity_type,
+                              name=name, normalized_name=name.lower()))
+    db.commit()
+
+
+def pair_counts(db):
+    rows = db.query(ProtocolCooccurrence).all()
+    names = {e.id: e.normalized_name for e in db.query(ProtocolEntity).all()}
+    return sorted((names[r.technique_entity_id], names[r.target_entity_id], r.cooccurrence_count) for r in rows)
+
+
+class TestEntityCooccurrences:
+    def test_full_build_pairs_techniques_with_targets_and_is_idempotent(self, tmp_path):
+        engine, db = make_session(tmp_path)
+        service = ProtocolGraphService(None, "unused")
+        add_document(db, "d1", [("technique", "PCR"), ("reagent", "Taq"), ("equipment", "Thermocycler")])
+        add_document(db, "d2", [("technique", "Western blot"), ("technique", "ELISA"), ("reagent", "BSA")])
+
+        assert service.build_cooccurrences_from_corpus(db) == 4
+        assert service.build_cooccurrences_from_corpus(db) == 4
+        assert pair_counts(db) == [
+            ("elisa", "bsa", 1), ("pcr", "taq", 1), ("pcr", "thermocycler", 1), ("western blot", "bsa", 1),
+        ]
+
+    def test_incremental_build_only_touches_new_documents(self, tmp_path):
+        engine, db = make_session(tmp_path)
+        service = ProtocolGraphService(None, "unused")
+        add_document(db, "d1", [("technique", "PCR"), ("reagent", "Taq")])
+        service.build_cooccurrences_from_corpus(db, incremental=True)
+        time.sleep(0.01)
+        add_document(db, "d2", [("technique", "ELISA"), ("reagent", "BSA"), ("buffer", "PBS")])
+
+        assert service.build_cooccurrences_from_corpus(db, incremental=True) == 2
+        assert service.build_cooccurrences_from_corpus(db, incremental=True) == 0
+        assert pair_counts(db) == [("elisa", "bsa", 1), ("elisa", "pbs", 1), ("pcr", "taq", 1)]
+
+    def test_additive_upsert_merges_existing_rows(self, tmp_path):
+        engine, db = make_session(tmp_path)
+        row = {'technique_entity_id': 'a', 'target_entity_id': 'b', 'target_type': 'reagent',
+               'cooccurrence_count': 2, 'source_protocols': [{"document_id": "d1"}]}
+        upsert_cooccurrences(db, [row])
+        upsert_cooccurrences(db, [dict(row, source_protocols=[{"document_id": "d2"}])], additive=True)
+        stored = db.query(ProtocolCooccurrence).one()
+        assert stored.cooccurrence_count == 4
+        assert stored.confidence == 0.4
+        assert stored.source_protocols == [{"document_id": "d1"}, {"document_id": "d2"}]
+
+
+class TestCorpusFileCooccurrences:
+    def test_counts_protocols_per_pair_and_rerun_replaces_counts(self, tmp_path):
+        engine, db = make_session(tmp_path)
+        add_document(db, "d1", [("technique", "centrifuge")])  # a tenant's extracted entity
+        corpus = tmp_path / "unified_corpus.jsonl"
+        protocols = [
+            {"title": "A", "source": "x", "steps": [{"action_verb": "Centrifuge"}, {"action_verb": "Incubate"}],
+             "reagents": ["PBS", "PBS", "Trypsin"], "equipment": ["Centrifuge 5424"]},
+            {"title": "B", "source": "y", "steps": [{"action_verb": "centrifuge"}], "reagents": ["pbs"]},
+            {"title": "C", "steps": [{"action_verb": "mix"}], "reagents": [], "equipment": []},
+        ]
+        corpus.write_text("\n".join(json.dumps(p) for p in protocols) + "\nnot json\n")
+        service = ProtocolGraphService(None, "unused")
+
+        assert service.build_cooccurrences_from_corpus_file(str(corpus), db) == 6
+        service.build_cooccurrences_from_corpus_file(str(corpus), db)
+        counts = pair_counts(db)
+        assert ("centrifuge", "pbs", 2) in counts
+        assert ("incubate", "trypsin", 1) in counts
+        assert len(counts) == 6
+
+        corpus_tech = db.query(ProtocolEntity).filter(
+            ProtocolEntity.normalized_name == "centrifuge", ProtocolEntity.document_id.is_(None)).one()
+        assert corpus_tech.tenant_id is None
+        assert db.query(ProtocolCooccurrence).filter(
+            ProtocolCooccurrence.technique_entity_id == corpus_tech.id).count() == 3
@@ -0,0 +1,143 @@
+"""
+Tests for the persisted protocol reference index.
+
+These tests work WITHOUT API keys (a small corpus is written to a temp dir).
+"""
+
+import sys
+import os
+import json
+import fcntl
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.protocol_reference_store import ProtocolReferenceStore
+
+TOPICS = {
+    'molecular_biology': ('western blot transfer membrane antibody', ['Transfer', 'Block', 'Incubate']),
+    'cell_biology': ('passage cells trypsin culture flask', ['Aspirate', 'Wash', 'Seed']),
+    'genomics': ('pcr amplification primers polymerase', ['Mix', 'Denature', 'Anneal']),
+}
+
+
+def make_protocol(i, domain):
+    text, verbs = TOPICS[domain]
+    return {
+        'title': f'{domain} protocol {i}',
+        'domain': domain,
+        'source': 'test',
+        'steps': [{'text': f'{verb} {text} step {i}', 'action_verb': verb} for verb in verbs],
+        'reagents': [f'reagent {i % 3}'],
+        'equipment': ['pipette'],
+    }
+
+
+def write_corpus(path, protocols, mode='w'):
+    with open(path, mode) as f:
+        for p in protocols:
+            f.write(json.dumps(p) + '\n')
+
+
+def corpus(start, count):
+    domains = list(TOPICS)
+    return [make_protocol(i, domains[i % len(domains)]) for i in range(start, start + count)]
+
+
+def make_store(tmp_path):
+    return ProtocolReferenceStore(corpus_path=str(tmp_path / 'corpus.jsonl'),
+                                  index_dir=str(tmp_path / 'index'))
+
+
+class TestProtocolReferenceIndex:
+    def test_index_round_trips_through_disk(self, tmp_path):
+        write_corpus(tmp_path / 'corpus.jsonl', corpus(0, 30))
+        built = make_store(tmp_path)
+        assert built.refresh()
+        expected = built.find_similar_protocols('western blot antibody membrane', top_k=3)
+
+        loaded = make_store(tmp_path)
+        assert loaded.load_index()
+        assert loaded.version == built.version
+        assert loaded.loaded and len(loaded.protocols) == 30
+        assert loaded.find_similar_protocols('western blot antibody membrane', top_k=3) == expected
+        assert loaded.get_domain_stats('genomics') == built.get_domain_stats('genomics')
+
+    def test_domain_filter_only_returns_that_domain(self, tmp_path):
+        write_corpus(tmp_path / 'corpus.jsonl', corpus(0, 30))
+        store = make_store(tmp_path)
+        store.refresh()
+        results = store.find_similar_protocols('western blot pcr primers trypsin', top_k=20,
+                                               domain='genomics')
+        assert results
+        assert {r['domain'] for r in results} == {'genomics'}
+        assert store.get_domain_stats('genomics')['top_verbs'] == ['mix', 'denature', 'anneal']
+
+    def test_appended_lines_are_added_without_refit(self, tmp_path):
+        path = tmp_path / 'corpus.jsonl'
+        write_corpus(path, corpus(0, 30))
+        store = make_store(tmp_path)
+        store.refresh()
+        vocabulary = dict(store.vectorizer.vocabulary_)
+
+        write_corpus(path, corpus(30, 3), mode='a')
+        assert store.update_from_corpus() == 3
+        assert len(store.protocols) == 33
+        assert store.manifest['fitted_rows'] == 30
+        assert store.vectorizer.vocabulary_ == vocabulary
+        assert store.get_domain_stats('cell_biology')['count'] == 11
+
+        reloaded = make_store(tmp_path)
+        reloaded.load_index()
+        titles = [r['title'] for r in reloaded.find_similar_protocols(
+            'genomics protocol 32 pcr', top_k=40, domain='genomics')]
+        assert 'genomics protocol 32' in titles
+        assert reloaded.update_from_corpus() == 0
+
+    def test_rewritten_corpus_triggers_rebuild(self, tmp_path):
+        path = tmp_path / 'corpus.jsonl'
+        write_corpus(path, corpus(0, 30))
+        store = make_store(tmp_path)
+        store.refresh()
+
+        write_corpus(path, corpus(100, 12))
+        reopened = make_store(tmp_path)
+        assert reopened.refresh()
+        assert len(reopened.protocols) == 12
+        assert reopened.manifest['fitted_rows'] == 12
+        assert reopened.version != store.version
+
+    def test_load_never_builds(self, tmp_path):
+        write_corpus(tmp_path / 'corpus.jsonl', corpus(0, 30))
+        store = make_store(tmp_path)
+        assert not store.load()
+        assert not (tmp_path / 'index').exists()
+        assert store.needs_update()
+
+    def test_saves_are_serialized_and_only_prune_older_versions(self, tmp_path):
+        write_corpus(tmp_path / 'corpus.jsonl', corpus(0, 30))
+        first = make_store(tmp_path)
+        first.refresh()
+        second = make_store(tmp_path)
+        second.load_index()
+        oldest = first.version
+
+        with open(tmp_path / 'index' / '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)  # another process mid-save
+            saver = threading.Thread(target=second.save)
+            saver.start()
+            saver.join(timeout=0.2)
+            assert saver.is_alive() and first.current_version() == oldest
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        saver.join(timeout=5)
+        assert not saver.is_alive()
+
+        # A version directory newer than CURRENT belongs to a writer that has not switched yet
+        in_flight = tmp_path / 'index' / f'v{10 ** 20}'
+        in_flight.mkdir()
+        first.save()
+
+        versions = {n for n in os.listdir(tmp_path / 'index') if n.startswith('v')}
+        assert versions == {first.version, second.version, in_flight.name}
+        assert oldest not in versions
+        assert make_store(tmp_path).load_index()
@@ -0,0 +1,80 @@
+"""
+Tests for the GCRA rate limiter.
+
+These tests work WITHOUT API keys or Redis (in-memory backend).
+"""
+
+import sys
+import os
+import importlib
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from middleware.rate_limit import RateLimiter
+
+# middleware/__init__ re-exports the rate_limit decorator under the module's name
+rate_limit_module = importlib.import_module("middleware.rate_limit")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def limiter_with_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit_module, "time", clock)
+    return RateLimiter(), clock
+
+
+class TestGCRARateLimiter:
+    def test_allows_burst_of_limit_then_denies_with_retry_after(self, monkeypatch):
+        limiter, clock = limiter_with_clock(monkeypatch)
+        results = [limiter.is_allowed("t1", limit=5, window_seconds=60) for _ in range(6)]
+        assert results[:5] == [(True, None)] * 5
+        assert results[5] == (False, 12)  # one slot frees every 60/5 seconds
+
+    def test_recovers_one_request_per_emission_interval(self, monkeypatch):
+        limiter, clock = limiter_with_clock(monkeypatch)
+        for _ in range(5):
+            limiter.is_allowed("t1", limit=5, window_seconds=60)
+        clock.now += 11.5
+        assert not limiter.is_allowed("t1", limit=5, window_seconds=60)[0]
+        clock.now += 0.5
+        assert limiter.is_allowed("t1", limit=5, window_seconds=60)[0]
+        assert not limiter.is_allowed("t1", limit=5, window_seconds=60)[0]
+
+    def test_keys_are_independent_and_cleanup_drops_recovered_keys(self, monkeypatch):
+        limiter, clock = limiter_with_clock(monkeypatch)
+        for _ in range(2):
+            limiter.is_allowed("t1", limit=2, window_seconds=10)
+        assert not limiter.is_allowed("t1", limit=2, window_seconds=10)[0]
+        assert limiter.is_allowed("t2:upload", limit=2, window_seconds=10)[0]
+
+        clock.now += 6
+        limiter.cleanup()
+        assert sum(len(arrivals) for arrivals, _ in limiter._stripes) == 1  # t1 still limited
+        clock.now += 5
+        limiter.cleanup()
+        assert sum(len(arrivals) for arrivals, _ in limiter._stripes) == 0
+
+    def test_concurrent_callers_never_exceed_limit(self):
+        limiter = RateLimiter(stripes=4)
+        allowed = []
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            allowed.append(sum(limiter.is_allowed("hot", limit=500, window_seconds=3600)[0]
+                               for _ in range(200)))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sum(allowed) == 500
@@ -0,0 +1,64 @@
+"""
+Tests for the shared rerank engine (bucketing, score cache, fallbacks).
+
+These tests work WITHOUT sentence-transformers (scorer is a local stub).
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.rerank_engine import RerankEngine
+
+
+class LengthScorer:
+    """Scores by passage length; records each batch it sees."""
+
+    def __init__(self, delay: float = 0.0):
+        self.batches = []
+        self.delay = delay
+
+    def __call__(self, pairs):
+        self.batches.append([p for _, p in pairs])
+        time.sleep(self.delay)
+        return [float(len(p)) for _, p in pairs]
+
+
+def make_results(lengths):
+    return [{'chunk_id': f"c{i}", 'content': "x" * n} for i, n in enumerate(lengths)]
+
+
+class TestRerankEngine:
+    def test_ranks_by_score_and_keeps_top_k(self):
+        engine = RerankEngine(scorer=LengthScorer())
+        ranked = engine.rerank("q", make_results([5, 50, 20]), top_k=2)
+        assert [r['chunk_id'] for r in ranked] == ["c1", "c2"]
+        assert ranked[0]['rerank_score'] == 50.0
+
+    def test_batches_are_length_bucketed(self):
+        scorer = LengthScorer()
+        engine = RerankEngine(scorer=scorer, batch_size=2)
+        engine.rerank("q", make_results([100, 1, 50, 2]), top_k=4)
+        assert [[len(p) for p in batch] for batch in scorer.batches] == [[1, 2], [50, 100]]
+
+    def test_repeated_query_is_served_from_cache(self):
+        scorer = LengthScorer()
+        engine = RerankEngine(scorer=scorer)
+        engine.rerank("What is the PCR protocol?", make_results([3, 4]), top_k=2)
+        engine.rerank("what is the pcr protocol? ", make_results([3, 4, 9]), top_k=3)
+        assert sum(len(b) for b in scorer.batches) == 3
+
+    def test_changed_chunk_text_is_rescored(self):
+        scorer = LengthScorer()
+        engine = RerankEngine(scorer=scorer)
+        engine.rerank("q", [{'chunk_id': 'c0', 'content': 'old'}])
+        engine.rerank("q", [{'chunk_id': 'c0', 'content': 'new text'}])
+        assert len(scorer.batches) == 2
+
+    def test_timeout_keeps_retrieval_order(self):
+        engine = RerankEngine(scorer=LengthScorer(delay=0.5), timeout=0.05)
+        results = make_results([1, 9])
+        assert engine.rerank("q", results, top_k=2) == results
+        assert engine.stats()["timeouts"] == 1
@@ -0,0 +1,81 @@
+"""
+Tests for streaming ingestion (lazy chunking, windowed embed + upsert).
+
+These tests work WITHOUT API keys (fake Pinecone index, fake embeddings).
+"""
+
+import sys
+import os
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vector_stores.pinecone_store as store_module
+from vector_stores.bm25_index import BM25Index
+from vector_stores.pinecone_store import PineconeVectorStore
+
+
+class RecordingIndex:
+    def __init__(self, log):
+        self.log = log
+        self.batches = []
+
+    def upsert(self, vectors, namespace):
+        self.batches.append([v['id'] for v in vectors])
+        self.log.append(('upsert', len(vectors)))
+
+
+class FakeStore(PineconeVectorStore):
+    BATCH_SIZE = 4
+
+    def __init__(self, log):
+        self.log = log
+        self.index = RecordingIndex(log)
+
+    def _get_embeddings_batch(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+def paragraphs(n):
+    return "\n\n".join(f"Paragraph {i} about the western blot protocol." for i in range(n))
+
+
+class TestStreamingIngest:
+    def test_chunks_are_yielded_lazily(self):
+        store = FakeStore([])
+        chunks = store._iter_chunks(paragraphs(50), chunk_size=100, overlap=20)
+        assert isinstance(chunks, types.GeneratorType)
+        assert next(chunks)[1] == 0
+        assert list(store._iter_chunks(paragraphs(50), 100, 20)) == store._chunk_text(paragraphs(50), 100, 20)
+
+    def test_upserts_are_windowed_and_interleaved_with_reading(self, monkeypatch):
+        log = []
+        store = FakeStore(log)
+
+        def documents():
+            for i in range(5):
+                log.append(('read', i))
+                yield {'id': f"d{i}", 'title': "T", 'content': paragraphs(6)}
+
+        result = store.embed_and_upsert_documents(
+            documents(), tenant_id="t1", chunk_size=100, chunk_overlap=0, show_progress=False
+        )
+        assert result['total_documents'] == 5 and result['success']
+        assert result['upserted'] == result['total_chunks'] == sum(len(b) for b in store.index.batches)
+        assert max(len(b) for b in store.index.batches) <= FakeStore.BATCH_SIZE
+        # The first window is upserted before the last document has been read
+        assert log.index(('upsert', 4)) < log.index(('read', 4))
+
+    def test_document_spanning_windows_is_fully_bm25_indexed(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(store_module, "UPSERT_WINDOW_TOKENS", 40)
+        store = FakeStore([])
+        index = BM25Index(tmp_path)
+        docs = [{'id': "long", 'title': "", 'content': paragraphs(12)},
+                {'id': "short", 'title': "", 'content': "Freezer inventory ab9485."}]
+        result = store.embed_and_upsert_documents(
+            docs, tenant_id="t1", chunk_size=100, chunk_overlap=0, show_progress=False,
+            sparse_index=index
+        )
+        assert len(store.index.batches) > 2
+        assert index.stats()['chunks'] == result['total_chunks']
+        assert index.search("ab9485")[0]['doc_id'] == "short"
@@ -0,0 +1,218 @@
+"""
+Tests for SyncProgressService backends and event coalescing.
+
+These tests work WITHOUT API keys or Redis (in-memory backend, and a small
+in-process stand-in for the Redis commands the shared backend uses).
+"""
+
+import sys
+import os
+import json
+import time
+import queue
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.sync_progress_service as progress_module
+from services.sync_progress_service import (
+    RedisSyncProgressBackend,
+    SyncProgress,
+    SyncProgressService,
+)
+
+
+class SharedRedis:
+    """Hashes, sets and pub/sub shared by several 'workers' in one process."""
+
+    def __init__(self):
+        self.hashes = defaultdict(dict)
+        self.sets = defaultdict(set)
+        self.listeners = []
+        self.published = []
+        self.writes = []
+
+    def client(self):
+        return FakeClient(self)
+
+
+class FakeClient:
+    def __init__(self, shared):
+        self.shared = shared
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def hset(self, key, mapping):
+        self.shared.writes.append(dict(mapping))
+        self.shared.hashes[key].update({k.encode(): v.encode() for k, v in mapping.items()})
+
+    def hgetall(self, key):
+        return dict(self.shared.hashes.get(key, {}))
+
+    def expire(self, key, seconds):
+        pass
+
+    def sadd(self, key, *values):
+        self.shared.sets[key].update(v.encode() for v in values)
+
+    def srem(self, key, *values):
+        self.shared.sets[key].difference_update(v.encode() for v in values)
+
+    def smembers(self, key):
+        return set(self.shared.sets.get(key, set()))
+
+    def delete(self, key):
+        self.shared.hashes.pop(key, None)
+
+    def publish(self, channel, message):
+        self.shared.published.append(json.loads(message))
+        for backend in self.shared.listeners:
+            backend.handle_message(message)
+
+    def pubsub(self, **kwargs):
+        return BlockingPubSub()
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class BlockingPubSub:
+    def psubscribe(self, pattern):
+        pass
+
+    def listen(self):
+        threading.Event().wait()
+        return iter(())
+
+
+def redis_worker(shared):
+    def backend_class(subscribers):
+        backend = RedisSyncProgressBackend(subscribers)  # redis-py connects lazily
+        backend.client = shared.client()
+        shared.listeners.append(backend)
+        return backend
+    return SyncProgressService(backend_class)
+
+
+def drain(q):
+    events = []
+    while True:
+        try:
+            events.append(q.get_nowait())
+        except queue.Empty:
+            return events
+
+
+class TestSyncProgressCoalescing:
+    def test_rapid_increments_become_one_event_plus_trailing_event(self, monkeypatch):
+        monkeypatch.setattr(progress_module, "SYNC_PROGRESS_EVENT_INTERVAL", 0.1)
+        service = SyncProgressService()
+        sync_id = service.start_sync("t1", "u1", "gmail")
+        service.update_progress(sync_id, status='saving', total_items=200)
+        q = service.subscribe(sync_id)
+        drain(q)
+
+        for i in range(200):
+            service.increment_processed(sync_id, current_item=f"doc {i}")
+        immediate = drain(q)
+        time.sleep(0.25)
+        trailing = drain(q)
+
+        assert len(immediate) <= 1
+        assert len(trailing) == 1 and trailing[0]['data']['processed_items'] == 200
+
+    def test_status_change_and_completion_are_immediate(self, monkeypatch):
+        monkeypatch.setattr(progress_module, "SYNC_PROGRESS_EVENT_INTERVAL", 60)
+        service = SyncProgressService()
+        sync_id = service.start_sync("t1", "u1", "gmail")
+        q = service.subscribe(sync_id)
+        drain(q)
+        service.update_progress(sync_id, status='embedding', stage='Embedding...')
+        service.complete_sync(sync_id)
+        assert [e['event'] for e in drain(q)] == ['progress', 'complete']
+
+
+class TestSharedBackend:
+    def test_record_round_trip(self):
+        service = SyncProgressService()
+        sync_id = service.start_sync("t1", "u1", "box")
+        service.update_progress(sync_id, status='awaiting_selection', extra_data={'documents': [{'id': 1}]})
+        original = service._progress[sync_id]
+        restored = SyncProgress.from_record(
+            {k.encode(): v.encode() for k, v in original.to_record().items()}
+        )
+        assert restored == original
+
+    def test_any_worker_serves_status_and_sse_with_deltas_on_the_wire(self, monkeypatch):
+        monkeypatch.setattr(progress_module, "SYNC_PROGRESS_EVENT_INTERVAL", 0)
+        shared = SharedRedis()
+        sync_worker, api_worker = redis_worker(shared), redis_worker(shared)
+
+        sync_id = sync_worker.start_sync("t1", "u1", "slack")
+        sync_worker.update_progress(sync_id, status='saving', total_items=10)
+        assert api_worker.get_active_by_tenant_type("t1", "slack")['status'] == 'saving'
+
+        q = api_worker.subscribe(sync_id)
+        assert drain(q)[0]['event'] == 'current_state'
+
+        sync_worker.increment_processed(sync_id, current_item="general")
+        events = drain(q)
+        assert events[-1]['data']['processed_items'] == 1
+        assert events[-1]['data']['connector_type'] == 'slack'  # full state for the browser
+        assert set(shared.published[-1]['delta']) <= {'processed_items', 'current_item'}
+
+        sync_worker.complete_sync(sync_id)
+        assert drain(q)[-1]['event'] == 'complete'
+        assert api_worker.get_progress(sync_id)['status'] == 'complete'
+
+    def test_other_workers_never_serve_a_stale_snapshot(self, monkeypatch):
+        monkeypatch.setattr(progress_module, "SYNC_PROGRESS_EVENT_INTERVAL", 0)
+        shared = SharedRedis()
+        sync_worker, api_worker = redis_worker(shared), redis_worker(shared)
+
+        sync_id = sync_worker.start_sync("t1", "u1", "gmail")
+        sync_worker.update_progress(sync_id, status='saving', total_items=5)
+        api_worker.subscribe_email(sync_id, "pi@lab.org")
+        assert api_worker.get_progress(sync_id)['status'] == 'saving'
+        assert sync_id not in api_worker._progress
+
+        for _ in range(5):
+            sync_worker.increment_processed(sync_id)
+        sync_worker.complete_sync(sync_id)
+        progress = api_worker.get_progress(sync_id)
+        assert (progress['status'], progress['processed_items']) == ('complete', 5)
+        assert [p.status for p in api_worker._all_progress()] == ['complete']
+
+    def test_writes_from_other_workers_only_touch_changed_fields(self, monkeypatch):
+        monkeypatch.setattr(progress_module, "SYNC_PROGRESS_EVENT_INTERVAL", 0)
+        shared = SharedRedis()
+        sync_worker, api_worker = redis_worker(shared), redis_worker(shared)
+
+        sync_id = sync_worker.start_sync("t1", "u1", "gmail")
+        sync_worker.update_progress(sync_id, status='saving', total_items=5)
+        api_worker.subscribe_email(sync_id, "pi@lab.org")
+        assert shared.writes[-1] == {'notify_email': json.dumps("pi@lab.org")}
+
+        sync_worker.increment_processed(sync_id)
+        assert set(shared.writes[-1]) == {'processed_items'}
+        assert api_worker._load(sync_id).notify_email == "pi@lab.org"
+
+        # A stuck-sync sweep on the API worker writes the error fields only
+        sync_worker._progress[sync_id].started_at = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        sync_worker._emit_event(sync_id, 'progress')
+        api_worker.cleanup_old_syncs()
+        assert 'processed_items' not in shared.writes[-1]
+        progress = api_worker._load(sync_id)
+        assert (progress.status, progress.processed_items, progress.notify_email) == ('error', 1, "pi@lab.org")
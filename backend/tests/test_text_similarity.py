@@ -0,0 +1,75 @@
+"""
+Tests for the vectorized text-similarity module and its callers
+(context compression, claim verification, chunk deduplication).
+
+These tests work WITHOUT API keys (pure text, no model calls).
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.text_similarity import (
+    SentenceMatrix,
+    shingle_jaccard_matrix,
+    term_coverage,
+    top_sentences_per_source,
+)
+from services.enhanced_search_service import ContextCompressor, HallucinationDetector
+from rag.enhanced_rag_v2 import ContextDeduplicator
+
+
+class TestTextSimilarity:
+    def test_sentences_ranked_by_overlap_per_source(self):
+        matrix = SentenceMatrix([
+            "Western blot needs a membrane. Short one. The antibody incubates overnight at 4C.",
+            "Unrelated sentence about freezer inventory.",
+        ])
+        picked = top_sentences_per_source(matrix, {"antibody", "overnight", "membrane"}, 10)
+        assert picked == {0: ["The antibody incubates overnight at 4C.", "Western blot needs a membrane."]}
+
+    def test_jaccard_matrix_matches_pairwise_definition(self):
+        texts = ["The quick brown fox", "the quick brown dog", "", "zzzz"]
+        sim = shingle_jaccard_matrix(texts, n=4)
+        a = set(texts[0].lower()[i:i + 4] for i in range(len(texts[0]) - 3))
+        b = set(texts[1].lower()[i:i + 4] for i in range(len(texts[1]) - 3))
+        assert np.isclose(sim[0, 1], len(a & b) / len(a | b))
+        assert sim[2, 2] == 0.0 and sim[0, 3] == 0.0
+
+    def test_term_coverage_uses_substring_semantics(self):
+        coverage = term_coverage([["protocol", "approved", "missing"], []], "the protocols were approved")
+        assert np.isclose(coverage[0], 2 / 3) and np.isnan(coverage[1])
+
+
+class TestCallers:
+    def test_compress_sources_keeps_short_sources_whole(self):
+        long_text = "Irrelevant filler sentence number one. " * 15 + "The confocal booking uses iLab."
+        out = ContextCompressor.compress_sources("confocal booking", [
+            {'content': long_text}, {'content': "Short source."},
+        ])
+        assert out[0]['content'] == "The confocal booking uses iLab."
+        assert out[1]['compressed_length'] == out[1]['original_length'] == len("Short source.")
+
+    def test_verify_claims_statement_and_citation(self):
+        sources = [{'title': "SOP", 'content': "The freezer protocol was approved in 2023 by 12 reviewers."}]
+        claims = [
+            {'type': 'statement', 'text': "The freezer protocol was approved by reviewers", 'value': None},
+            {'type': 'statement', 'text': "Budget renewal requires dean signature", 'value': None},
+            {'type': 'citation', 'source_num': 1, 'context': "approved by 12 reviewers [Source 1]"},
+            {'type': 'citation', 'source_num': 3, 'context': "[Source 3]"},
+        ]
+        result = HallucinationDetector(client=None).verify_claims(claims, sources)
+        assert (result['verified'], result['unverified'], result['hallucinated']) == (2, 1, 1)
+
+    def test_deduplicate_keeps_higher_scored_duplicate(self):
+        text = "Incubate the membrane overnight with primary antibody at 4C."
+        chunks = [
+            {'content': text, 'score': 0.5},
+            {'content': "Completely different grant budget text here.", 'score': 0.9},
+            {'content': text + " ", 'score': 0.8},
+        ]
+        kept = ContextDeduplicator.deduplicate(chunks)
+        assert [c['score'] for c in kept] == [0.9, 0.8]
@@ -0,0 +1,201 @@
+"""
+Tests for the concurrent WebScraper crawl engine: fetcher pool, per-host
+politeness, process-pool parsing and conditional (ETag) re-crawls.
+
+These tests work WITHOUT API keys or network access (a local HTTP server
+serves a small synthetic site with a fixed per-request latency).
+"""
+
+import sys
+import os
+import time
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import connectors.webscraper_connector as webscraper_module
+from connectors.base_connector import ConnectorConfig
+from connectors.webscraper_connector import WebScraperConnector
+
+N_PAGES = 20
+LATENCY = 0.1  # seconds per page request
+
+
+class FixtureSite:
+    """`/` links to /p1../pN; /p1 also links to /deep. Every page has an ETag."""
+
+    def __init__(self, robots=""):
+        self.robots = robots
+        self.versions = {}
+        self.requests = []  # (path, start time, status)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def body(self, path):
+        links = []
+        if path == "/":
+            links = [f"/p{i}" for i in range(1, N_PAGES + 1)]
+        elif path == "/p1":
+            links = ["/deep"]
+        anchors = "".join(f'<a href="{link}">{link}</a> ' for link in links)
+        text = f"This is page {path}, version {self.versions.get(path, 1)}. " * 5
+        return f"<html><head><title>Page {path}</title></head><body><main><p>{text}</p>{anchors}</main></body></html>"
+
+    def handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/robots.txt" and site.robots:
+                    return self._send(200, site.robots.encode(), "text/plain")
+                if path != "/" and path != "/deep" and not (path.startswith("/p") and path[2:].isdigit()):
+                    return self._send(404, b"not found", "text/plain")
+
+                with site._lock:
+                    site.in_flight += 1
+                    site.max_in_flight = max(site.max_in_flight, site.in_flight)
+                start = time.monotonic()
+                time.sleep(LATENCY)
+                etag = f'"{path}-v{site.versions.get(path, 1)}"'
+                status = 304 if self.headers.get("If-None-Match") == etag else 200
+                with site._lock:
+                    site.in_flight -= 1
+                    site.requests.append((path, start, status))
+                if status == 304:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self._send(200, site.body(path).encode(), "text/html; charset=utf-8", etag)
+
+            def _send(self, status, body, content_type, etag=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def page_requests(self):
+        return [r for r in self.requests if r[0] != "/robots.txt"]
+
+
+@pytest.fixture
+def serve(monkeypatch, tmp_path):
+    monkeypatch.setattr(webscraper_module, "WEBSCRAPER_STATE_PATH", str(tmp_path / "state.sqlite3"))
+    monkeypatch.setattr(webscraper_module, "WEBSCRAPER_PARSE_PROCESSES", 0)
+    servers = []
+
+    def start(site):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), site.handler())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def make_scraper(url, **settings):
+    config = ConnectorConfig(
+        connector_type="webscraper", user_id="u1", connector_id="c1",
+        settings={"start_url": url, "max_pages": 50, "max_depth": 3, "crawl_delay": 0, **settings},
+    )
+    return WebScraperConnector(config)
+
+
+class TestWebScraperCrawl:
+    def test_concurrent_fetchers_beat_sequential_latency(self, serve):
+        site = FixtureSite()
+        url = serve(site)
+
+        start = time.time()
+        pages = make_scraper(url, max_concurrency=8, max_per_host=4)._crawl_website(url, 50, 3)
+        elapsed = time.time() - start
+
+        paths = {p["url"].split(str(url)[:-1], 1)[1] for p in pages}
+        assert paths == {"/", "/deep"} | {f"/p{i}" for i in range(1, N_PAGES + 1)}
+        assert all(p["extracted"]["title"].startswith("Page /") for p in pages)
+        assert site.max_in_flight <= 4
+        # 22 pages one at a time would take > 2.2 s
+        assert elapsed < (N_PAGES + 2) * LATENCY * 0.6
+
+    def test_robots_crawl_delay_spaces_requests_per_host(self, serve):
+        site = FixtureSite(robots="User-agent: *\nCrawl-delay: 1\n")
+        url = serve(site)
+
+        pages = make_scraper(url, max_concurrency=8, max_per_host=4)._crawl_website(url, 3, 1)
+        assert len(pages) == 3
+        starts = sorted(start for _, start, _ in site.page_requests())
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        assert min(gaps) >= 0.9
+
+    def test_incremental_sync_skips_unchanged_pages(self, serve):
+        site = FixtureSite()
+        url = serve(site)
+
+        first_scraper = make_scraper(url, max_concurrency=8, max_per_host=8)
+        first = first_scraper._sync_sync(since=None)
+        assert len(first) == N_PAGES + 2
+        first_scraper.documents_committed([doc.doc_id for doc in first])
+
+        site.versions["/deep"] = 2
+        site.requests.clear()
+        scraper = make_scraper(url, max_concurrency=8, max_per_host=8)
+        second = scraper._sync_sync(since=datetime.now())
+
+        # /deep is only reachable through /p1, which answered 304 - its stored links were still followed
+        assert [doc.title for doc in second] == ["Page /deep"]
+        assert "version 2" in second[0].content
+        assert scraper.unchanged_count == N_PAGES + 1
+        statuses = {path: status for path, _, status in site.page_requests()}
+        assert statuses["/deep"] == 200 and statuses["/p1"] == 304
+
+    def test_validators_wait_for_the_documents_to_be_committed(self, serve):
+        site = FixtureSite()
+        url = serve(site)
+
+        first_scraper = make_scraper(url, max_concurrency=8, max_per_host=8)
+
+        def save_fails_for_deep(doc):
+            if doc.title == "Page /deep":
+                raise RuntimeError("database unavailable")
+
+        first_scraper.on_document_ready = save_fails_for_deep
+        first = first_scraper._sync_sync(since=None)
+        # The route committed everything but /p2; /deep's save raised
+        first_scraper.documents_committed([doc.doc_id for doc in first if doc.title != "Page /p2"])
+
+        site.requests.clear()
+        scraper = make_scraper(url, max_concurrency=8, max_per_host=8)
+        second = scraper._sync_sync(since=datetime.now())
+        assert sorted(doc.title for doc in second) == ["Page /deep", "Page /p2"]
+        assert scraper.unchanged_count == N_PAGES
+
+    def test_pages_are_parsed_in_worker_processes(self, serve, monkeypatch):
+        site = FixtureSite()
+        url = serve(site)
+        monkeypatch.setattr(webscraper_module, "WEBSCRAPER_PARSE_PROCESSES", 2)
+        monkeypatch.setattr(webscraper_module, "_gevent_patched", lambda: False)
+        monkeypatch.setattr(webscraper_module, "_parse_pool", None)
+        try:
+            pages = make_scraper(url, max_concurrency=8, max_per_host=8)._crawl_website(url, 50, 3)
+            assert webscraper_module._parse_pool is not None
+        finally:
+            if webscraper_module._parse_pool is not None:
+                webscraper_module._parse_pool.shutdown()
+        assert len(pages) == N_PAGES + 2
+        assert any("version 1" in p["extracted"]["content"] for p in pages)
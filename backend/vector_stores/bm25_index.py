@@ -0,0 +1,405 @@
+"""
+BM25 Sparse Index - per-tenant keyword index for HybridPineconeStore
+
+Dense retrieval misses exact identifiers (gene names, reagent catalog
+numbers, protocol IDs). This index catches them and is fused with the
+Pinecone results by reciprocal rank.
+
+Layout on disk ({BM25_INDEX_DIR}/{tenant_id}/):
+- base.npz   compact postings in CSR form: per-term offsets into int32 chunk
+             numbers and uint16 term frequencies, plus chunk IDs (= Pinecone
+             vector IDs), document IDs and chunk lengths
+- log.jsonl  append-only upserts/deletes since the last compaction
+
+Writers (EmbeddingService) append to the log under a file lock; when the log
+grows past BM25_COMPACT_MIN_CHUNKS (or a fifth of the base) it is merged into
+a new base. Readers (search) hold the index in memory and pick up new log
+lines or a new base by checking file sizes/mtimes before each query.
+Replaying an operation twice is harmless (upsert replaces a document's chunks).
+"""
+
+import os
+import re
+import json
+import math
+import fcntl
+import threading
+from collections import OrderedDict, Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Iterable
+
+import numpy as np
+
+BM25_INDEX_DIR = os.getenv(
+    "BM25_INDEX_DIR",
+    str(Path(__file__).parent.parent / "tenant_data" / "bm25")
+)
+BM25_INDEX_CACHE_SIZE = int(os.getenv("BM25_INDEX_CACHE_SIZE", "16"))
+BM25_COMPACT_MIN_CHUNKS = int(os.getenv("BM25_COMPACT_MIN_CHUNKS", "2000"))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+MAX_TF = 65535
+
+# Identifiers like "PRT-2024-17", "ab9485", "sc-7392", "NM_000546.6": the
+# domain tokenizer splits them on punctuation, so also keep the joined form
+_IDENTIFIER_RE = re.compile(r"\b[a-z0-9]+(?:[-_./#][a-z0-9]+)+\b")
+
+_tokenizer = None
+
+
+def tokenize(text: str) -> List[str]:
+    """DomainTokenizer tokens plus joined identifier tokens that contain a digit."""
+    global _tokenizer
+    if _tokenizer is None:
+        from rag.enhanced_rag_v2 import DomainTokenizer
+        _tokenizer = DomainTokenizer
+    tokens = _tokenizer.tokenize(text)
+    for match in _IDENTIFIER_RE.findall(text.lower()):
+        if any(c.isdigit() for c in match):
+            tokens.append(re.sub(r"[-./#]", "_", match))
+    return tokens
+
+
+def chunk_terms(text: str) -> Tuple[Dict[str, int], int]:
+    """Term frequencies and length (in tokens) for one chunk."""
+    tokens = tokenize(text)
+    return dict(Counter(tokens)), len(tokens)
+
+
+class BM25Index:
+    """
+    One tenant's BM25 index.
+
+    Args:
+        directory: Where base.npz / log.jsonl live (created on first write)
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.base_path = self.directory / "base.npz"
+        self.log_path = self.directory / "log.jsonl"
+        self.lock_path = self.directory / ".lock"
+        self._lock = threading.RLock()
+        self._base_sig = None
+        self._log_offset = 0
+        self._reset()
+
+    # ------------------------------------------------------------------ state
+
+    def _reset(self):
+        self.vocab: Dict[str, int] = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.post_chunks = np.zeros(0, dtype=np.int32)
+        self.post_tfs = np.zeros(0, dtype=np.uint16)
+        self.chunk_ids: List[str] = []
+        self.chunk_docs: List[str] = []
+        self.lengths = np.zeros(0, dtype=np.int32)
+        self.alive = bytearray()  # 1 = live chunk; viewed as a bool array for scoring
+        self.n_base = 0
+        # Delta (chunks added since the base was written)
+        self.delta_postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.delta_lengths: List[int] = []
+        self.doc_chunks: Dict[str, List[int]] = {}
+
+    def _load_base(self):
+        self._reset()
+        if not self.base_path.exists():
+            self._base_sig = None
+            return
+        self._base_sig = self._base_signature()
+        with np.load(self.base_path, allow_pickle=False) as data:
+            terms = data["terms"].tolist()
+            self.vocab = {t: i for i, t in enumerate(terms)}
+            self.offsets = data["offsets"]
+            self.post_chunks = data["post_chunks"]
+            self.post_tfs = data["post_tfs"]
+            self.chunk_ids = data["chunk_ids"].tolist()
+            self.chunk_docs = data["chunk_docs"].tolist()
+            self.lengths = data["lengths"]
+        self.n_base = len(self.chunk_ids)
+        self.alive = bytearray(b"\x01" * self.n_base)
+        for chunk_no, doc_id in enumerate(self.chunk_docs):
+            self.doc_chunks.setdefault(doc_id, []).append(chunk_no)
+
+    def _base_signature(self):
+        """(inode, mtime) of base.npz - compaction replaces the file, changing both"""
+        try:
+            st = self.base_path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def _refresh(self):
+        """Pick up a new base (compaction elsewhere) or new log lines."""
+        if self._base_signature() != self._base_sig:
+            self._load_base()
+            self._log_offset = 0
+
+        if not self.log_path.exists():
+            self._log_offset = 0
+            return
+        size = self.log_path.stat().st_size
+        if size < self._log_offset:
+            # Log truncated by a compaction we haven't seen the base for yet
+            self._load_base()
+            self._log_offset = 0
+        if size == self._log_offset:
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # only complete lines
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._apply(json.loads(line))
+        self._log_offset += end
+
+    def _apply(self, op: Dict):
+        if op["op"] == "delete":
+            for doc_id in op["docs"]:
+                self._remove_doc(doc_id)
+        elif op["op"] == "upsert":
+            for doc_id, chunks in op["docs"].items():
+                self._remove_doc(doc_id)
+                for chunk_id, tfs, length in chunks:
+                    self._add_chunk(doc_id, chunk_id, tfs, length)
+
+    def _remove_doc(self, doc_id: str):
+        for chunk_no in self.doc_chunks.pop(doc_id, []):
+            self.alive[chunk_no] = 0
+
+    def _add_chunk(self, doc_id: str, chunk_id: str, tfs: Dict[str, int], length: int):
+        chunk_no = len(self.chunk_ids)
+        self.chunk_ids.append(chunk_id)
+        self.chunk_docs.append(doc_id)
+        self.delta_lengths.append(length)
+        self.alive.append(1)
+        self.doc_chunks.setdefault(doc_id, []).append(chunk_no)
+        for term, tf in tfs.items():
+            self.delta_postings.setdefault(term, []).append((chunk_no, min(tf, MAX_TF)))
+
+    # ----------------------------------------------------------------- writes
+
+    @contextmanager
+    def _exclusive(self):
+        """Thread lock plus the cross-process file lock that serializes writers."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, op: Dict):
+        with self._exclusive():
+            self._refresh()
+            line = (json.dumps(op, separators=(",", ":")) + "\n").encode("utf-8")
+            with open(self.log_path, "ab") as f:
+                f.write(line)
+            self._apply(op)
+            self._log_offset += len(line)
+            if len(self.delta_lengths) >= max(BM25_COMPACT_MIN_CHUNKS, self.n_base // 5) \
+                    or self.n_base - sum(self.alive[:self.n_base]) > self.n_base // 5:
+                self._compact()
+
+    def upsert_documents(self, chunks: Iterable[Tuple[str, str, str]]):
+        """
+        Replace the indexed chunks of every document that appears in `chunks`.
+
+        Args:
+            chunks: (chunk_id, doc_id, text) for ALL chunks of each document
+        """
+        docs: Dict[str, List] = {}
+        for chunk_id, doc_id, text in chunks:
+            tfs, length = chunk_terms(text)
+            docs.setdefault(str(doc_id), []).append([chunk_id, tfs, length])
+        self.upsert_chunk_terms(docs)
+
+    def upsert_chunk_terms(self, docs: Dict[str, List]):
+        """
+        upsert_documents for chunks already passed through `chunk_terms`, so
+        streaming callers can tokenize as they go and drop the text.
+
+        Args:
+            docs: {doc_id: [[chunk_id, term_freqs, length], ...]} - ALL chunks per document
+        """
+        if docs:
+            self._write({"op": "upsert", "docs": {str(d): c for d, c in docs.items()}})
+
+    def delete_documents(self, doc_ids: List[str]):
+        if doc_ids:
+            self._write({"op": "delete", "docs": [str(d) for d in doc_ids]})
+
+    def clear(self):
+        """Drop the whole index (tenant namespace wiped)."""
+        with self._exclusive():
+            for path in (self.base_path, self.log_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self._reset()
+            self._base_sig = None
+            self._log_offset = 0
+
+    def _compact(self):
+        """Merge base + delta (minus deleted chunks) into a new base; truncate the log."""
+        n_total = len(self.chunk_ids)
+        lengths = self._all_lengths()
+        remap = np.full(n_total, -1, dtype=np.int64)
+        alive_idx = np.flatnonzero(self._alive_mask())
+        remap[alive_idx] = np.arange(len(alive_idx))
+
+        # (term_id, chunk, tf) triplets from the base...
+        term_ids = [np.repeat(np.arange(len(self.vocab), dtype=np.int64), np.diff(self.offsets))]
+        chunks = [self.post_chunks.astype(np.int64)]
+        tfs = [self.post_tfs]
+        # ...and from the delta
+        vocab = dict(self.vocab)
+        for term, postings in self.delta_postings.items():
+            tid = vocab.setdefault(term, len(vocab))
+            arr = np.asarray(postings, dtype=np.int64).reshape(-1, 2)
+            term_ids.append(np.full(len(arr), tid, dtype=np.int64))
+            chunks.append(arr[:, 0])
+            tfs.append(arr[:, 1].astype(np.uint16))
+        term_ids = np.concatenate(term_ids)
+        chunks = remap[np.concatenate(chunks)]
+        tfs = np.concatenate(tfs)
+
+        keep = chunks >= 0
+        term_ids, chunks, tfs = term_ids[keep], chunks[keep], tfs[keep]
+
+        # Drop terms that no longer occur and renumber the vocabulary
+        used = np.unique(term_ids)
+        term_remap = np.full(len(vocab), -1, dtype=np.int64)
+        term_remap[used] = np.arange(len(used))
+        term_ids = term_remap[term_ids]
+        terms_by_id = [None] * len(vocab)
+        for term, tid in vocab.items():
+            terms_by_id[tid] = term
+        terms = np.array([terms_by_id[t] for t in used], dtype=str)
+
+        order = np.lexsort((chunks, term_ids))
+        term_ids, chunks, tfs = term_ids[order], chunks[order], tfs[order]
+        offsets = np.zeros(len(used) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(term_ids, minlength=len(used)))
+
+        tmp_path = self.base_path.with_name(f"base.{os.getpid()}.tmp.npz")
+        np.savez(
+            tmp_path,
+            terms=terms,
+            offsets=offsets,
+            post_chunks=chunks.astype(np.int32),
+            post_tfs=tfs.astype(np.uint16),
+            chunk_ids=np.array([self.chunk_ids[i] for i in alive_idx], dtype=str),
+            chunk_docs=np.array([self.chunk_docs[i] for i in alive_idx], dtype=str),
+            lengths=lengths[alive_idx].astype(np.int32),
+        )
+        os.replace(tmp_path, self.base_path)
+        with open(self.log_path, "wb"):
+            pass
+        self._load_base()
+        self._log_offset = 0
+        print(f"[BM25Index] Compacted {self.directory.name}: {self.n_base} chunks, {len(self.vocab)} terms", flush=True)
+
+    # ----------------------------------------------------------------- search
+
+    def _alive_mask(self) -> np.ndarray:
+        return np.frombuffer(bytes(self.alive), dtype=np.bool_)
+
+    def _all_lengths(self) -> np.ndarray:
+        if not self.delta_lengths:
+            return self.lengths.astype(np.int64)
+        return np.concatenate([self.lengths, np.asarray(self.delta_lengths)]).astype(np.int64)
+
+    def _postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        parts_c, parts_t = [], []
+        tid = self.vocab.get(term)
+        if tid is not None:
+            start, end = self.offsets[tid], self.offsets[tid + 1]
+            parts_c.append(self.post_chunks[start:end].astype(np.int64))
+            parts_t.append(self.post_tfs[start:end].astype(np.float32))
+        delta = self.delta_postings.get(term)
+        if delta:
+            arr = np.asarray(delta, dtype=np.int64).reshape(-1, 2)
+            parts_c.append(arr[:, 0])
+            parts_t.append(arr[:, 1].astype(np.float32))
+        if not parts_c:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        return np.concatenate(parts_c), np.concatenate(parts_t)
+
+    def search(self, query: str, top_k: int = 10) -> List[Dict]:
+        """BM25 top-k: [{'id', 'doc_id', 'bm25_score'}], best first."""
+        with self._lock:
+            self._refresh()
+            alive = self._alive_mask()
+            n_alive = int(alive.sum())
+            if n_alive == 0:
+                return []
+            lengths = self._all_lengths()
+            avgdl = float(lengths[alive].mean()) or 1.0
+            scores = np.zeros(len(self.chunk_ids), dtype=np.float32)
+
+            for term in set(tokenize(query)):
+                chunks, tfs = self._postings(term)
+                if not len(chunks):
+                    continue
+                mask = alive[chunks]
+                chunks, tfs = chunks[mask], tfs[mask]
+                df = len(chunks)
+                if df == 0:
+                    continue
+                idf = math.log(1.0 + (n_alive - df + 0.5) / (df + 0.5))
+                norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths[chunks] / avgdl)
+                np.add.at(scores, chunks, idf * tfs * (BM25_K1 + 1.0) / (tfs + norm))
+
+            candidates = np.flatnonzero(scores > 0)
+            if not len(candidates):
+                return []
+            if len(candidates) > top_k:
+                part = np.argpartition(-scores[candidates], top_k - 1)[:top_k]
+                candidates = candidates[part]
+            candidates = candidates[np.argsort(-scores[candidates])]
+            return [
+                {'id': self.chunk_ids[i], 'doc_id': self.chunk_docs[i], 'bm25_score': float(scores[i])}
+                for i in candidates
+            ]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._refresh()
+            return {
+                "chunks": int(self._alive_mask().sum()),
+                "base_chunks": self.n_base,
+                "delta_chunks": len(self.delta_lengths),
+                "terms": len(self.vocab) + len(set(self.delta_postings) - set(self.vocab)),
+            }
+
+
+# =============================================================================
+# PER-TENANT ACCESS
+# =============================================================================
+
+_indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+_indexes_lock = threading.Lock()
+_SAFE_TENANT_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def get_bm25_index(tenant_id: str) -> BM25Index:
+    """Get the (process-cached) BM25 index for a tenant"""
+    if not tenant_id:
+        raise ValueError("tenant_id is required for multi-tenant isolation")
+    safe_id = _SAFE_TENANT_RE.sub("_", tenant_id)
+    with _indexes_lock:
+        index = _indexes.get(safe_id)
+        if index is None:
+            index = BM25Index(Path(BM25_INDEX_DIR) / safe_id)
+            _indexes[safe_id] = index
+            while len(_indexes) > BM25_INDEX_CACHE_SIZE:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(safe_id)
+        return index
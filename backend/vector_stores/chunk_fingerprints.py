@@ -0,0 +1,183 @@
+"""
+Chunk Fingerprint Store - skip re-embedding unchanged chunk text
+
+Every chunk written to a vector index is recorded as
+(vector_id -> sha256(model | dimensions | normalized text), metadata hash, vector).
+On the next embed of the same documents:
+- same vector_id, same text, same metadata  -> nothing to do
+- same text anywhere in the tenant          -> reuse the stored vector
+- vector_ids that no longer exist           -> delete from the index
+Only genuinely new text is sent to the embeddings API.
+
+Backed by the chunk_fingerprints table (database.models.ChunkFingerprint).
+Writes are flushed inside a SAVEPOINT on the caller's session and never
+committed here - the caller owns the transaction. Fingerprints are a cache:
+any failure rolls back only the savepoint, is logged, and the caller falls
+back to embedding normally.
+"""
+
+import re
+import json
+import hashlib
+import unicodedata
+from typing import Dict, List, Optional, Iterable
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from database.models import ChunkFingerprint
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_IN_CLAUSE_BATCH = 500
+
+
+def normalize_chunk_text(text: str) -> str:
+    """NFC-normalize and collapse whitespace so formatting-only changes still match."""
+    text = unicodedata.normalize("NFC", text or "")
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def chunk_content_hash(text: str, model: str, dimensions: int) -> str:
+    payload = f"{model}|{dimensions}|{normalize_chunk_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8", errors="replace")).hexdigest()
+
+
+def metadata_hash(metadata: Dict) -> str:
+    payload = json.dumps(metadata, sort_keys=True, default=str)
+    return hashlib.md5(payload.encode("utf-8", errors="replace")).hexdigest()
+
+
+def _pack_vector(vector: List[float]) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def _unpack_vector(blob: bytes) -> List[float]:
+    return np.frombuffer(blob, dtype=np.float32).tolist()
+
+
+def _batched(items: List, size: int = _IN_CLAUSE_BATCH) -> Iterable[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class ChunkFingerprintStore:
+    """
+    Per-tenant view over chunk_fingerprints for one vector index.
+
+    Args:
+        db: SQLAlchemy session (writes are flushed, the caller commits)
+        tenant_id: Tenant ID
+        model: Embedding model name (part of the content hash)
+        dimensions: Embedding dimensions (part of the content hash)
+        index_name: Which index the vector IDs belong to ("pinecone" or "local")
+    """
+
+    def __init__(self, db: Session, tenant_id: str, model: str,
+                 dimensions: int = 1536, index_name: str = "pinecone"):
+        self.db = db
+        self.tenant_id = tenant_id
+        self.model = model
+        self.dimensions = dimensions
+        self.index_name = index_name
+
+    def _query(self):
+        return self.db.query(ChunkFingerprint).filter(
+            ChunkFingerprint.tenant_id == self.tenant_id,
+            ChunkFingerprint.index_name == self.index_name,
+        )
+
+    def content_hash(self, text: str) -> str:
+        return chunk_content_hash(text, self.model, self.dimensions)
+
+    def get_for_documents(self, doc_ids: List[str]) -> Dict[str, Dict]:
+        """vector_id -> {content_hash, metadata_hash, document_id} for these documents"""
+        result = {}
+        for batch in _batched(list(set(doc_ids))):
+            rows = self._query().with_entities(
+                ChunkFingerprint.vector_id,
+                ChunkFingerprint.content_hash,
+                ChunkFingerprint.metadata_hash,
+                ChunkFingerprint.document_id,
+            ).filter(ChunkFingerprint.document_id.in_(batch)).all()
+            for row in rows:
+                result[row.vector_id] = {
+                    'content_hash': row.content_hash,
+                    'metadata_hash': row.metadata_hash,
+                    'document_id': row.document_id,
+                }
+        return result
+
+    def vectors_for_hashes(self, hashes: List[str]) -> Dict[str, List[float]]:
+        """content_hash -> stored vector, for any chunk in the tenant with that text"""
+        result = {}
+        for batch in _batched(list(set(hashes))):
+            rows = self._query().with_entities(
+                ChunkFingerprint.content_hash,
+                ChunkFingerprint.embedding,
+            ).filter(
+                ChunkFingerprint.content_hash.in_(batch),
+                ChunkFingerprint.embedding != None,
+            ).all()
+            for row in rows:
+                if row.content_hash not in result:
+                    result[row.content_hash] = _unpack_vector(row.embedding)
+        return result
+
+    def record(self, entries: List[Dict]):
+        """
+        Upsert fingerprints after a successful index write.
+
+        Each entry: vector_id, document_id, chunk_index, content_hash,
+        metadata_hash, embedding (list of floats).
+        """
+        if not entries:
+            return
+        try:
+            with self.db.begin_nested():
+                by_id = {e['vector_id']: e for e in entries}
+                existing = {}
+                for batch in _batched(list(by_id)):
+                    for row in self._query().filter(ChunkFingerprint.vector_id.in_(batch)).all():
+                        existing[row.vector_id] = row
+
+                for vector_id, entry in by_id.items():
+                    row = existing.get(vector_id)
+                    if row is None:
+                        row = ChunkFingerprint(
+                            tenant_id=self.tenant_id,
+                            index_name=self.index_name,
+                            vector_id=vector_id,
+                        )
+                        self.db.add(row)
+                    row.document_id = str(entry['document_id'])
+                    row.chunk_index = entry.get('chunk_index', 0)
+                    row.content_hash = entry['content_hash']
+                    row.metadata_hash = entry.get('metadata_hash')
+                    row.embedding = _pack_vector(entry['embedding'])
+                    row.embedding_model = self.model
+        except Exception as e:
+            print(f"[ChunkFingerprints] Failed to record {len(entries)} fingerprints: {e}", flush=True)
+
+    def delete_vectors(self, vector_ids: List[str]):
+        self._delete(ChunkFingerprint.vector_id, vector_ids)
+
+    def delete_documents(self, doc_ids: List[str]):
+        self._delete(ChunkFingerprint.document_id, [str(d) for d in doc_ids])
+
+    def delete_tenant(self):
+        """Forget every fingerprint for the tenant in this index (namespace wiped)."""
+        try:
+            with self.db.begin_nested():
+                self._query().delete(synchronize_session=False)
+        except Exception as e:
+            print(f"[ChunkFingerprints] Failed to clear tenant {self.tenant_id}: {e}", flush=True)
+
+    def _delete(self, column, values: List[str]):
+        if not values:
+            return
+        try:
+            with self.db.begin_nested():
+                for batch in _batched(list(set(values))):
+                    self._query().filter(column.in_(batch)).delete(synchronize_session=False)
+        except Exception as e:
+            print(f"[ChunkFingerprints] Failed to delete fingerprints: {e}", flush=True)
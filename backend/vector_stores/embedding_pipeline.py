@@ -0,0 +1,316 @@
+"""
+Embedding Pipeline - concurrent, rate-limit-aware batch embedding
+
+Used by PineconeVectorStore._get_embeddings_batch for bulk syncs:
+- One shared, connection-pooled embeddings client per process (the SDK's
+  built-in retries are disabled so this module owns backoff)
+- Inputs packed into sub-batches by estimated token count, not item count
+- A bounded number of sub-batch requests in flight at once; the limit is
+  adaptive (halved on 429, grown back by one after a run of successes)
+- 429 / 503 responses honour retry-after(-ms) headers and pause every worker
+- Failed items are re-queued (split in half on non-rate-limit errors to
+  isolate a bad input); items that still fail come back as None so callers
+  can skip them. Zero vectors are never returned.
+"""
+
+import os
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Tuple
+
+EMBEDDING_DIMENSIONS = 1536
+
+# Azure embeddings accept up to 2048 inputs per request; stay well below the
+# per-request token ceiling so one request never trips the TPM limit alone.
+MAX_BATCH_TOKENS = int(os.getenv("EMBEDDING_MAX_BATCH_TOKENS", "20000"))
+MAX_BATCH_ITEMS = int(os.getenv("EMBEDDING_MAX_BATCH_ITEMS", "256"))
+MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+MAX_ATTEMPTS = int(os.getenv("EMBEDDING_MAX_ATTEMPTS", "6"))
+MAX_BACKOFF_SECONDS = 60.0
+
+_client_lock = threading.Lock()
+_shared_client = None
+_shared_model = None
+
+
+def _get_shared_client() -> Tuple[Any, str]:
+    """
+    One embeddings client per process.
+
+    The openai SDK keeps an httpx connection pool per client instance, so
+    reusing this object gives keep-alive connections across sub-batches.
+    """
+    global _shared_client, _shared_model
+    if _shared_client is not None:
+        return _shared_client, _shared_model
+
+    with _client_lock:
+        if _shared_client is not None:
+            return _shared_client, _shared_model
+        try:
+            import httpx
+            from openai import AzureOpenAI
+            from azure_openai_config import (
+                AZURE_OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT,
+                AZURE_EMBEDDING_DEPLOYMENT, AZURE_EMBEDDING_API_VERSION
+            )
+            _shared_client = AzureOpenAI(
+                api_key=AZURE_OPENAI_API_KEY,
+                api_version=AZURE_EMBEDDING_API_VERSION,
+                azure_endpoint=AZURE_OPENAI_ENDPOINT,
+                max_retries=0,
+                timeout=60.0,
+                http_client=httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONCURRENCY * 2,
+                        max_keepalive_connections=MAX_CONCURRENCY * 2,
+                    ),
+                    timeout=60.0,
+                ),
+            )
+            _shared_model = AZURE_EMBEDDING_DEPLOYMENT
+        except ImportError as e:
+            print(f"[EmbeddingPipeline] Azure config unavailable ({e}), using default OpenAI client", flush=True)
+            from services.openai_client import get_openai_client
+            wrapper = get_openai_client()
+            _shared_client = wrapper.client
+            _shared_model = wrapper.get_embedding_model()
+    return _shared_client, _shared_model
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars/token for English prose)."""
+    return len(text) // 4 + 1
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read retry-after-ms / retry-after from an SDK error's response headers."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+@dataclass
+class _Batch:
+    indices: List[int]
+    attempts: int = 0
+    not_before: float = 0.0  # earliest retry time (set by backoff)
+
+
+@dataclass
+class PipelineStats:
+    requests: int = 0
+    rate_limited: int = 0
+    retries: int = 0
+    failed_items: int = 0
+    embedded_items: int = 0
+    elapsed: float = 0.0
+    peak_concurrency: int = 0
+
+    def to_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+
+class _AdaptiveLimit:
+    """AIMD concurrency limit plus a shared 'pause until' for retry-after."""
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self._successes = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def on_success(self):
+        with self._lock:
+            self._successes += 1
+            if self.limit < self.max_limit and self._successes >= self.limit * 2:
+                self.limit += 1
+                self._successes = 0
+
+    def on_rate_limited(self, retry_after: float):
+        with self._lock:
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+            self._paused_until = max(self._paused_until, time.time() + retry_after)
+
+    def wait_if_paused(self):
+        delay = self._paused_until - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class EmbeddingPipeline:
+    """
+    Embed many texts with bounded concurrency and adaptive rate-limit backoff.
+
+    Usage:
+        vectors = EmbeddingPipeline().embed(texts)   # List[Optional[List[float]]]
+    """
+
+    def __init__(
+        self,
+        client=None,
+        model: Optional[str] = None,
+        dimensions: int = EMBEDDING_DIMENSIONS,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        max_batch_items: int = MAX_BATCH_ITEMS,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        self._client = client
+        self._model = model
+        self.dimensions = dimensions
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_items = max_batch_items
+        self.max_attempts = max_attempts
+        self.last_stats = PipelineStats()
+
+    def _client_and_model(self) -> Tuple[Any, str]:
+        if self._client is not None:
+            return self._client, self._model
+        return _get_shared_client()
+
+    def _pack(self, texts: List[str], indices: List[int]) -> List[_Batch]:
+        """Greedy token-budget packing, preserving input order."""
+        batches = []
+        current, current_tokens = [], 0
+        for i in indices:
+            tokens = estimate_tokens(texts[i])
+            if current and (current_tokens + tokens > self.max_batch_tokens
+                            or len(current) >= self.max_batch_items):
+                batches.append(_Batch(current))
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(_Batch(current))
+        return batches
+
+    def _request(self, texts: List[str], batch: _Batch, limiter: _AdaptiveLimit) -> List[List[float]]:
+        delay = batch.not_before - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        limiter.wait_if_paused()
+        client, model = self._client_and_model()
+        response = client.embeddings.create(
+            model=model,
+            input=[texts[i] for i in batch.indices],
+            dimensions=self.dimensions
+        )
+        data = sorted(response.data, key=lambda d: d.index)
+        if len(data) != len(batch.indices):
+            raise ValueError(f"Expected {len(batch.indices)} embeddings, got {len(data)}")
+        return [d.embedding for d in data]
+
+    def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed texts; result[i] is the vector for texts[i] or None if it failed
+        after max_attempts.
+        """
+        stats = PipelineStats()
+        self.last_stats = stats
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        if not texts:
+            return results
+
+        start = time.time()
+        limiter = _AdaptiveLimit(self.max_concurrency)
+        queue = deque(self._pack(texts, [i for i, t in enumerate(texts)]))
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                thread_name_prefix="embed") as executor:
+            while queue or in_flight:
+                while queue and len(in_flight) < limiter.limit:
+                    batch = queue.popleft()
+                    batch.attempts += 1
+                    stats.requests += 1
+                    future = executor.submit(self._request, texts, batch, limiter)
+                    in_flight[future] = batch
+                    stats.peak_concurrency = max(stats.peak_concurrency, len(in_flight))
+
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = in_flight.pop(future)
+                    try:
+                        vectors = future.result()
+                    except Exception as e:
+                        self._handle_failure(e, batch, queue, limiter, stats)
+                        continue
+                    for i, vector in zip(batch.indices, vectors):
+                        results[i] = vector
+                    stats.embedded_items += len(batch.indices)
+                    limiter.on_success()
+
+        stats.elapsed = time.time() - start
+        if stats.failed_items or stats.rate_limited:
+            print(f"[EmbeddingPipeline] {stats.embedded_items}/{len(texts)} embedded in {stats.requests} requests "
+                  f"({stats.rate_limited} rate-limited, {stats.failed_items} failed, {stats.elapsed:.1f}s)", flush=True)
+        return results
+
+    def _handle_failure(self, error: Exception, batch: _Batch, queue: deque,
+                        limiter: _AdaptiveLimit, stats: PipelineStats):
+        status = _status_code(error)
+        rate_limited = status in (429, 503) or type(error).__name__ == "RateLimitError"
+
+        if rate_limited:
+            stats.rate_limited += 1
+            retry_after = _retry_after_seconds(error)
+            if retry_after is None:
+                retry_after = min(MAX_BACKOFF_SECONDS, (2 ** min(batch.attempts, 6)) + random.random())
+            limiter.on_rate_limited(retry_after)
+            # Rate limiting is not the batch's fault: don't burn its attempts as fast
+            if batch.attempts < self.max_attempts * 2:
+                stats.retries += 1
+                queue.append(batch)
+                return
+        elif len(batch.indices) > 1:
+            # Isolate a poison input by splitting the batch; halving bounds
+            # the number of splits to log2(batch size)
+            stats.retries += 1
+            mid = len(batch.indices) // 2
+            queue.append(_Batch(batch.indices[:mid]))
+            queue.append(_Batch(batch.indices[mid:]))
+            return
+        elif batch.attempts < self.max_attempts:
+            stats.retries += 1
+            batch.not_before = time.time() + min(MAX_BACKOFF_SECONDS, 0.5 * (2 ** (batch.attempts - 1))) + random.random() * 0.25
+            queue.append(batch)
+            return
+
+        stats.failed_items += len(batch.indices)
+        print(f"[EmbeddingPipeline] Giving up on {len(batch.indices)} items after {batch.attempts} attempts: "
+              f"{type(error).__name__}: {error}", flush=True)
+
+
+_pipeline_instance: Optional[EmbeddingPipeline] = None
+
+
+def get_embedding_pipeline() -> EmbeddingPipeline:
+    """Get or create the process-wide EmbeddingPipeline"""
+    global _pipeline_instance
+    if _pipeline_instance is None:
+        _pipeline_instance = EmbeddingPipeline()
+    return _pipeline_instance
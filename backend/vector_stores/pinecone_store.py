@@ -20,9 +20,16 @@ import os
 import re
 import time
 import hashlib
-from typing import List, Dict, Optional, Any, Tuple
+import threading
+import numpy as np
+from typing import List, Dict, Optional, Any, Tuple, Iterable, Iterator
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from services.openai_client import get_openai_client
+from services.embedding_cache import get_cached_embedding, get_cached_embeddings
+from vector_stores.embedding_pipeline import get_embedding_pipeline, estimate_tokens, MAX_BATCH_TOKENS, MAX_CONCURRENCY
+from vector_stores.rank_fusion import reciprocal_rank_fusion
+from services.answer_cache import bump_corpus_version
 
 # Embedding dimensions - using 1536 for compatibility with existing index
 # text-embedding-3-large supports native dimensionality reduction
@@ -33,6 +40,25 @@ EMBEDDING_DIMENSIONS = 1536
 SHARED_CTSI_NAMESPACE = "ctsi-shared"
 SHARED_CTSI_TENANT_ID = "__system__"
 
+# Streaming ingestion: chunks are embedded and upserted in windows of this many
+# tokens (default: enough to keep every embedding worker busy), so memory is
+# bounded by the window rather than the input
+UPSERT_WINDOW_TOKENS = int(os.getenv("UPSERT_WINDOW_TOKENS", str(MAX_BATCH_TOKENS * MAX_CONCURRENCY)))
+
+# Sentence boundary patterns for chunking (ordered by preference)
+SENTENCE_ENDINGS = (
+    '\n\n',  # Paragraph break (highest priority)
+    '.\n',   # Sentence + newline
+    '!\n',   # Exclamation + newline
+    '?\n',   # Question + newline
+    '. ',    # Period + space
+    '! ',    # Exclamation + space
+    '? ',    # Question + space
+    '.\t',   # Period + tab
+    '\n',    # Single newline
+    '; ',    # Semicolon (fallback)
+)
+
 # Pinecone imports
 try:
     from pinecone import Pinecone, ServerlessSpec
@@ -68,7 +94,6 @@ class PineconeVectorStore:
     """
 
     BATCH_SIZE = 200  # Reduced to stay under Pinecone's 4MB limit (was 500, caused 4.3MB batches)
-    EMBEDDING_BATCH_SIZE = 50  # Embed 50 texts per API call (10x faster)
     MAX_RETRIES = 3
     RETRY_DELAY = 1  # seconds
 
@@ -121,19 +146,27 @@ class PineconeVectorStore:
     MAX_EMBEDDING_CHARS = 30000
 
     def _get_embedding(self, text: str) -> List[float]:
-        """Get embedding for single text"""
+        """Get embedding for single text (memoized per chat turn and per process)"""
         if len(text) > self.MAX_EMBEDDING_CHARS:
             print(f"[PineconeVectorStore] WARNING: Text truncated from {len(text)} to {self.MAX_EMBEDDING_CHARS} chars")
             text = text[:self.MAX_EMBEDDING_CHARS]
 
+        return get_cached_embedding(
+            text,
+            dimensions=EMBEDDING_DIMENSIONS,
+            embed_fn=self._embed_uncached,
+            model=self.openai.get_embedding_model()
+        )
+
+    def _embed_uncached(self, text: str, dimensions: int) -> List[float]:
         response = self.openai.create_embedding(
             text=text,
-            dimensions=EMBEDDING_DIMENSIONS
+            dimensions=dimensions
         )
         return response.data[0].embedding
 
-    def _get_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """Get embeddings for multiple texts efficiently"""
+    def _get_embeddings_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Get embeddings for multiple texts efficiently (None for items that failed)"""
         if not texts:
             return []
 
@@ -146,56 +179,14 @@ class PineconeVectorStore:
             else:
                 processed.append(t if t else "")
 
-        # OPTIMIZED: Use REAL batch API calls (not a loop!)
-        embeddings = []
-
-        # Process in sub-batches (Azure OpenAI supports up to 2048 inputs)
-        for i in range(0, len(processed), self.EMBEDDING_BATCH_SIZE):
-            batch = processed[i:i + self.EMBEDDING_BATCH_SIZE]
+        # Concurrent, token-budgeted sub-batches on one pooled client.
+        # Items that still fail after retries come back as None (callers skip
+        # them) - never as zero vectors, which would poison search results.
+        embeddings = get_embedding_pipeline().embed(processed)
 
-            try:
-                from openai import AzureOpenAI
-                from azure_openai_config import (
-                    AZURE_OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT,
-                    AZURE_EMBEDDING_DEPLOYMENT, AZURE_EMBEDDING_API_VERSION
-                )
-
-                client = AzureOpenAI(
-                    api_key=AZURE_OPENAI_API_KEY,
-                    api_version=AZURE_EMBEDDING_API_VERSION,
-                    azure_endpoint=AZURE_OPENAI_ENDPOINT
-                )
-
-                # KEY OPTIMIZATION: Pass list of texts, get all embeddings in ONE API call
-                response = client.embeddings.create(
-                    model=AZURE_EMBEDDING_DEPLOYMENT,
-                    input=batch,  # BATCH INPUT
-                    dimensions=EMBEDDING_DIMENSIONS
-                )
-
-                for item in response.data:
-                    embeddings.append(item.embedding)
-
-            except ImportError as e:
-                print(f"[PineconeVectorStore] Import error (missing azure config): {e}", flush=True)
-                # Fall back to instance client
-                for text in batch:
-                    try:
-                        response = self.openai.create_embedding(text=text, dimensions=EMBEDDING_DIMENSIONS)
-                        embeddings.append(response.data[0].embedding)
-                    except Exception as embed_error:
-                        print(f"[PineconeVectorStore] Fallback embedding failed: {embed_error}", flush=True)
-                        embeddings.append(None)  # Skip instead of inserting zero vectors
-            except Exception as e:
-                print(f"[PineconeVectorStore] Batch embedding error: {type(e).__name__}: {e}", flush=True)
-                # Fall back to individual embeddings
-                for text in batch:
-                    try:
-                        response = self.openai.create_embedding(text=text, dimensions=EMBEDDING_DIMENSIONS)
-                        embeddings.append(response.data[0].embedding)
-                    except Exception as embed_error:
-                        print(f"[PineconeVectorStore] Individual embedding failed: {type(embed_error).__name__}", flush=True)
-                        embeddings.append([0.0] * EMBEDDING_DIMENSIONS)
+        failed = sum(1 for e in embeddings if e is None)
+        if failed:
+            print(f"[PineconeVectorStore] {failed}/{len(processed)} embeddings failed after retries", flush=True)
 
         return embeddings
 
@@ -224,61 +215,55 @@ class PineconeVectorStore:
         Returns:
             List of (chunk_text, chunk_index) tuples
         """
+        return list(self._iter_chunks(text, chunk_size, overlap))
+
+    def _iter_chunks(
+        self,
+        text: str,
+        chunk_size: int = 2000,
+        overlap: int = 400
+    ) -> Iterator[Tuple[str, int]]:
+        """
+        Lazy version of _chunk_text: yields (chunk_text, chunk_index) one at a time.
+
+        Windows are tracked as offsets into `text`: boundaries are searched in
+        place (rfind bounded to the latter half of the window, so no window copy
+        and no scan of the half that could never be used) and each chunk is
+        sliced exactly once, when it is yielded.
+        """
         if not text:
-            return []
+            return
 
-        chunks = []
+        text_len = len(text)
         start = 0
         chunk_idx = 0
         prev_start = -1  # Track previous start to prevent infinite loops
 
-        # Sentence boundary patterns (ordered by preference)
-        sentence_endings = [
-            '\n\n',  # Paragraph break (highest priority)
-            '.\n',   # Sentence + newline
-            '!\n',   # Exclamation + newline
-            '?\n',   # Question + newline
-            '. ',    # Period + space
-            '! ',    # Exclamation + space
-            '? ',    # Question + space
-            '.\t',   # Period + tab
-            '\n',    # Single newline
-            '; ',    # Semicolon (fallback)
-        ]
-
-        while start < len(text):
+        while start < text_len:
             # Prevent infinite loop
             if start == prev_start:
                 start += chunk_size // 2  # Force progress
-                if start >= len(text):
+                if start >= text_len:
                     break
             prev_start = start
 
-            end = min(start + chunk_size, len(text))
-            chunk = text[start:end]
+            end = min(start + chunk_size, text_len)
 
             # If not at end of text, find best sentence boundary
             actual_end = end
-            if end < len(text):
-                best_break = -1
-
-                # Try each boundary type in order of preference
-                for boundary in sentence_endings:
-                    pos = chunk.rfind(boundary)
-                    # Only use if it's in the latter half of the chunk
-                    if pos > chunk_size * 0.5:
-                        best_break = pos + len(boundary)
+            if end < text_len:
+                # Only boundaries in the latter half of the window are used
+                search_from = start + int(chunk_size * 0.5) + 1
+                for boundary in SENTENCE_ENDINGS:
+                    pos = text.rfind(boundary, search_from, end)
+                    if pos >= 0:
+                        actual_end = pos + len(boundary)
                         break
 
-                # Use the boundary if found
-                if best_break > 0:
-                    chunk = chunk[:best_break]
-                    actual_end = start + best_break
-
             # Add chunk if it has content
-            stripped = chunk.strip()
+            stripped = text[start:actual_end].strip()
             if stripped:
-                chunks.append((stripped, chunk_idx))
+                yield stripped, chunk_idx
                 chunk_idx += 1
 
             # Move start position (with overlap, but ensure forward progress)
@@ -287,27 +272,59 @@ class PineconeVectorStore:
                 next_start = actual_end  # Force forward progress
             start = next_start
 
-        return chunks
+    def _build_vector_metadata(self, chunk: Dict) -> Dict:
+        """Pinecone metadata for a chunk (Pinecone has 40KB limit per vector)"""
+        metadata = {
+            'doc_id': chunk['doc_id'],
+            'chunk_idx': chunk['chunk_idx'],
+            'tenant_id': chunk['tenant_id'],  # Critical for isolation
+            'title': chunk['title'][:200] if chunk['title'] else '',
+            'content_preview': chunk['content'][:2000],  # Full chunk for RAG context
+        }
+
+        # Add custom metadata (with size limits)
+        for k, v in chunk.get('metadata', {}).items():
+            if isinstance(v, (str, int, float, bool)) and len(str(v)) < 500:
+                metadata[k] = v
+        return metadata
 
     def embed_and_upsert_documents(
         self,
-        documents: List[Dict],
+        documents: Iterable[Dict],
         tenant_id: str,
         namespace: Optional[str] = None,
         chunk_size: int = 2000,
         chunk_overlap: int = 400,
-        show_progress: bool = True
+        show_progress: bool = True,
+        fingerprint_store=None,
+        force_upsert: bool = False,
+        sparse_index=None
     ) -> Dict:
         """
-        Chunk, embed, and upsert documents to Pinecone.
+        Chunk, embed, and upsert documents to Pinecone as a stream.
+
+        Chunks are produced lazily and processed in windows of at most BATCH_SIZE
+        chunks / UPSERT_WINDOW_TOKENS tokens. Each window is fingerprint-checked,
+        embedded, then upserted in the background while the next window is
+        embedded; at most one upsert is in flight, so peak memory follows the
+        window size rather than the size of the input.
 
         Args:
-            documents: List of dicts with 'id', 'content', 'title', and optional 'metadata'
+            documents: Iterable (list or generator) of dicts with 'id', 'content',
+                'title', and optional 'metadata'
             tenant_id: Tenant ID for isolation (REQUIRED)
             namespace: Optional namespace override (defaults to tenant_id)
             chunk_size: Characters per chunk
             chunk_overlap: Overlap between chunks
             show_progress: Print progress updates
+            fingerprint_store: Optional ChunkFingerprintStore. When given, chunks whose
+                text is unchanged are not re-embedded, identical text elsewhere in the
+                tenant reuses its stored vector, and chunks that no longer exist are
+                deleted from the index.
+            force_upsert: Write every chunk to Pinecone even if its fingerprint is
+                unchanged (stored vectors are still reused instead of re-embedding)
+            sparse_index: Optional BM25Index for the tenant; every chunk of these
+                documents is (re)indexed under the same vector ID
 
         Returns:
             Stats about the operation
@@ -318,108 +335,275 @@ class PineconeVectorStore:
         # Use tenant_id as namespace if not specified
         ns = namespace or tenant_id
 
-        total_docs = len(documents)
-        total_chunks = 0
-        upserted = 0
+        doc_ids: List[str] = []  # every document seen, filled in as the stream is consumed
+        stats = {'total_chunks': 0, 'upserted': 0, 'unchanged': 0, 'reused': 0}
         errors = []
+        # Previous fingerprints of the documents seen so far; entries are popped as
+        # their chunks reappear, so whatever is left at the end is stale
+        previous_fingerprints: Dict[str, Dict] = {}
+        fingerprinted_docs = set()
+        sparse_pending: Dict[str, List] = {}  # BM25 terms of documents still being chunked
+        chunked_docs = set()
 
-        print(f"[PineconeVectorStore] Processing {total_docs} documents for tenant {tenant_id}")
+        print(f"[PineconeVectorStore] Streaming documents for tenant {tenant_id}")
 
-        # Prepare all chunks first
-        all_chunks = []
-        for doc in documents:
-            doc_id = str(doc.get('id', ''))
-            content = doc.get('content', '')
-            title = doc.get('title', '')
-            metadata = doc.get('metadata', {})
+        upserter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pinecone-upsert")
+        in_flight = None
 
-            if not content:
-                continue
+        def finish_upsert():
+            # Backpressure: wait for the previous window's upsert before starting another
+            future, window_start, fingerprints = in_flight
+            try:
+                stats['upserted'] += future.result()
+                if fingerprints:
+                    fingerprint_store.record(fingerprints)
+                if show_progress:
+                    print(f"[PineconeVectorStore] Upserted {stats['upserted']}/{stats['total_chunks']} chunks...")
+            except Exception as e:
+                errors.append({'batch': window_start, 'error': str(e)})
+                print(f"[PineconeVectorStore] Failed batch {window_start}: {e}")
 
-            # Chunk the document
-            chunks = self._chunk_text(content, chunk_size, chunk_overlap)
+        try:
+            chunks = self._iter_document_chunks(documents, tenant_id, chunk_size, chunk_overlap, doc_ids)
+            for window in self._iter_windows(chunks):
+                window_start = stats['total_chunks']
+                stats['total_chunks'] += len(window)
+                chunked_docs.update(c['doc_id'] for c in window)
 
-            for chunk_text, chunk_idx in chunks:
-                all_chunks.append({
-                    'doc_id': doc_id,
-                    'chunk_idx': chunk_idx,
-                    'content': chunk_text,
-                    'title': title,
-                    'metadata': metadata,
-                    'tenant_id': tenant_id  # Always include tenant_id
-                })
+                if sparse_index is not None:
+                    try:
+                        self._buffer_sparse_terms(window, sparse_pending)
+                        # Every document but the one still being chunked is complete
+                        current_doc = window[-1]['doc_id']
+                        sparse_index.upsert_chunk_terms(
+                            {d: sparse_pending.pop(d) for d in list(sparse_pending) if d != current_doc}
+                        )
+                    except Exception as e:
+                        print(f"[PineconeVectorStore] BM25 indexing failed (dense upsert continues): {e}", flush=True)
+                        sparse_index = None
+
+                if fingerprint_store is not None:
+                    window = self._diff_window_fingerprints(
+                        window, fingerprint_store, previous_fingerprints, fingerprinted_docs,
+                        force_upsert, stats
+                    )
 
-        total_chunks = len(all_chunks)
-        print(f"[PineconeVectorStore] Created {total_chunks} chunks from {total_docs} documents")
+                try:
+                    vectors, fingerprints = self._embed_window(window, fingerprint_store)
+                except Exception as e:
+                    errors.append({'batch': window_start, 'error': str(e)})
+                    print(f"[PineconeVectorStore] Failed batch {window_start}: {e}")
+                    continue
 
-        # Process in batches
-        for i in range(0, total_chunks, self.BATCH_SIZE):
-            batch = all_chunks[i:i + self.BATCH_SIZE]
+                if in_flight is not None:
+                    finish_upsert()
+                in_flight = (upserter.submit(self._upsert_with_retry, vectors, ns), window_start, fingerprints)
 
-            for retry in range(self.MAX_RETRIES):
-                try:
-                    # Get embeddings for batch
-                    texts = [chunk['content'] for chunk in batch]
-                    embeddings = self._get_embeddings_batch(texts)
-
-                    # Prepare vectors (skip chunks with failed embeddings)
-                    vectors = []
-                    for chunk, embedding in zip(batch, embeddings):
-                        if embedding is None:
-                            print(f"[PineconeVectorStore] Skipping chunk {chunk['doc_id']}:{chunk['chunk_idx']} - embedding failed", flush=True)
-                            continue
-                        vector_id = self._generate_vector_id(chunk['doc_id'], chunk['chunk_idx'])
-
-                        # Prepare metadata (Pinecone has 40KB limit per vector)
-                        metadata = {
-                            'doc_id': chunk['doc_id'],
-                            'chunk_idx': chunk['chunk_idx'],
-                            'tenant_id': chunk['tenant_id'],  # Critical for isolation
-                            'title': chunk['title'][:200] if chunk['title'] else '',
-                            'content_preview': chunk['content'][:2000],  # Full chunk for RAG context
-                        }
-
-                        # Add custom metadata (with size limits)
-                        for k, v in chunk.get('metadata', {}).items():
-                            if isinstance(v, (str, int, float, bool)) and len(str(v)) < 500:
-                                metadata[k] = v
-
-                        vectors.append({
-                            'id': vector_id,
-                            'values': embedding,
-                            'metadata': metadata
-                        })
-
-                    # Upsert to Pinecone (handles duplicates automatically)
-                    self.index.upsert(vectors=vectors, namespace=ns)
-                    upserted += len(vectors)
-
-                    if show_progress:
-                        print(f"[PineconeVectorStore] Upserted {upserted}/{total_chunks} chunks...")
-
-                    break  # Success, exit retry loop
+            if in_flight is not None:
+                finish_upsert()
+        finally:
+            upserter.shutdown(wait=True)
 
-                except Exception as e:
-                    if retry < self.MAX_RETRIES - 1:
-                        print(f"[PineconeVectorStore] Retry {retry + 1} after error: {e}")
-                        time.sleep(self.RETRY_DELAY * (retry + 1))
-                    else:
-                        errors.append({'batch': i, 'error': str(e)})
-                        print(f"[PineconeVectorStore] Failed batch {i}: {e}")
+        total_docs = len(doc_ids)
+        if sparse_index is not None:
+            try:
+                sparse_index.upsert_chunk_terms(sparse_pending)
+                sparse_index.delete_documents([d for d in doc_ids if d not in chunked_docs])
+            except Exception as e:
+                print(f"[PineconeVectorStore] BM25 indexing failed (dense upsert continues): {e}", flush=True)
 
+        # Chunks that existed before but not anymore (document shrank or emptied)
+        stale_deleted = 0
+        if fingerprint_store is not None:
+            try:
+                unseen = [d for d in doc_ids if d not in fingerprinted_docs]
+                if unseen:
+                    previous_fingerprints.update(fingerprint_store.get_for_documents(unseen))
+                stale_ids = list(previous_fingerprints)
+                if stale_ids:
+                    for j in range(0, len(stale_ids), 1000):
+                        self.index.delete(ids=stale_ids[j:j + 1000], namespace=ns)
+                    fingerprint_store.delete_vectors(stale_ids)
+                    stale_deleted = len(stale_ids)
+            except Exception as e:
+                print(f"[PineconeVectorStore] Stale chunk cleanup failed: {e}", flush=True)
+            print(f"[PineconeVectorStore] Fingerprints: {stats['unchanged']} unchanged, {stats['reused']} reused, "
+                  f"{stale_deleted} stale deleted", flush=True)
+
+        upserted, total_chunks, unchanged = stats['upserted'], stats['total_chunks'], stats['unchanged']
         result = {
             'success': len(errors) == 0,
             'total_documents': total_docs,
             'total_chunks': total_chunks,
             'upserted': upserted,
+            'unchanged': unchanged,
+            'reused_embeddings': stats['reused'],
+            'stale_deleted': stale_deleted,
             'errors': errors,
             'namespace': ns,
             'tenant_id': tenant_id
         }
 
-        print(f"[PineconeVectorStore] Complete: {upserted}/{total_chunks} chunks upserted")
+        if upserted or stale_deleted:
+            bump_corpus_version(tenant_id)
+
+        print(f"[PineconeVectorStore] Complete: {upserted}/{total_chunks} chunks from {total_docs} documents upserted"
+              + (f", {unchanged} unchanged" if unchanged else ""))
         return result
 
+    def _iter_document_chunks(
+        self,
+        documents: Iterable[Dict],
+        tenant_id: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        doc_ids: List[str]
+    ) -> Iterator[Dict]:
+        """Chunk dicts for each document, lazily and in order; appends every document ID to `doc_ids`."""
+        for doc in documents:
+            doc_id = str(doc.get('id', ''))
+            doc_ids.append(doc_id)
+            content = doc.get('content', '')
+            if not content:
+                continue
+
+            title = doc.get('title', '')
+            metadata = doc.get('metadata', {})
+            for chunk_text, chunk_idx in self._iter_chunks(content, chunk_size, chunk_overlap):
+                yield {
+                    'doc_id': doc_id,
+                    'chunk_idx': chunk_idx,
+                    'content': chunk_text,
+                    'title': title,
+                    'metadata': metadata,
+                    'tenant_id': tenant_id  # Always include tenant_id
+                }
+
+    def _iter_windows(self, chunks: Iterator[Dict]) -> Iterator[List[Dict]]:
+        """Group chunks into windows of at most BATCH_SIZE chunks and UPSERT_WINDOW_TOKENS tokens."""
+        window = []
+        window_tokens = 0
+        for chunk in chunks:
+            tokens = estimate_tokens(chunk['content'])
+            if window and (len(window) >= self.BATCH_SIZE or window_tokens + tokens > UPSERT_WINDOW_TOKENS):
+                yield window
+                window = []
+                window_tokens = 0
+            window.append(chunk)
+            window_tokens += tokens
+        if window:
+            yield window
+
+    def _buffer_sparse_terms(self, window: List[Dict], pending: Dict[str, List]):
+        """Tokenize a window for BM25 now, so only term counts outlive it."""
+        from vector_stores.bm25_index import chunk_terms
+        for chunk in window:
+            tfs, length = chunk_terms(f"{chunk['title'] or ''}\n{chunk['content']}")
+            pending.setdefault(chunk['doc_id'], []).append(
+                [self._generate_vector_id(chunk['doc_id'], chunk['chunk_idx']), tfs, length]
+            )
+
+    def _diff_window_fingerprints(
+        self,
+        window: List[Dict],
+        fingerprint_store,
+        previous: Dict[str, Dict],
+        fingerprinted_docs: set,
+        force_upsert: bool,
+        stats: Dict
+    ) -> List[Dict]:
+        """Drop unchanged chunks from a window and attach reusable stored vectors to the rest."""
+        from vector_stores.chunk_fingerprints import metadata_hash
+        try:
+            new_docs = list(dict.fromkeys(c['doc_id'] for c in window if c['doc_id'] not in fingerprinted_docs))
+            if new_docs:
+                previous.update(fingerprint_store.get_for_documents(new_docs))
+                fingerprinted_docs.update(new_docs)
+
+            pending = []
+            unchanged = 0
+            for chunk in window:
+                vector_id = self._generate_vector_id(chunk['doc_id'], chunk['chunk_idx'])
+                chunk['vector_id'] = vector_id
+                chunk['vector_metadata'] = self._build_vector_metadata(chunk)
+                chunk['content_hash'] = fingerprint_store.content_hash(chunk['content'])
+                chunk['metadata_hash'] = metadata_hash(chunk['vector_metadata'])
+
+                prior = previous.pop(vector_id, None)
+                if (not force_upsert and prior
+                        and prior['content_hash'] == chunk['content_hash']
+                        and prior['metadata_hash'] == chunk['metadata_hash']):
+                    unchanged += 1
+                    continue
+                pending.append(chunk)
+
+            reused = 0
+            stored = fingerprint_store.vectors_for_hashes([c['content_hash'] for c in pending])
+            for chunk in pending:
+                vector = stored.get(chunk['content_hash'])
+                if vector is not None:
+                    chunk['embedding'] = vector
+                    reused += 1
+
+            stats['unchanged'] += unchanged
+            stats['reused'] += reused
+            return pending
+        except Exception as e:
+            print(f"[PineconeVectorStore] Fingerprint check failed, embedding window: {e}", flush=True)
+            for chunk in window:
+                chunk.pop('embedding', None)
+                chunk.pop('content_hash', None)
+            return window
+
+    def _embed_window(self, window: List[Dict], fingerprint_store=None) -> Tuple[List[Dict], List[Dict]]:
+        """Embed a window (only chunks without a reusable vector) into Pinecone vectors + fingerprint rows."""
+        to_embed = [chunk for chunk in window if chunk.get('embedding') is None]
+        if to_embed:
+            new_embeddings = self._get_embeddings_batch([chunk['content'] for chunk in to_embed])
+            for chunk, embedding in zip(to_embed, new_embeddings):
+                chunk['embedding'] = embedding
+
+        # Prepare vectors (skip chunks with failed embeddings)
+        vectors = []
+        fingerprints = []
+        for chunk in window:
+            embedding = chunk.get('embedding')
+            if embedding is None:
+                print(f"[PineconeVectorStore] Skipping chunk {chunk['doc_id']}:{chunk['chunk_idx']} - embedding failed", flush=True)
+                continue
+            vector_id = chunk.get('vector_id') or self._generate_vector_id(chunk['doc_id'], chunk['chunk_idx'])
+            metadata = chunk.get('vector_metadata') or self._build_vector_metadata(chunk)
+
+            vectors.append({
+                'id': vector_id,
+                'values': embedding,
+                'metadata': metadata
+            })
+            if fingerprint_store is not None and chunk.get('content_hash'):
+                fingerprints.append({
+                    'vector_id': vector_id,
+                    'document_id': chunk['doc_id'],
+                    'chunk_index': chunk['chunk_idx'],
+                    'content_hash': chunk['content_hash'],
+                    'metadata_hash': chunk['metadata_hash'],
+                    'embedding': embedding,
+                })
+        return vectors, fingerprints
+
+    def _upsert_with_retry(self, vectors: List[Dict], namespace: str) -> int:
+        """Upsert one window to Pinecone (handles duplicates automatically); returns the count."""
+        if not vectors:
+            return 0
+        for retry in range(self.MAX_RETRIES):
+            try:
+                self.index.upsert(vectors=vectors, namespace=namespace)
+                return len(vectors)
+            except Exception as e:
+                if retry == self.MAX_RETRIES - 1:
+                    raise
+                print(f"[PineconeVectorStore] Retry {retry + 1} after error: {e}")
+                time.sleep(self.RETRY_DELAY * (retry + 1))
+
     def search(
         self,
         query: str,
@@ -509,6 +693,7 @@ class PineconeVectorStore:
 
         try:
             self.index.delete(delete_all=True, namespace=ns)
+            bump_corpus_version(tenant_id)
             print(f"[PineconeVectorStore] Deleted all data for tenant {tenant_id}", flush=True)
             return True
         except ValueError as e:
@@ -542,6 +727,7 @@ class PineconeVectorStore:
                 batch = vector_ids[i:i + batch_size]
                 self.index.delete(ids=batch, namespace=ns)
 
+            bump_corpus_version(tenant_id)
             print(f"[PineconeVectorStore] Deleted {len(doc_ids)} documents for tenant {tenant_id}")
             return True
         except ValueError as e:
@@ -579,6 +765,28 @@ class PineconeVectorStore:
         """Public wrapper around _get_embedding for external callers."""
         return self._get_embedding(query)
 
+    def get_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed several queries with ONE embeddings call.
+
+        Vectors land in the per-turn embedding memo, so later search() calls
+        for the same strings do not hit the API again.
+        """
+        texts = [q[:self.MAX_EMBEDDING_CHARS] for q in queries]
+        return get_cached_embeddings(
+            texts,
+            dimensions=EMBEDDING_DIMENSIONS,
+            embed_batch_fn=self._embed_batch_uncached,
+            model=self.openai.get_embedding_model()
+        )
+
+    def _embed_batch_uncached(self, texts: List[str], dimensions: int) -> List[List[float]]:
+        response = self.openai.create_embedding(
+            text=texts,
+            dimensions=dimensions
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
     def search_shared_namespace(
         self,
         query_embedding: List[float],
@@ -634,12 +842,21 @@ class HybridPineconeStore(PineconeVectorStore):
     """
     Extended Pinecone store with hybrid search capabilities.
     Combines dense (semantic) and sparse (keyword) retrieval.
+
+    Sparse retrieval is a per-tenant BM25 index (vector_stores/bm25_index.py)
+    maintained by EmbeddingService alongside the Pinecone upserts. Both
+    retrievals run concurrently and are fused with reciprocal-rank fusion, so
+    exact-term matches dense search missed (gene names, catalog numbers,
+    protocol IDs) can still surface.
     """
 
+    SPARSE_TIMEOUT = 3.0
+
     def __init__(self, config: Optional[PineconeConfig] = None):
         super().__init__(config)
-        self.sparse_weight = 0.3
-        self.dense_weight = 0.7
+        # Reciprocal-rank fusion weights per result list
+        self.sparse_weight = 1.0
+        self.dense_weight = 1.0
 
     def hybrid_search(
         self,
@@ -652,39 +869,129 @@ class HybridPineconeStore(PineconeVectorStore):
         dense_weight: Optional[float] = None
     ) -> List[Dict]:
         """
-        Hybrid search combining semantic and keyword matching.
+        Hybrid search: Pinecone dense search and BM25 in parallel, RRF-fused.
 
-        Uses keyword boosting on top of semantic search results.
+        Dense hits keep their cosine 'score'. BM25-only hits are fetched from
+        Pinecone (so content and tenant checks are identical to dense hits)
+        and scored by cosine against the query embedding.
         """
-        sw = sparse_weight or self.sparse_weight
-        dw = dense_weight or self.dense_weight
+        from vector_stores.bm25_index import get_bm25_index
+
+        sw = sparse_weight if sparse_weight is not None else self.sparse_weight
+        dw = dense_weight if dense_weight is not None else self.dense_weight
 
-        # Get semantic results (fetch more for reranking)
+        sparse_future = _get_sparse_pool().submit(
+            lambda: get_bm25_index(tenant_id).search(query, top_k=top_k * 2)
+        )
         semantic_results = self.search(query, tenant_id, namespace, top_k * 2, filter)
 
-        # Boost results that contain query keywords
-        query_terms = set(query.lower().split())
+        try:
+            sparse_hits = sparse_future.result(timeout=self.SPARSE_TIMEOUT)
+        except Exception as e:
+            print(f"[HybridPineconeStore] BM25 search skipped: {type(e).__name__}: {e}", flush=True)
+            sparse_hits = []
 
         for result in semantic_results:
-            content_lower = result.get('content', '').lower()
-            title_lower = result.get('title', '').lower()
+            result['semantic_score'] = result['score']
+        if not sparse_hits:
+            return semantic_results[:top_k]
+
+        known = {r['id']: r for r in semantic_results}
+        known.update(self._fetch_results(
+            [hit['id'] for hit in sparse_hits if hit['id'] not in known],
+            tenant_id, query, filter
+        ))
+        sparse_results = []
+        for hit in sparse_hits:
+            result = known.get(hit['id'])
+            if result is not None:
+                result['bm25_score'] = hit['bm25_score']
+                sparse_results.append(result)
+
+        fused = reciprocal_rank_fusion([semantic_results, sparse_results], weights=[dw, sw])
+        return fused[:top_k]
+
+    def _fetch_results(self, vector_ids: List[str], tenant_id: str, query: str,
+                       filter: Optional[Dict]) -> Dict[str, Dict]:
+        """Fetch BM25-only hits from Pinecone, formatted like search() results."""
+        if not vector_ids:
+            return {}
+        try:
+            response = self.index.fetch(ids=vector_ids, namespace=tenant_id)
+        except Exception as e:
+            print(f"[HybridPineconeStore] Fetch of {len(vector_ids)} BM25 hits failed: {e}", flush=True)
+            return {}
+
+        query_vec = np.asarray(self._get_embedding(query), dtype=np.float32)
+        query_vec /= (np.linalg.norm(query_vec) + 1e-8)
+        results = {}
+        for vector_id, vector in (getattr(response, 'vectors', None) or {}).items():
+            metadata = dict(getattr(vector, 'metadata', None) or {})
+            # SECURITY: same tenant check as search()
+            if metadata.get('tenant_id', '') != tenant_id:
+                continue
+            if filter and not _matches_filter(metadata, filter):
+                continue
+            values = np.asarray(getattr(vector, 'values', None) or [], dtype=np.float32)
+            score = float(values @ query_vec / (np.linalg.norm(values) + 1e-8)) if len(values) else 0.0
+            results[vector_id] = {
+                'id': vector_id,
+                'score': score,
+                'semantic_score': score,
+                'doc_id': metadata.get('doc_id', ''),
+                'chunk_idx': metadata.get('chunk_idx', 0),
+                'title': metadata.get('title', ''),
+                'content': metadata.get('content_preview', ''),
+                'metadata': {k: v for k, v in metadata.items()
+                             if k not in ['doc_id', 'chunk_idx', 'content_preview', 'tenant_id', 'title']}
+            }
+        return results
 
-            # Count keyword matches in content and title
-            content_matches = sum(1 for term in query_terms if term in content_lower)
-            title_matches = sum(1 for term in query_terms if term in title_lower)
 
-            # Title matches weighted higher
-            keyword_boost = min((content_matches * 0.05) + (title_matches * 0.15), 0.3)
+def _matches_filter(metadata: Dict, filter: Dict) -> bool:
+    """
+    Client-side check of a Pinecone metadata filter ($eq, $ne, $in, $nin,
+    $and, $or, bare equality). Unknown operators do not match, so sparse
+    hits can never widen a filtered search.
+    """
+    for key, condition in filter.items():
+        if key == '$and':
+            if not all(_matches_filter(metadata, f) for f in condition):
+                return False
+        elif key == '$or':
+            if not any(_matches_filter(metadata, f) for f in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, expected in condition.items():
+                if op == '$eq' and value != expected:
+                    return False
+                elif op == '$ne' and value == expected:
+                    return False
+                elif op == '$in' and value not in expected:
+                    return False
+                elif op == '$nin' and value in expected:
+                    return False
+                elif op not in ('$eq', '$ne', '$in', '$nin'):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
 
-            # Combine scores
-            result['semantic_score'] = result['score']
-            result['keyword_boost'] = keyword_boost
-            result['score'] = (dw * result['score']) + (sw * keyword_boost)
 
-        # Re-sort by combined score
-        semantic_results.sort(key=lambda x: x['score'], reverse=True)
+_sparse_pool = None
+_sparse_pool_lock = threading.Lock()
+
 
-        return semantic_results[:top_k]
+def _get_sparse_pool():
+    """Small pool for BM25 lookups (separate from the retrieval pool that calls hybrid_search)"""
+    global _sparse_pool
+    if _sparse_pool is None:
+        with _sparse_pool_lock:
+            if _sparse_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _sparse_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='bm25')
+    return _sparse_pool
 
 
 # Singleton instance for easy access
@@ -0,0 +1,52 @@
+"""
+Reciprocal-rank fusion of ranked result lists.
+
+Shared by HybridPineconeStore (dense + BM25) and EnhancedSearchService
+(sub-query fan-out). Kept free of service imports so the storage layer can
+use it without pulling in the search stack.
+"""
+
+from typing import Dict, List, Optional
+
+# Standard RRF damping constant (Cormack et al.)
+RRF_K = 60
+
+
+def result_key(result: Dict) -> str:
+    return result.get('id') or result.get('doc_id') or result.get('metadata', {}).get('doc_id', '')
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict]], k: int = RRF_K,
+                           weights: Optional[List[float]] = None) -> List[Dict]:
+    """
+    Merge ranked result lists with reciprocal-rank fusion.
+
+    score(d) = sum over lists of w_list / (k + rank_d) (w = 1 unless weights
+    are given). Each fused result keeps its best original 'score' (downstream
+    thresholds are cosine-based) and gets an 'rrf_score'. Results without any
+    ID cannot be matched and are appended as-is.
+    """
+    fused: Dict[str, Dict] = {}
+    rrf_scores: Dict[str, float] = {}
+    unkeyed = []
+
+    for list_idx, results in enumerate(result_lists):
+        weight = weights[list_idx] if weights else 1.0
+        for rank, result in enumerate(results):
+            key = result_key(result)
+            if not key:
+                unkeyed.append(result)
+                continue
+            rrf_scores[key] = rrf_scores.get(key, 0.0) + weight / (k + rank + 1)
+            existing = fused.get(key)
+            if existing is None:
+                fused[key] = dict(result)
+            elif result.get('score', 0) > existing.get('score', 0):
+                existing['score'] = result.get('score', 0)
+
+    merged = []
+    for key, result in fused.items():
+        result['rrf_score'] = rrf_scores[key]
+        merged.append(result)
+    merged.sort(key=lambda r: r['rrf_score'], reverse=True)
+    return merged + unkeyed